@@ -0,0 +1,56 @@
+"""卡圖雜湊索引在 ~13k 張卡圖中比對一張照片的延遲
+
+索引以隨機指紋填滿 (不需要下載卡圖)，照片為隨機產生的卡片大小圖片
+
+Usage
+-----
+    cd backend
+    python -m benchmarks.artwork_lookup --cards 13000 --repeat 200
+"""
+
+# standard library
+import argparse
+import time
+
+# 3rd party library
+import numpy as np
+from PIL import Image
+
+# local module
+from src.image.artwork_index import ArtworkIndex, artwork_fingerprint, crop_artwork
+from src.utils.metrics import LatencyRecorder
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=13000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    index = ArtworkIndex(
+        np.arange(args.cards, dtype=np.int64),
+        rng.integers(0, 2**64, size=(args.cards, 4), dtype=np.uint64),
+    )
+    card = Image.fromarray(rng.integers(0, 256, size=(860, 590), dtype=np.uint8))
+    query = artwork_fingerprint(crop_artwork(card))
+
+    # 只算 Hamming 距離 (NumPy 向量化) / 含切圖與計算指紋的完整比對
+    distance_latency, match_latency = LatencyRecorder(), LatencyRecorder()
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        np.bitwise_count(index.fingerprints ^ query).sum(axis=1, dtype=np.int32)
+        distance_latency.record(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        index.match(card, max_distance=40, min_margin=16)
+        match_latency.record(time.perf_counter() - start)
+
+    print(f"{'step':<12}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for name, latency in (("distance", distance_latency), ("match", match_latency)):
+        summary = latency.summary()
+        print(f"{name:<12}{summary['p50'] * 1000:>12.3f}{summary['p99'] * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
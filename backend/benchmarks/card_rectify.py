@@ -0,0 +1,75 @@
+"""OCR 前影像前處理 (找出卡片、透視校正、切出效果框) 的延遲與送出的圖片大小
+
+照片為隨機產生的卡片斜放在手機照片大小 (預設 4032 x 3024) 的桌面上
+
+Usage
+-----
+    cd backend
+    python -m benchmarks.card_rectify --repeat 20
+"""
+
+# standard library
+import argparse
+import io
+import time
+
+# 3rd party library
+import numpy as np
+from PIL import Image, ImageDraw
+
+# local module
+from src.image.card_geometry import perspective_transform, rectify_card
+from src.utils.metrics import LatencyRecorder
+
+
+def make_photo(width: int, height: int) -> bytes:
+    """產生卡片斜放在桌面上的 JPEG 照片"""
+    rng = np.random.default_rng(0)
+    card = Image.new("RGB", (590, 860), (200, 150, 80))
+    draw = ImageDraw.Draw(card)
+    for _ in range(30):
+        x, y, r = int(rng.integers(0, 590)), int(rng.integers(0, 860)), int(rng.integers(20, 120))
+        draw.ellipse(
+            (x - r, y - r, x + r, y + r), fill=tuple(int(c) for c in rng.integers(0, 255, 3))
+        )
+
+    # 卡片約佔照片高度的 70%，傾斜且有透視變形
+    quad = np.array([[0.32, 0.12], [0.66, 0.17], [0.63, 0.86], [0.26, 0.80]]) * (width, height)
+    corners = np.array([[0, 0], [590, 0], [590, 860], [0, 860]], dtype=np.float64)
+    homography = perspective_transform(quad, corners)
+    homography /= homography[2, 2]
+    warped = card.convert("RGBA").transform(
+        (width, height), Image.Transform.PERSPECTIVE, tuple(homography.ravel()[:8])
+    )
+
+    photo = Image.new("RGB", (width, height), (60, 70, 60))
+    photo.paste(warped, (0, 0), warped)
+    buffer = io.BytesIO()
+    photo.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, nargs=2, default=[4032, 3024])
+    parser.add_argument("--width", type=int, default=1000, help="校正後卡片的寬度")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    photo = make_photo(*args.size)
+    latency = LatencyRecorder()
+    text_box = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        text_box = rectify_card(photo, width=args.width)
+        latency.record(time.perf_counter() - start)
+
+    assert text_box is not None, "no card detected"
+    summary = latency.summary()
+    print(f"photo:    {len(photo) / 1024:>8.1f} KB  {args.size[0]} x {args.size[1]}")
+    print(f"text box: {len(text_box) / 1024:>8.1f} KB  {Image.open(io.BytesIO(text_box)).size}")
+    print(f"latency:  p50 {summary['p50'] * 1000:.1f} ms, p99 {summary['p99'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""比較各模型精度在 CPU 上的載入時間、常駐記憶體與單筆延遲
+
+每種精度在獨立的子行程中量測，避免前一個模型的記憶體影響 RSS
+
+Usage
+-----
+    cd backend
+    python -m benchmarks.cpu_precision --precisions fp32 int8 bf16 --repeat 3
+"""
+
+# standard library
+import argparse
+import json
+import subprocess
+import sys
+
+# local module
+from benchmarks.samples import CARD_TEXTS
+
+
+def measure(precision: str, repeat: int) -> dict:
+    """載入指定精度的模型並翻譯範例文字，回傳 `YugiohTranslator.stats()`"""
+    # 延遲 import，讓父行程不必載入 torch
+    from src.card.translator import YugiohTranslator
+    from src.utils.log import getDummyLogger
+
+    translator = YugiohTranslator(logger=getDummyLogger(), precision=precision)
+    for _ in range(repeat):
+        for text in CARD_TEXTS:
+            translator.translate(text)
+    return translator.stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--precisions", nargs="+", default=["fp32", "int8", "bf16"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.repeat)))
+        return
+
+    print(f"{'precision':<10}{'load (s)':>10}{'RSS (MB)':>10}{'p50 (s)':>10}{'p95 (s)':>10}")
+    for precision in args.precisions:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.cpu_precision", "--child", precision]
+            + ["--repeat", str(args.repeat)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        stats = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{stats['precision']:<10}"
+            f"{stats['load_seconds']:>10.1f}"
+            f"{(stats['resident_memory_bytes'] or 0) / 2**20:>10.0f}"
+            f"{stats['latency']['p50']:>10.3f}"
+            f"{stats['latency']['p95']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""比較各 decoding profile 的延遲與吞吐量
+
+需先將翻譯模型放到 `src/model` (見 doc/tech-doc.md)
+
+Usage
+-----
+    cd backend
+    python -m benchmarks.decoding_profiles --profiles greedy beam-4 sampling --repeat 3
+"""
+
+# standard library
+import argparse
+import statistics
+import time
+
+# local module
+from benchmarks.samples import CARD_TEXTS
+from src.card.translator import YugiohTranslator, decoding_kwargs
+from src.utils.log import getDummyLogger
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=["greedy", "beam-4", "sampling"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    translator = YugiohTranslator(logger=getDummyLogger())
+    tokenizer = translator._tokenizer
+
+    # 暖機 (CUDA kernel、記憶體配置)
+    translator.translate(CARD_TEXTS[0])
+
+    print(f"{'profile':<12}{'p50 (s)':>10}{'max (s)':>10}{'tokens/s':>12}")
+    for profile in args.profiles:
+        translator._generate_kwargs = decoding_kwargs(profile)
+
+        latencies: list[float] = []
+        generated_tokens = 0
+        for _ in range(args.repeat):
+            for text in CARD_TEXTS:
+                start = time.perf_counter()
+                translated_text = translator.translate(text)
+                latencies.append(time.perf_counter() - start)
+                generated_tokens += len(tokenizer(translated_text)["input_ids"])
+
+        print(
+            f"{profile:<12}"
+            f"{statistics.median(latencies):>10.3f}"
+            f"{max(latencies):>10.3f}"
+            f"{generated_tokens / sum(latencies):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""比較舊的字串規則 (`_filter_text`) 與版面解析 (`parse_card_layout`) 送進翻譯模型的 token 數
+
+OCR fixture 為 Azure Read API (v3.2) 回傳格式的 JSON (`benchmarks/ocr_fixtures`)；
+有翻譯模型 (`src/model`) 時以模型的 tokenizer 計算 token 數，否則以字元數代替
+
+Usage
+-----
+    cd backend
+    python -m benchmarks.ocr_layout_tokens
+"""
+
+# standard library
+import argparse
+import json
+import os
+from collections.abc import Callable
+
+# local module
+from src.card.card_layout import OcrLine, parse_card_layout
+from src.card.text_extractor import OcrTextExtractor
+from src.constants import PATH
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "ocr_fixtures")
+
+
+def load_fixture(path: str) -> list[OcrLine]:
+    """讀取 Azure Read API 回傳的 JSON，轉成帶 bounding box 的每行文字"""
+    with open(path, encoding="utf-8") as file:
+        read_result = json.load(file)
+    return [
+        OcrLine(line["text"], line.get("boundingBox"))
+        for text_result in read_result["analyzeResult"]["readResults"]
+        for line in text_result["lines"]
+    ]
+
+
+def token_counter(model_dir: str) -> tuple[str, Callable[[str], int]]:
+    """有翻譯模型時以其 tokenizer 計算 token 數，否則以字元數代替"""
+    if not os.path.isfile(os.path.join(model_dir, "config.json")):
+        return "chars", len
+
+    # 3rd party library
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir, trust_remote_code=True)
+    return "tokens", lambda text: len(tokenizer(text)["input_ids"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture-dir", default=FIXTURE_DIR)
+    parser.add_argument("--model-dir", default=PATH.MODEL_DIR.value)
+    parser.add_argument("--verbose", action="store_true", help="印出送進模型的文字")
+    args = parser.parse_args()
+
+    unit, count = token_counter(args.model_dir)
+    total_before = total_after = 0
+
+    print(f"{'fixture':<28}{f'before ({unit})':>16}{f'after ({unit})':>16}")
+    for filename in sorted(os.listdir(args.fixture_dir)):
+        if not filename.endswith(".json"):
+            continue
+        lines = load_fixture(os.path.join(args.fixture_dir, filename))
+        before = OcrTextExtractor._filter_text(lines)
+        layout = parse_card_layout(lines)
+        after = layout.effect_text if layout is not None else before
+
+        total_before += count(before)
+        total_after += count(after)
+        print(f"{filename.removesuffix('.json'):<28}{count(before):>16}{count(after):>16}")
+        if args.verbose:
+            print(f"  before: {before}\n  after:  {after}")
+
+    print(f"{'total':<28}{total_before:>16}{total_after:>16}")
+
+
+if __name__ == "__main__":
+    main()
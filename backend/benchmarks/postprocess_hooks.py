@@ -0,0 +1,121 @@
+"""翻譯後處理 hook：逐個 hook 掃描 vs 編譯合併後 (`PostprocessHooks`) 的延遲
+
+以基準測試的卡片效果文字 (標點改成半形，模擬模型輸出) 串接成長文字，
+套用標點標準化、全形數字、術語替換 (17 個詞) 與空白正規化 4 個 hook
+
+Usage
+-----
+    cd backend
+    python -m benchmarks.postprocess_hooks --copies 20 --repeat 2000
+"""
+
+# standard library
+import argparse
+import re
+import time
+from collections.abc import Callable
+
+# local module
+from benchmarks.samples import CARD_TEXTS
+from src.card.postprocess import CharMap, PostprocessHooks, RegexReplace, Replace
+from src.card.translation_pipeline import PUNCTUATION_MAP
+from src.utils.metrics import LatencyRecorder
+
+FULLWIDTH_DIGITS = CharMap({chr(ord("０") + i): str(i) for i in range(10)})
+# 術語對照 (模擬整理模型輸出用詞的詞彙表)
+GLOSSARY = Replace(
+    {
+        "エクストラデッキ": "額外牌組",
+        "デッキ": "牌組",
+        "手札": "手牌",
+        "フィールド": "場上",
+        "モンスター": "怪獸",
+        "カード": "卡",
+        "ドロー": "抽牌",
+        "ターン": "回合",
+        "メインフェイズ": "主要階段",
+        "破壊": "破壞",
+        "発動": "發動",
+        "効果": "效果",
+        "対象": "對象",
+        "無効": "無效",
+        "戦闘": "戰鬥",
+        "自分": "自己",
+        "相手": "對方",
+    }
+)
+COLLAPSE_SPACES = RegexReplace(r"\s{2,}", " ")
+
+
+def legacy_normalize_punctuation(text: str) -> str:
+    """舊版的標點標準化 (每次重建 dict，逐字元串接)"""
+    norm_map = {":": "：", ";": "；", "!": "！", "?": "？", ",": "，", ".": "。"}
+    return "".join(norm_map.get(char, char) for char in text)
+
+
+def sequential_hooks() -> list[Callable[[str], str]]:
+    """每個 hook 各掃描一次 (術語依序 `str.replace`，較長的先替換)"""
+    digits = dict(FULLWIDTH_DIGITS.mapping)
+    terms = sorted(GLOSSARY.replacements.items(), key=lambda item: len(item[0]), reverse=True)
+    spaces = re.compile(str(COLLAPSE_SPACES.pattern))
+
+    def replace_terms(text: str) -> str:
+        for key, value in terms:
+            text = text.replace(key, value)
+        return text
+
+    return [
+        legacy_normalize_punctuation,
+        lambda text: "".join(digits.get(char, char) for char in text),
+        replace_terms,
+        lambda text: spaces.sub(str(COLLAPSE_SPACES.repl), text),
+    ]
+
+
+def fused_hooks() -> PostprocessHooks:
+    hooks = PostprocessHooks()
+    for hook in (PUNCTUATION_MAP, FULLWIDTH_DIGITS, GLOSSARY, COLLAPSE_SPACES):
+        hooks.add(hook)
+    return hooks
+
+
+def measure(apply: Callable[[str], str], text: str, repeat: int) -> LatencyRecorder:
+    latency = LatencyRecorder()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        apply(text)
+        latency.record(time.perf_counter() - start)
+    return latency
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=20, help="效果文字串接幾份")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    # 模型輸出常見的半形標點、全形數字與多餘空白
+    sample = "  ".join(CARD_TEXTS).replace("。", ".").replace("、", ",").replace("1", "１")
+    text = sample * args.copies
+
+    sequential = sequential_hooks()
+
+    def apply_sequential(text: str) -> str:
+        for hook in sequential:
+            text = hook(text)
+        return text
+
+    fused = fused_hooks()
+    assert apply_sequential(text) == fused(text), "fused hooks must match sequential hooks"
+
+    print(f"text: {len(text)} chars, hooks: {len(fused)}, fused passes: {len(fused.passes)}")
+    results = {}
+    for name, apply in (("sequential", apply_sequential), ("fused", fused)):
+        summary = measure(apply, text, args.repeat).summary()
+        results[name] = summary["p50"]
+        print(f"{name:<12}p50 {summary['p50'] * 1e6:>9.1f} us  p99 {summary['p99'] * 1e6:>9.1f} us")
+    print(f"speedup:    {results['sequential'] / results['fused']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""比較 worker 各自載入模型與 pre-fork 共用模型時，每個 worker 的記憶體
+
+- independent：每個 worker (spawn) 各自載入一份模型 (等同每個 worker 各自 `create_app()`)
+- prefork：master 載入一次模型後 fork 出 worker (等同 `python -m src.serve`)
+
+所有 worker 都完成一次推論且同時存活時才量測。
+RSS 會把共用分頁重複計入每個 worker，PSS (共用分頁依共用行程數均分) 加總才是實際佔用
+
+Usage
+-----
+    cd backend
+    python -m benchmarks.prefork_memory --workers 3
+    python -m benchmarks.prefork_memory --workers 3 --synthetic
+
+    --synthetic：沒有模型權重時，改用 mt5-small 形狀的隨機權重量測
+"""
+
+# standard library
+import argparse
+import gc
+import multiprocessing
+import os
+from multiprocessing.synchronize import Barrier
+from queue import Queue
+
+# 3rd party library
+import torch
+from transformers import MT5Config, MT5ForConditionalGeneration
+
+# local module
+from src.constants import PATH
+from src.utils.metrics import proportional_set_size_bytes, resident_memory_bytes
+
+# pre-fork 模式下由 master 載入，fork 後 worker 直接沿用
+_MODEL: MT5ForConditionalGeneration | None = None
+
+
+def load_model(synthetic: bool) -> MT5ForConditionalGeneration:
+    """載入翻譯模型 (synthetic 時改用 mt5-small 形狀的隨機權重)"""
+    if synthetic:
+        config = MT5Config(
+            vocab_size=250112,
+            d_model=512,
+            d_kv=64,
+            d_ff=1024,
+            num_layers=8,
+            num_heads=6,
+            decoder_start_token_id=0,
+        )
+        return MT5ForConditionalGeneration(config).eval()
+    return MT5ForConditionalGeneration.from_pretrained(
+        PATH.MODEL_DIR.value, revision="defualt_0321-0402"
+    ).eval()
+
+
+def worker(synthetic: bool, threads: int, barrier: Barrier, results: "Queue[dict]") -> None:
+    """推論一次後，等所有 worker 都就緒再量測記憶體"""
+    torch.set_num_threads(threads)
+    model = _MODEL if _MODEL is not None else load_model(synthetic)
+    with torch.inference_mode():
+        model.generate(input_ids=torch.arange(2, 66).unsqueeze(0), max_new_tokens=16)
+
+    barrier.wait()
+    results.put(
+        {
+            "pid": os.getpid(),
+            "rss": resident_memory_bytes() or 0,
+            "pss": proportional_set_size_bytes() or 0,
+        }
+    )
+    # 量測完之前不能結束，否則共用分頁的 PSS 會重新分配
+    barrier.wait()
+
+
+def measure(mode: str, workers: int, synthetic: bool, threads: int) -> tuple[list[dict], int]:
+    """啟動 worker 並收集每個 worker 的 RSS / PSS，以及 master 的 PSS"""
+    global _MODEL
+    if mode == "prefork":
+        torch.set_num_threads(1)
+        _MODEL = load_model(synthetic)
+        gc.freeze()
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context("spawn")
+
+    # master 也參與 barrier，才能在 worker 存活時量測 master 自己的 PSS
+    # (worker 若被 OOM killer 結束，等待逾時後會拋出 BrokenBarrierError，不會一直卡住)
+    barrier = context.Barrier(workers + 1, timeout=600)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(synthetic, threads, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    master_pss = proportional_set_size_bytes() or 0
+    stats = [results.get() for _ in processes]
+    barrier.wait()
+    for process in processes:
+        process.join()
+
+    _MODEL = None
+    gc.unfreeze()
+    return stats, master_pss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--modes", nargs="+", default=["independent", "prefork"])
+    parser.add_argument("--synthetic", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'worker RSS (MB)':>18}{'worker PSS (MB)':>18}{'total PSS (MB)':>18}")
+    for mode in args.modes:
+        stats, master_pss = measure(mode, args.workers, args.synthetic, args.threads_per_worker)
+        rss = sum(stat["rss"] for stat in stats) / len(stats)
+        pss = sum(stat["pss"] for stat in stats) / len(stats)
+        total = sum(stat["pss"] for stat in stats) + master_pss
+        print(f"{mode:<12}{rss / 2**20:>18.0f}{pss / 2**20:>18.0f}{total / 2**20:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
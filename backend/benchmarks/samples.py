@@ -0,0 +1,18 @@
+# 基準測試用的卡片效果文字 (長短不一)
+CARD_TEXTS: list[str] = [
+    "このカードは通常召喚できない。",
+    "①：このカードが召喚に成功した時に発動できる。デッキからカードを1枚ドローする。",
+    "このカード名の①②の効果はそれぞれ1ターンに1度しか使用できない。"
+    "①：自分フィールドにモンスターが存在しない場合、このカードは手札から特殊召喚できる。"
+    "②：このカードが墓地へ送られた場合に発動できる。"
+    "デッキから「ブラック・マジシャン」1体を手札に加える。",
+    "①：相手がモンスターの効果を発動した時、自分の墓地のカード1枚を除外して発動できる。"
+    "その発動を無効にし破壊する。",
+    "①：1ターンに1度、自分メインフェイズに発動できる。"
+    "自分の手札・フィールドから、融合モンスターカードによって決められた融合素材モンスターを"
+    "墓地へ送り、その融合モンスター1体をエクストラデッキから融合召喚する。"
+    "②：このカードがフィールドから離れた場合に発動できる。"
+    "相手フィールドのカードを1枚選んで破壊する。"
+    "③：このカードが戦闘で破壊された時、自分の墓地のモンスター1体を対象として発動できる。"
+    "そのモンスターを特殊召喚する。",
+]
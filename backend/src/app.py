@@ -0,0 +1,913 @@
+# standard library
+import io
+import json
+import logging
+import math
+import os
+import queue
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any, BinaryIO
+
+# 3rd party library
+from dotenv import load_dotenv
+from flask import (
+    Flask,
+    Request,
+    Response,
+    current_app,
+    g,
+    jsonify,
+    request,
+    send_file,
+    send_from_directory,
+    stream_with_context,
+    url_for,
+)
+from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+# load environment variable
+load_dotenv()
+
+# local module
+from src.card.batching_translator import BatchingTranslator  # noqa: E402
+from src.card.card_recognizer import ArtworkCardRecognizer  # noqa: E402
+from src.card.card_rectifier import CardRectifier, RectifiedTextExtractor  # noqa: E402
+from src.card.ocr_cache import CachedTextExtractor, OcrResultCache  # noqa: E402
+from src.card.text_extractor import (  # noqa: E402
+    AbstractTextExtractor,
+    AsyncOcrTextExtractor,
+    OcrTextExtractor,
+)
+from src.card.translation_cache import CachedTranslator, TranslationCache  # noqa: E402
+from src.card.translation_jobs import (  # noqa: E402
+    JOB_FAILED,
+    JOB_SUCCEEDED,
+    TranslationJob,
+    TranslationJobQueue,
+)
+from src.card.translation_pipeline import (  # noqa: E402
+    PUNCTUATION_MAP,
+    BatchTranslation,
+    PipelineEvent,
+    TranslationPipeline,
+)
+from src.card.translator import AbstractTranslator, YugiohTranslator  # noqa: E402
+from src.config import DEFAULT_CONFIG  # noqa: E402
+from src.constants import PATH  # noqa: E402
+from src.image.artwork_index import ArtworkIndex, photo_artwork_fingerprint  # noqa: E402
+from src.image.card_geometry import rectify_card  # noqa: E402
+from src.image.card_image import CardImage  # noqa: E402
+from src.image.upload_normalizer import NormalizedUpload, UploadNormalizer  # noqa: E402
+from src.shared_types import FrontCardData  # noqa: E402
+from src.utils.admission import (  # noqa: E402
+    AdmissionController,
+    AdmissionRejectedError,
+    AdmissionTicket,
+)
+from src.utils.background_loader import BackgroundLoader  # noqa: E402
+from src.utils.deadline import Deadline, DeadlineExceededError  # noqa: E402
+from src.utils.event_loop import EventLoopThread  # noqa: E402
+from src.utils.process_pool import LazyProcessPool  # noqa: E402
+from src.utils.stage_executor import StageExecutor  # noqa: E402
+
+# 需要翻譯模型的 API (模型就緒前回 503)
+_MODEL_ENDPOINTS = frozenset(
+    {"translate_api", "translate_stream_api", "translate_batch_api", "create_translation_job_api"}
+)
+
+# 觀看非同步翻譯工作時，最多幾秒沒有新事件就結束串流 (client 可重新連線，事件會從頭重播)
+_JOB_WATCH_TIMEOUT = 60.0
+
+
+class _InMemoryUploadRequest(Request):
+    """上傳的檔案一律留在記憶體 (werkzeug 預設超過 500 KB 就寫入暫存檔)
+
+    上傳大小由 `MAX_CONTENT_LENGTH` 限制，超過時回傳 413
+    """
+
+    def _get_file_stream(
+        self,
+        total_content_length: int | None,
+        content_type: str | None,
+        filename: str | None = None,
+        content_length: int | None = None,
+    ) -> BinaryIO:
+        return io.BytesIO()
+
+
+def create_app(config: Mapping[str, Any] | None = None) -> Flask:
+    """創建 Flask app，並初始化所有依賴
+
+    Parameters
+    ----------
+    config : Mapping[str, Any] | None, optional
+        覆寫 `DEFAULT_CONFIG` 與環境變數的設定
+    """
+    # app
+    app = Flask(__name__)
+    app.request_class = _InMemoryUploadRequest
+    CORS(app)
+
+    # 設定 (預設值 → `FLASK_` 環境變數 → 參數)
+    app.config.from_mapping(DEFAULT_CONFIG)
+    app.config.from_prefixed_env()
+    app.config.from_mapping(config)
+
+    # 設定日誌
+    logger = app.logger
+    logger.setLevel(logging.DEBUG)
+
+    # app.config
+    app.config["TRANSLATOR"] = None
+    app.config["TRANSLATION_PIPELINE"] = None
+    app.config["TRANSLATION_CACHE"] = None
+    app.config["OCR_CACHE"] = None
+    app.config["LOGGER"] = logger
+
+    # OCR 與非同步翻譯工作共用的 event loop (HTTP client 屬於同一個 event loop)
+    app.config["EVENT_LOOP"] = (
+        EventLoopThread("ocr-event-loop") if app.config["OCR_ASYNC"] else None
+    )
+
+    # 上傳圖片正規化 (轉正、縮小、重新壓縮；在有上限的行程池中執行)
+    app.config["UPLOAD_NORMALIZER"] = _create_upload_normalizer(app.config, logger)
+
+    # 准入控制 (速率限制、同時執行數與排隊上限)
+    _setup_admission_control(app)
+
+    # 翻譯管線 (背景載入) 與健康檢查 API
+    _setup_model_loading(app)
+
+    # 批次翻譯 API
+    _setup_batch_translation(app)
+
+    # 非同步翻譯工作 API
+    _setup_translation_jobs(app)
+
+    @app.route("/api/translate", methods=["POST"])
+    def translate_api() -> Response | tuple[Response, int]:
+        """翻譯 API"""
+
+        if "image" not in request.files:
+            return jsonify({"success": False, "errMessage": "No image file provided"}), 400
+
+        # 翻譯圖片 (正規化後的圖片 bytes 直接送 OCR，不存檔也不轉存圖床)
+        deadline = _admit_request()
+        upload = _read_upload()
+        pipeline: TranslationPipeline = app.config["TRANSLATION_PIPELINE"]
+        translated_text = pipeline.process(upload.image_bytes, deadline=deadline)
+
+        # 產出 FrontCardData
+        front_card_data: FrontCardData = {"description": translated_text}
+
+        response = jsonify({"success": True, "frontCardData": front_card_data})
+        response.headers["X-Upload-Bytes-Saved"] = str(upload.bytes_saved)
+        return response
+
+    @app.route("/api/translate/stream", methods=["POST"])
+    def translate_stream_api() -> Response | tuple[Response, int]:
+        """串流翻譯 API (Server-Sent Events)
+
+        依序推送 `stage` (uploaded / ocr_done)、`extracted`、`token`，
+        最後以 `done` 推送完整翻譯 (失敗時推送 `error`)
+        """
+
+        if "image" not in request.files:
+            return jsonify({"success": False, "errMessage": "No image file provided"}), 400
+
+        # 翻譯圖片 (邊翻譯邊推送；串流結束才歸還執行名額)
+        deadline = _admit_request()
+        upload = _read_upload()
+        pipeline: TranslationPipeline = app.config["TRANSLATION_PIPELINE"]
+        events = _stream_translation(pipeline, upload.image_bytes, logger, deadline)
+
+        return Response(
+            stream_with_context(events),
+            mimetype="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+                "X-Upload-Bytes-Saved": str(upload.bytes_saved),
+            },
+        )
+
+    @app.route("/api/question", methods=["POST"])
+    def question_api() -> Response | tuple[Response, int]:
+        """問答 API"""
+        if not request.data:
+            return jsonify({"success": False, "errMessage": "No question text provided"}), 400
+
+        question_text = request.data.decode("utf-8")
+
+        return jsonify(
+            {
+                "success": True,
+                "answer": f"嗯...我知道你問了「{question_text}」，但拍謝，問答功能還在開發中噢！",
+            }
+        )
+
+    @app.route("/api/assets/card-material/<path:filepath>")
+    def serve_card_material(filepath: str) -> Response | tuple[Response, int]:
+        """卡片材質 API"""
+        return send_from_directory(PATH.YUGIOH_MATERIAL_DIR.value, filepath)
+
+    @app.route("/api/assets/card-image/<image_id>")
+    def serve_card_image(image_id: str) -> Response | tuple[Response, int]:
+        """卡面圖片 API"""
+        logger: logging.Logger = app.config["LOGGER"]
+        card_image = CardImage(image_id, logger=logger)
+
+        # 如果圖片不存在就下載
+        if not card_image.exists_locally():
+            card_image.download()
+
+        return send_file(card_image.local_path)
+
+    return app
+
+
+def _setup_model_loading(app: Flask) -> None:
+    """載入翻譯管線，並註冊存活 / 就緒檢查 API
+
+    模型載入很久，預設在背景載入，讓 app 先開始接受連線；
+    載入完成 (含暖機) 前，需要模型的 API 一律回 503 + Retry-After
+
+    Parameters
+    ----------
+    app : Flask
+        Flask app
+    """
+    model_loader = BackgroundLoader(
+        lambda: _load_translation_pipeline(app), logger=app.logger, name="translation pipeline"
+    )
+    app.config["MODEL_LOADER"] = model_loader
+    if app.config["MODEL_BACKGROUND_LOADING"]:
+        model_loader.start()
+    else:
+        model_loader.load()
+    app.before_request(_reject_until_model_ready)
+
+    @app.route("/healthz")
+    def healthz() -> Response:
+        """存活檢查 (process 可以回應即可)"""
+        return jsonify({"status": "ok"})
+
+    @app.route("/readyz")
+    def readyz() -> Response | tuple[Response, int, dict[str, str]]:
+        """就緒檢查 (模型已載入並暖機)"""
+        if model_loader.ready:
+            return jsonify({"status": "ready", "loadSeconds": model_loader.load_seconds})
+        return _model_unavailable_response(model_loader)
+
+    @app.route("/metrics")
+    def metrics() -> Response:
+        """各階段的佇列深度、執行時間與快取命中數 (用來調整各階段的大小)"""
+        return jsonify(_collect_metrics(app.config))
+
+
+def _collect_metrics(config: Mapping[str, Any]) -> dict[str, Any]:
+    """收集翻譯模型與翻譯管線 (模型就緒後)、上傳圖片正規化與快取的統計"""
+    components = {
+        "translator": config["TRANSLATOR"],
+        "pipeline": config["TRANSLATION_PIPELINE"],
+        "uploadNormalizer": config["UPLOAD_NORMALIZER"],
+        "translationCache": config["TRANSLATION_CACHE"],
+        "ocrCache": config["OCR_CACHE"],
+        "translationJobs": config["TRANSLATION_JOBS"],
+        "admission": config["ADMISSION_CONTROLLER"],
+    }
+    return {
+        name: component.stats() for name, component in components.items() if component is not None
+    }
+
+
+def _setup_admission_control(app: Flask) -> None:
+    """建立准入控制，並註冊拒絕請求與請求逾時的回應
+
+    翻譯 API 在開始處理前呼叫 `_admit_request` 取得執行名額與請求期限，
+    回應送完 (含串流結束) 時歸還名額；超過期限時回 504
+
+    Parameters
+    ----------
+    app : Flask
+        Flask app
+    """
+    # 反向代理後以 X-Forwarded-For 還原 client IP (只信任設定的代理層數，client 無法偽造)
+    if app.config["PROXY_FIX_X_FOR"] > 0:
+        app.wsgi_app = ProxyFix(  # type: ignore[method-assign]
+            app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"]
+        )
+
+    admission: AdmissionController | None = None
+    if app.config["ADMISSION_MAX_IN_FLIGHT"] > 0:
+        admission = AdmissionController(
+            max_in_flight=app.config["ADMISSION_MAX_IN_FLIGHT"],
+            max_queue_size=app.config["ADMISSION_MAX_QUEUE_SIZE"],
+            rate=app.config["ADMISSION_RATE"],
+            burst=app.config["ADMISSION_BURST"],
+        )
+    app.config["ADMISSION_CONTROLLER"] = admission
+
+    @app.errorhandler(AdmissionRejectedError)
+    def admission_rejected(error: AdmissionRejectedError) -> tuple[Response, int, dict[str, str]]:
+        """超過速率限制 (429) 或伺服器忙碌 (503)"""
+        return (
+            jsonify({"success": False, "errMessage": error.reason}),
+            error.status,
+            {"Retry-After": str(max(1, math.ceil(error.retry_after)))},
+        )
+
+    @app.errorhandler(DeadlineExceededError)
+    def deadline_exceeded(_: DeadlineExceededError) -> tuple[Response, int]:
+        """翻譯超過請求期限 (已停止尚未完成的 OCR 輪詢與推論)"""
+        return jsonify({"success": False, "errMessage": "Translation timed out"}), 504
+
+    @app.after_request
+    def release_admission_on_close(response: Response) -> Response:
+        """回應送完 (含串流結束或 client 中斷連線) 時歸還執行名額"""
+        ticket: AdmissionTicket | None = g.pop("admission_ticket", None)
+        if ticket is not None:
+            response.call_on_close(ticket.release)
+        return response
+
+    @app.teardown_request
+    def release_admission(_: BaseException | None) -> None:
+        """處理請求時拋出例外 (不會執行 after_request) 時歸還執行名額"""
+        ticket: AdmissionTicket | None = g.pop("admission_ticket", None)
+        if ticket is not None:
+            ticket.release()
+
+
+def _admit_request(cost: float = 1.0) -> Deadline:
+    """取得執行名額 (請求結束時歸還；未啟用准入控制時不限制)
+
+    Parameters
+    ----------
+    cost : float, optional
+        消耗幾個速率限制的 token (例如批次翻譯的圖片數)
+
+    Returns
+    -------
+    Deadline
+        請求的期限 (從抵達時開始計算，含排隊等待名額的時間)，交給翻譯管線
+
+    Raises
+    ------
+    AdmissionRejectedError
+        超過速率限制，或排隊時間會超過請求期限
+    """
+    timeout = _request_timeout()
+    deadline = Deadline(timeout)
+    admission: AdmissionController | None = current_app.config["ADMISSION_CONTROLLER"]
+    if admission is not None:
+        g.admission_ticket = admission.admit(_client_id(), timeout=timeout, cost=cost)
+    return deadline
+
+
+def _client_id() -> str:
+    """速率限制的 client 識別 (部署在反向代理後時，以 `PROXY_FIX_X_FOR` 還原 client IP)"""
+    return request.remote_addr or "unknown"
+
+
+def _request_timeout() -> float:
+    """請求期限 (秒)：預設為 `REQUEST_TIMEOUT`，client 可用 `X-Request-Timeout` header 縮短"""
+    timeout: float = current_app.config["REQUEST_TIMEOUT"]
+    requested = request.headers.get("X-Request-Timeout", type=float)
+    if requested is not None and 0 < requested < timeout:
+        return requested
+    return timeout
+
+
+def _setup_batch_translation(app: Flask) -> None:
+    """註冊批次翻譯 API
+
+    一次上傳整副牌組的卡片圖片，每張翻譯完成時立即以一行 NDJSON 回傳
+
+    Parameters
+    ----------
+    app : Flask
+        Flask app
+    """
+
+    @app.route("/api/translate/batch", methods=["POST"])
+    def translate_batch_api() -> Response | tuple[Response, int]:
+        """批次翻譯 API (NDJSON 串流，完成順序)"""
+        request.max_content_length = app.config["TRANSLATE_BATCH_MAX_CONTENT_LENGTH"]
+        files = request.files.getlist("images")
+        if not files:
+            return jsonify({"success": False, "errMessage": "No image file provided"}), 400
+        if len(files) > app.config["TRANSLATE_BATCH_MAX_IMAGES"]:
+            return jsonify({"success": False, "errMessage": "Too many images"}), 400
+
+        deadline = _admit_request(cost=len(files))
+        filenames = [file.filename or "" for file in files]
+        images = [file.read() for file in files]
+        pipeline: TranslationPipeline = app.config["TRANSLATION_PIPELINE"]
+        results = pipeline.process_batch(
+            images,
+            max_workers=app.config["TRANSLATE_BATCH_WORKERS"],
+            prepare=_upload_preparer(app.config["UPLOAD_NORMALIZER"]),
+            deadline=deadline,
+        )
+        lines = _format_batch_results(results, filenames, app.logger)
+
+        return Response(
+            stream_with_context(lines),
+            mimetype="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
+def _upload_preparer(
+    upload_normalizer: UploadNormalizer | None,
+) -> Callable[[bytes], bytes] | None:
+    """批次翻譯時，在各張圖片的 worker 中正規化上傳圖片 (未啟用正規化時為 None)"""
+    if upload_normalizer is None:
+        return None
+
+    def prepare(image_bytes: bytes) -> bytes:
+        return upload_normalizer.normalize(image_bytes).image_bytes
+
+    return prepare
+
+
+def _format_batch_results(
+    results: Iterator[BatchTranslation], filenames: list[str], logger: logging.Logger
+) -> Iterator[str]:
+    """將批次翻譯結果轉成 NDJSON (每張圖片一行)
+
+    Parameters
+    ----------
+    results : Iterator[BatchTranslation]
+        批次翻譯結果
+    filenames : list[str]
+        上傳的檔名 (依上傳順序)
+    logger : logging.Logger
+        日誌 logger
+
+    Yields
+    ------
+    str
+        一行 JSON
+    """
+    for result in results:
+        body: dict[str, Any] = {"index": result.index, "filename": filenames[result.index]}
+        if result.error is None:
+            front_card_data: FrontCardData = {"description": result.translated_text or ""}
+            body.update({"success": True, "frontCardData": front_card_data})
+        else:
+            logger.error(
+                "[translate_batch_api] - translation failed: %s",
+                filenames[result.index],
+                exc_info=result.error,
+            )
+            body.update({"success": False, "errMessage": "Translation failed"})
+        yield json.dumps(body, ensure_ascii=False) + "\n"
+
+
+def _setup_translation_jobs(app: Flask) -> None:
+    """註冊非同步翻譯工作 API
+
+    上傳圖片後立即回傳工作 ID，翻譯在有上限的佇列中執行；
+    client 之後以工作 ID 查詢 (或以 Server-Sent Events 觀看) 狀態與結果，
+    不必為了等待翻譯一直佔住連線。
+    工作只保存在建立它的行程的記憶體中：多個 worker 共用同一個 listening socket 時，
+    查詢會被分到其他 worker 而找不到工作，因此 `TRANSLATION_JOBS_ENABLED` 為否時不註冊這些 API
+
+    Parameters
+    ----------
+    app : Flask
+        Flask app
+    """
+    app.config["TRANSLATION_JOBS"] = None
+    if not app.config["TRANSLATION_JOBS_ENABLED"]:
+        app.logger.info("[create_app] - translation jobs disabled")
+        return
+
+    translation_jobs = TranslationJobQueue(
+        logger=app.logger,
+        max_workers=app.config["TRANSLATION_JOB_WORKERS"],
+        max_queue_size=app.config["TRANSLATION_JOB_QUEUE_SIZE"],
+        ttl=app.config["TRANSLATION_JOB_TTL"],
+        timeout=app.config["TRANSLATION_JOB_TIMEOUT"],
+        event_loop=app.config["EVENT_LOOP"],
+        max_in_flight=app.config["TRANSLATION_JOB_MAX_IN_FLIGHT"],
+    )
+    app.config["TRANSLATION_JOBS"] = translation_jobs
+
+    @app.route("/api/translate/jobs", methods=["POST"])
+    def create_translation_job_api() -> tuple[Response, int, dict[str, str]]:
+        """建立非同步翻譯工作 API"""
+        if "image" not in request.files:
+            return jsonify({"success": False, "errMessage": "No image file provided"}), 400, {}
+
+        # 工作在自己有上限的佇列中排隊，這裡只做速率限制
+        admission: AdmissionController | None = app.config["ADMISSION_CONTROLLER"]
+        if admission is not None:
+            admission.limit_rate(_client_id())
+
+        upload = _read_upload()
+        pipeline: TranslationPipeline = app.config["TRANSLATION_PIPELINE"]
+        try:
+            job = _submit_translation_job(translation_jobs, pipeline, upload.image_bytes)
+        except queue.Full:
+            retry_after = str(app.config["TRANSLATION_JOB_RETRY_AFTER"])
+            return (
+                jsonify({"success": False, "errMessage": "Too many translation jobs"}),
+                503,
+                {"Retry-After": retry_after},
+            )
+
+        return (
+            jsonify({"success": True, "jobId": job.id, "status": job.status}),
+            202,
+            {
+                "Location": url_for("translation_job_api", job_id=job.id),
+                "X-Upload-Bytes-Saved": str(upload.bytes_saved),
+            },
+        )
+
+    @app.route("/api/translate/jobs/<job_id>")
+    def translation_job_api(job_id: str) -> Response | tuple[Response, int]:
+        """查詢非同步翻譯工作 API"""
+        job = translation_jobs.get(job_id)
+        if job is None:
+            return jsonify({"success": False, "errMessage": "Job not found"}), 404
+        return jsonify(_job_response_body(job))
+
+    @app.route("/api/translate/jobs/<job_id>/events")
+    def translation_job_events_api(job_id: str) -> Response | tuple[Response, int]:
+        """觀看非同步翻譯工作 API (Server-Sent Events)
+
+        從頭重播 `stage` queued / running，最後以 `done` (完整翻譯) 或 `error` 結束
+        """
+        job = translation_jobs.get(job_id)
+        if job is None:
+            return jsonify({"success": False, "errMessage": "Job not found"}), 404
+
+        events = (_format_sse(event) for event in job.watch(_JOB_WATCH_TIMEOUT))
+        return Response(
+            stream_with_context(events),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
+def _submit_translation_job(
+    translation_jobs: TranslationJobQueue, pipeline: TranslationPipeline, image_bytes: bytes
+) -> TranslationJob:
+    """建立非同步翻譯工作 (有 event loop 時在 event loop 上執行，等待 OCR 時不佔用執行緒)
+
+    Raises
+    ------
+    queue.Full
+        工作佇列已滿
+    """
+    if translation_jobs.event_loop is not None:
+        # 推論仍經過 micro-batching 推論階段
+        return translation_jobs.submit_async(
+            lambda deadline: pipeline.aprocess(image_bytes, deadline=deadline)
+        )
+    # 與同步翻譯 API 相同，經過 OCR 階段與 micro-batching 推論階段 (共用其上限)
+    return translation_jobs.submit(
+        lambda deadline: pipeline.process(image_bytes, deadline=deadline)
+    )
+
+
+def _job_response_body(job: TranslationJob) -> dict[str, Any]:
+    """非同步翻譯工作的狀態 (成功時附上 FrontCardData)"""
+    body: dict[str, Any] = {"success": True, "jobId": job.id, "status": job.status}
+    if job.status == JOB_SUCCEEDED:
+        front_card_data: FrontCardData = {"description": job.result or ""}
+        body["frontCardData"] = front_card_data
+    elif job.status == JOB_FAILED:
+        body["errMessage"] = job.error or "Translation failed"
+    return body
+
+
+def _load_translation_pipeline(app: Flask) -> TranslationPipeline:
+    """建立翻譯管線，並放進 app.config (供背景載入使用)"""
+    translation_pipeline, translator, translation_cache, ocr_cache = _create_translation_pipeline(
+        app.config, app.logger
+    )
+    app.config["TRANSLATOR"] = translator
+    app.config["TRANSLATION_CACHE"] = translation_cache
+    app.config["OCR_CACHE"] = ocr_cache
+    app.config["TRANSLATION_PIPELINE"] = translation_pipeline
+    return translation_pipeline
+
+
+def _reject_until_model_ready() -> tuple[Response, int, dict[str, str]] | None:
+    """模型就緒前，需要模型的 API 直接回 503 (不必排隊等模型)"""
+    model_loader: BackgroundLoader[TranslationPipeline] = current_app.config["MODEL_LOADER"]
+    if request.endpoint in _MODEL_ENDPOINTS and not model_loader.ready:
+        return _model_unavailable_response(model_loader)
+    return None
+
+
+def _model_unavailable_response(
+    model_loader: BackgroundLoader[TranslationPipeline],
+) -> tuple[Response, int, dict[str, str]]:
+    """模型尚未就緒 (或載入失敗) 的 503 回應"""
+    status = "failed" if model_loader.failed else "loading"
+    retry_after = str(current_app.config["MODEL_RETRY_AFTER"])
+    return (
+        jsonify({"success": False, "status": status, "errMessage": f"Model is {status}"}),
+        503,
+        {"Retry-After": retry_after},
+    )
+
+
+def _create_upload_normalizer(
+    config: Mapping[str, Any], logger: logging.Logger
+) -> UploadNormalizer | None:
+    """依設定建立上傳圖片正規化器
+
+    Parameters
+    ----------
+    config : Mapping[str, Any]
+        app 設定
+    logger : logging.Logger
+        日誌 logger
+
+    Returns
+    -------
+    UploadNormalizer | None
+        上傳圖片正規化器 (不正規化時為 None)
+    """
+    if config["UPLOAD_NORMALIZE_WORKERS"] <= 0:
+        return None
+
+    return UploadNormalizer(
+        logger=logger,
+        max_workers=config["UPLOAD_NORMALIZE_WORKERS"],
+        max_pending=config["UPLOAD_NORMALIZE_MAX_PENDING"],
+        max_edge=config["UPLOAD_MAX_EDGE"],
+        quality=config["UPLOAD_JPEG_QUALITY"],
+    )
+
+
+def _read_upload() -> NormalizedUpload:
+    """讀取上傳的圖片並正規化 (未啟用正規化時為原圖)"""
+    image_bytes = request.files["image"].read()
+    upload_normalizer: UploadNormalizer | None = current_app.config["UPLOAD_NORMALIZER"]
+    if upload_normalizer is None:
+        return NormalizedUpload(image_bytes, len(image_bytes))
+    return upload_normalizer.normalize(image_bytes)
+
+
+def _stream_translation(
+    pipeline: TranslationPipeline,
+    image_bytes: bytes,
+    logger: logging.Logger,
+    deadline: Deadline | None = None,
+) -> Iterator[str]:
+    """執行串流翻譯，並將事件轉成 Server-Sent Events
+
+    client 中斷連線 (串流提早關閉) 時取消 `deadline`，尚未完成的 OCR 與推論隨之停止
+
+    Parameters
+    ----------
+    pipeline : TranslationPipeline
+        翻譯管線
+    image_bytes : bytes
+        使用者上傳的圖片
+    logger : logging.Logger
+        日誌 logger
+    deadline : Deadline | None, optional
+        請求的期限 (None 代表沒有期限)
+
+    Yields
+    ------
+    str
+        Server-Sent Events 訊息
+    """
+    try:
+        yield _format_sse(PipelineEvent("stage", "uploaded"))
+        for event in pipeline.process_stream(image_bytes, deadline=deadline):
+            yield _format_sse(event)
+    except DeadlineExceededError:
+        logger.warning("[translate_stream_api] - translation timed out")
+        yield _format_sse(PipelineEvent("error", "Translation timed out"))
+    except Exception:
+        logger.exception("[translate_stream_api] - translation failed")
+        yield _format_sse(PipelineEvent("error", "Translation failed"))
+    finally:
+        if deadline is not None:
+            deadline.cancel()
+
+
+def _format_sse(event: PipelineEvent) -> str:
+    """將事件轉成 Server-Sent Events 格式 (data 以 JSON 字串編碼，換行不會破壞格式)"""
+    return f"event: {event.event}\ndata: {json.dumps(event.data, ensure_ascii=False)}\n\n"
+
+
+def _create_translation_pipeline(
+    config: Mapping[str, Any], logger: logging.Logger
+) -> tuple[TranslationPipeline, AbstractTranslator, TranslationCache | None, OcrResultCache | None]:
+    """依設定建立翻譯管線與其依賴
+
+    Parameters
+    ----------
+    config : Mapping[str, Any]
+        app 設定
+    logger : logging.Logger
+        日誌 logger
+
+    Returns
+    -------
+    tuple[TranslationPipeline, AbstractTranslator, TranslationCache | None, OcrResultCache | None]
+        翻譯管線、實際執行推論的翻譯模型 (統計載入時間、常駐記憶體與延遲)、
+        翻譯記憶快取 (decoding 非確定性時為 None)，以及 OCR 結果快取 (不快取時為 None)
+    """
+    # 影像前處理與卡圖辨識共用的行程池 (偵測、校正卡片與計算雜湊不佔住 GIL)
+    image_pool: LazyProcessPool | None = None
+    if config["CARD_RECTIFY_WORKERS"] > 0:
+        image_pool = LazyProcessPool(
+            config["CARD_RECTIFY_WORKERS"],
+            preload=[rectify_card.__module__, photo_artwork_fingerprint.__module__],
+        )
+
+    # OCR 文字提取器
+    text_extractor, ocr_cache = _create_text_extractor(config, logger, image_pool)
+
+    # 翻譯模型
+    yugioh_translator = _create_model_translator(config, logger)
+
+    # 暖機：先跑一次推論 (初始化 kernel、配置記憶體)，第一個請求才不會特別慢
+    if config["TRANSLATOR_WARM_UP_TEXT"]:
+        yugioh_translator.translate(config["TRANSLATOR_WARM_UP_TEXT"])
+
+    # 前面加一層 micro-batching，讓同時抵達的請求合併推論
+    translator: AbstractTranslator = BatchingTranslator(
+        yugioh_translator,
+        logger=logger,
+        max_batch_size=config["TRANSLATOR_BATCH_MAX_SIZE"],
+        max_wait=config["TRANSLATOR_BATCH_MAX_WAIT"],
+        max_queue_size=config["TRANSLATOR_BATCH_QUEUE_SIZE"],
+    )
+
+    # 翻譯記憶快取 (key 為模型設定的 fingerprint 與正規化後的日文原文，重複的卡片不必再推論)
+    # 取樣結果不固定，只有確定性的 decoding profile 才能快取
+    translation_cache: TranslationCache | None = None
+    if yugioh_translator.deterministic:
+        translation_cache = TranslationCache(
+            config["TRANSLATION_CACHE_DB"],
+            max_entries=config["TRANSLATION_CACHE_MAX_ENTRIES"],
+            ttl=config["TRANSLATION_CACHE_TTL"],
+        )
+        translator = CachedTranslator(translator, translation_cache, logger=logger)
+
+    # 翻譯管線
+    # 以卡片密碼為 key 的完整翻譯 (卡圖辨識或 OCR 讀到密碼的卡片已有翻譯時，不必推論)
+    # 永久保存，同樣只有確定性的 decoding profile 才能使用 (key 含模型設定與後處理 hook 的前綴)
+    translation_store: TranslationCache | None = None
+    if yugioh_translator.deterministic:
+        translation_store = TranslationCache(config["CARD_TRANSLATION_STORE_DB"], ttl=None)
+    card_recognizer = _create_card_recognizer(config, logger, image_pool)
+
+    # OCR 階段 (I/O 為主，以有上限的執行緒與佇列執行；推論階段為上面的 micro-batching worker)
+    ocr_stage: StageExecutor | None = None
+    if config["PIPELINE_OCR_WORKERS"] > 0:
+        ocr_stage = StageExecutor(
+            "ocr",
+            max_workers=config["PIPELINE_OCR_WORKERS"],
+            max_queue_size=config["PIPELINE_OCR_QUEUE_SIZE"],
+        )
+
+    translation_pipeline = TranslationPipeline(
+        text_extractor,
+        translator,
+        clause_segmentation=config["PIPELINE_CLAUSE_SEGMENTATION"],
+        card_recognizer=card_recognizer,
+        translation_store=translation_store,
+        ocr_stage=ocr_stage,
+    )
+    translation_pipeline.add_postprocess_hook(PUNCTUATION_MAP)
+
+    return translation_pipeline, yugioh_translator, translation_cache, ocr_cache
+
+
+def _create_text_extractor(
+    config: Mapping[str, Any], logger: logging.Logger, image_pool: LazyProcessPool | None
+) -> tuple[AbstractTextExtractor, OcrResultCache | None]:
+    """依設定建立 OCR 文字提取器
+
+    Parameters
+    ----------
+    config : Mapping[str, Any]
+        app 設定
+    logger : logging.Logger
+        日誌 logger
+    image_pool : LazyProcessPool | None
+        影像前處理的行程池 (None 代表不做影像前處理)
+
+    Returns
+    -------
+    tuple[AbstractTextExtractor, OcrResultCache | None]
+        文字提取器，以及 OCR 結果快取 (不快取時為 None)
+    """
+    text_extractor: AbstractTextExtractor
+    if config["OCR_ASYNC"]:
+        text_extractor = AsyncOcrTextExtractor(
+            logger=logger,
+            event_loop=config["EVENT_LOOP"],
+            max_connections=config["OCR_ASYNC_MAX_CONNECTIONS"],
+        )
+    else:
+        text_extractor = OcrTextExtractor(logger=logger)
+
+    # OCR 前的影像前處理 (找出卡片、透視校正，只把效果框送去 OCR)
+    card_rectifier: CardRectifier | None = None
+    if image_pool is not None:
+        card_rectifier = CardRectifier(
+            logger=logger, width=config["CARD_RECTIFY_WIDTH"], pool=image_pool
+        )
+
+    # 重複上傳 (或重新壓縮、縮放過) 的同一張照片不必再呼叫 OCR API
+    # (以照片中的卡片計算雜湊；有影像前處理時與效果框在同一個行程池工作中算出)
+    ocr_cache: OcrResultCache | None = None
+    if config["OCR_CACHE_MAX_ENTRIES"] > 0:
+        ocr_cache = OcrResultCache(
+            max_entries=config["OCR_CACHE_MAX_ENTRIES"],
+            max_distance=config["OCR_CACHE_MAX_DISTANCE"],
+        )
+        text_extractor = CachedTextExtractor(
+            text_extractor, ocr_cache, logger=logger, card_rectifier=card_rectifier
+        )
+    elif card_rectifier is not None:
+        text_extractor = RectifiedTextExtractor(text_extractor, card_rectifier)
+
+    return text_extractor, ocr_cache
+
+
+def _create_card_recognizer(
+    config: Mapping[str, Any], logger: logging.Logger, image_pool: LazyProcessPool | None
+) -> ArtworkCardRecognizer | None:
+    """依設定建立卡圖辨識器
+
+    Parameters
+    ----------
+    config : Mapping[str, Any]
+        app 設定
+    logger : logging.Logger
+        日誌 logger
+    image_pool : LazyProcessPool | None
+        計算卡圖指紋的行程池 (None 代表在請求執行緒計算)
+
+    Returns
+    -------
+    ArtworkCardRecognizer | None
+        卡圖辨識器 (沒有卡圖雜湊索引時為 None)
+    """
+    index_path = config["ARTWORK_INDEX_PATH"]
+    if index_path is None or not os.path.exists(index_path):
+        logger.info("[create_app] - no artwork index, card recognition disabled")
+        return None
+
+    return ArtworkCardRecognizer(
+        ArtworkIndex.load(index_path),
+        logger=logger,
+        max_distance=config["ARTWORK_MATCH_MAX_DISTANCE"],
+        min_margin=config["ARTWORK_MATCH_MIN_MARGIN"],
+        pool=image_pool,
+    )
+
+
+def _create_model_translator(
+    config: Mapping[str, Any], logger: logging.Logger
+) -> AbstractTranslator:
+    """依設定建立實際執行推論的翻譯模型
+
+    Parameters
+    ----------
+    config : Mapping[str, Any]
+        app 設定
+    logger : logging.Logger
+        日誌 logger
+
+    Returns
+    -------
+    AbstractTranslator
+        翻譯模型
+    """
+    if config["TRANSLATOR_BACKEND"] == "onnx":
+        # 選用依賴 (pip install ".[onnx]")，只在需要時 import
+        from src.card.onnx_translator import OnnxYugiohTranslator
+
+        return OnnxYugiohTranslator(
+            logger=logger,
+            output_length_ratio=config["TRANSLATOR_OUTPUT_LENGTH_RATIO"],
+            output_length_margin=config["TRANSLATOR_OUTPUT_LENGTH_MARGIN"],
+        )
+
+    return YugiohTranslator(
+        logger=logger,
+        decoding=config["TRANSLATOR_DECODING"],
+        padding=config["TRANSLATOR_PADDING"],
+        length_buckets=tuple(config["TRANSLATOR_LENGTH_BUCKETS"]),
+        output_length_ratio=config["TRANSLATOR_OUTPUT_LENGTH_RATIO"],
+        output_length_margin=config["TRANSLATOR_OUTPUT_LENGTH_MARGIN"],
+        precision=config["TRANSLATOR_PRECISION"],
+    )
@@ -0,0 +1,337 @@
+# standard library
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, NamedTuple
+
+# local module
+from src.utils.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    all_deadlines,
+    current_deadline,
+    deadline_scope,
+)
+from src.utils.metrics import LatencyRecorder
+
+from .translator import AbstractTranslator
+
+
+class _PendingTranslation(NamedTuple):
+    untranslated_text: str
+    future: "Future[str]"
+    # 進入佇列的時間 (time.perf_counter)
+    enqueued_at: float
+    # 呼叫端請求的期限 (None 代表沒有期限)
+    deadline: Deadline | None
+
+
+class _PendingStream(NamedTuple):
+    untranslated_text: str
+    # 翻譯片段，最後為 `_STREAM_END` 或例外
+    chunks: "queue.Queue[str | object]"
+    # 進入佇列的時間 (time.perf_counter)
+    enqueued_at: float
+    # 串流的期限 (呼叫端不再讀取時取消)
+    deadline: Deadline
+
+
+# worker 停止訊號
+_STOP = object()
+# 串流結束訊號
+_STREAM_END = object()
+
+
+class BatchingTranslator(AbstractTranslator):
+    def __init__(
+        self,
+        translator: AbstractTranslator,
+        *,
+        logger: logging.Logger,
+        max_batch_size: int = 8,
+        max_wait: float = 0.01,
+        max_queue_size: int = 0,
+    ) -> None:
+        """動態 micro-batching 翻譯器
+
+        收集短時間窗內同時抵達的翻譯請求，合併成一批交給 `translator.translate_batch`，
+        再把結果各自交還給呼叫端。
+        管線的推論階段：每個行程只有一個 worker 執行推論，
+        佇列已滿時 `submit` 會等待 (backpressure)。
+        串流翻譯無法合批，但同樣排進佇列 (計入佇列深度與上限)，由 worker 逐一生成，
+        不會與批次推論同時使用模型。
+        排隊時已到期 (或被取消) 的請求不會推論；同一批的請求全部到期時才停止生成
+
+        Parameters
+        ----------
+        translator : AbstractTranslator
+            實際執行翻譯的翻譯器
+        logger : logging.Logger
+            日誌 logger
+        max_batch_size : int, optional
+            每批最多幾筆請求
+        max_wait : float, optional
+            收到第一筆請求後，最多再等幾秒湊批
+        max_queue_size : int, optional
+            最多幾筆請求排隊等待推論 (0 代表不限制)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must >= 1!")
+        if max_wait < 0:
+            raise ValueError("max_wait must >= 0!")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size must >= 0!")
+
+        self.translator = translator
+        self.logger = logger
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue_size = max_queue_size
+
+        self.requests = 0
+        self.streams = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self.wait_latency = LatencyRecorder()
+        self._stats_lock = threading.Lock()
+
+        self._worker_lock = threading.Lock()
+        self._start_worker()
+
+    def submit(self, untranslated_text: str) -> "Future[str]":
+        """送出一筆翻譯請求
+
+        Parameters
+        ----------
+        untranslated_text : str
+            翻譯前文字
+
+        Returns
+        -------
+        Future[str]
+            翻譯結果的 future
+        """
+        future: Future[str] = Future()
+        self._enqueue(
+            _PendingTranslation(untranslated_text, future, time.perf_counter(), current_deadline())
+        )
+        with self._stats_lock:
+            self.requests += 1
+        return future
+
+    @property
+    def deterministic(self) -> bool:
+        return self.translator.deterministic
+
+    @property
+    def fingerprint(self) -> str:
+        return self.translator.fingerprint
+
+    def translate(self, untranslated_text: str) -> str:
+        return self.submit(untranslated_text).result()
+
+    def translate_batch(self, untranslated_texts: list[str]) -> list[str]:
+        futures = [self.submit(untranslated_text) for untranslated_text in untranslated_texts]
+        return [future.result() for future in futures]
+
+    def translate_stream(self, untranslated_text: str) -> Iterator[str]:
+        # 串流需要逐 token 產出，無法與其他請求合批；排進同一個佇列，由 worker 生成
+        stream_deadline = Deadline(parent=current_deadline())
+        chunks: queue.Queue[str | object] = queue.Queue()
+        self._enqueue(
+            _PendingStream(untranslated_text, chunks, time.perf_counter(), stream_deadline)
+        )
+        with self._stats_lock:
+            self.streams += 1
+
+        try:
+            while (chunk := chunks.get()) is not _STREAM_END:
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                yield chunk  # type: ignore[misc]
+        except BaseException:
+            # 含 GeneratorExit (呼叫端提早關閉)：worker 在下一個 token 停止生成
+            stream_deadline.cancel()
+            raise
+
+    def stats(self) -> dict[str, Any]:
+        """請求數、批次數、目前的佇列深度與排隊時間"""
+        with self._stats_lock:
+            return {
+                "max_queue_size": self.max_queue_size,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "streams": self.streams,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "mean_batch_size": (self.batched_requests / self.batches if self.batches else 0.0),
+                "wait_latency": self.wait_latency.summary(),
+            }
+
+    def close(self) -> None:
+        """停止 worker (已排隊的請求會先處理完)"""
+        self._queue.put(_STOP)
+        self._worker.join()
+
+    def _enqueue(self, pending: "_PendingTranslation | _PendingStream") -> None:
+        """排入佇列 (佇列已滿時等待)"""
+        # fork 只會複製呼叫 fork 的執行緒，子行程需要自己的 worker
+        if self._worker_pid != os.getpid():
+            with self._worker_lock:
+                if self._worker_pid != os.getpid():
+                    self._start_worker()
+
+        self._queue.put(pending)
+        queue_depth = self._queue.qsize()
+        with self._stats_lock:
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+    def _start_worker(self) -> None:
+        """建立請求佇列並啟動 worker (每個行程一個)"""
+        self._queue: queue.Queue[_PendingTranslation | object] = queue.Queue(self.max_queue_size)
+        self._worker = threading.Thread(target=self._run, name="BatchingTranslator", daemon=True)
+        self._worker.start()
+        self._worker_pid = os.getpid()
+
+    def _run(self) -> None:
+        """worker 主迴圈：湊批 → 推論 → 分發結果 (串流請求單獨生成)"""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            if isinstance(first, _PendingStream):
+                self._run_stream(first)
+                continue
+
+            batch = self._collect_batch(first)
+            last = batch[-1]
+            if last is _STOP or isinstance(last, _PendingStream):
+                batch.pop()
+
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                # worker 不能結束：否則之後排隊的請求會永遠等不到結果
+                self.logger.exception("[BatchingTranslator] - failed to run batch")
+                _fail_pending(batch, e)
+
+            if isinstance(last, _PendingStream):
+                self._run_stream(last)
+            elif last is _STOP:
+                return
+
+    def _collect_batch(self, first: _PendingTranslation) -> list:
+        """從第一筆請求開始，在 `max_wait` 內收集最多 `max_batch_size` 筆請求
+
+        若途中收到停止訊號或串流請求，會附在 list 最後 (並停止收集)
+        """
+        batch: list = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    pending = self._queue.get(timeout=remaining)
+                else:
+                    # 時間窗已過，只撈已經在排隊的請求
+                    pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(pending)
+            if pending is _STOP or isinstance(pending, _PendingStream):
+                break
+
+        return batch
+
+    def _run_batch(self, batch: list[_PendingTranslation]) -> None:
+        """執行一批翻譯，並把結果 (或例外) 交給各自的 future"""
+        batch = self._drop_expired(batch)
+        if not batch:
+            return
+
+        self.logger.debug("[BatchingTranslator] - running batch of size %d", len(batch))
+        started_at = time.perf_counter()
+        for pending in batch:
+            self.wait_latency.record(started_at - pending.enqueued_at)
+        with self._stats_lock:
+            self.batches += 1
+            self.batched_requests += len(batch)
+
+        try:
+            with deadline_scope(all_deadlines(pending.deadline for pending in batch)):
+                translated_texts = self.translator.translate_batch(
+                    [pending.untranslated_text for pending in batch]
+                )
+            if len(translated_texts) != len(batch):
+                raise ValueError(
+                    f"translate_batch returned {len(translated_texts)} results "
+                    f"for {len(batch)} texts!"
+                )
+
+            for pending, translated_text in zip(batch, translated_texts, strict=True):
+                if pending.deadline is not None and pending.deadline.expired:
+                    pending.future.set_exception(
+                        DeadlineExceededError("deadline exceeded in batch")
+                    )
+                else:
+                    pending.future.set_result(translated_text)
+        except Exception as e:
+            _fail_pending(batch, e)
+
+    def _run_stream(self, pending: _PendingStream) -> None:
+        """逐片段生成一筆串流翻譯，片段 (或例外) 交給呼叫端"""
+        if pending.deadline.expired:
+            pending.chunks.put(DeadlineExceededError("deadline exceeded in queue"))
+            with self._stats_lock:
+                self.dropped += 1
+            return
+
+        self.wait_latency.record(time.perf_counter() - pending.enqueued_at)
+        try:
+            with deadline_scope(pending.deadline):
+                for chunk in self.translator.translate_stream(pending.untranslated_text):
+                    pending.chunks.put(chunk)
+        except Exception as e:
+            pending.chunks.put(e)
+            return
+        pending.chunks.put(_STREAM_END)
+
+    def _drop_expired(self, batch: list[_PendingTranslation]) -> list[_PendingTranslation]:
+        """丟棄排隊時已到期 (或被取消) 的請求
+
+        其餘請求的 future 標記為執行中，之後呼叫端無法再取消 (設定結果不會失敗)；
+        呼叫端已取消 future 的請求直接丟棄
+        """
+        alive: list[_PendingTranslation] = []
+        for pending in batch:
+            if not pending.future.set_running_or_notify_cancel():
+                continue
+            if pending.deadline is not None and pending.deadline.expired:
+                pending.future.set_exception(DeadlineExceededError("deadline exceeded in queue"))
+            else:
+                alive.append(pending)
+
+        if len(alive) < len(batch):
+            with self._stats_lock:
+                self.dropped += len(batch) - len(alive)
+        return alive
+
+
+def _fail_pending(batch: list[_PendingTranslation], exception: BaseException) -> None:
+    """把例外交給批次中尚未有結果的 future (已有結果的略過)"""
+    for pending in batch:
+        if pending.future.done():
+            continue
+        try:
+            pending.future.set_exception(exception)
+        except InvalidStateError:
+            # 同時被其他地方設定了結果
+            pass
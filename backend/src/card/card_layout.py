@@ -0,0 +1,152 @@
+# standard library
+import math
+import re
+import statistics
+from collections.abc import Sequence
+from typing import NamedTuple
+
+# 【】 行 (種族 / 類型，OCR 常把 【 誤讀成 [ 或 ［)
+_TYPE_LINE_PATTERN = re.compile(r"[【】]|^\s*[\[［]")
+# 卡片密碼 (左下角，8 位數)
+_PASSWORD_PATTERN = re.compile(r"(\d{8})")
+# 卡號 (例：SD25-JP001)
+_SET_CODE_PATTERN = re.compile(r"\w{3,4}\-\w{5}")
+# 攻擊力 / 守備力 / LINK 值
+_STATS_PATTERN = re.compile(r"ATK|DEF|LINK")
+# 效果框左右可超出錨點行的範圍 (以卡片高度的比例表示)
+_HORIZONTAL_TOLERANCE = 0.05
+
+
+class OcrLine(str):
+    """OCR 提取出的一行文字，另外帶著 Azure 回傳的 bounding box
+
+    bounding box 為 [x1, y1, x2, y2, x3, y3, x4, y4] (左上起順時針)，沒有時為 None
+    """
+
+    bounding_box: Sequence[float] | None
+
+    def __new__(cls, text: str, bounding_box: Sequence[float] | None = None) -> "OcrLine":
+        line = super().__new__(cls, text)
+        line.bounding_box = bounding_box
+        return line
+
+
+class _Rect(NamedTuple):
+    left: float
+    top: float
+    right: float
+    bottom: float
+
+    @property
+    def center_x(self) -> float:
+        return (self.left + self.right) / 2
+
+    @property
+    def center_y(self) -> float:
+        return (self.top + self.bottom) / 2
+
+
+class CardLayout(NamedTuple):
+    # 卡名 (最上面一行，最上面一行是錨點時為 None)
+    name: str | None
+    # 【】 那一行 (種族 / 類型)
+    type_line: str | None
+    # 效果框內的文字 (只有這部分需要翻譯)
+    effect_text: str
+    # 攻擊力 / 守備力
+    stats: str | None
+    # 卡片密碼
+    password: int | None
+
+
+def parse_card_layout(lines: Sequence[OcrLine]) -> CardLayout | None:
+    """依每行文字的 bounding box 分出卡片的各個區域，只留下效果框內的文字
+
+    先以少數容易辨認的行作為錨點 (【】 行、卡號、攻擊力、密碼)，
+    效果框的上緣為 【】 行與卡號中較低者的下緣，下緣為攻擊力或密碼行的上緣，
+    左右以錨點行的範圍為界；整體為線性時間，照片傾斜時先依文字行的角度轉正
+
+    Parameters
+    ----------
+    lines : Sequence[OcrLine]
+        OCR 提取出的每一行文字 (依 Azure 的閱讀順序)
+
+    Returns
+    -------
+    CardLayout | None
+        卡片版面，沒有 bounding box 或找不到效果框上緣時回傳 None
+    """
+    if not lines or any(not _valid_box(line.bounding_box) for line in lines):
+        return None
+
+    rects = _upright_rects(lines)
+    name_index = min(range(len(lines)), key=lambda i: rects[i].top)
+
+    # 錨點
+    type_index = password_index = stats_index = set_code_index = None
+    for i, line in enumerate(lines):
+        if _TYPE_LINE_PATTERN.search(line):
+            type_index = i
+        elif password_index is None and _PASSWORD_PATTERN.match(line):
+            password_index = i
+        elif stats_index is None and _STATS_PATTERN.search(line):
+            stats_index = i
+        elif _SET_CODE_PATTERN.search(line):
+            set_code_index = i
+
+    header_indices = [i for i in (type_index, set_code_index) if i is not None]
+    if not header_indices:
+        return None
+    footer_indices = [i for i in (stats_index, password_index) if i is not None]
+    anchor_indices = [name_index, *header_indices, *footer_indices]
+
+    effect_top = max(rects[i].bottom for i in header_indices)
+    effect_bottom = min((rects[i].top for i in footer_indices), default=math.inf)
+    card_height = max(rects[i].bottom for i in anchor_indices) - rects[name_index].top
+    tolerance = card_height * _HORIZONTAL_TOLERANCE
+    effect_left = min(rects[i].left for i in anchor_indices) - tolerance
+    effect_right = max(rects[i].right for i in anchor_indices) + tolerance
+
+    effect_text = "".join(
+        line
+        for i, (line, rect) in enumerate(zip(lines, rects, strict=True))
+        if i not in anchor_indices
+        and effect_top < rect.center_y < effect_bottom
+        and effect_left < rect.center_x < effect_right
+    )
+    password_match = (
+        _PASSWORD_PATTERN.match(lines[password_index]) if password_index is not None else None
+    )
+
+    # 只送效果框去 OCR 時 (`CardRectifier`) 沒有卡名，最上面一行會是錨點
+    has_name = name_index not in (*header_indices, *footer_indices)
+    return CardLayout(
+        name=str(lines[name_index]) if has_name else None,
+        type_line=str(lines[type_index]) if type_index is not None else None,
+        effect_text=effect_text,
+        stats=str(lines[stats_index]) if stats_index is not None else None,
+        password=int(password_match.group(1)) if password_match is not None else None,
+    )
+
+
+def _valid_box(bounding_box: Sequence[float] | None) -> bool:
+    return isinstance(bounding_box, Sequence) and len(bounding_box) == 8
+
+
+def _upright_rects(lines: Sequence[OcrLine]) -> list[_Rect]:
+    """依文字行的角度 (中位數) 把所有 bounding box 轉正，取外接矩形"""
+    angle = statistics.median(
+        math.atan2(
+            line.bounding_box[3] - line.bounding_box[1], line.bounding_box[2] - line.bounding_box[0]
+        )
+        for line in lines
+    )
+    cos, sin = math.cos(-angle), math.sin(-angle)
+
+    rects: list[_Rect] = []
+    for line in lines:
+        xs, ys = line.bounding_box[0::2], line.bounding_box[1::2]
+        rotated_xs = [x * cos - y * sin for x, y in zip(xs, ys, strict=True)]
+        rotated_ys = [x * sin + y * cos for x, y in zip(xs, ys, strict=True)]
+        rects.append(_Rect(min(rotated_xs), min(rotated_ys), max(rotated_xs), max(rotated_ys)))
+    return rects
@@ -0,0 +1,96 @@
+# standard library
+import logging
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+# 3rd party library
+import numpy as np
+from PIL import Image
+
+# local module
+from src.image.artwork_index import ArtworkIndex, photo_artwork_fingerprint
+from src.utils.process_pool import LazyProcessPool
+
+
+class ArtworkCardRecognizer:
+    def __init__(
+        self,
+        index: ArtworkIndex,
+        *,
+        logger: logging.Logger,
+        max_distance: int = 40,
+        min_margin: int = 16,
+        pool: LazyProcessPool | None = None,
+    ) -> None:
+        """以卡圖雜湊索引辨識上傳照片是哪張卡 (不必 OCR)
+
+        先找出照片中的卡片並透視校正 (與 OCR 前的影像前處理相同的偵測)，
+        再切出卡圖比對；照片有背景或些微傾斜也能辨識。找不到卡片時，視整張照片為卡片。
+        偵測、校正與雜湊在行程池中執行 (通常與 `CardRectifier` 共用)，不會佔住 GIL；
+        請求執行緒只比對索引
+
+        Parameters
+        ----------
+        index : ArtworkIndex
+            卡圖雜湊索引
+        logger : logging.Logger
+            日誌 logger
+        max_distance : int, optional
+            最大 Hamming 距離 (dHash 共 256 bit)
+        min_margin : int, optional
+            最近的卡圖至少要比第二近的卡圖近多少，才視為有把握
+        pool : LazyProcessPool | None, optional
+            計算卡圖指紋的行程池 (None 代表在呼叫的執行緒計算)
+        """
+        if max_distance < 0:
+            raise ValueError("max_distance must >= 0!")
+        if min_margin < 0:
+            raise ValueError("min_margin must >= 0!")
+
+        self.index = index
+        self.logger = logger
+        self.max_distance = max_distance
+        self.min_margin = min_margin
+        self._pool = pool
+
+    def recognize(self, image_bytes: bytes) -> int | None:
+        """辨識卡片
+
+        Parameters
+        ----------
+        image_bytes : bytes
+            使用者上傳的卡片照片
+
+        Returns
+        -------
+        int | None
+            卡片密碼，沒有把握 (或無法解碼圖片、子行程異常結束) 時回傳 None
+        """
+        start = time.perf_counter()
+        try:
+            query = self._fingerprint(image_bytes)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            self.logger.warning("[ArtworkCardRecognizer] - cannot decode image")
+            return None
+        except BrokenProcessPool:
+            # 子行程異常結束 (下一個工作會改用新的行程池)
+            self.logger.warning("[ArtworkCardRecognizer] - process pool is broken")
+            return None
+
+        match = self.index.match_fingerprint(
+            query, max_distance=self.max_distance, min_margin=self.min_margin
+        )
+        self.logger.debug(
+            "[ArtworkCardRecognizer] - match: %s (%.1f ms)",
+            match,
+            (time.perf_counter() - start) * 1000,
+        )
+        return match.password if match is not None else None
+
+    def _fingerprint(self, image_bytes: bytes) -> np.ndarray:
+        if self._pool is None:
+            return photo_artwork_fingerprint(image_bytes)
+
+        future = self._pool.submit(photo_artwork_fingerprint, image_bytes)
+        assert future is not None
+        return future.result()
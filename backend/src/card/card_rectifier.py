@@ -0,0 +1,201 @@
+# standard library
+import asyncio
+import logging
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+# 3rd party library
+from PIL import Image
+
+# local module
+from src.image.card_geometry import rectify_card, rectify_card_with_hash
+from src.utils.process_pool import LazyProcessPool
+
+from .text_extractor import AbstractTextExtractor, ExtractedCard, ImageSource
+
+# 無法校正 (無法解碼圖片或子行程異常結束) 時送出原本的照片
+_RECTIFY_ERRORS = (OSError, ValueError, Image.DecompressionBombError, BrokenProcessPool)
+
+
+class CardRectifier:
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        max_workers: int = 2,
+        width: int = 1000,
+        quality: int = 90,
+        pool: LazyProcessPool | None = None,
+    ) -> None:
+        """OCR 前的影像前處理：找出照片中的卡片、透視校正，只把效果框送去 OCR
+
+        影像運算在行程池中執行，不會佔住 GIL (同一行程的翻譯推論與其他請求不受影響)
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            日誌 logger
+        max_workers : int, optional
+            行程池大小 (傳入 `pool` 時不使用)
+        width : int, optional
+            校正後卡片的寬度 (像素)
+        quality : int, optional
+            送去 OCR 的 JPEG 品質
+        pool : LazyProcessPool | None, optional
+            共用的行程池 (例如與 `ArtworkCardRecognizer` 共用；None 代表自行建立)
+        """
+        if width < 1:
+            raise ValueError("width must >= 1!")
+        if not 1 <= quality <= 100:
+            raise ValueError("quality must be in [1, 100]!")
+
+        self.logger = logger
+        self.width = width
+        self.quality = quality
+        self._pool = (
+            pool
+            if pool is not None
+            else LazyProcessPool(max_workers, preload=[rectify_card.__module__])
+        )
+
+    def rectify(self, image_bytes: bytes) -> bytes:
+        """校正照片並切出效果框
+
+        Parameters
+        ----------
+        image_bytes : bytes
+            使用者上傳的照片
+
+        Returns
+        -------
+        bytes
+            效果框圖片，找不到卡片 (或無法解碼圖片、子行程異常結束) 時回傳原本的照片
+        """
+        result = self._run(image_bytes)
+        return image_bytes if result is None else self._choose(image_bytes, result)
+
+    def rectify_with_hash(
+        self, image_bytes: bytes, hash_size: int
+    ) -> tuple[bytes, tuple[int, bool] | None]:
+        """校正照片並切出效果框，以同一次卡片偵測計算卡片的 dHash (OCR 結果快取的 key)
+
+        偵測、校正與雜湊都在同一個行程池工作中完成，請求執行緒不必再解碼照片
+
+        Parameters
+        ----------
+        image_bytes : bytes
+            使用者上傳的照片
+        hash_size : int
+            雜湊邊長 (雜湊共 hash_size * hash_size 個 bit)
+
+        Returns
+        -------
+        tuple[bytes, tuple[int, bool] | None]
+            (效果框圖片 (找不到卡片時為原本的照片), (dHash, 是否找到卡片))；
+            無法解碼圖片或子行程異常結束時為 (原本的照片, None)
+        """
+        result = self._run(image_bytes, hash_size)
+        if result is None:
+            return image_bytes, None
+        text_box, card_hash, card_found = result
+        return self._choose(image_bytes, text_box), (card_hash, card_found)
+
+    async def arectify(self, image_bytes: bytes) -> bytes:
+        """`rectify` 的 coroutine 版本 (等待行程池時讓出 event loop)"""
+        result = await self._arun(image_bytes)
+        return image_bytes if result is None else self._choose(image_bytes, result)
+
+    async def arectify_with_hash(
+        self, image_bytes: bytes, hash_size: int
+    ) -> tuple[bytes, tuple[int, bool] | None]:
+        """`rectify_with_hash` 的 coroutine 版本 (等待行程池時讓出 event loop)"""
+        result = await self._arun(image_bytes, hash_size)
+        if result is None:
+            return image_bytes, None
+        text_box, card_hash, card_found = result
+        return self._choose(image_bytes, text_box), (card_hash, card_found)
+
+    def close(self) -> None:
+        """關閉行程池"""
+        self._pool.close()
+
+    def _run(self, image_bytes: bytes, hash_size: int | None = None) -> Any:
+        """在行程池中執行，無法解碼圖片或子行程異常結束時回傳 None"""
+        try:
+            return self._submit(image_bytes, hash_size).result()
+        except _RECTIFY_ERRORS as e:
+            return self._fallback(e)
+
+    async def _arun(self, image_bytes: bytes, hash_size: int | None = None) -> Any:
+        """`_run` 的 coroutine 版本"""
+        try:
+            return await asyncio.wrap_future(self._submit(image_bytes, hash_size))
+        except _RECTIFY_ERRORS as e:
+            return self._fallback(e)
+
+    def _fallback(self, error: Exception) -> None:
+        """記錄無法校正的原因 (之後送出原本的照片)"""
+        if isinstance(error, BrokenProcessPool):
+            # 子行程異常結束 (下一個工作會改用新的行程池)
+            self.logger.warning("[CardRectifier] - process pool is broken, send the original")
+        else:
+            self.logger.warning("[CardRectifier] - cannot decode image, send the original")
+
+    def _submit(self, image_bytes: bytes, hash_size: int | None = None) -> Future[Any]:
+        if hash_size is None:
+            future = self._pool.submit(
+                rectify_card, image_bytes, width=self.width, quality=self.quality
+            )
+        else:
+            future = self._pool.submit(
+                rectify_card_with_hash,
+                image_bytes,
+                width=self.width,
+                quality=self.quality,
+                hash_size=hash_size,
+            )
+        assert future is not None
+        return future
+
+    def _choose(self, image_bytes: bytes, text_box: bytes | None) -> bytes:
+        if text_box is None:
+            self.logger.debug("[CardRectifier] - no card detected, send the original")
+            return image_bytes
+
+        self.logger.debug(
+            "[CardRectifier] - text box: %d -> %d bytes", len(image_bytes), len(text_box)
+        )
+        return text_box
+
+
+class RectifiedTextExtractor(AbstractTextExtractor):
+    def __init__(
+        self, text_extractor: AbstractTextExtractor, card_rectifier: CardRectifier
+    ) -> None:
+        """OCR 前先校正照片，只把效果框交給 `text_extractor` (URL 直接交給 `text_extractor`)
+
+        只在不快取 OCR 結果時使用；有快取時改由 `CachedTextExtractor` 呼叫 `CardRectifier`，
+        以同一次卡片偵測取得效果框與快取 key
+
+        Parameters
+        ----------
+        text_extractor : AbstractTextExtractor
+            實際執行 OCR 的文字提取器
+        card_rectifier : CardRectifier
+            OCR 前的影像前處理
+        """
+        self.text_extractor = text_extractor
+        self.card_rectifier = card_rectifier
+
+    def extract(self, src: ImageSource) -> ExtractedCard:
+        if isinstance(src, str):
+            return self.text_extractor.extract(src)
+        image_bytes = src if isinstance(src, bytes) else src.read()
+        return self.text_extractor.extract(self.card_rectifier.rectify(image_bytes))
+
+    async def aextract(self, src: ImageSource) -> ExtractedCard:
+        if isinstance(src, str):
+            return await self.text_extractor.aextract(src)
+        image_bytes = src if isinstance(src, bytes) else src.read()
+        return await self.text_extractor.aextract(await self.card_rectifier.arectify(image_bytes))
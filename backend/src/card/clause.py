@@ -0,0 +1,63 @@
+# standard library
+import re
+from typing import NamedTuple
+
+# 分隔符：效果編號 + 全形冒號 (例：①：)，或單獨的全形冒號 (cost / effect 分界)
+# NOTE: 「①②の効果」這種引用不算分隔符，因此效果編號後面一定要接冒號
+_SEPARATOR_PATTERN = re.compile(r"[①-⑳]?：")
+# 句子前後的空白
+_SPACE_PATTERN = re.compile(r"(\s*)(.*?)(\s*)", re.DOTALL)
+
+
+class Clause(NamedTuple):
+    text: str
+    # 是否需要翻譯 (分隔符原樣保留)
+    translatable: bool
+
+
+def split_clauses(text: str) -> list[Clause]:
+    """將卡片效果文字切成子句
+
+    以「。」結尾為一句，並把「①：」、「：」等分隔符與句子之間的空白 (換行) 獨立出來原樣保留，
+    將所有 `Clause.text` 串起來即為原文
+
+    Parameters
+    ----------
+    text : str
+        卡片效果文字
+
+    Returns
+    -------
+    list[Clause]
+        子句 list
+    """
+    clauses: list[Clause] = []
+    position = 0
+
+    for separator in _SEPARATOR_PATTERN.finditer(text):
+        clauses += _split_sentences(text[position : separator.start()])
+        clauses.append(Clause(separator.group(), translatable=False))
+        position = separator.end()
+    clauses += _split_sentences(text[position:])
+
+    return clauses
+
+
+def _split_sentences(text: str) -> list[Clause]:
+    """以「。」切句 (句號保留在句尾)
+
+    句子前後的空白 (例如效果之間的換行) 獨立成不需翻譯的子句原樣保留，
+    翻譯器只收到去掉空白的句子，組回時換行不會遺失
+    """
+    clauses: list[Clause] = []
+    for piece in re.findall(r"[^。]+。?|。", text):
+        match = _SPACE_PATTERN.fullmatch(piece)
+        assert match is not None
+        leading, sentence, trailing = match.groups()
+        if leading:
+            clauses.append(Clause(leading, translatable=False))
+        if sentence:
+            clauses.append(Clause(sentence, translatable=True))
+        if trailing:
+            clauses.append(Clause(trailing, translatable=False))
+    return clauses
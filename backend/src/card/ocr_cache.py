@@ -0,0 +1,226 @@
+# standard library
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+# 3rd party library
+from PIL import Image
+
+# local module
+from src.image.card_geometry import card_difference_hash
+from src.image.perceptual_hash import HammingIndex
+
+from .card_rectifier import CardRectifier
+from .text_extractor import AbstractTextExtractor, ExtractedCard, ImageSource
+
+
+class OcrCacheKey(NamedTuple):
+    # dHash
+    value: int
+    # 是否為校正後卡片的雜湊 (否則為整張照片的雜湊，只接受完全相同的雜湊)
+    card: bool = True
+
+
+class OcrResultCache:
+    def __init__(
+        self, *, max_entries: int = 1024, hash_size: int = 16, max_distance: int = 8
+    ) -> None:
+        """OCR 結果快取 (以照片中卡片的感知雜湊為 key)
+
+        雜湊以透視校正後的整張卡片計算 (`card_difference_hash`)，背景不計入雜湊：
+        重新上傳的同一張照片，或重新壓縮、縮放過的複本，雜湊只差幾個 bit，
+        透過 `HammingIndex` 找到距離在 `max_distance` 以內的條目即視為命中；
+        在同一張桌墊上拍的不同卡片雜湊差很多，不會共用條目。
+        找不到卡片時以整張照片計算雜湊，背景佔了大半，只接受完全相同的雜湊。
+        條目只放在記憶體，超過 `max_entries` 時淘汰最久未用的條目
+
+        Parameters
+        ----------
+        max_entries : int, optional
+            最多保留幾筆
+        hash_size : int, optional
+            dHash 邊長 (雜湊共 hash_size * hash_size 個 bit)
+        max_distance : int, optional
+            視為同一張卡片的最大 Hamming 距離 (0 代表只接受完全相同的雜湊)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must >= 1!")
+        if hash_size < 2:
+            raise ValueError("hash_size must >= 2!")
+
+        self.max_entries = max_entries
+        self.hash_size = hash_size
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+        # 雜湊 -> 提取出的卡片文字 (相近查詢的索引只放卡片的雜湊)
+        self._entries: OrderedDict[OcrCacheKey, ExtractedCard] = OrderedDict()
+        self._index = HammingIndex(hash_size * hash_size, max_distance)
+        self._lock = threading.Lock()
+
+    def image_hash(self, image_bytes: bytes) -> OcrCacheKey:
+        """計算照片的快取 key"""
+        return OcrCacheKey(*card_difference_hash(image_bytes, self.hash_size))
+
+    def get(self, key: OcrCacheKey) -> ExtractedCard | None:
+        """查詢快取 (先找完全相同的雜湊，卡片的雜湊再找相近的雜湊)
+
+        Parameters
+        ----------
+        key : OcrCacheKey
+            照片的快取 key
+
+        Returns
+        -------
+        ExtractedCard | None
+            快取的 OCR 結果，沒有則回傳 None
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return self._entries[key]
+
+            nearest = self._index.nearest(key.value) if key.card else None
+            if nearest is not None:
+                nearest_key = OcrCacheKey(nearest[0])
+                self._entries.move_to_end(nearest_key)
+                self.near_hits += 1
+                return self._entries[nearest_key]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: OcrCacheKey, value: ExtractedCard) -> None:
+        """寫入快取，超過上限時淘汰最久未用的條目
+
+        Parameters
+        ----------
+        key : OcrCacheKey
+            照片的快取 key
+        value : ExtractedCard
+            OCR 結果
+        """
+        with self._lock:
+            if key.card and key not in self._entries:
+                self._index.add(key.value)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                if evicted_key.card:
+                    self._index.remove(evicted_key.value)
+
+    def stats(self) -> dict[str, int | float]:
+        """命中 / 未命中計數與命中率"""
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            hits = self.exact_hits + self.near_hits
+            return {
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class CachedTextExtractor(AbstractTextExtractor):
+    def __init__(
+        self,
+        text_extractor: AbstractTextExtractor,
+        cache: OcrResultCache,
+        *,
+        logger: logging.Logger,
+        card_rectifier: CardRectifier | None = None,
+    ) -> None:
+        """以照片中卡片的感知雜湊為 key，快取 OCR 結果 (命中時不必再呼叫 OCR API)
+
+        只快取圖片 bytes / binary stream；URL 來源與無法解碼的圖片直接交給 `text_extractor`。
+        有 `card_rectifier` 時，快取 key 與效果框在同一個行程池工作中以同一次卡片偵測算出，
+        未命中時只把效果框交給 `text_extractor`；
+        沒有時在呼叫端的執行緒計算快取 key (`OcrResultCache.image_hash`)
+
+        Parameters
+        ----------
+        text_extractor : AbstractTextExtractor
+            實際執行 OCR 的文字提取器
+        cache : OcrResultCache
+            OCR 結果快取
+        logger : logging.Logger
+            日誌 logger
+        card_rectifier : CardRectifier | None, optional
+            OCR 前的影像前處理 (None 代表把原圖交給 `text_extractor`)
+        """
+        self.text_extractor = text_extractor
+        self.cache = cache
+        self.logger = logger
+        self.card_rectifier = card_rectifier
+
+    def extract(self, src: ImageSource) -> ExtractedCard:
+        if isinstance(src, str):
+            return self.text_extractor.extract(src)
+
+        image_bytes = src if isinstance(src, bytes) else src.read()
+        image_bytes, key = self._lookup_key(image_bytes)
+        if key is None:
+            return self.text_extractor.extract(image_bytes)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.logger.debug("[CachedTextExtractor] - hit (stats: %s)", self.cache.stats())
+            return cached
+
+        extracted_card = self.text_extractor.extract(image_bytes)
+        self.cache.set(key, extracted_card)
+        return extracted_card
+
+    async def aextract(self, src: ImageSource) -> ExtractedCard:
+        if isinstance(src, str):
+            return await self.text_extractor.aextract(src)
+
+        image_bytes = src if isinstance(src, bytes) else src.read()
+        image_bytes, key = await self._alookup_key(image_bytes)
+        if key is None:
+            return await self.text_extractor.aextract(image_bytes)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.logger.debug("[CachedTextExtractor] - hit (stats: %s)", self.cache.stats())
+            return cached
+
+        extracted_card = await self.text_extractor.aextract(image_bytes)
+        self.cache.set(key, extracted_card)
+        return extracted_card
+
+    def _lookup_key(self, image_bytes: bytes) -> tuple[bytes, OcrCacheKey | None]:
+        """計算快取 key (有 `card_rectifier` 時同時切出效果框)
+
+        Returns
+        -------
+        tuple[bytes, OcrCacheKey | None]
+            (之後要交給 `text_extractor` 的圖片, 快取 key)，無法快取時 key 為 None
+        """
+        if self.card_rectifier is not None:
+            text_box, card_hash = self.card_rectifier.rectify_with_hash(
+                image_bytes, self.cache.hash_size
+            )
+            return text_box, None if card_hash is None else OcrCacheKey(*card_hash)
+
+        try:
+            return image_bytes, self.cache.image_hash(image_bytes)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            self.logger.warning("[CachedTextExtractor] - cannot decode image, skip cache")
+            return image_bytes, None
+
+    async def _alookup_key(self, image_bytes: bytes) -> tuple[bytes, OcrCacheKey | None]:
+        """`_lookup_key` 的 coroutine 版本 (沒有 `card_rectifier` 時在執行緒中計算雜湊)"""
+        if self.card_rectifier is not None:
+            text_box, card_hash = await self.card_rectifier.arectify_with_hash(
+                image_bytes, self.cache.hash_size
+            )
+            return text_box, None if card_hash is None else OcrCacheKey(*card_hash)
+        return await asyncio.to_thread(self._lookup_key, image_bytes)
@@ -0,0 +1,297 @@
+"""將翻譯模型匯出成 ONNX (encoder / decoder / decoder_with_past 三張圖)
+
+Usage
+-----
+    cd backend
+    python -m src.card.onnx_export
+"""
+
+# standard library
+import argparse
+import logging
+import os
+import warnings
+
+# 3rd party library
+import torch
+from transformers import (
+    AutoTokenizer,
+    DynamicCache,
+    EncoderDecoderCache,
+    MT5ForConditionalGeneration,
+    PreTrainedTokenizerBase,
+)
+
+# local module
+from src.constants import PATH
+
+ENCODER_FILENAME = "encoder_model.onnx"
+DECODER_FILENAME = "decoder_model.onnx"
+DECODER_WITH_PAST_FILENAME = "decoder_with_past_model.onnx"
+
+
+def past_names(num_layers: int, prefix: str) -> list[str]:
+    """KV-cache 的輸入 / 輸出名稱 (先全部 self-attention，再全部 cross-attention)
+
+    Parameters
+    ----------
+    num_layers : int
+        decoder 層數
+    prefix : str
+        "past_key_values" (輸入) 或 "present" (輸出)
+
+    Returns
+    -------
+    list[str]
+        名稱 list
+    """
+    return [
+        f"{prefix}.{i}.{attention}.{kv}"
+        for attention in ("decoder", "encoder")
+        for i in range(num_layers)
+        for kv in ("key", "value")
+    ]
+
+
+def _flatten_cache(cache: DynamicCache) -> list[torch.Tensor]:
+    """將 DynamicCache 攤平成 [layer0.key, layer0.value, layer1.key, ...]"""
+    tensors: list[torch.Tensor] = []
+    for layer in cache:
+        tensors += [layer[0], layer[1]]
+    return tensors
+
+
+class _Encoder(torch.nn.Module):
+    def __init__(self, model: MT5ForConditionalGeneration) -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        return self.model.get_encoder()(
+            input_ids=input_ids, attention_mask=attention_mask
+        ).last_hidden_state
+
+
+class _Decoder(torch.nn.Module):
+    """第一步 decoder：計算 cross-attention KV，並輸出完整的 KV-cache"""
+
+    def __init__(self, model: MT5ForConditionalGeneration) -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(
+        self,
+        decoder_input_ids: torch.Tensor,
+        encoder_hidden_states: torch.Tensor,
+        encoder_attention_mask: torch.Tensor,
+    ) -> tuple[torch.Tensor, ...]:
+        output = self.model(
+            decoder_input_ids=decoder_input_ids,
+            encoder_outputs=(encoder_hidden_states,),
+            attention_mask=encoder_attention_mask,
+            past_key_values=EncoderDecoderCache(DynamicCache(), DynamicCache()),
+            use_cache=True,
+        )
+        cache = output.past_key_values
+        return (
+            output.logits,
+            *_flatten_cache(cache.self_attention_cache),
+            *_flatten_cache(cache.cross_attention_cache),
+        )
+
+
+class _DecoderWithPast(torch.nn.Module):
+    """之後每一步的 decoder：沿用 KV-cache，只輸出更新後的 self-attention KV"""
+
+    def __init__(self, model: MT5ForConditionalGeneration) -> None:
+        super().__init__()
+        self.model = model
+        self.num_layers = model.config.num_decoder_layers
+
+    def forward(
+        self,
+        decoder_input_ids: torch.Tensor,
+        encoder_attention_mask: torch.Tensor,
+        *past_key_values: torch.Tensor,
+    ) -> tuple[torch.Tensor, ...]:
+        self_attention_cache, cross_attention_cache = DynamicCache(), DynamicCache()
+        for i in range(self.num_layers):
+            self_attention_cache.update(past_key_values[2 * i], past_key_values[2 * i + 1], i)
+            j = 2 * (self.num_layers + i)
+            cross_attention_cache.update(past_key_values[j], past_key_values[j + 1], i)
+
+        # cross-attention KV 已在 cache 中，encoder_hidden_states 只需要形狀正確
+        batch_size, source_length = encoder_attention_mask.shape
+        encoder_hidden_states = torch.zeros(batch_size, source_length, self.model.config.d_model)
+
+        output = self.model(
+            decoder_input_ids=decoder_input_ids,
+            encoder_outputs=(encoder_hidden_states,),
+            attention_mask=encoder_attention_mask,
+            past_key_values=EncoderDecoderCache(self_attention_cache, cross_attention_cache),
+            use_cache=True,
+        )
+        return (output.logits, *_flatten_cache(output.past_key_values.self_attention_cache))
+
+
+def export_onnx(
+    model: MT5ForConditionalGeneration,
+    tokenizer: PreTrainedTokenizerBase,
+    output_dir: str,
+    *,
+    opset_version: int = 17,
+) -> None:
+    """匯出 encoder / decoder / decoder_with_past 三張 ONNX 圖，以及 tokenizer 與 config
+
+    Parameters
+    ----------
+    model : MT5ForConditionalGeneration
+        翻譯模型
+    tokenizer : PreTrainedTokenizerBase
+        tokenizer (需為 fast tokenizer，推論時只用 `tokenizers` 載入 tokenizer.json)
+    output_dir : str
+        輸出目錄
+    opset_version : int, optional
+        ONNX opset 版本
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    model = model.eval()
+    num_layers = model.config.num_decoder_layers
+
+    # 範例輸入 (batch 與長度皆為動態軸)
+    input_ids = torch.tensor([[5, 6, 7, 1], [8, 1, 0, 0]])
+    attention_mask = (input_ids != model.config.pad_token_id).long()
+    decoder_input_ids = torch.full((2, 1), model.config.decoder_start_token_id)
+
+    # wrapper 需設為 eval，否則匯出結束時會把模型切回 training 模式
+    encoder, decoder, decoder_with_past = (
+        _Encoder(model).eval(),
+        _Decoder(model).eval(),
+        _DecoderWithPast(model).eval(),
+    )
+
+    with torch.no_grad():
+        encoder_hidden_states = encoder(input_ids, attention_mask)
+        past_key_values = decoder(decoder_input_ids, encoder_hidden_states, attention_mask)[1:]
+
+    # tracing 時 transformers 內部的 python 分支會觸發大量 TracerWarning，這裡統一忽略
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", torch.jit.TracerWarning)
+        _export_graphs(
+            encoder,
+            decoder,
+            decoder_with_past,
+            output_dir,
+            opset_version=opset_version,
+            sample_inputs=(input_ids, attention_mask, decoder_input_ids),
+            sample_hidden_states=encoder_hidden_states,
+            sample_past_key_values=past_key_values,
+            num_layers=num_layers,
+        )
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+
+def _export_graphs(
+    encoder: _Encoder,
+    decoder: _Decoder,
+    decoder_with_past: _DecoderWithPast,
+    output_dir: str,
+    *,
+    opset_version: int,
+    sample_inputs: tuple[torch.Tensor, torch.Tensor, torch.Tensor],
+    sample_hidden_states: torch.Tensor,
+    sample_past_key_values: tuple[torch.Tensor, ...],
+    num_layers: int,
+) -> None:
+    """以範例輸入 tracing 三張圖並寫入 `output_dir`"""
+    input_ids, attention_mask, decoder_input_ids = sample_inputs
+    encoder_hidden_states, past_key_values = sample_hidden_states, sample_past_key_values
+    self_past_outputs = past_names(num_layers, "present")[: 2 * num_layers]
+    all_past_outputs = past_names(num_layers, "present")
+    all_past_inputs = past_names(num_layers, "past_key_values")
+    batch_and_source = {0: "batch_size", 1: "source_length"}
+
+    torch.onnx.export(
+        encoder,
+        (input_ids, attention_mask),
+        os.path.join(output_dir, ENCODER_FILENAME),
+        dynamo=False,
+        opset_version=opset_version,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": batch_and_source,
+            "attention_mask": batch_and_source,
+            "last_hidden_state": batch_and_source,
+        },
+    )
+
+    decoder_axes = {
+        "decoder_input_ids": {0: "batch_size"},
+        "encoder_hidden_states": batch_and_source,
+        "encoder_attention_mask": batch_and_source,
+        "logits": {0: "batch_size"},
+    }
+    for name in all_past_outputs:
+        decoder_axes[name] = (
+            {0: "batch_size", 2: "source_length"} if "encoder" in name else {0: "batch_size"}
+        )
+    torch.onnx.export(
+        decoder,
+        (decoder_input_ids, encoder_hidden_states, attention_mask),
+        os.path.join(output_dir, DECODER_FILENAME),
+        dynamo=False,
+        opset_version=opset_version,
+        input_names=["decoder_input_ids", "encoder_hidden_states", "encoder_attention_mask"],
+        output_names=["logits", *all_past_outputs],
+        dynamic_axes=decoder_axes,
+    )
+
+    decoder_with_past_axes = {
+        "decoder_input_ids": {0: "batch_size"},
+        "encoder_attention_mask": batch_and_source,
+        "logits": {0: "batch_size"},
+    }
+    for name in all_past_inputs:
+        decoder_with_past_axes[name] = {
+            0: "batch_size",
+            2: "source_length" if "encoder" in name else "past_length",
+        }
+    for name in self_past_outputs:
+        decoder_with_past_axes[name] = {0: "batch_size", 2: "past_length + 1"}
+    torch.onnx.export(
+        decoder_with_past,
+        (decoder_input_ids, attention_mask, *past_key_values),
+        os.path.join(output_dir, DECODER_WITH_PAST_FILENAME),
+        dynamo=False,
+        opset_version=opset_version,
+        input_names=["decoder_input_ids", "encoder_attention_mask", *all_past_inputs],
+        output_names=["logits", *self_past_outputs],
+        dynamic_axes=decoder_with_past_axes,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the translation model to ONNX")
+    parser.add_argument("--output-dir", default=PATH.ONNX_MODEL_DIR.value)
+    parser.add_argument("--revision", default="defualt_0321-0402")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger("onnx_export")
+
+    logger.info("loading model from %s ...", PATH.MODEL_DIR.value)
+    tokenizer = AutoTokenizer.from_pretrained(PATH.MODEL_DIR.value, trust_remote_code=True)
+    model = MT5ForConditionalGeneration.from_pretrained(
+        PATH.MODEL_DIR.value, revision=args.revision
+    )
+
+    logger.info("exporting to %s ...", args.output_dir)
+    export_onnx(model, tokenizer, args.output_dir)
+    logger.info("done")
+
+
+if __name__ == "__main__":
+    main()
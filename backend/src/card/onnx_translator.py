@@ -0,0 +1,246 @@
+# standard library
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from typing import Any
+
+# 3rd party library
+import numpy as np
+import onnxruntime as ort
+from tokenizers import Tokenizer
+
+# local module
+from src.constants import PATH
+from src.utils.deadline import current_deadline
+from src.utils.metrics import LatencyRecorder, resident_memory_bytes
+
+from .onnx_export import DECODER_FILENAME, DECODER_WITH_PAST_FILENAME, ENCODER_FILENAME, past_names
+from .translator import AbstractTranslator
+
+
+class OnnxYugiohTranslator(AbstractTranslator):
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        model_dir: str = PATH.ONNX_MODEL_DIR.value,
+        output_length_ratio: float = 2.0,
+        output_length_margin: int = 16,
+        intra_op_num_threads: int = 0,
+    ) -> None:
+        """以 ONNX Runtime (CPU) 執行的遊戲王卡片翻譯模型
+
+        需先以 `python -m src.card.onnx_export` 匯出模型。
+        推論只經過 onnxruntime 與 tokenizers (不經過 PyTorch)，
+        並以 greedy decoding 搭配 KV-cache 逐步生成
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            日誌 logger
+        model_dir : str, optional
+            ONNX 模型目錄
+        output_length_ratio : float, optional
+            輸出 token 預算 = 輸入 token 數 * ratio + margin
+        output_length_margin : int, optional
+            同上
+        intra_op_num_threads : int, optional
+            每個運算子使用的執行緒數 (0 代表由 onnxruntime 決定)
+        """
+        self.logger = logger
+        self.model_dir = model_dir
+        self.prefix = "<-ja2zh->"
+        self.max_length = 768
+        self.output_length_ratio = output_length_ratio
+        self.output_length_margin = output_length_margin
+
+        load_start = time.perf_counter()
+
+        # config
+        with open(os.path.join(model_dir, "config.json"), encoding="utf-8") as file:
+            config: dict[str, Any] = json.load(file)
+        self._export_id = _export_id(model_dir)
+        self._num_layers: int = config["num_decoder_layers"]
+        self._decoder_start_token_id: int = config["decoder_start_token_id"]
+        self._eos_token_id: int = config["eos_token_id"]
+        self._pad_token_id: int = config["pad_token_id"]
+
+        # tokenizer
+        self.logger.debug("[OnnxYugiohTranslator] - loading tokenizer...")
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self._tokenizer.enable_truncation(self.max_length)
+        self.logger.debug("[OnnxYugiohTranslator] - tokenizer ready")
+
+        # sessions
+        self.logger.debug("[OnnxYugiohTranslator] - loading model...")
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = intra_op_num_threads
+        self._encoder, self._decoder, self._decoder_with_past = (
+            ort.InferenceSession(
+                os.path.join(model_dir, filename),
+                sess_options=session_options,
+                providers=["CPUExecutionProvider"],
+            )
+            for filename in (ENCODER_FILENAME, DECODER_FILENAME, DECODER_WITH_PAST_FILENAME)
+        )
+        self._past_input_names = past_names(self._num_layers, "past_key_values")
+
+        self.load_seconds = time.perf_counter() - load_start
+        self._latency = LatencyRecorder()
+        resident_memory = resident_memory_bytes()
+        self.logger.info(
+            "[OnnxYugiohTranslator] - model ready (load: %.1f s, RSS: %s MB)",
+            self.load_seconds,
+            "?" if resident_memory is None else resident_memory // 2**20,
+        )
+
+    @property
+    def deterministic(self) -> bool:
+        return True
+
+    @property
+    def fingerprint(self) -> str:
+        """後端、匯出的模型 (重新匯出時改變) 與輸出長度設定 (只支援 greedy decoding)"""
+        return (
+            f"onnx:{self.model_dir}@{self._export_id}:greedy"
+            f":{self.output_length_ratio}+{self.output_length_margin}"
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """載入時間、常駐記憶體與單筆請求延遲"""
+        return {
+            "precision": "onnx-fp32",
+            "device": "cpu",
+            "load_seconds": self.load_seconds,
+            "resident_memory_bytes": resident_memory_bytes(),
+            "latency": self._latency.summary(),
+        }
+
+    def translate(self, untranslated_text: str) -> str:
+        return self.translate_batch([untranslated_text])[0]
+
+    def translate_batch(self, untranslated_texts: list[str]) -> list[str]:
+        self.logger.debug(
+            "[OnnxYugiohTranslator] - translation started (batch size: %d)",
+            len(untranslated_texts),
+        )
+        start = time.perf_counter()
+
+        # tokenize 並 pad 到同批最長
+        encodings = self._tokenizer.encode_batch(
+            [self.prefix + untranslated_text for untranslated_text in untranslated_texts]
+        )
+        input_lengths = [len(encoding.ids) for encoding in encodings]
+        input_ids = np.full((len(encodings), max(input_lengths)), self._pad_token_id, np.int64)
+        for i, encoding in enumerate(encodings):
+            input_ids[i, : len(encoding.ids)] = encoding.ids
+        attention_mask = (np.arange(input_ids.shape[1]) < np.array(input_lengths)[:, None]).astype(
+            np.int64
+        )
+
+        max_new_tokens = max(self._output_budget(length) for length in input_lengths)
+        output_ids = self._greedy_generate(input_ids, attention_mask, max_new_tokens)
+        translated_texts = self._tokenizer.decode_batch(output_ids, skip_special_tokens=True)
+
+        elapsed = time.perf_counter() - start
+        for _ in untranslated_texts:
+            self._latency.record(elapsed)
+
+        self.logger.debug(
+            "[OnnxYugiohTranslator] - translation completed.\nResult:\n%s", translated_texts
+        )
+
+        return translated_texts
+
+    def _output_budget(self, input_length: int) -> int:
+        """依輸入長度決定最多生成幾個 token"""
+        budget = math.ceil(input_length * self.output_length_ratio) + self.output_length_margin
+        return min(budget, self.max_length)
+
+    def _greedy_generate(
+        self, input_ids: np.ndarray, attention_mask: np.ndarray, max_new_tokens: int
+    ) -> list[list[int]]:
+        """greedy decoding (KV-cache)
+
+        Parameters
+        ----------
+        input_ids : np.ndarray
+            padding 後的輸入 token，形狀 (batch_size, source_length)
+        attention_mask : np.ndarray
+            同上形狀的 attention mask
+        max_new_tokens : int
+            最多生成幾個 token
+
+        Returns
+        -------
+        list[list[int]]
+            每筆輸入生成的 token
+
+        Raises
+        ------
+        DeadlineExceededError
+            目前請求的期限已到期或被取消 (每生成一個 token 檢查一次)
+        """
+        deadline = current_deadline()
+        batch_size = input_ids.shape[0]
+        (encoder_hidden_states,) = self._encoder.run(
+            None, {"input_ids": input_ids, "attention_mask": attention_mask}
+        )
+
+        # 第一步：計算 cross-attention KV
+        decoder_input_ids = np.full((batch_size, 1), self._decoder_start_token_id, np.int64)
+        logits, *past_key_values = self._decoder.run(
+            None,
+            {
+                "decoder_input_ids": decoder_input_ids,
+                "encoder_hidden_states": encoder_hidden_states,
+                "encoder_attention_mask": attention_mask,
+            },
+        )
+        self_past, cross_past = (
+            past_key_values[: 2 * self._num_layers],
+            past_key_values[2 * self._num_layers :],
+        )
+
+        generated: list[list[int]] = [[] for _ in range(batch_size)]
+        finished = np.zeros(batch_size, dtype=bool)
+        for _ in range(max_new_tokens):
+            if deadline is not None:
+                deadline.check()
+            next_tokens = logits[:, -1].argmax(axis=-1)
+            # 已結束的句子只補 pad
+            next_tokens = np.where(finished, self._pad_token_id, next_tokens)
+            for i in np.flatnonzero(~finished):
+                generated[i].append(int(next_tokens[i]))
+            finished |= next_tokens == self._eos_token_id
+            if finished.all():
+                break
+
+            # 之後每一步：沿用 KV-cache，只送入上一個 token
+            feeds = {
+                "decoder_input_ids": next_tokens[:, None].astype(np.int64),
+                "encoder_attention_mask": attention_mask,
+            }
+            feeds.update(zip(self._past_input_names, self_past + cross_past, strict=True))
+            logits, *self_past = self._decoder_with_past.run(None, feeds)
+
+        return generated
+
+
+def _export_id(model_dir: str) -> str:
+    """匯出的模型的識別碼 (以檔案大小與修改時間計算，不必讀取整個模型)"""
+    digest = hashlib.sha256()
+    for filename in (
+        "config.json",
+        "tokenizer.json",
+        ENCODER_FILENAME,
+        DECODER_FILENAME,
+        DECODER_WITH_PAST_FILENAME,
+    ):
+        stat = os.stat(os.path.join(model_dir, filename))
+        digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
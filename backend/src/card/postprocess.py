@@ -0,0 +1,228 @@
+# standard library
+import re
+from collections.abc import Callable, Iterator, Mapping
+from functools import partial
+from typing import NamedTuple, TypeAlias
+
+
+class CharMap(NamedTuple):
+    # 逐字元替換 (key 為單一字元，value 為任意字串，空字串代表刪除)
+    mapping: Mapping[str, str]
+
+
+class Replace(NamedTuple):
+    # 字面字串替換 (同一位置有多個 key 符合時，較長的優先)
+    replacements: Mapping[str, str]
+
+
+class RegexReplace(NamedTuple):
+    # 正規表示式替換 (`repl` 同 `re.sub`：替換字串，或接收 match 並回傳字串的函式)
+    pattern: "str | re.Pattern[str]"
+    repl: "str | Callable[[re.Match[str]], str]"
+
+
+PostprocessHook: TypeAlias = CharMap | Replace | RegexReplace | Callable[[str], str]
+
+
+class PostprocessHooks:
+    def __init__(self) -> None:
+        """翻譯後處理 hook 的註冊表
+
+        hook 可以宣告成字元對照表 (`CharMap`)、字面字串替換 (`Replace`) 或正規表示式替換
+        (`RegexReplace`)，也可以是任意 `Callable[[str], str]`。
+        註冊時依序編譯成盡量少次的掃描：
+
+        - 連續的 `CharMap` 合併成一個 `str.translate` 表 (與依序套用的結果相同)
+        - 連續的 `Replace` 合併成一個交替 (alternation) 正規表示式，一次掃描同時替換。
+          只合併比對不會互相重疊、替換結果也不會產生 (或因刪除而接出) 後面規則的 key 的規則，
+          與依序套用的結果相同；否則從該規則開始另一次掃描
+        - `RegexReplace` 無法判斷是否與其他規則重疊，各自掃描一次
+        - 任意函式各自執行一次，並隔開前後的合併 (維持註冊順序)
+        """
+        self.hooks: list[PostprocessHook] = []
+        self.passes: list[Callable[[str], str]] = []
+
+    def add(self, hook: PostprocessHook) -> None:
+        """註冊 hook，並重新編譯
+
+        Parameters
+        ----------
+        hook : PostprocessHook
+            後處理 hook
+
+        Raises
+        ------
+        ValueError
+            `CharMap` 的 key 不是單一字元，或正規表示式不合法
+        """
+        try:
+            passes = _compile([*self.hooks, hook])
+        except re.error as e:
+            raise ValueError(f"invalid postprocess regex: {e}") from e
+        self.hooks.append(hook)
+        self.passes = passes
+
+    def __call__(self, text: str) -> str:
+        """依序套用所有 hook
+
+        Parameters
+        ----------
+        text : str
+            後處理前字串
+
+        Returns
+        -------
+        str
+            後處理後字串
+        """
+        for postprocess_pass in self.passes:
+            text = postprocess_pass(text)
+        return text
+
+    @property
+    def fingerprint(self) -> str:
+        """影響後處理結果的 hook 設定 (依註冊順序)
+
+        宣告式 hook 以其內容表示；任意函式 (與 `RegexReplace` 的替換函式) 只能以模組與名稱表示，
+        修改函式內容時應一併改名
+        """
+        return "|".join(_describe(hook) for hook in self.hooks)
+
+    def __len__(self) -> int:
+        return len(self.hooks)
+
+    def __iter__(self) -> Iterator[PostprocessHook]:
+        return iter(self.hooks)
+
+
+class _TranslatePass:
+    def __init__(self, char_maps: list[CharMap]) -> None:
+        """把連續的字元對照表合併成一個 `str.translate` 表"""
+        table: dict[str, str] = {}
+        for char_map in char_maps:
+            # 先前已替換的字元，替換結果再套用這個對照表
+            translation = str.maketrans(dict(char_map.mapping))
+            table = {char: output.translate(translation) for char, output in table.items()}
+            for char, output in char_map.mapping.items():
+                table.setdefault(char, output)
+        self.mapping = table
+        self.table = str.maketrans(table)
+        # 非 ASCII 字串 (中文翻譯) 的 `str.translate` 要逐字元查表，
+        # 改以字元類別找出要替換的字元 (C 實作掃描，只對符合的字元查表)
+        self.regex = re.compile(f"[{''.join(map(re.escape, table))}]") if table else None
+
+    def __call__(self, text: str) -> str:
+        if self.regex is None:
+            return text
+        if text.isascii():
+            return text.translate(self.table)
+        return self.regex.sub(self._replace, text)
+
+    def _replace(self, match: re.Match[str]) -> str:
+        return self.mapping[match.group()]
+
+
+class _ReplacePass:
+    def __init__(self, rules: list[Replace]) -> None:
+        """把連續的字面字串替換合併成一個交替正規表示式
+
+        合併的規則彼此不會重疊 (見 `_conflicts`)，因此可以放進同一個對照表，
+        同一位置有多個 key 符合時只可能來自同一個規則，較長的優先
+        """
+        self.replacements: dict[str, str] = {}
+        for rule in rules:
+            self.replacements.update(_literal_replacements(rule))
+        keys = sorted(self.replacements, key=len, reverse=True)
+        self.regex = re.compile("|".join(map(re.escape, keys))) if keys else None
+
+    def __call__(self, text: str) -> str:
+        if self.regex is None:
+            return text
+        return self.regex.sub(self._replace, text)
+
+    def _replace(self, match: re.Match[str]) -> str:
+        return self.replacements[match.group()]
+
+
+def _compile(hooks: list[PostprocessHook]) -> list[Callable[[str], str]]:
+    """依序把 hook 編譯成掃描 (連續同種的宣告式 hook 盡量合併成一次)"""
+    passes: list[Callable[[str], str]] = []
+    char_maps: list[CharMap] = []
+    rules: list[Replace] = []
+
+    def flush() -> None:
+        if char_maps:
+            passes.append(_TranslatePass(char_maps.copy()))
+            char_maps.clear()
+        if rules:
+            passes.append(_ReplacePass(rules.copy()))
+            rules.clear()
+
+    for hook in hooks:
+        if isinstance(hook, CharMap):
+            if rules:
+                flush()
+            char_maps.append(hook)
+        elif isinstance(hook, Replace):
+            if char_maps or any(_conflicts(rule, hook) for rule in rules):
+                flush()
+            rules.append(hook)
+        elif isinstance(hook, RegexReplace):
+            flush()
+            passes.append(partial(re.compile(hook.pattern).sub, hook.repl))
+        else:
+            flush()
+            passes.append(hook)
+    flush()
+
+    return passes
+
+
+def _describe(hook: PostprocessHook) -> str:
+    """hook 的設定 (不含記憶體位址，不同行程、重新啟動後都相同)"""
+    if isinstance(hook, CharMap | Replace):
+        return repr(hook)
+    if isinstance(hook, RegexReplace):
+        pattern = hook.pattern
+        if isinstance(pattern, re.Pattern):
+            pattern = f"{pattern.pattern}/{pattern.flags}"
+        repl = hook.repl if isinstance(hook.repl, str) else _callable_name(hook.repl)
+        return f"RegexReplace({pattern!r}, {repl!r})"
+    return _callable_name(hook)
+
+
+def _callable_name(fn: Callable[..., str]) -> str:
+    """函式的模組與名稱"""
+    module = getattr(fn, "__module__", None) or type(fn).__module__
+    return f"{module}.{getattr(fn, '__qualname__', type(fn).__qualname__)}"
+
+
+def _literal_replacements(rule: Replace) -> dict[str, str]:
+    """字面字串替換的對照表 (不含空字串 key)"""
+    return {key: value for key, value in rule.replacements.items() if key}
+
+
+def _conflicts(earlier: Replace, later: Replace) -> bool:
+    """兩個規則合併成一次掃描時，結果是否可能與依序套用不同
+
+    - 兩者的 key 在文字中可能重疊：依序套用時先替換的會破壞後者的比對
+    - 前者的替換結果可能含有 (或接出) 後者的 key：依序套用時後者會再替換
+    - 前者刪除文字 (替換成空字串)：前後的文字接起來可能成為後者的 key
+    """
+    later_keys = list(_literal_replacements(later))
+    for key, value in _literal_replacements(earlier).items():
+        for later_key in later_keys:
+            if _overlaps(key, later_key):
+                return True
+            if value and _overlaps(value, later_key):
+                return True
+            if not value and len(later_key) > 1:
+                return True
+    return False
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """兩個字串在同一段文字中能否重疊 (其中一個包含另一個，或一個的結尾是另一個的開頭)"""
+    if a in b or b in a:
+        return True
+    return any(a.endswith(b[:i]) or b.endswith(a[:i]) for i in range(1, min(len(a), len(b))))
@@ -1,47 +1,97 @@
 # standard library
+import asyncio
+import io
 import logging
 import random
 import re
 import time
 from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, NamedTuple
 
 # 3rd party library
+import httpx
 from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
 from msrest.authentication import CognitiveServicesCredentials
 
 # local module
+from src.utils.deadline import Deadline, current_deadline, deadline_scope
+from src.utils.event_loop import EventLoopThread
 from src.utils.misc import try_getenv
 
+from .card_layout import OcrLine, parse_card_layout
+
+# 圖片來源：URL、圖片 bytes，或可讀取圖片 bytes 的 binary stream
+ImageSource = str | bytes | BinaryIO
+
+
+class ExtractedCard(NamedTuple):
+    # 卡片效果文字
+    text: str
+    # 【】 那一行 (種族 / 類型，例：【ドラゴン族／効果】)
+    type_line: str | None = None
+    # 卡片左下角的 8 位數密碼
+    password: int | None = None
+    # 卡名
+    name: str | None = None
+
 
 class AbstractTextExtractor(ABC):
     @abstractmethod
-    def extract(self, src: str) -> str:  # pragma: no cover
-        """從指定來源提取文字
+    def extract(self, src: ImageSource) -> ExtractedCard:  # pragma: no cover
+        """從指定來源提取卡片文字
 
         Parameters
         ----------
-        src : str
-            圖片 URL
+        src : ImageSource
+            圖片 URL、圖片 bytes 或 binary stream
 
         Returns
         -------
-        str
-            提取出的文字
+        ExtractedCard
+            提取出的卡片效果文字、【】 行與卡片密碼
         """
         pass
 
+    async def aextract(self, src: ImageSource) -> ExtractedCard:
+        """`extract` 的 coroutine 版本 (預設在執行緒中執行 `extract`，不阻塞 event loop)
+
+        Parameters
+        ----------
+        src : ImageSource
+            圖片 URL、圖片 bytes 或 binary stream
+
+        Returns
+        -------
+        ExtractedCard
+            提取出的卡片效果文字、【】 行與卡片密碼
+        """
+        return await asyncio.to_thread(self.extract, src)
+
 
 class OcrTextExtractor(AbstractTextExtractor):
-    def __init__(self, *, logger: logging.Logger) -> None:
-        self.logger = logger
-        self._subscription_key = try_getenv("AZURE_CV_SUBSCRIPTION_KEY")
-        self._endpoint = try_getenv("AZURE_CV_ENDPOINT")
-        self._computervision_client = ComputerVisionClient(
-            self._endpoint, CognitiveServicesCredentials(self._subscription_key)
-        )
+    def __init__(
+        self, *, logger: logging.Logger, client: ComputerVisionClient | None = None
+    ) -> None:
+        """Azure OCR 文字提取器
 
-    def extract(self, src: str) -> str:
+        Parameters
+        ----------
+        logger : logging.Logger
+            日誌 logger
+        client : ComputerVisionClient | None, optional
+            OCR client (None 代表以環境變數建立 Azure client；測試時可換成本地替身)
+        """
+        self.logger = logger
+        if client is None:
+            self._subscription_key = try_getenv("AZURE_CV_SUBSCRIPTION_KEY")
+            self._endpoint = try_getenv("AZURE_CV_ENDPOINT")
+            client = ComputerVisionClient(
+                self._endpoint, CognitiveServicesCredentials(self._subscription_key)
+            )
+        self._computervision_client = client
+
+    def extract(self, src: ImageSource) -> ExtractedCard:
         self.logger.debug("[OcrTextExtractor] - extracting text started")
 
         operation_id = self._send_read_request(src)
@@ -52,36 +102,43 @@ class OcrTextExtractor(AbstractTextExtractor):
             read_result,
         )
 
-        extracted_text = OcrTextExtractor._filter_text(read_result)
+        extracted_card = OcrTextExtractor._parse_card(read_result)
 
         self.logger.debug(
             "In OcrTextExtractor, filtering text completed.\nResult:\n%s",
-            extracted_text,
+            extracted_card,
         )
 
-        return extracted_text
+        return extracted_card
 
-    def _send_read_request(self, src: str) -> str:
+    def _send_read_request(self, src: ImageSource) -> str:
         """發送 OCR 請求，返回操作 ID
 
+        URL 交給 Azure 自行下載；圖片 bytes / stream 則直接放在請求本體上傳
+        (不必先存檔或轉存到其他圖床)
+
         Parameters
         ----------
-        src : str
-            圖片 URL
+        src : ImageSource
+            圖片 URL、圖片 bytes 或 binary stream
 
         Returns
         -------
         str
             操作 ID
         """
-        read_response = self._computervision_client.read(src, raw=True)
+        if isinstance(src, str):
+            read_response = self._computervision_client.read(src, raw=True)
+        else:
+            stream = io.BytesIO(src) if isinstance(src, bytes) else src
+            read_response = self._computervision_client.read_in_stream(stream, raw=True)
         operation_id = read_response.headers["Operation-Location"].split("/")[-1]
 
         return operation_id
 
     def _poll_with_backoff(
         self, operation_id: str, *, max_attempts: int = 10, initial_wait: float = 1.0
-    ) -> list[str]:
+    ) -> list[OcrLine]:
         """向 Azure OCR API 不斷輪詢
 
         Parameters
@@ -95,8 +152,8 @@ class OcrTextExtractor(AbstractTextExtractor):
 
         Returns
         -------
-        list[str]
-            讀取結果
+        list[OcrLine]
+            讀取結果 (每一行文字與其 bounding box)
 
         Raises
         ------
@@ -106,6 +163,8 @@ class OcrTextExtractor(AbstractTextExtractor):
             OCR 程序跑太久
         TimeoutError
             OCR 程序不知為何未開始
+        DeadlineExceededError
+            請求已超過期限或被取消 (不再輪詢)
         """
 
         if max_attempts < 1:
@@ -115,23 +174,26 @@ class OcrTextExtractor(AbstractTextExtractor):
 
         wait_time = initial_wait
         read_result = None
+        deadline = current_deadline()
 
         for _ in range(max_attempts):
+            if deadline is not None:
+                deadline.check()
             read_result = self._computervision_client.get_read_result(operation_id)
             if read_result.status == OperationStatusCodes.succeeded:
                 break
             elif read_result.status == OperationStatusCodes.failed:
                 raise RuntimeError("OCR processing failed.")
             else:
-                time.sleep(wait_time)
+                _sleep(wait_time, deadline)
                 # 每次 request 最多間隔 10 秒
                 wait_time = min(wait_time * 2, 10)
                 # 加入 jitter (避免同算法的 client 造成流量高峰)
                 wait_time -= random.uniform(0, wait_time * 0.1)
 
         if read_result.status == OperationStatusCodes.succeeded:
-            extracted_text_list: list[str] = [
-                line.text
+            extracted_text_list: list[OcrLine] = [
+                OcrLine(line.text, getattr(line, "bounding_box", None))
                 for text_result in read_result.analyze_result.read_results
                 for line in text_result.lines
             ]
@@ -141,6 +203,39 @@ class OcrTextExtractor(AbstractTextExtractor):
         elif read_result.status == OperationStatusCodes.not_started:
             raise TimeoutError("OCR processing is not even started!")
 
+    @staticmethod
+    def _parse_card(text_list: list[str]) -> ExtractedCard:
+        """從 OCR 提取出的文字整理出卡片效果文字、【】 行、卡片密碼與卡名
+
+        有 bounding box 時依版面只取效果框內的文字 (`parse_card_layout`)，
+        否則退回以字串規則過濾 (`_filter_text`)
+
+        Parameters
+        ----------
+        text_list : list[str]
+            OCR 提取出的每一行文字 (`OcrLine` 會帶著 bounding box)
+
+        Returns
+        -------
+        ExtractedCard
+            卡片效果文字、【】 行、卡片密碼與卡名 (找不到時為 None)
+        """
+        layout = parse_card_layout(
+            [OcrLine(text, getattr(text, "bounding_box", None)) for text in text_list]
+        )
+        if layout is not None:
+            return ExtractedCard(layout.effect_text, layout.type_line, layout.password, layout.name)
+
+        # 與 `_filter_text` 的切法一致：效果從最後一個 【】 行之後開始，到第一個密碼行之前結束
+        type_line = next(
+            (text for text in reversed(text_list) if "【" in text and "】" in text), None
+        )
+        password = next(
+            (int(match.group(1)) for text in text_list if (match := re.match(r"(\d{8})", text))),
+            None,
+        )
+        return ExtractedCard(OcrTextExtractor._filter_text(text_list), type_line, password)
+
     @staticmethod
     def _filter_text(text_list: list[str]) -> str:
         """過濾 OCR 提取出的文字
@@ -186,3 +281,206 @@ class OcrTextExtractor(AbstractTextExtractor):
         description = "".join(description_text_list)
 
         return description
+
+
+def _sleep(seconds: float, deadline: Deadline | None) -> None:
+    """等待 `seconds` 秒 (有期限時最多等到期限，被取消時提早醒來並拋出 `DeadlineExceededError`)"""
+    if deadline is None:
+        time.sleep(seconds)
+    else:
+        deadline.sleep(seconds)
+
+
+class AsyncOcrTextExtractor(AbstractTextExtractor):
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        event_loop: EventLoopThread,
+        endpoint: str | None = None,
+        subscription_key: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_attempts: int = 10,
+        initial_wait: float = 1.0,
+        max_connections: int = 100,
+    ) -> None:
+        """以 coroutine 呼叫 Azure Read REST API 的 OCR 文字提取器
+
+        `aextract` 上傳圖片與輪詢結果時都讓出 event loop (輪詢以 `Deadline.asleep` /
+        `asyncio.sleep` 等待)，同時進行中的 OCR 只佔用 event loop 上的 coroutine，
+        共用有上限的 HTTP 連線池。`extract` 把 `aextract` 交給 `event_loop` 並等待結果
+        (供同步的翻譯流程使用)。HTTP client 屬於第一次使用它的 event loop，
+        只能在 `event_loop` 上呼叫 `aextract`
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            日誌 logger
+        event_loop : EventLoopThread
+            執行 OCR 請求的 event loop
+        endpoint : str | None, optional
+            Azure Computer Vision endpoint (None 代表讀取環境變數 `AZURE_CV_ENDPOINT`)
+        subscription_key : str | None, optional
+            Azure Computer Vision 金鑰 (None 代表讀取環境變數 `AZURE_CV_SUBSCRIPTION_KEY`)
+        transport : httpx.AsyncBaseTransport | None, optional
+            HTTP transport (None 代表預設的連線池)
+        max_attempts : int, optional
+            每個 OCR 工作最多輪詢幾次
+        initial_wait : float, optional
+            最初等待時間
+        max_connections : int, optional
+            最多同時幾條 HTTP 連線
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must >= 1!")
+        if initial_wait <= 0:
+            raise ValueError("initial_wait must > 0!")
+        if max_connections < 1:
+            raise ValueError("max_connections must >= 1!")
+
+        self.logger = logger
+        self.event_loop = event_loop
+        self.max_attempts = max_attempts
+        self.initial_wait = initial_wait
+        self.max_connections = max_connections
+
+        if subscription_key is None:
+            subscription_key = try_getenv("AZURE_CV_SUBSCRIPTION_KEY")
+        if endpoint is None:
+            endpoint = try_getenv("AZURE_CV_ENDPOINT")
+        self._subscription_key = subscription_key
+        self._endpoint = endpoint.rstrip("/")
+        self._transport = transport
+
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    def extract(self, src: ImageSource) -> ExtractedCard:
+        # event loop 執行緒看不到呼叫端的 context，期限直接傳入
+        deadline = current_deadline()
+
+        async def extract_in_scope() -> ExtractedCard:
+            with deadline_scope(deadline):
+                return await self.aextract(src)
+
+        return self.event_loop.submit(extract_in_scope()).result()
+
+    async def aextract(self, src: ImageSource) -> ExtractedCard:
+        self.logger.debug("[AsyncOcrTextExtractor] - extracting text started")
+
+        operation_url = await self._send_read_request(src)
+        read_result = await self._poll_with_backoff(operation_url)
+        extracted_card = OcrTextExtractor._parse_card(read_result)
+
+        self.logger.debug(
+            "[AsyncOcrTextExtractor] - extracting text completed.\nResult:\n%s", extracted_card
+        )
+
+        return extracted_card
+
+    async def aclose(self) -> None:
+        """關閉 HTTP 連線 (在 `event_loop` 上呼叫)"""
+        if self._client is not None and self._client_loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """目前 event loop 的 HTTP client (第一次使用時建立；fork 後的子行程會重新建立一個)"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                headers={"Ocp-Apim-Subscription-Key": self._subscription_key},
+                transport=self._transport,
+                limits=httpx.Limits(max_connections=self.max_connections),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _send_read_request(self, src: ImageSource) -> str:
+        """發送 OCR 請求，返回查詢結果用的 URL
+
+        Parameters
+        ----------
+        src : ImageSource
+            圖片 URL、圖片 bytes 或 binary stream
+
+        Returns
+        -------
+        str
+            查詢結果用的 URL (Operation-Location)
+        """
+        client = self._get_client()
+        url = f"{self._endpoint}/vision/v3.2/read/analyze"
+        if isinstance(src, str):
+            response = await client.post(url, json={"url": src})
+        else:
+            content = src if isinstance(src, bytes) else src.read()
+            response = await client.post(
+                url, content=content, headers={"Content-Type": "application/octet-stream"}
+            )
+        response.raise_for_status()
+
+        return response.headers["Operation-Location"]
+
+    async def _poll_with_backoff(self, operation_url: str) -> list[OcrLine]:
+        """向 Azure OCR API 不斷輪詢 (等待期間讓出 event loop)
+
+        Parameters
+        ----------
+        operation_url : str
+            查詢結果用的 URL
+
+        Returns
+        -------
+        list[OcrLine]
+            讀取結果 (每一行文字與其 bounding box)
+
+        Raises
+        ------
+        RuntimeError
+            OCR 程序處理失敗
+        TimeoutError
+            OCR 程序跑太久
+        TimeoutError
+            OCR 程序不知為何未開始
+        DeadlineExceededError
+            請求已超過期限或被取消 (不再輪詢)
+        """
+        client = self._get_client()
+        wait_time = self.initial_wait
+        read_result: dict[str, Any] = {}
+        deadline = current_deadline()
+
+        for _ in range(self.max_attempts):
+            if deadline is not None:
+                deadline.check()
+            response = await client.get(operation_url)
+            response.raise_for_status()
+            read_result = response.json()
+            if read_result["status"] == OperationStatusCodes.succeeded:
+                return [
+                    OcrLine(line["text"], line.get("boundingBox"))
+                    for text_result in read_result["analyzeResult"]["readResults"]
+                    for line in text_result["lines"]
+                ]
+            elif read_result["status"] == OperationStatusCodes.failed:
+                raise RuntimeError("OCR processing failed.")
+            else:
+                await _asleep(wait_time, deadline)
+                # 每次 request 最多間隔 10 秒
+                wait_time = min(wait_time * 2, 10)
+                # 加入 jitter (避免同算法的 client 造成流量高峰)
+                wait_time -= random.uniform(0, wait_time * 0.1)
+
+        if read_result["status"] == OperationStatusCodes.not_started:
+            raise TimeoutError("OCR processing is not even started!")
+        raise TimeoutError("OCR processing took too long!")
+
+
+async def _asleep(seconds: float, deadline: Deadline | None) -> None:
+    """`_sleep` 的 coroutine 版本 (等待時讓出 event loop)"""
+    if deadline is None:
+        await asyncio.sleep(seconds)
+    else:
+        await deadline.asleep(seconds)
@@ -0,0 +1,279 @@
+# standard library
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Iterator
+
+# local module
+from .translator import AbstractTranslator
+
+
+def normalize_source_text(text: str) -> str:
+    """正規化日文原文，作為快取 key
+
+    OCR 每次切行、空白位置都不太一樣，因此統一 Unicode 形式並移除所有空白
+
+    Parameters
+    ----------
+    text : str
+        日文原文
+
+    Returns
+    -------
+    str
+        正規化後字串
+    """
+    return re.sub(r"\s+", "", unicodedata.normalize("NFC", text))
+
+
+class TranslationCache:
+    def __init__(
+        self,
+        db_path: str | None = None,
+        *,
+        max_entries: int = 4096,
+        ttl: float | None = 86400.0,
+    ) -> None:
+        """翻譯記憶快取
+
+        熱門條目放在記憶體 LRU (依數量與 TTL 淘汰)，所有條目另外寫入 SQLite (WAL 模式)，
+        重啟後仍可沿用 (SQLite 的條目同樣超過 TTL 即失效，連線時清除)
+
+        Parameters
+        ----------
+        db_path : str | None, optional
+            SQLite 檔案路徑，None 代表只用記憶體
+        max_entries : int, optional
+            記憶體 LRU 最多保留幾筆
+        ttl : float | None, optional
+            條目存活秒數 (記憶體與 SQLite)，None 代表不過期
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must >= 1!")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must > 0!")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # key -> (value, 過期時間)
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # SQLite 連線在第一次使用時才建立，且每個行程各自連線 (連線不能跨 fork 共用)
+        self.db_path = db_path
+        self._connection: sqlite3.Connection | None = None
+        self._connection_pid: int | None = None
+        # fork 前父行程的連線：子行程不能使用，也不能關閉 (會影響父行程的 WAL)，只保留參照
+        self._inherited_connections: list[sqlite3.Connection] = []
+
+    def get(self, key: str) -> str | None:
+        """查詢快取 (記憶體 → SQLite)
+
+        Parameters
+        ----------
+        key : str
+            快取 key
+
+        Returns
+        -------
+        str | None
+            快取值，沒有則回傳 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._entries[key]
+
+            connection = self._db()
+            if connection is not None:
+                row = connection.execute(
+                    "SELECT value, created_at FROM translation WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    age = time.time() - created_at
+                    if self.ttl is None or age < self.ttl:
+                        self._remember(key, value, age)
+                        self.disk_hits += 1
+                        return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """寫入快取 (記憶體與 SQLite)
+
+        Parameters
+        ----------
+        key : str
+            快取 key
+        value : str
+            快取值
+        """
+        with self._lock:
+            self._remember(key, value)
+            connection = self._db()
+            if connection is not None:
+                connection.execute(
+                    "INSERT OR REPLACE INTO translation (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, time.time()),
+                )
+                connection.commit()
+
+    def stats(self) -> dict[str, int]:
+        """命中 / 未命中計數"""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._entries),
+            }
+
+    def close(self) -> None:
+        """關閉 SQLite 連線"""
+        with self._lock:
+            if self._connection is not None and self._connection_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+            self._connection_pid = None
+
+    def _db(self) -> sqlite3.Connection | None:
+        """目前行程的 SQLite 連線 (呼叫端需持有 lock)，只用記憶體時回傳 None"""
+        if self.db_path is None:
+            return None
+        if self._connection_pid == os.getpid():
+            return self._connection
+
+        if self._connection is not None:
+            self._inherited_connections.append(self._connection)
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS translation ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        if self.ttl is not None:
+            self._connection.execute(
+                "DELETE FROM translation WHERE created_at <= ?", (time.time() - self.ttl,)
+            )
+        self._connection.commit()
+        self._connection_pid = os.getpid()
+        return self._connection
+
+    def _remember(self, key: str, value: str, age: float = 0.0) -> None:
+        """放進記憶體 LRU，超過上限時淘汰最久未用的條目 (呼叫端需持有 lock)
+
+        age 為條目寫入至今的秒數 (從 SQLite 讀回的條目，剩餘的存活時間較短)
+        """
+        expires_at = float("inf") if self.ttl is None else time.monotonic() + self.ttl - age
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CachedTranslator(AbstractTranslator):
+    def __init__(
+        self,
+        translator: AbstractTranslator,
+        cache: TranslationCache,
+        *,
+        logger: logging.Logger,
+    ) -> None:
+        """以翻譯器的 `fingerprint` 與正規化後的日文原文為 key，快取翻譯結果
+
+        換模型、版本、精度或 decoding profile 後，不會讀到其他設定的翻譯
+
+        Parameters
+        ----------
+        translator : AbstractTranslator
+            實際執行翻譯的翻譯器
+        cache : TranslationCache
+            翻譯記憶快取
+        logger : logging.Logger
+            日誌 logger
+        """
+        self.translator = translator
+        self.cache = cache
+        self.logger = logger
+        # 不同模型與設定的翻譯各自一個 key 前綴
+        self.namespace = hashlib.sha256(translator.fingerprint.encode()).hexdigest()[:16]
+
+    @property
+    def deterministic(self) -> bool:
+        return self.translator.deterministic
+
+    @property
+    def fingerprint(self) -> str:
+        return self.translator.fingerprint
+
+    def translate(self, untranslated_text: str) -> str:
+        return self.translate_batch([untranslated_text])[0]
+
+    def translate_batch(self, untranslated_texts: list[str]) -> list[str]:
+        keys = [self._key(untranslated_text) for untranslated_text in untranslated_texts]
+        translated_texts: dict[str, str] = {}
+
+        # 查快取，同一批內重複的原文只翻一次
+        missed_texts: dict[str, str] = {}
+        for key, untranslated_text in zip(keys, untranslated_texts, strict=True):
+            if key in translated_texts or key in missed_texts:
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                missed_texts[key] = untranslated_text
+            else:
+                translated_texts[key] = cached
+
+        self.logger.debug(
+            "[CachedTranslator] - %d hit(s), %d miss(es)",
+            len(translated_texts),
+            len(missed_texts),
+        )
+
+        # 未命中的整批交給翻譯器
+        if missed_texts:
+            results = self.translator.translate_batch(list(missed_texts.values()))
+            for key, translated_text in zip(missed_texts, results, strict=True):
+                self.cache.set(key, translated_text)
+                translated_texts[key] = translated_text
+
+        return [translated_texts[key] for key in keys]
+
+    def translate_stream(self, untranslated_text: str) -> Iterator[str]:
+        key = self._key(untranslated_text)
+        cached = self.cache.get(key)
+        self.logger.debug(
+            "[CachedTranslator] - %d hit(s), %d miss(es)", cached is not None, cached is None
+        )
+        if cached is not None:
+            yield cached
+            return
+
+        # 串流完整結束才寫入快取 (中途斷線不留下不完整的翻譯)
+        chunks: list[str] = []
+        for chunk in self.translator.translate_stream(untranslated_text):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.set(key, "".join(chunks))
+
+    def _key(self, untranslated_text: str) -> str:
+        """快取 key：模型與設定的前綴 + 正規化後的日文原文"""
+        return f"{self.namespace}:{normalize_source_text(untranslated_text)}"
@@ -0,0 +1,298 @@
+# standard library
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+# local module
+from src.utils.deadline import Deadline, DeadlineExceededError
+from src.utils.event_loop import EventLoopThread
+from src.utils.stage_executor import StageExecutor
+
+from .translation_pipeline import PipelineEvent
+
+# 工作狀態
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class TranslationJob:
+    def __init__(self, job_id: str) -> None:
+        """非同步翻譯工作
+
+        記錄工作狀態的事件 (`stage` queued / running，最後為 `done` 或 `error`)，
+        之後才開始觀看的 client 也能從頭重播。只保留最終結果，不保留翻譯途中的 token
+
+        Parameters
+        ----------
+        job_id : str
+            工作 ID
+        """
+        self.id = job_id
+        self.status = JOB_QUEUED
+        self.result: str | None = None
+        self.error: str | None = None
+        self.events: list[PipelineEvent] = [PipelineEvent("stage", JOB_QUEUED)]
+        self.finished_at: float | None = None
+
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        """是否已完成 (成功或失敗)"""
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def watch(self, timeout: float | None = None) -> Iterator[PipelineEvent]:
+        """從頭產出工作的事件，直到工作完成
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            最多等幾秒沒有新事件就停止 (None 代表一直等)
+
+        Yields
+        ------
+        PipelineEvent
+            翻譯流程事件 (最後一個為 `done` 或 `error`)
+        """
+        index = 0
+        while True:
+            with self._condition:
+                if index == len(self.events) and not self.finished:
+                    self._condition.wait(timeout)
+                events = self.events[index:]
+                finished = self.finished
+
+            if not events and not finished:
+                return
+            yield from events
+            index += len(events)
+            if finished and index == len(self.events):
+                return
+
+    def add_event(self, event: PipelineEvent) -> None:
+        """記錄事件並通知觀看中的 client (`done` / `error` 會結束工作)"""
+        with self._condition:
+            self.events.append(event)
+            if event.event == "stage" and event.data == JOB_RUNNING:
+                self.status = JOB_RUNNING
+            elif event.event == "done":
+                self.status = JOB_SUCCEEDED
+                self.result = event.data
+            elif event.event == "error":
+                self.status = JOB_FAILED
+                self.error = event.data
+            if self.finished:
+                self.finished_at = time.monotonic()
+            self._condition.notify_all()
+
+
+class TranslationJobQueue:
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        max_workers: int = 4,
+        max_queue_size: int = 64,
+        ttl: float = 600.0,
+        timeout: float = 120.0,
+        event_loop: EventLoopThread | None = None,
+        max_in_flight: int = 256,
+    ) -> None:
+        """非同步翻譯工作佇列
+
+        收到圖片後立即回傳工作 ID，翻譯在有上限的執行緒與佇列中執行 (佇列已滿時直接拒絕)，
+        完成的結果保留 `ttl` 秒供 client 查詢。
+        以 `submit_async` 提交的工作改在 `event_loop` 上以 coroutine 執行，
+        等待 OCR 時不佔用執行緒，最多同時 `max_in_flight` 個 (已滿時直接拒絕)。
+        每個工作從提交起有 `timeout` 秒的期限 (含排隊時間)，超過時停止 OCR 與推論。
+        工作只保存在目前的行程 (多個 worker 的 pre-fork 部署查不到其他 worker 的工作，
+        `src.serve` 會關閉此 API)
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            日誌 logger
+        max_workers : int, optional
+            同時執行幾個工作
+        max_queue_size : int, optional
+            最多幾個工作排隊等待執行
+        ttl : float, optional
+            完成的工作保留幾秒
+        timeout : float, optional
+            工作的期限 (秒)
+        event_loop : EventLoopThread | None, optional
+            執行 `submit_async` 工作的 event loop (None 代表不接受 `submit_async`)
+        max_in_flight : int, optional
+            最多同時幾個 `submit_async` 的工作 (含等待 OCR 中)
+        """
+        if ttl <= 0:
+            raise ValueError("ttl must > 0!")
+        if timeout <= 0:
+            raise ValueError("timeout must > 0!")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must >= 1!")
+
+        self.logger = logger
+        self.ttl = ttl
+        self.timeout = timeout
+        self.event_loop = event_loop
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+        self._stage = StageExecutor(
+            "translation-job", max_workers=max_workers, max_queue_size=max_queue_size
+        )
+        self._jobs: dict[str, TranslationJob] = {}
+        # 依完成順序排列的 (完成時間, 工作 ID)，用來淘汰過期的工作
+        self._finished: deque[tuple[float, str]] = deque()
+        self._lock = threading.Lock()
+
+    def submit(self, run: Callable[[Deadline], str]) -> TranslationJob:
+        """建立工作並排入佇列
+
+        Parameters
+        ----------
+        run : Callable[[Deadline], str]
+            以工作的期限執行翻譯流程並回傳翻譯
+            (例如 `lambda deadline: pipeline.process(image_bytes, deadline=deadline)`)
+
+        Returns
+        -------
+        TranslationJob
+            排隊中的工作
+
+        Raises
+        ------
+        queue.Full
+            佇列已滿
+        """
+        self._evict_expired()
+
+        job = TranslationJob(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._stage.submit(self._run, job, run, Deadline(self.timeout), timeout=0)
+        except BaseException:
+            with self._lock:
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def submit_async(self, run: Callable[[Deadline], Awaitable[str]]) -> TranslationJob:
+        """建立工作，在 event loop 上執行
+
+        Parameters
+        ----------
+        run : Callable[[Deadline], Awaitable[str]]
+            以工作的期限執行翻譯流程並回傳翻譯的 coroutine
+            (例如 `lambda deadline: pipeline.aprocess(image_bytes, deadline=deadline)`)
+
+        Returns
+        -------
+        TranslationJob
+            排隊中的工作
+
+        Raises
+        ------
+        queue.Full
+            同時執行的工作已達 `max_in_flight`
+        """
+        if self.event_loop is None:
+            raise RuntimeError("submit_async requires an event loop!")
+        self._evict_expired()
+
+        job = TranslationJob(uuid.uuid4().hex)
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                raise queue.Full
+            self.in_flight += 1
+            self._jobs[job.id] = job
+        try:
+            self.event_loop.submit(self._arun(job, run, Deadline(self.timeout)))
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def get(self, job_id: str) -> TranslationJob | None:
+        """查詢工作 (不存在或已過期時回傳 None)"""
+        self._evict_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict[str, Any]:
+        """保存中的工作數、在 event loop 上執行中的工作數，與執行工作的佇列深度"""
+        with self._lock:
+            jobs = len(self._jobs)
+            finished = len(self._finished)
+            in_flight = self.in_flight
+        return {
+            "jobs": jobs,
+            "finished": finished,
+            "in_flight": in_flight,
+            "stage": self._stage.stats(),
+        }
+
+    def close(self) -> None:
+        """停止 worker (已排隊的工作會先完成)"""
+        self._stage.close()
+
+    def _run(self, job: TranslationJob, run: Callable[[Deadline], str], deadline: Deadline) -> None:
+        """執行翻譯流程，並把結果記錄到工作中"""
+        job.add_event(PipelineEvent("stage", JOB_RUNNING))
+        try:
+            translated_text = run(deadline)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            job.add_event(PipelineEvent("done", translated_text))
+        self._finish(job)
+
+    async def _arun(
+        self, job: TranslationJob, run: Callable[[Deadline], Awaitable[str]], deadline: Deadline
+    ) -> None:
+        """`_run` 的 coroutine 版本 (完成後讓出 `max_in_flight` 的名額)"""
+        try:
+            job.add_event(PipelineEvent("stage", JOB_RUNNING))
+            try:
+                translated_text = await run(deadline)
+            except Exception as e:
+                self._fail(job, e)
+            else:
+                job.add_event(PipelineEvent("done", translated_text))
+            self._finish(job)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _fail(self, job: TranslationJob, error: Exception) -> None:
+        """記錄工作失敗的原因 (在 `except` 區塊中呼叫)"""
+        if isinstance(error, DeadlineExceededError):
+            self.logger.warning("[TranslationJobQueue] - job %s timed out", job.id)
+            job.add_event(PipelineEvent("error", "Translation timed out"))
+        else:
+            self.logger.exception("[TranslationJobQueue] - job %s failed", job.id)
+            job.add_event(PipelineEvent("error", "Translation failed"))
+
+    def _finish(self, job: TranslationJob) -> None:
+        """記錄完成時間 (之後依 `ttl` 淘汰)"""
+        with self._lock:
+            self._finished.append((job.finished_at or time.monotonic(), job.id))
+
+    def _evict_expired(self) -> None:
+        """淘汰完成超過 `ttl` 秒的工作"""
+        expired_before = time.monotonic() - self.ttl
+        with self._lock:
+            while self._finished and self._finished[0][0] < expired_before:
+                _, job_id = self._finished.popleft()
+                self._jobs.pop(job_id, None)
@@ -1,65 +1,696 @@
 # standard library
-from collections.abc import Callable
+import asyncio
+import hashlib
+import queue
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, NamedTuple
 
 # local module
-from .text_extractor import AbstractTextExtractor
+from src.utils.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    all_deadlines,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+    iterate_in_scope,
+)
+from src.utils.single_flight import LeaderCancelledError, SingleFlight
+from src.utils.stage_executor import StageExecutor
+
+from .batching_translator import BatchingTranslator
+from .card_recognizer import ArtworkCardRecognizer
+from .clause import split_clauses
+from .postprocess import CharMap, PostprocessHook, PostprocessHooks
+from .text_extractor import AbstractTextExtractor, ExtractedCard, ImageSource
+from .translation_cache import TranslationCache
 from .translator import AbstractTranslator
 
 
+class PipelineEvent(NamedTuple):
+    # 事件種類："stage" | "extracted" | "token" | "done" | "error"
+    # (以卡圖辨識出卡片且已有翻譯時，只會有 `stage` "card_recognized" 與 `done`；
+    #  以 OCR 讀到的卡片密碼找到翻譯時，不會有 `token`)
+    event: str
+    data: str
+
+
+class BatchTranslation(NamedTuple):
+    # 在上傳圖片中的位置
+    index: int
+    # 翻譯字串 (失敗時為 None)
+    translated_text: str | None
+    # 失敗原因 (成功時為 None)
+    error: Exception | None
+
+
 class TranslationPipeline:
     def __init__(
-        self, text_extractor: AbstractTextExtractor, translator: AbstractTranslator
+        self,
+        text_extractor: AbstractTextExtractor,
+        translator: AbstractTranslator,
+        *,
+        clause_segmentation: bool = False,
+        card_recognizer: ArtworkCardRecognizer | None = None,
+        translation_store: TranslationCache | None = None,
+        ocr_stage: StageExecutor | None = None,
     ) -> None:
+        """翻譯管線
+
+        同一張圖片 (或同一段提取出的文字) 同時有多個請求時，
+        只有第一個請求實際辨識卡圖、OCR (或推論)，
+        其他請求等待並取得相同的結果或例外 (single-flight，以內容雜湊為 key)。
+
+        各方法可傳入請求的期限 (`Deadline`)：階段之間、排隊、OCR 輪詢與推論時都會檢查，
+        到期或被取消 (client 中斷連線) 時拋出 `DeadlineExceededError`，不再繼續工作
+
+        Parameters
+        ----------
+        text_extractor : AbstractTextExtractor
+            文字提取器 (可包含 OCR 前的影像前處理 `RectifiedTextExtractor` 與 OCR 結果快取)
+        translator : AbstractTranslator
+            翻譯器
+        clause_segmentation : bool, optional
+            是否將提取出的文字切成子句，整批翻譯後再組回
+            (子句較短、重複率高，搭配 `CachedTranslator` 時快取會以子句為單位命中)
+        card_recognizer : ArtworkCardRecognizer | None, optional
+            以卡圖辨識上傳照片是哪張卡 (None 代表不辨識)
+        translation_store : TranslationCache | None, optional
+            以卡片密碼為 key 的完整翻譯 (套用後處理 hook 後，key 見 `translation_store_key`；
+            翻譯器的 decoding 須為確定性)。
+            以卡圖辨識出的卡片已有翻譯時，不必 OCR 也不必推論；
+            否則以 OCR 讀到的卡片密碼查詢，找到時不必推論。
+            只以 OCR 讀到的卡片密碼保存 (與卡圖辨識的結果不一致時不保存)
+        ocr_stage : StageExecutor | None, optional
+            執行影像前處理與 OCR 的階段 (有上限的執行緒與佇列)，
+            同時 OCR 的請求數不超過其上限 (None 代表在請求執行緒執行)
+        """
         self.text_extractor = text_extractor
         self.translator = translator
-        self.postprocess_hooks: list[Callable[[str], str]] = []
+        self.clause_segmentation = clause_segmentation
+        self.card_recognizer = card_recognizer
+        self.translation_store = translation_store
+        self.ocr_stage = ocr_stage
+        # 所有後處理 hook，與串流時逐片段套用的 hook (註冊時編譯成盡量少次的掃描)
+        self.postprocess_hooks = PostprocessHooks()
+        self.streamable_postprocess_hooks = PostprocessHooks()
+        # 進行中的卡圖辨識、OCR (key 為圖片雜湊) 與翻譯 (key 為原文雜湊)
+        self.recognize_flight: SingleFlight[str, int | None] = SingleFlight()
+        self.extract_flight: SingleFlight[str, ExtractedCard] = SingleFlight()
+        self.translate_flight: SingleFlight[str, str] = SingleFlight()
+        # 完整翻譯的 key 前綴 (第一次使用時計算，註冊 hook 後重新計算)
+        self._store_namespace: str | None = None
+
+    def add_postprocess_hook(
+        self, hook: PostprocessHook, *, streamable: bool | None = None
+    ) -> None:
+        """註冊翻譯後處理 hook
+
+        宣告成 `CharMap` / `Replace` 的 hook 會與相鄰的同種 hook 合併 (結果與依序套用相同)，
+        減少後處理掃描字串的次數 (見 `PostprocessHooks`)
+
+        Parameters
+        ----------
+        hook : PostprocessHook
+            字元對照表、字面字串替換、正規表示式替換，或任意後處理函式
+        streamable : bool | None, optional
+            hook 是否可以逐片段套用 (例如逐字元替換)，
+            可以的話串流時每個 token 片段都會先套用一次
+            (None 代表依 hook 種類決定：只有 `CharMap` 可以)
+
+        Raises
+        ------
+        ValueError
+            `CharMap` 的 key 不是單一字元，或正規表示式不合法
+        """
+        self.postprocess_hooks.add(hook)
+        if streamable or (streamable is None and isinstance(hook, CharMap)):
+            self.streamable_postprocess_hooks.add(hook)
+        self._store_namespace = None
+
+    def translation_store_key(self, password: int) -> str:
+        """以卡片密碼保存完整翻譯的 key
+
+        前綴為翻譯模型的 `fingerprint`、是否切成子句與後處理 hook 的設定：
+        換模型、decoding profile 或後處理規則後，不會讀到其他設定保存的翻譯
 
-    def add_postprocess_hook(self, hook: Callable[[str], str]) -> None:
-        """註冊翻譯後處理函式
         Parameters
         ----------
-        hook : Callable[[str], str]
-            後處理函式
+        password : int
+            卡片密碼
+
+        Returns
+        -------
+        str
+            `translation_store` 的 key
         """
-        self.postprocess_hooks.append(hook)
+        if self._store_namespace is None:
+            config = "\0".join(
+                [
+                    self.translator.fingerprint,
+                    f"clause_segmentation={self.clause_segmentation}",
+                    self.postprocess_hooks.fingerprint,
+                ]
+            )
+            self._store_namespace = hashlib.sha256(config.encode()).hexdigest()[:16]
+        return f"{self._store_namespace}:{password}"
 
-    def process(self, src: str) -> str:
+    def process(self, src: ImageSource, *, deadline: Deadline | None = None) -> str:
         """開始翻譯流程
 
         Parameters
         ----------
-        src : str
-            圖片 URL
+        src : ImageSource
+            圖片 URL、圖片 bytes 或 binary stream
+        deadline : Deadline | None, optional
+            請求的期限 (None 代表沒有期限)
 
         Returns
         -------
         str
             翻譯字串
+
+        Raises
+        ------
+        DeadlineExceededError
+            請求已超過期限或被取消
         """
-        extracted_text = self.text_extractor.extract(src)
-        translated_text = self.translator.translate(extracted_text)
+        with deadline_scope(deadline):
+            return self._process(src)
+
+    def _process(self, src: ImageSource) -> str:
+        stored_text, text, password = self._stored_or_extract(src)
+        if stored_text is not None:
+            return stored_text
 
-        # 執行所有後處理 Hook
-        for postprocess_hook in self.postprocess_hooks:
-            translated_text = postprocess_hook(translated_text)
+        check_deadline()
+        translated_text = self.translate_flight.do(_text_key(text), lambda: self._translate(text))
+        translated_text = self._postprocess(translated_text)
+        self._store_translation(password, translated_text)
 
         return translated_text
 
+    async def aprocess(self, src: ImageSource, *, deadline: Deadline | None = None) -> str:
+        """`process` 的 coroutine 版本 (在 event loop 上執行)
 
-def normalize_punctuation(text: str) -> str:
-    """中文標點符號標準化
+        OCR 以 `AbstractTextExtractor.aextract` 執行，`AsyncOcrTextExtractor` 上傳與輪詢時
+        讓出 event loop：同時進行中的 OCR 不佔用執行緒，也不經過 OCR 階段
+        (同時 OCR 的請求數由呼叫端限制，例如 `TranslationJobQueue` 的 `max_in_flight`)。
+        卡圖辨識與翻譯 (micro-batching 推論階段) 在執行緒中等待，不阻塞 event loop
 
-    Parameters
-    ----------
-    text : str
-        標準化前字串
+        Parameters
+        ----------
+        src : ImageSource
+            圖片 URL、圖片 bytes 或 binary stream
+        deadline : Deadline | None, optional
+            請求的期限 (None 代表沒有期限)
+
+        Returns
+        -------
+        str
+            翻譯字串
+
+        Raises
+        ------
+        DeadlineExceededError
+            請求已超過期限或被取消
+        """
+        with deadline_scope(deadline):
+            stored_text, text, password = await self._astored_or_extract(src)
+            if stored_text is not None:
+                return stored_text
+
+            check_deadline()
+            translated_text = await asyncio.to_thread(
+                self.translate_flight.do, _text_key(text), lambda: self._translate(text)
+            )
+            translated_text = self._postprocess(translated_text)
+            self._store_translation(password, translated_text)
+
+            return translated_text
+
+    def process_stream(
+        self, src: ImageSource, *, deadline: Deadline | None = None
+    ) -> Iterator[PipelineEvent]:
+        """開始翻譯流程，並邊翻譯邊產出事件
+
+        依序產出：
+        - `stage` "ocr_done"：OCR 完成
+        - `extracted`：提取出的原文
+        - `token`：翻譯片段 (已套用可串流的後處理 hook)
+        - `done`：套用所有後處理 hook 後的完整翻譯
+
+        以卡圖辨識出卡片且已有翻譯時，只產出 `stage` "card_recognized" 與 `done`；
+        以 OCR 讀到的卡片密碼找到翻譯時，`extracted` 之後直接產出 `done`
+
+        Parameters
+        ----------
+        src : ImageSource
+            圖片 URL、圖片 bytes 或 binary stream
+        deadline : Deadline | None, optional
+            請求的期限 (None 代表沒有期限)
+
+        Yields
+        ------
+        PipelineEvent
+            翻譯流程事件
+
+        Raises
+        ------
+        DeadlineExceededError
+            請求已超過期限或被取消
+        """
+        return iterate_in_scope(self._process_stream(src), deadline)
+
+    def _process_stream(self, src: ImageSource) -> Iterator[PipelineEvent]:
+        src, password = self._recognize_card(src)
+        stored_text = self._stored_translation(password)
+        if stored_text is not None:
+            yield PipelineEvent("stage", "card_recognized")
+            yield PipelineEvent("done", stored_text)
+            return
+
+        check_deadline()
+        extracted_card = self._extract(src)
+        extracted_text = extracted_card.text
+        yield PipelineEvent("stage", "ocr_done")
+        yield PipelineEvent("extracted", extracted_text)
+
+        stored_text = self._stored_translation(extracted_card.password)
+        if stored_text is not None:
+            yield PipelineEvent("done", stored_text)
+            return
+        password = _confirmed_password(password, extracted_card.password)
+
+        check_deadline()
+        translated_chunks: list[str] = []
+        for chunk in self._translate_stream(extracted_text):
+            translated_chunks.append(chunk)
+            chunk = self.streamable_postprocess_hooks(chunk)
+            if chunk:
+                yield PipelineEvent("token", chunk)
+
+        # 完整結果仍以整段文字執行所有後處理 Hook
+        translated_text = self._postprocess("".join(translated_chunks))
+        self._store_translation(password, translated_text)
+
+        yield PipelineEvent("done", translated_text)
+
+    def process_batch(
+        self,
+        images: Sequence[bytes],
+        *,
+        max_workers: int = 8,
+        prepare: Callable[[bytes], bytes] | None = None,
+        deadline: Deadline | None = None,
+    ) -> Iterator[BatchTranslation]:
+        """翻譯多張圖片，每張完成時立即產出結果 (完成順序，不是上傳順序)
+
+        內容相同的圖片只翻譯一次。各張圖片先同時辨識卡圖、OCR (受 OCR 階段的上限限制)，
+        已有完整翻譯的圖片立即產出；全部 OCR 完成後，需要翻譯的原文一起交給
+        `translate_batch` (推論階段為 `BatchingTranslator` 時依其批次上限合併推論)。
+        單張失敗不影響其他圖片
+
+        Parameters
+        ----------
+        images : Sequence[bytes]
+            圖片 bytes
+        max_workers : int, optional
+            最多同時辨識卡圖、OCR 幾張圖片
+        prepare : Callable[[bytes], bytes] | None, optional
+            翻譯前對每張 (去重後的) 圖片的前處理，例如上傳圖片正規化
+        deadline : Deadline | None, optional
+            整批請求的期限 (到期後尚未完成的圖片以 `DeadlineExceededError` 失敗)
+
+        Yields
+        ------
+        BatchTranslation
+            每張圖片的翻譯結果 (內容相同的圖片各產出一筆)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must >= 1!")
+
+        indices_by_key, unique_images = _group_images(images)
+        if not unique_images:
+            return
+
+        # 呼叫端不再讀取 (client 中斷連線) 時取消，處理中的圖片也隨之停止
+        batch_deadline = Deadline(parent=deadline)
+
+        def extract(image_bytes: bytes) -> tuple[str | None, str, int | None]:
+            image_bytes = prepare(image_bytes) if prepare else image_bytes
+            with deadline_scope(batch_deadline):
+                return self._stored_or_extract(image_bytes)
+
+        # 圖片 key -> (原文, 保存完整翻譯用的卡片密碼)
+        untranslated: dict[str, tuple[str, int | None]] = {}
+        executor = ThreadPoolExecutor(min(max_workers, len(unique_images)), "process-batch")
+        try:
+            futures = {
+                executor.submit(extract, image_bytes): key
+                for key, image_bytes in unique_images.items()
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                error = future.exception()
+                stored_text = None
+                if error is None:
+                    stored_text, text, password = future.result()
+                    if stored_text is None:
+                        untranslated[key] = (text, password)
+                        continue
+                for index in indices_by_key[key]:
+                    yield BatchTranslation(index, stored_text, error)
+
+            # 全部 OCR 完成後，原文一起翻譯
+            with deadline_scope(batch_deadline):
+                translations = self._translate_all(text for text, _ in untranslated.values())
+            for key, (text, password) in untranslated.items():
+                translated_text, error = self._finish_translation(translations[text], password)
+                for index in indices_by_key[key]:
+                    yield BatchTranslation(index, translated_text, error)
+        finally:
+            # client 中斷連線時，尚未開始的圖片不必再處理
+            batch_deadline.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        """各階段的佇列深度與執行時間 (未設定的階段不列出)，以及 single-flight 的合併次數"""
+        stats: dict[str, Any] = {
+            "recognize_flight": self.recognize_flight.stats(),
+            "extract_flight": self.extract_flight.stats(),
+            "translate_flight": self.translate_flight.stats(),
+        }
+        if self.ocr_stage is not None:
+            stats["ocr"] = self.ocr_stage.stats()
+        translate_stage = _find_batching_translator(self.translator)
+        if translate_stage is not None:
+            stats["translate"] = translate_stage.stats()
+        return stats
+
+    def _stored_or_extract(self, src: ImageSource) -> tuple[str | None, str, int | None]:
+        """辨識卡圖、OCR，途中找到卡片已完成的翻譯時不再繼續
+
+        Returns
+        -------
+        tuple[str | None, str, int | None]
+            (已完成的翻譯, 提取出的原文, 保存完整翻譯用的卡片密碼)；
+            找到已完成的翻譯時原文為空字串
+        """
+        src, password = self._recognize_card(src)
+        stored_text = self._stored_translation(password)
+        if stored_text is not None:
+            return stored_text, "", None
+
+        check_deadline()
+        extracted_card = self._extract(src)
+        stored_text = self._stored_translation(extracted_card.password)
+        if stored_text is not None:
+            return stored_text, "", None
+        return None, extracted_card.text, _confirmed_password(password, extracted_card.password)
+
+    async def _astored_or_extract(self, src: ImageSource) -> tuple[str | None, str, int | None]:
+        """`_stored_or_extract` 的 coroutine 版本 (OCR 時讓出 event loop)"""
+        src, password = await asyncio.to_thread(self._recognize_card, src)
+        stored_text = self._stored_translation(password)
+        if stored_text is not None:
+            return stored_text, "", None
+
+        check_deadline()
+        src, image_key = _image_key(src)
+        extracted_card = await self.extract_flight.ado(
+            image_key, lambda: self.text_extractor.aextract(src)
+        )
+        stored_text = self._stored_translation(extracted_card.password)
+        if stored_text is not None:
+            return stored_text, "", None
+        return None, extracted_card.text, _confirmed_password(password, extracted_card.password)
+
+    def _recognize_card(self, src: ImageSource) -> tuple[ImageSource, int | None]:
+        """以卡圖辨識卡片 (stream 會先讀成 bytes，之後交給 OCR；同一張圖片同時只辨識一次)
+
+        Returns
+        -------
+        tuple[ImageSource, int | None]
+            (之後要交給 OCR 的圖片來源, 卡片密碼)，未辨識時密碼為 None
+        """
+        if self.card_recognizer is None or isinstance(src, str):
+            return src, None
+
+        card_recognizer = self.card_recognizer
+        image_bytes = src if isinstance(src, bytes) else src.read()
+        password = self.recognize_flight.do(
+            hashlib.sha256(image_bytes).hexdigest(), lambda: card_recognizer.recognize(image_bytes)
+        )
+        return image_bytes, password
+
+    def _extract(self, src: ImageSource) -> ExtractedCard:
+        """影像前處理後 OCR (同一張圖片同時只 OCR 一次)"""
+        src, image_key = _image_key(src)
+        return self.extract_flight.do(image_key, lambda: self._run_ocr_stage(src))
+
+    def _run_ocr_stage(self, src: ImageSource) -> ExtractedCard:
+        """在 OCR 階段執行影像前處理與 OCR (佇列已滿時等待)"""
+        if self.ocr_stage is None:
+            return self._extract_in_stage(src)
+
+        # 有期限時，等待佇列空位最多等到期限
+        deadline = current_deadline()
+        try:
+            return self.ocr_stage.run(
+                lambda: self._extract_in_stage(src),
+                timeout=None if deadline is None else deadline.remaining(),
+            )
+        except queue.Full:
+            raise DeadlineExceededError("deadline exceeded waiting for OCR stage") from None
+
+    def _extract_in_stage(self, src: ImageSource) -> ExtractedCard:
+        """OCR (排隊期間已到期的請求不再處理)"""
+        check_deadline()
+        return self.text_extractor.extract(src)
+
+    def _stored_translation(self, password: int | None) -> str | None:
+        """查詢卡片已完成的翻譯"""
+        if password is None or self.translation_store is None:
+            return None
+        return self.translation_store.get(self.translation_store_key(password))
+
+    def _store_translation(self, password: int | None, translated_text: str) -> None:
+        """保存卡片完成的翻譯，下次遇到同一張卡 (卡圖或卡片密碼) 時直接使用"""
+        if password is not None and self.translation_store is not None:
+            self.translation_store.set(self.translation_store_key(password), translated_text)
+
+    def _postprocess(self, translated_text: str) -> str:
+        """執行所有後處理 Hook"""
+        return self.postprocess_hooks(translated_text)
+
+    def _translate_stream(self, text: str) -> Iterator[str]:
+        """逐片段翻譯 (同一段原文正在翻譯時，等待其完整結果，以一個片段產出)"""
+        key = _text_key(text)
+        while True:
+            future, leader = self.translate_flight.begin(key)
+            if leader:
+                break
+            try:
+                translated_text = self.translate_flight.wait(future)
+            except LeaderCancelledError:
+                # 翻譯中的請求放棄了，這個請求仍在期限內，重新翻譯 (或等待新的翻譯)
+                continue
+            yield translated_text
+            return
+
+        translated_chunks: list[str] = []
+        try:
+            # 在所有等待這段原文的請求的期限下推論
+            chunks = iterate_in_scope(
+                self._translate_chunks(text), self.translate_flight.deadline(key)
+            )
+            for chunk in chunks:
+                translated_chunks.append(chunk)
+                yield chunk
+        except BaseException as exc:
+            # 含 client 中斷連線 (GeneratorExit)，等待中的請求不會卡住
+            self.translate_flight.finish(key, future, exception=exc)
+            raise
+        self.translate_flight.finish(key, future, result="".join(translated_chunks))
+
+    def _translate_chunks(self, text: str) -> Iterator[str]:
+        """逐片段翻譯 (切成子句時整批翻譯，以一個片段產出)"""
+        if self.clause_segmentation:
+            yield self._translate_clauses([text])[0]
+        else:
+            yield from self.translator.translate_stream(text)
+
+    def _translate(self, text: str) -> str:
+        """翻譯提取出的文字 (依設定整段翻譯，或切成子句翻譯)"""
+        if self.clause_segmentation:
+            return self._translate_clauses([text])[0]
+        return self.translator.translate(text)
+
+    def _finish_translation(
+        self, translation: "Future[str]", password: int | None
+    ) -> tuple[str | None, Exception | None]:
+        """套用後處理並保存完整翻譯
+
+        Returns
+        -------
+        tuple[str | None, Exception | None]
+            (翻譯字串, 失敗原因)，失敗時翻譯字串為 None
+        """
+        error = translation.exception()
+        if error is not None:
+            return None, error  # type: ignore[return-value]
+        translated_text = self._postprocess(translation.result())
+        self._store_translation(password, translated_text)
+        return translated_text, None
+
+    def _translate_all(self, texts: Iterable[str]) -> dict[str, "Future[str]"]:
+        """整批翻譯多段原文 (例如批次上傳的所有卡片)
+
+        其他請求正在翻譯的原文等待其結果 (single-flight)，其餘原文一起交給 `_translate_batch`，
+        在所有等待這些原文的請求的期限下推論
+
+        Returns
+        -------
+        dict[str, Future[str]]
+            原文 -> 已完成的翻譯結果 (或例外)
+        """
+        leaders: dict[str, Future[str]] = {}
+        followers: dict[str, Future[str]] = {}
+        for text in dict.fromkeys(texts):
+            future, leader = self.translate_flight.begin(_text_key(text))
+            (leaders if leader else followers)[text] = future
+
+        if leaders:
+            keys = [_text_key(text) for text in leaders]
+            try:
+                with deadline_scope(all_deadlines(self.translate_flight.deadline(k) for k in keys)):
+                    translated_texts = self._translate_batch(list(leaders))
+            except BaseException as exc:
+                for key, future in zip(keys, leaders.values(), strict=True):
+                    self.translate_flight.finish(key, future, exception=exc)
+                if not isinstance(exc, Exception):
+                    raise
+            else:
+                for key, future, translated_text in zip(
+                    keys, leaders.values(), translated_texts, strict=True
+                ):
+                    self.translate_flight.finish(key, future, result=translated_text)
+
+        translations = dict(leaders)
+        for text, future in followers.items():
+            translations[text] = self._wait_translation(text, future)
+        return translations
+
+    def _wait_translation(self, text: str, future: "Future[str]") -> "Future[str]":
+        """等待其他請求翻譯同一段原文 (該請求放棄時自己翻譯)，結果 (或例外) 放在已完成的 Future"""
+        translation: Future[str] = Future()
+        try:
+            try:
+                translation.set_result(self.translate_flight.wait(future))
+            except LeaderCancelledError:
+                translation.set_result(
+                    self.translate_flight.do(_text_key(text), lambda: self._translate(text))
+                )
+        except Exception as e:
+            translation.set_exception(e)
+        return translation
+
+    def _translate_batch(self, texts: list[str]) -> list[str]:
+        """整批翻譯多段提取出的文字 (依設定整段翻譯，或切成子句後合併成一批翻譯)"""
+        if self.clause_segmentation:
+            return self._translate_clauses(texts)
+        return self.translator.translate_batch(texts)
+
+    def _translate_clauses(self, texts: list[str]) -> list[str]:
+        """切成子句，只把需要翻譯的子句 (所有原文合併去重) 整批送給翻譯器，再依原順序組回
+
+        Parameters
+        ----------
+        texts : list[str]
+            卡片效果文字
+
+        Returns
+        -------
+        list[str]
+            翻譯字串
+        """
+        clauses_list = [split_clauses(text) for text in texts]
+        untranslated_texts = list(
+            dict.fromkeys(c.text for clauses in clauses_list for c in clauses if c.translatable)
+        )
+        if not untranslated_texts:
+            return list(texts)
+
+        translated_texts = dict(
+            zip(
+                untranslated_texts,
+                self.translator.translate_batch(untranslated_texts),
+                strict=True,
+            )
+        )
+        return [
+            "".join(translated_texts[c.text] if c.translatable else c.text for c in clauses)
+            if any(c.translatable for c in clauses)
+            else text
+            for text, clauses in zip(texts, clauses_list, strict=True)
+        ]
+
+
+def _group_images(images: Sequence[bytes]) -> tuple[dict[str, list[int]], dict[str, bytes]]:
+    """以內容雜湊合併相同的圖片
 
     Returns
     -------
-    str
-        標準化後字串
+    tuple[dict[str, list[int]], dict[str, bytes]]
+        (圖片 key -> 在上傳圖片中的位置, 圖片 key -> 圖片 bytes)
     """
-    norm_map = {
+    indices_by_key: dict[str, list[int]] = {}
+    unique_images: dict[str, bytes] = {}
+    for index, image_bytes in enumerate(images):
+        key = hashlib.sha256(image_bytes).hexdigest()
+        indices_by_key.setdefault(key, []).append(index)
+        unique_images.setdefault(key, image_bytes)
+    return indices_by_key, unique_images
+
+
+def _image_key(src: ImageSource) -> tuple[ImageSource, str]:
+    """圖片內容的 key (stream 會先讀成 bytes，之後交給 OCR)"""
+    if isinstance(src, str):
+        return src, f"url:{src}"
+    image_bytes = src if isinstance(src, bytes) else src.read()
+    return image_bytes, hashlib.sha256(image_bytes).hexdigest()
+
+
+def _find_batching_translator(translator: AbstractTranslator) -> BatchingTranslator | None:
+    """沿著包裝 (例如 `CachedTranslator`) 找出推論階段的 `BatchingTranslator`"""
+    while not isinstance(translator, BatchingTranslator):
+        translator = getattr(translator, "translator", None)
+        if not isinstance(translator, AbstractTranslator):
+            return None
+    return translator
+
+
+def _text_key(text: str) -> str:
+    """原文內容的 key"""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _confirmed_password(recognized: int | None, extracted: int | None) -> int | None:
+    """保存完整翻譯用的卡片密碼
+
+    只採用 OCR 讀到的密碼 (翻譯的就是 OCR 提取出的原文)；
+    卡圖辨識的結果與 OCR 不一致時，無法確定是哪張卡，回傳 None (不保存)
+    """
+    if recognized is not None and recognized != extracted:
+        return None
+    return extracted
+
+
+# 中文標點符號標準化 (半形 → 全形)
+PUNCTUATION_MAP = CharMap(
+    {
         ":": "：",
         ";": "；",
         "!": "！",
@@ -67,4 +698,21 @@ def normalize_punctuation(text: str) -> str:
         ",": "，",
         ".": "。",
     }
-    return "".join(norm_map.get(char, char) for char in text)
+)
+_PUNCTUATION_TABLE = str.maketrans(dict(PUNCTUATION_MAP.mapping))
+
+
+def normalize_punctuation(text: str) -> str:
+    """中文標點符號標準化 (註冊成後處理 hook 時，請改用可與其他 hook 合併的 `PUNCTUATION_MAP`)
+
+    Parameters
+    ----------
+    text : str
+        標準化前字串
+
+    Returns
+    -------
+    str
+        標準化後字串
+    """
+    return text.translate(_PUNCTUATION_TABLE)
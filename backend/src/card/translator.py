@@ -1,13 +1,29 @@
 # standard library
 import logging
+import math
+import re
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Iterator
+from typing import Any, Literal
 
 # 3rd party library
 import torch
-from transformers import AutoTokenizer, MT5ForConditionalGeneration
+from transformers import (
+    AutoTokenizer,
+    MT5ForConditionalGeneration,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
+from transformers.generation.streamers import BaseStreamer
 
 # local module
 from src.constants import PATH
+from src.utils.deadline import Deadline, current_deadline, deadline_scope
+from src.utils.metrics import LatencyRecorder, resident_memory_bytes
 
 
 class AbstractTranslator(ABC):
@@ -27,17 +43,155 @@ class AbstractTranslator(ABC):
         """
         pass
 
+    @property
+    def deterministic(self) -> bool:
+        """同樣輸入是否必定得到同樣輸出 (可否安全快取，預設視為否)"""
+        return False
+
+    @property
+    def fingerprint(self) -> str:
+        """影響翻譯結果的模型與設定 (翻譯快取以此區分不同模型的結果，預設為類別名稱)"""
+        return type(self).__qualname__
+
+    def stats(self) -> dict[str, Any]:
+        """執行期統計，例如載入時間、常駐記憶體與單筆請求延遲 (預設沒有)"""
+        return {}
+
+    def translate_batch(self, untranslated_texts: list[str]) -> list[str]:
+        """批次翻譯文字 (預設逐一呼叫 `translate`，子類別可覆寫成單次推論)
+
+        Parameters
+        ----------
+        untranslated_texts : list[str]
+            翻譯前文字 list
+
+        Returns
+        -------
+        list[str]
+            翻譯後文字 list (順序與輸入相同)
+        """
+        return [self.translate(untranslated_text) for untranslated_text in untranslated_texts]
+
+    def translate_stream(self, untranslated_text: str) -> Iterator[str]:
+        """串流翻譯文字 (預設一次產出完整結果，子類別可覆寫成邊生成邊產出)
+
+        Parameters
+        ----------
+        untranslated_text : str
+            翻譯前文字
+
+        Yields
+        ------
+        str
+            翻譯後文字片段 (全部串起來即為完整翻譯)
+        """
+        yield self.translate(untranslated_text)
+
+
+# padding 模式
+# - "max_length"：一律 pad 到 `max_length` (舊行為)
+# - "longest"：pad 到同批最長的輸入
+# - "bucket"：依長度分桶，同桶一起推論，並 pad 到桶的上限
+PaddingMode = Literal["max_length", "longest", "bucket"]
+
+# 模型精度
+# - "fp32"：原始權重 (有 CUDA 就用 CUDA)
+# - "int8"：CPU 上動態量化所有 Linear 層 (權重 int8，activation 推論時才量化)
+# - "bf16"：CPU 上以 bfloat16 推論 (CPU 不支援時退回 fp32)
+Precision = Literal["fp32", "int8", "bf16"]
+
+
+def decoding_kwargs(profile: str) -> dict[str, Any]:
+    """將 decoding profile 轉成 `generate` 參數
+
+    - "greedy"：每步取機率最高的 token (確定性，預設)
+    - "beam-<n>"：n 條 beam search (確定性)，例如 "beam-4"
+    - "sampling"：top-k / top-p 取樣 (非確定性，結果無法快取)
+
+    Parameters
+    ----------
+    profile : str
+        decoding profile
+
+    Returns
+    -------
+    dict[str, Any]
+        `generate` 參數
+
+    Raises
+    ------
+    ValueError
+        未知的 decoding profile
+    """
+    if profile == "greedy":
+        return {"do_sample": False, "num_beams": 1}
+    elif profile == "sampling":
+        return {"do_sample": True, "top_k": 50, "top_p": 0.95, "temperature": 0.1}
+    elif match := re.fullmatch(r"beam-([1-9]\d*)", profile):
+        return {"do_sample": False, "num_beams": int(match.group(1)), "early_stopping": True}
+    raise ValueError(f"Unknown decoding profile: {profile}")
+
 
 class YugiohTranslator(AbstractTranslator):
-    def __init__(self, *, logger: logging.Logger):
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        decoding: str = "greedy",
+        padding: PaddingMode = "bucket",
+        length_buckets: tuple[int, ...] = (64, 128, 256, 512, 768),
+        output_length_ratio: float = 2.0,
+        output_length_margin: int = 16,
+        precision: Precision = "fp32",
+    ):
+        """遊戲王卡片翻譯模型 (MT5)
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            日誌 logger
+        decoding : str, optional
+            decoding profile："greedy" | "beam-<n>" | "sampling"
+        padding : PaddingMode, optional
+            padding 模式
+        length_buckets : tuple[int, ...], optional
+            "bucket" 模式的長度分桶 (token 數)
+        output_length_ratio : float, optional
+            輸出 token 預算 = 輸入 token 數 * ratio + margin ("max_length" 模式不適用)
+        output_length_margin : int, optional
+            同上
+        precision : Precision, optional
+            模型精度 ("int8" / "bf16" 一律在 CPU 上推論)
+        """
+        if output_length_ratio <= 0:
+            raise ValueError("output_length_ratio must > 0!")
+        if output_length_margin < 0:
+            raise ValueError("output_length_margin must >= 0!")
+
         self.logger = logger
         self.model_path = PATH.MODEL_DIR.value
         self.model_revision = "defualt_0321-0402"
+        self.prefix = "<-ja2zh->"
+        self.max_length = 768
+        self.padding = padding
+        self.length_buckets = tuple(sorted(length_buckets))
+        self.output_length_ratio = output_length_ratio
+        self.output_length_margin = output_length_margin
+
+        # generate 參數
+        self.decoding = decoding
+        self._generate_kwargs = decoding_kwargs(decoding)
+        self.logger.debug("[YugiohTranslator] - using decoding profile: %s", decoding)
 
         # device
-        self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        if precision == "fp32" and torch.cuda.is_available():
+            self._device = torch.device("cuda")
+        else:
+            self._device = torch.device("cpu")
         self.logger.debug("[YugiohTranslator] - using device: %s", self._device)
 
+        load_start = time.perf_counter()
+
         # tokenizer
         self.logger.debug("[YugiohTranslator] - loading tokenizer...")
         self._tokenizer = AutoTokenizer.from_pretrained(self.model_path, trust_remote_code=True)
@@ -45,43 +199,276 @@ class YugiohTranslator(AbstractTranslator):
 
         # model
         self.logger.debug("[YugiohTranslator] - loading model...")
-        self._model = MT5ForConditionalGeneration.from_pretrained(
+        model = MT5ForConditionalGeneration.from_pretrained(
             self.model_path, revision=self.model_revision
-        ).to(self._device)
-        self.logger.debug("[YugiohTranslator] - model ready")
+        )
+        self.precision = self._resolve_precision(precision)
+        self._model = self._apply_precision(model, self.precision).to(self._device)
+        self._model.eval()
+
+        self.load_seconds = time.perf_counter() - load_start
+        self._latency = LatencyRecorder()
+        resident_memory = resident_memory_bytes()
+        self.logger.info(
+            "[YugiohTranslator] - model ready (precision: %s, load: %.1f s, RSS: %s MB)",
+            self.precision,
+            self.load_seconds,
+            "?" if resident_memory is None else resident_memory // 2**20,
+        )
+
+    def _resolve_precision(self, precision: Precision) -> Precision:
+        """確認精度在此機器上可用，不可用時退回 fp32"""
+        if precision not in ("fp32", "int8", "bf16"):
+            raise ValueError(f"Unknown precision: {precision}")
+        if precision == "bf16" and not (
+            torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+        ):
+            self.logger.warning("[YugiohTranslator] - bf16 is not supported, fallback to fp32")
+            return "fp32"
+        return precision
+
+    @staticmethod
+    def _apply_precision(
+        model: MT5ForConditionalGeneration, precision: Precision
+    ) -> MT5ForConditionalGeneration:
+        """依精度轉換模型
+
+        Parameters
+        ----------
+        model : MT5ForConditionalGeneration
+            fp32 模型
+        precision : Precision
+            模型精度
+
+        Returns
+        -------
+        MT5ForConditionalGeneration
+            轉換後的模型
+        """
+        if precision == "int8":
+            return torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        elif precision == "bf16":
+            return model.to(torch.bfloat16)
+        return model
+
+    def stats(self) -> dict[str, Any]:
+        """載入時間、常駐記憶體與單筆請求延遲"""
+        return {
+            "precision": self.precision,
+            "device": str(self._device),
+            "load_seconds": self.load_seconds,
+            "resident_memory_bytes": resident_memory_bytes(),
+            "latency": self._latency.summary(),
+        }
+
+    @property
+    def deterministic(self) -> bool:
+        """同樣輸入是否必定得到同樣輸出 (可否安全快取)"""
+        return not self._generate_kwargs["do_sample"]
+
+    @property
+    def fingerprint(self) -> str:
+        """後端、模型與版本、精度、decoding profile 與 padding / 輸出長度設定"""
+        return (
+            f"torch:{self.model_path}@{self.model_revision}:{self.precision}:{self.decoding}"
+            f":{self.padding}:{self.output_length_ratio}+{self.output_length_margin}"
+        )
 
     def translate(self, untranslated_text: str) -> str:
-        self.logger.debug("[YugiohTranslator] - translation started")
+        return self.translate_batch([untranslated_text])[0]
 
-        top_k: int = 50
-        max_length: int = 768
-        top_p: float = 0.95
-        temperature: float = 0.1
-        num_return_sequences: int = 1
-        prefix = "<-ja2zh->"
+    def translate_batch(self, untranslated_texts: list[str]) -> list[str]:
+        self.logger.debug(
+            "[YugiohTranslator] - translation started (batch size: %d)", len(untranslated_texts)
+        )
 
-        encodings_text: torch.Tensor = self._tokenizer.encode(
-            prefix + untranslated_text,
-            return_tensors="pt",
-            max_length=max_length,
-            padding="max_length",
+        # 先不 padding，取得每筆輸入的 token
+        input_ids_list: list[list[int]] = self._tokenizer(
+            [self.prefix + untranslated_text for untranslated_text in untranslated_texts],
+            max_length=self.max_length,
             truncation=True,
-        ).to(self._device)
+        )["input_ids"]
 
-        output: torch.Tensor = self._model.generate(
-            encodings_text,
-            do_sample=True,
-            top_k=top_k,
-            max_length=max_length,
-            top_p=top_p,
-            temperature=temperature,
-            num_return_sequences=num_return_sequences,
-        )
+        # 依 padding 長度分組，同組一起推論
+        groups: defaultdict[int, list[int]] = defaultdict(list)
+        for i, input_ids in enumerate(input_ids_list):
+            groups[self._padded_length(len(input_ids))].append(i)
 
-        translated_text = [self._tokenizer.decode(o, skip_special_tokens=True) for o in output][0]
+        start = time.perf_counter()
+        translated_texts: list[str] = [""] * len(untranslated_texts)
+        for padded_length, indices in groups.items():
+            group_input_ids = [input_ids_list[i] for i in indices]
+            for i, translated_text in zip(
+                indices, self._generate(group_input_ids, padded_length), strict=True
+            ):
+                translated_texts[i] = translated_text
+
+        # 同批的每筆請求都等了整批的時間
+        elapsed = time.perf_counter() - start
+        for _ in untranslated_texts:
+            self._latency.record(elapsed)
 
         self.logger.debug(
-            "[YugiohTranslator] - translation completed.\nResult:\n%s", translated_text
+            "[YugiohTranslator] - translation completed.\nResult:\n%s", translated_texts
         )
 
-        return translated_text
+        return translated_texts
+
+    def translate_stream(self, untranslated_text: str) -> Iterator[str]:
+        # beam search 不支援 streamer，只能一次產出
+        if self._generate_kwargs.get("num_beams", 1) > 1:
+            yield self.translate(untranslated_text)
+            return
+
+        self.logger.debug("[YugiohTranslator] - streaming translation started")
+
+        input_ids_list: list[list[int]] = self._tokenizer(
+            [self.prefix + untranslated_text], max_length=self.max_length, truncation=True
+        )["input_ids"]
+        padded_length = self._padded_length(len(input_ids_list[0]))
+        streamer = TextIteratorStreamer(self._tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+        # generate 在背景執行緒跑，這裡邊收 token 邊產出；
+        # 呼叫端不再讀取 (client 中斷連線) 時取消，背景執行緒在下一個 token 停止生成
+        errors: list[Exception] = []
+        stream_deadline = Deadline(parent=current_deadline())
+
+        def generate() -> None:
+            try:
+                with deadline_scope(stream_deadline):
+                    self._generate(input_ids_list, padded_length, streamer=streamer)
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        start = time.perf_counter()
+        thread = threading.Thread(target=generate, name="YugiohTranslator-stream", daemon=True)
+        thread.start()
+        try:
+            yield from streamer
+        except BaseException:
+            # 含 GeneratorExit (呼叫端提早關閉)
+            stream_deadline.cancel()
+            raise
+        thread.join()
+        if errors:
+            raise errors[0]
+        self._latency.record(time.perf_counter() - start)
+
+        self.logger.debug("[YugiohTranslator] - streaming translation completed")
+
+    def _padded_length(self, input_length: int) -> int:
+        """依 padding 模式決定輸入要 pad 到多長 (0 代表同組最長)
+
+        Parameters
+        ----------
+        input_length : int
+            輸入 token 數
+
+        Returns
+        -------
+        int
+            padding 後長度
+        """
+        if self.padding == "max_length":
+            return self.max_length
+        elif self.padding == "bucket":
+            for bucket in self.length_buckets:
+                if input_length <= bucket:
+                    return min(bucket, self.max_length)
+            return self.max_length
+        else:
+            return 0
+
+    def _output_budget(self, input_length: int) -> int:
+        """依輸入長度決定最多生成幾個 token
+
+        Parameters
+        ----------
+        input_length : int
+            輸入 token 數
+
+        Returns
+        -------
+        int
+            輸出 token 預算
+        """
+        if self.padding == "max_length":
+            return self.max_length
+        budget = math.ceil(input_length * self.output_length_ratio) + self.output_length_margin
+        return min(budget, self.max_length)
+
+    def _generate(
+        self,
+        input_ids_list: list[list[int]],
+        padded_length: int,
+        *,
+        streamer: BaseStreamer | None = None,
+    ) -> list[str]:
+        """將一組輸入 padding 後送進模型生成
+
+        Parameters
+        ----------
+        input_ids_list : list[list[int]]
+            未 padding 的輸入 token
+        padded_length : int
+            padding 後長度 (0 代表 pad 到同組最長)
+        streamer : BaseStreamer | None, optional
+            逐 token 接收生成結果的 streamer (僅支援單筆輸入)
+
+        Returns
+        -------
+        list[str]
+            翻譯後文字 list
+
+        Raises
+        ------
+        DeadlineExceededError
+            目前請求的期限已到期或被取消 (生成中途停止，不回傳截斷的結果)
+        """
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check()
+
+        encodings = self._tokenizer.pad(
+            {"input_ids": input_ids_list},
+            padding="max_length" if padded_length else "longest",
+            max_length=padded_length or None,
+            return_tensors="pt",
+        ).to(self._device)
+
+        # 同組共用一個上限，但每筆輸出遇到 eos 就會結束
+        max_new_tokens = max(self._output_budget(len(input_ids)) for input_ids in input_ids_list)
+
+        with torch.inference_mode():
+            output: torch.Tensor = self._model.generate(
+                input_ids=encodings["input_ids"],
+                attention_mask=encodings["attention_mask"],
+                max_new_tokens=max_new_tokens,
+                streamer=streamer,
+                stopping_criteria=(
+                    None
+                    if deadline is None
+                    else StoppingCriteriaList([_DeadlineStoppingCriteria(deadline)])
+                ),
+                **self._generate_kwargs,
+            )
+        if deadline is not None:
+            deadline.check()
+
+        return self._tokenizer.batch_decode(output, skip_special_tokens=True)
+
+
+class _DeadlineStoppingCriteria(StoppingCriteria):
+    def __init__(self, deadline: Deadline) -> None:
+        """期限到期或被取消時停止生成 (每生成一個 token 檢查一次)"""
+        self.deadline = deadline
+
+    def __call__(
+        self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs: Any
+    ) -> torch.BoolTensor:
+        return torch.full(  # type: ignore[return-value]
+            (input_ids.shape[0],), self.deadline.expired, dtype=torch.bool, device=input_ids.device
+        )
@@ -0,0 +1,107 @@
+# standard library
+from typing import Any
+
+# local module
+from src.constants import PATH
+
+# app 預設設定
+# 可用 `FLASK_` 前綴的環境變數覆寫，例如：FLASK_TRANSLATOR_BATCH_MAX_SIZE=16
+DEFAULT_CONFIG: dict[str, Any] = {
+    # 上傳大小上限 (byte)，超過回傳 413 (上傳的圖片只放在記憶體)
+    "MAX_CONTENT_LENGTH": 16 * 2**20,
+    # 上傳圖片正規化 (依 EXIF 轉正、縮小、重新壓縮成 JPEG)：行程池大小 (0 代表不正規化)
+    "UPLOAD_NORMALIZE_WORKERS": 2,
+    # 上傳圖片正規化：最多同時幾張 (含排隊中)，已滿時沿用原圖，不讓請求排隊
+    "UPLOAD_NORMALIZE_MAX_PENDING": 8,
+    # 上傳圖片正規化：最長邊 (像素) 與 JPEG 品質
+    "UPLOAD_MAX_EDGE": 2048,
+    "UPLOAD_JPEG_QUALITY": 90,
+    # 請求期限 (秒)，client 可用 `X-Request-Timeout` header 縮短；預估的排隊時間超過期限時直接回 503
+    "REQUEST_TIMEOUT": 60.0,
+    # 准入控制：同時最多執行幾個翻譯請求 (0 代表不限制)、最多幾個排隊 (已滿時回 503)
+    "ADMISSION_MAX_IN_FLIGHT": 8,
+    "ADMISSION_MAX_QUEUE_SIZE": 16,
+    # 准入控制：每個 client (IP) 每秒幾個請求、最多連續幾個 (超過時回 429；None 代表不限制)
+    # 批次翻譯每張圖片各算一個請求。預設不限速：部署在反向代理後時所有請求的 IP 都是代理的 IP，
+    # 需同時設定 `PROXY_FIX_X_FOR` 才能以真正的 client IP 限速
+    "ADMISSION_RATE": None,
+    "ADMISSION_BURST": 10,
+    # 部署在反向代理後時，信任幾層代理的 X-Forwarded-For 作為 client IP (0 代表不信任)
+    "PROXY_FIX_X_FOR": 0,
+    # 是否在背景執行緒載入模型 (載入完成前，需要模型的 API 一律回 503)
+    "MODEL_BACKGROUND_LOADING": True,
+    # 模型尚未就緒時，建議 client 幾秒後重試 (Retry-After)
+    "MODEL_RETRY_AFTER": 5,
+    # 模型載入後先翻譯一次暖機 (None 代表不暖機)
+    "TRANSLATOR_WARM_UP_TEXT": "このカードは通常召喚できない。",
+    # micro-batching：每批最多幾筆翻譯請求
+    "TRANSLATOR_BATCH_MAX_SIZE": 8,
+    # micro-batching：收到第一筆請求後，最多再等幾秒湊批
+    "TRANSLATOR_BATCH_MAX_WAIT": 0.01,
+    # micro-batching：最多幾筆請求排隊等待推論，已滿時請求等待 (0 代表不限制)
+    "TRANSLATOR_BATCH_QUEUE_SIZE": 64,
+    # 推論後端："torch" | "onnx" (onnx 需先執行 `python -m src.card.onnx_export`，只支援 greedy)
+    "TRANSLATOR_BACKEND": "torch",
+    # decoding profile："greedy" | "beam-<n>" | "sampling" (僅確定性的 profile 會啟用翻譯快取)
+    "TRANSLATOR_DECODING": "greedy",
+    # 模型精度："fp32" | "int8" | "bf16" (後兩者在 CPU 上推論，適合沒有 GPU 的機器)
+    "TRANSLATOR_PRECISION": "fp32",
+    # padding 模式："max_length" | "longest" | "bucket"
+    "TRANSLATOR_PADDING": "bucket",
+    # "bucket" 模式的長度分桶 (token 數)
+    "TRANSLATOR_LENGTH_BUCKETS": [64, 128, 256, 512, 768],
+    # 輸出 token 預算 = 輸入 token 數 * RATIO + MARGIN
+    "TRANSLATOR_OUTPUT_LENGTH_RATIO": 2.0,
+    "TRANSLATOR_OUTPUT_LENGTH_MARGIN": 16,
+    # OCR 以 coroutine 直接呼叫 Azure Read REST API (httpx，在專屬的 event loop 執行緒上執行)：
+    # 非同步翻譯工作改在 event loop 上執行，上傳與輪詢 OCR 時不佔用執行緒
+    "OCR_ASYNC": False,
+    # OCR_ASYNC：最多同時幾條 HTTP 連線
+    "OCR_ASYNC_MAX_CONNECTIONS": 100,
+    # OCR 結果快取 (以照片中卡片的感知雜湊為 key)：最多幾筆 (0 代表不快取)
+    "OCR_CACHE_MAX_ENTRIES": 1024,
+    # OCR 結果快取：卡片雜湊的 Hamming 距離在此以內即視為同一張卡片 (dHash 共 256 bit)
+    # (找不到卡片時以整張照片計算雜湊，只接受完全相同的雜湊)
+    "OCR_CACHE_MAX_DISTANCE": 8,
+    # 卡圖雜湊索引 (`python -m src.image.artwork_index` 建立；檔案不存在則不辨識卡圖)
+    "ARTWORK_INDEX_PATH": f"{PATH.CACHE_DIR.value}/artwork-index.npz",
+    # 卡圖辨識：最大 Hamming 距離 (dHash 共 256 bit)，以及與第二近卡圖的最小距離差
+    "ARTWORK_MATCH_MAX_DISTANCE": 40,
+    "ARTWORK_MATCH_MIN_MARGIN": 16,
+    # OCR 前的影像前處理 (找出卡片、透視校正、只送效果框)：行程池大小 (0 代表送出原圖)
+    "CARD_RECTIFY_WORKERS": 2,
+    # 影像前處理：校正後卡片的寬度 (像素)
+    "CARD_RECTIFY_WIDTH": 1000,
+    # 管線的 OCR 階段 (影像前處理 + OCR)：worker 執行緒數 (0 代表在請求執行緒執行)
+    "PIPELINE_OCR_WORKERS": 8,
+    # 管線的 OCR 階段：最多幾個請求排隊等待 worker，已滿時請求等待
+    "PIPELINE_OCR_QUEUE_SIZE": 32,
+    # 批次翻譯 (/api/translate/batch)：一次最多幾張圖片 (超過回 400)、最多同時處理幾張
+    "TRANSLATE_BATCH_MAX_IMAGES": 60,
+    "TRANSLATE_BATCH_WORKERS": 8,
+    # 批次翻譯：上傳大小上限 (byte，取代 `MAX_CONTENT_LENGTH`)
+    "TRANSLATE_BATCH_MAX_CONTENT_LENGTH": 128 * 2**20,
+    # 是否提供非同步翻譯工作 API (工作只保存在建立它的行程中，多個 worker 的 pre-fork 部署會關閉)
+    "TRANSLATION_JOBS_ENABLED": True,
+    # 非同步翻譯工作 (/api/translate/jobs)：同時執行幾個、最多幾個排隊 (已滿時回 503)
+    "TRANSLATION_JOB_WORKERS": 4,
+    "TRANSLATION_JOB_QUEUE_SIZE": 64,
+    # 非同步翻譯工作 (OCR_ASYNC)：最多同時幾個工作在 event loop 上執行 (已滿時回 503；
+    # 取代 `TRANSLATION_JOB_WORKERS` 與 `TRANSLATION_JOB_QUEUE_SIZE`)
+    "TRANSLATION_JOB_MAX_IN_FLIGHT": 256,
+    # 非同步翻譯工作：完成的結果保留幾秒
+    "TRANSLATION_JOB_TTL": 600.0,
+    # 非同步翻譯工作：每個工作的期限 (秒，含排隊時間；超過時停止 OCR 與推論)
+    "TRANSLATION_JOB_TIMEOUT": 120.0,
+    # 非同步翻譯工作：佇列已滿時，建議 client 幾秒後重試 (Retry-After)
+    "TRANSLATION_JOB_RETRY_AFTER": 5,
+    # 以卡片密碼為 key 的完整翻譯：SQLite 檔案路徑 (None 代表只用記憶體；decoding 非確定性時不保存)
+    "CARD_TRANSLATION_STORE_DB": f"{PATH.CACHE_DIR.value}/card-translation.sqlite3",
+    # 是否將卡片效果切成子句再整批翻譯 (翻譯快取會以子句為單位命中)
+    "PIPELINE_CLAUSE_SEGMENTATION": False,
+    # 翻譯記憶快取：SQLite 檔案路徑 (None 代表只用記憶體)
+    "TRANSLATION_CACHE_DB": f"{PATH.CACHE_DIR.value}/translation.sqlite3",
+    # 翻譯記憶快取：記憶體 LRU 最多幾筆、每筆存活秒數 (SQLite 的條目同樣過期)
+    "TRANSLATION_CACHE_MAX_ENTRIES": 4096,
+    "TRANSLATION_CACHE_TTL": 86400.0,
+}
@@ -13,3 +13,5 @@ class PATH(Enum):
     YUGIOH_MATERIAL_DIR = os.path.abspath("./src/assets/card-material")
     USER_UPLOAD_IMAGE_DIR = os.path.abspath("./src/storage")
     MODEL_DIR = os.path.abspath("./src/model")
+    ONNX_MODEL_DIR = os.path.abspath("./src/model/onnx")
+    CACHE_DIR = os.path.abspath("./src/cache")
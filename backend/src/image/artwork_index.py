@@ -0,0 +1,262 @@
+"""卡圖雜湊索引：以上傳照片的卡圖辨識卡片 (不必 OCR)
+
+離線時為 `PATH.YUGIOH_IMAGE_DIR` 下所有官方卡圖 (檔名為卡片密碼) 計算 dHash，
+存成 `.npz`；請求時把上傳照片的卡圖區域與所有卡圖一次比對 (NumPy 向量化)
+
+Usage
+-----
+    cd backend
+    python -m src.image.artwork_index
+"""
+
+# standard library
+import argparse
+import logging
+import os
+from typing import NamedTuple
+
+# 3rd party library
+import numpy as np
+from PIL import Image
+
+# local module
+from src.constants import PATH
+from src.image.card_geometry import rectify_card_image
+from src.image.perceptual_hash import difference_hash_image, open_image
+
+# 卡圖在卡片中的位置 (左、上、右、下，以卡片寬高的比例表示)
+ARTWORK_BOX = (0.119, 0.179, 0.881, 0.702)
+
+# dHash 邊長 (共 256 bit = 4 個 uint64)
+HASH_SIZE = 16
+_WORDS = HASH_SIZE * HASH_SIZE // 64
+
+# 校正後卡片的寬度 (像素)，卡圖約為寬度的 76%，足夠計算 16 x 16 的 dHash
+_CARD_WIDTH = 256
+
+
+class ArtworkMatch(NamedTuple):
+    password: int
+    # Hamming 距離
+    distance: int
+
+
+def crop_artwork(card: Image.Image) -> Image.Image:
+    """從整張卡片的照片切出卡圖區域
+
+    NOTE: 假設照片已經只拍到整張卡片 (沒有背景、沒有傾斜，上傳照片先以 `rectify_card_image` 校正)
+
+    Parameters
+    ----------
+    card : Image.Image
+        卡片照片
+
+    Returns
+    -------
+    Image.Image
+        卡圖
+    """
+    left, top, right, bottom = ARTWORK_BOX
+    width, height = card.size
+    return card.crop((left * width, top * height, right * width, bottom * height))
+
+
+def artwork_fingerprint(artwork: Image.Image) -> np.ndarray:
+    """計算卡圖指紋 (256 bit dHash，拆成 4 個 uint64)
+
+    Parameters
+    ----------
+    artwork : Image.Image
+        卡圖
+
+    Returns
+    -------
+    np.ndarray
+        shape 為 (4,) 的 uint64 陣列
+    """
+    value = difference_hash_image(artwork, HASH_SIZE)
+    return np.array(
+        [(value >> (64 * i)) & 0xFFFF_FFFF_FFFF_FFFF for i in range(_WORDS)], dtype=np.uint64
+    )
+
+
+def photo_artwork_fingerprint(image_bytes: bytes) -> np.ndarray:
+    """計算上傳照片中卡片的卡圖指紋
+
+    先找出照片中的卡片並透視校正 (與 OCR 前的影像前處理相同的偵測)，再切出卡圖；
+    找不到卡片時，視整張照片為卡片
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        使用者上傳的卡片照片
+
+    Returns
+    -------
+    np.ndarray
+        shape 為 (4,) 的 uint64 陣列
+
+    Raises
+    ------
+    PIL.UnidentifiedImageError
+        無法辨識的圖片格式
+    PIL.Image.DecompressionBombError
+        像素數超過 `Image.MAX_IMAGE_PIXELS` 兩倍的圖片 (解壓縮炸彈)
+    """
+    card = rectify_card_image(image_bytes, width=_CARD_WIDTH)
+    if card is None:
+        card = open_image(image_bytes, _CARD_WIDTH)
+    return artwork_fingerprint(crop_artwork(card))
+
+
+class ArtworkIndex:
+    def __init__(self, passwords: np.ndarray, fingerprints: np.ndarray) -> None:
+        """卡圖雜湊索引
+
+        Parameters
+        ----------
+        passwords : np.ndarray
+            卡片密碼，shape 為 (N,)
+        fingerprints : np.ndarray
+            卡圖指紋，shape 為 (N, 4) 的 uint64 陣列
+        """
+        if len(passwords) != len(fingerprints):
+            raise ValueError("passwords and fingerprints must have the same length!")
+
+        self.passwords = np.asarray(passwords, dtype=np.int64)
+        self.fingerprints = np.asarray(fingerprints, dtype=np.uint64).reshape(-1, _WORDS)
+
+    def __len__(self) -> int:
+        return len(self.passwords)
+
+    @classmethod
+    def build(cls, image_dir: str, *, logger: logging.Logger) -> "ArtworkIndex":
+        """為資料夾下所有卡圖 (`<卡片密碼>.jpg`) 建立索引
+
+        Parameters
+        ----------
+        image_dir : str
+            卡圖資料夾
+        logger : logging.Logger
+            日誌 logger
+
+        Returns
+        -------
+        ArtworkIndex
+            卡圖雜湊索引
+        """
+        passwords: list[int] = []
+        fingerprints: list[np.ndarray] = []
+        for filename in sorted(os.listdir(image_dir)):
+            stem, extension = os.path.splitext(filename)
+            if not stem.isdigit() or extension.lower() not in (".jpg", ".jpeg", ".png"):
+                continue
+            try:
+                with open(os.path.join(image_dir, filename), "rb") as file:
+                    artwork = open_image(file.read(), HASH_SIZE * 4)
+            except OSError:
+                logger.warning("[ArtworkIndex] - cannot read %s, skipped", filename)
+                continue
+            passwords.append(int(stem))
+            fingerprints.append(artwork_fingerprint(artwork))
+
+        logger.info("[ArtworkIndex] - indexed %d artworks", len(passwords))
+        return cls(
+            np.array(passwords, dtype=np.int64),
+            np.array(fingerprints, dtype=np.uint64).reshape(-1, _WORDS),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ArtworkIndex":
+        """讀取 `save` 存下的索引"""
+        with np.load(path) as data:
+            return cls(data["passwords"], data["fingerprints"])
+
+    def save(self, path: str) -> None:
+        """將索引存成 `.npz`"""
+        np.savez(path, passwords=self.passwords, fingerprints=self.fingerprints)
+
+    def match(
+        self, card: Image.Image, *, max_distance: int, min_margin: int
+    ) -> ArtworkMatch | None:
+        """以卡片照片的卡圖區域比對所有卡圖
+
+        最近的卡圖距離不超過 `max_distance`，且比第二近的卡圖至少近 `min_margin`，
+        才視為有把握的辨識結果
+
+        Parameters
+        ----------
+        card : Image.Image
+            卡片照片
+        max_distance : int
+            最大 Hamming 距離
+        min_margin : int
+            與第二近卡圖的最小距離差
+
+        Returns
+        -------
+        ArtworkMatch | None
+            辨識結果，沒有把握時回傳 None
+        """
+        return self.match_fingerprint(
+            artwork_fingerprint(crop_artwork(card)),
+            max_distance=max_distance,
+            min_margin=min_margin,
+        )
+
+    def match_fingerprint(
+        self, query: np.ndarray, *, max_distance: int, min_margin: int
+    ) -> ArtworkMatch | None:
+        """以卡圖指紋比對所有卡圖 (門檻同 `match`)
+
+        Parameters
+        ----------
+        query : np.ndarray
+            卡圖指紋，shape 為 (4,) 的 uint64 陣列
+        max_distance : int
+            最大 Hamming 距離
+        min_margin : int
+            與第二近卡圖的最小距離差
+
+        Returns
+        -------
+        ArtworkMatch | None
+            辨識結果，沒有把握時回傳 None
+        """
+        if len(self) == 0:
+            return None
+
+        distances = np.bitwise_count(self.fingerprints ^ query).sum(axis=1, dtype=np.int32)
+
+        if len(self) == 1:
+            best, second_distance = 0, None
+        else:
+            # 只需要最近的兩張 (不必整個排序)
+            best, second = np.argpartition(distances, 1)[:2]
+            second_distance = int(distances[second])
+
+        distance = int(distances[best])
+        if distance > max_distance:
+            return None
+        if second_distance is not None and second_distance - distance < min_margin:
+            return None
+        return ArtworkMatch(int(self.passwords[best]), distance)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the artwork hash index")
+    parser.add_argument("--image-dir", default=PATH.YUGIOH_IMAGE_DIR.value)
+    parser.add_argument("--output", default=f"{PATH.CACHE_DIR.value}/artwork-index.npz")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    index = ArtworkIndex.build(args.image_dir, logger=logger)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    index.save(args.output)
+    logger.info("[ArtworkIndex] - saved to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""從手機照片找出卡片的四個角，透視校正成正面朝上的卡片，再切出效果框 (或整張卡片)
+
+只用 NumPy / Pillow：縮小的照片上以 Otsu 門檻分出與背景顏色不同的區域，
+取其四個極值點作為卡片的四個角，再以 `Image.transform` 做透視變換
+"""
+
+# standard library
+import io
+
+# 3rd party library
+import numpy as np
+from PIL import Image, ImageFilter, ImageOps
+
+# local module
+from src.image.perceptual_hash import difference_hash_image
+
+# 卡片的寬高比 (59 x 86 mm)
+CARD_ASPECT_RATIO = 59 / 86
+
+# 效果框在卡片中的位置 (左、上、右、下，以卡片寬高的比例表示)
+# 從卡圖下緣到卡片底部：含卡號、【】 行、效果文字、攻守與卡片密碼，不含卡名與卡圖
+TEXT_BOX = (0.0, 0.70, 1.0, 1.0)
+
+# 偵測卡片時把照片縮到的邊長 (像素)
+_DETECT_SIZE = 256
+# 卡片至少要佔照片多少面積
+_MIN_AREA_RATIO = 0.15
+# 四邊形內至少要有多少比例屬於卡片 (排除不是四邊形的前景)
+_MIN_FILL_RATIO = 0.85
+# 寬高比可偏離卡片寬高比的比例
+_ASPECT_TOLERANCE = 0.2
+
+
+def detect_card_quad(image: Image.Image) -> np.ndarray | None:
+    """找出照片中卡片的四個角
+
+    以照片四邊的中位數顏色作為背景，與背景顏色差距超過 Otsu 門檻的像素視為卡片，
+    再取 x + y、x - y 的極值點作為四個角 (卡片傾斜不超過 45 度)
+
+    Parameters
+    ----------
+    image : Image.Image
+        照片 (已依 EXIF 轉正)
+
+    Returns
+    -------
+    np.ndarray | None
+        shape 為 (4, 2) 的四個角座標 (左上、右上、右下、左下)，
+        找不到像卡片的四邊形時回傳 None
+    """
+    scale = _DETECT_SIZE / max(image.size)
+    small = image.convert("RGB").resize(
+        (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+        Image.Resampling.BOX,
+    )
+    pixels = np.asarray(small.filter(ImageFilter.GaussianBlur(1)), dtype=np.float32)
+
+    border = np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]])
+    distance = np.linalg.norm(pixels - np.median(border, axis=0), axis=2)
+    mask = distance > _otsu_threshold(distance)
+
+    # opening：去掉背景上零星的雜點
+    mask_image = Image.fromarray(mask.astype(np.uint8) * 255)
+    mask_image = mask_image.filter(ImageFilter.MinFilter(5)).filter(ImageFilter.MaxFilter(5))
+    ys, xs = np.nonzero(np.asarray(mask_image))
+    if len(xs) == 0:
+        return None
+
+    sums, differences = xs + ys, xs - ys
+    corners = [sums.argmin(), differences.argmax(), sums.argmax(), differences.argmin()]
+    quad = np.array([[xs[i], ys[i]] for i in corners], dtype=np.float64) + 0.5
+
+    area = _polygon_area(quad)
+    if area < _MIN_AREA_RATIO * mask.size or len(xs) < _MIN_FILL_RATIO * area:
+        return None
+    width = (np.linalg.norm(quad[1] - quad[0]) + np.linalg.norm(quad[2] - quad[3])) / 2
+    height = (np.linalg.norm(quad[3] - quad[0]) + np.linalg.norm(quad[2] - quad[1])) / 2
+    if abs(width / height / CARD_ASPECT_RATIO - 1) > _ASPECT_TOLERANCE:
+        return None
+
+    return quad / scale
+
+
+def perspective_transform(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """計算把 `src` 四個點對應到 `dst` 四個點的透視變換 (homography)
+
+    Parameters
+    ----------
+    src : np.ndarray
+        shape 為 (4, 2) 的四個點
+    dst : np.ndarray
+        shape 為 (4, 2) 的四個點
+
+    Returns
+    -------
+    np.ndarray
+        3 x 3 矩陣 H，齊次座標下 H @ (x, y, 1) 與 (u, v, 1) 成比例
+    """
+    rows: list[list[float]] = []
+    values: list[float] = []
+    for (x, y), (u, v) in zip(src, dst, strict=True):
+        rows.append([x, y, 1, 0, 0, 0, -u * x, -u * y])
+        rows.append([0, 0, 0, x, y, 1, -v * x, -v * y])
+        values.extend((u, v))
+    coefficients = np.linalg.solve(np.array(rows), np.array(values))
+    return np.append(coefficients, 1.0).reshape(3, 3)
+
+
+def rectify_card(image_bytes: bytes, *, width: int = 1000, quality: int = 90) -> bytes | None:
+    """找出照片中的卡片，透視校正後切出效果框 (灰階 JPEG)
+
+    只對效果框的範圍做透視變換，不必先轉正整張卡片
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        使用者上傳的照片
+    width : int, optional
+        校正後卡片的寬度 (像素)，效果文字約為寬度的 3%
+    quality : int, optional
+        JPEG 品質
+
+    Returns
+    -------
+    bytes | None
+        效果框圖片，找不到卡片時回傳 None
+
+    Raises
+    ------
+    PIL.UnidentifiedImageError
+        無法辨識的圖片格式
+    """
+    image = _open_photo(image_bytes, width * 2)
+    quad = detect_card_quad(image)
+    if quad is None:
+        return None
+    return _encode_text_box(image, quad, width, quality)
+
+
+def rectify_card_with_hash(
+    image_bytes: bytes, *, width: int = 1000, quality: int = 90, hash_size: int = 16
+) -> tuple[bytes | None, int, bool]:
+    """只偵測一次卡片，同時切出效果框 (`rectify_card`) 並計算卡片的 dHash (`card_difference_hash`)
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        使用者上傳的照片
+    width : int, optional
+        校正後卡片的寬度 (像素)
+    quality : int, optional
+        JPEG 品質
+    hash_size : int, optional
+        雜湊邊長 (雜湊共 hash_size * hash_size 個 bit)
+
+    Returns
+    -------
+    tuple[bytes | None, int, bool]
+        (效果框圖片 (找不到卡片時為 None), dHash, 是否找到卡片)
+
+    Raises
+    ------
+    PIL.UnidentifiedImageError
+        無法辨識的圖片格式
+    """
+    image = _open_photo(image_bytes, width * 2)
+    quad = detect_card_quad(image)
+    card_hash, card_found = _card_hash(image, quad, hash_size)
+    if quad is None:
+        return None, card_hash, card_found
+    return _encode_text_box(image, quad, width, quality), card_hash, card_found
+
+
+def rectify_card_image(image_bytes: bytes, *, width: int = 256) -> Image.Image | None:
+    """找出照片中的卡片，透視校正成正面朝上的整張卡片 (灰階，例如用於卡圖辨識)
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        使用者上傳的照片
+    width : int, optional
+        校正後卡片的寬度 (像素)
+
+    Returns
+    -------
+    Image.Image | None
+        校正後的卡片，找不到卡片時回傳 None
+
+    Raises
+    ------
+    PIL.UnidentifiedImageError
+        無法辨識的圖片格式
+    """
+    image = _open_photo(image_bytes, width * 2)
+    quad = detect_card_quad(image)
+    if quad is None:
+        return None
+    return warp_card_region(image.convert("L"), quad, (0.0, 0.0, 1.0, 1.0), width)
+
+
+def card_difference_hash(image_bytes: bytes, hash_size: int = 16) -> tuple[int, bool]:
+    """計算照片中卡片的 dHash (透視校正後的整張卡片，背景不計入雜湊)
+
+    找不到卡片時 (例如照片只拍到卡片，或卡片太小)，退回計算整張照片的 dHash
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        使用者上傳的照片
+    hash_size : int, optional
+        雜湊邊長 (雜湊共 hash_size * hash_size 個 bit)
+
+    Returns
+    -------
+    tuple[int, bool]
+        (dHash, 是否找到卡片)
+
+    Raises
+    ------
+    PIL.UnidentifiedImageError
+        無法辨識的圖片格式
+    """
+    image = _open_photo(image_bytes, hash_size * 32)
+    return _card_hash(image, detect_card_quad(image), hash_size)
+
+
+def warp_card_region(
+    image: Image.Image, quad: np.ndarray, box: tuple[float, float, float, float], width: int
+) -> Image.Image:
+    """把照片中卡片的某個範圍透視校正出來
+
+    Parameters
+    ----------
+    image : Image.Image
+        照片
+    quad : np.ndarray
+        `detect_card_quad` 找出的四個角
+    box : tuple[float, float, float, float]
+        範圍在卡片中的位置 (左、上、右、下，以卡片寬高的比例表示)
+    width : int
+        校正後卡片的寬度 (像素)
+
+    Returns
+    -------
+    Image.Image
+        校正後的範圍 (與 `image` 相同的 mode)
+    """
+    height = width / CARD_ASPECT_RATIO
+    left, top, right, bottom = box
+    card_corners = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64)
+    # `Image.transform` 需要的是輸出座標 -> 照片座標的變換 (再平移到範圍的左上角)
+    homography = perspective_transform(card_corners, quad) @ np.array(
+        [[1, 0, left * width], [0, 1, top * height], [0, 0, 1]]
+    )
+    homography /= homography[2, 2]
+
+    size = (round((right - left) * width), round((bottom - top) * height))
+    return image.transform(
+        size,
+        Image.Transform.PERSPECTIVE,
+        tuple(homography.ravel()[:8]),
+        Image.Resampling.BILINEAR,
+    )
+
+
+def _encode_text_box(image: Image.Image, quad: np.ndarray, width: int, quality: int) -> bytes:
+    """透視校正出效果框，壓縮成灰階 JPEG"""
+    text_box = warp_card_region(image.convert("L"), quad, TEXT_BOX, width)
+    buffer = io.BytesIO()
+    text_box.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def _card_hash(image: Image.Image, quad: np.ndarray | None, hash_size: int) -> tuple[int, bool]:
+    """計算校正後整張卡片的 dHash (找不到卡片時為整張照片的 dHash)
+
+    先把照片縮到短邊約 hash_size * 32 再校正 (寬 hash_size * 16)：直接從大圖取樣會有鋸齒，
+    重新壓縮、縮放過的複本雜湊會差很多
+    """
+    scale = min(1.0, hash_size * 32 / min(image.size))
+    gray = image.convert("L")
+    if scale < 1.0:
+        gray = gray.resize(
+            (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+            Image.Resampling.BOX,
+        )
+    if quad is None:
+        return difference_hash_image(gray, hash_size), False
+    card = warp_card_region(gray, quad * scale, (0.0, 0.0, 1.0, 1.0), hash_size * 16)
+    return difference_hash_image(card, hash_size), True
+
+
+def _open_photo(image_bytes: bytes, min_size: int) -> Image.Image:
+    """開啟照片並依 EXIF 轉正"""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        # JPEG 只解碼到夠用的解析度 (手機照片完整解碼要上百毫秒)
+        image.draft("RGB", (min_size, min_size))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image
+
+
+def _otsu_threshold(values: np.ndarray) -> float:
+    """以 Otsu 法找出把數值分成兩群的門檻 (類間變異數最大)"""
+    histogram, edges = np.histogram(values, bins=256)
+    centers = (edges[:-1] + edges[1:]) / 2
+    weights = np.cumsum(histogram)
+    means = np.cumsum(histogram * centers)
+    total_weight, total_mean = weights[-1], means[-1]
+
+    background_weight = weights[:-1]
+    foreground_weight = total_weight - background_weight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between_variance = (total_mean * background_weight - means[:-1] * total_weight) ** 2 / (
+            background_weight * foreground_weight
+        )
+    return float(edges[1:][np.nanargmax(np.where(foreground_weight > 0, between_variance, 0))])
+
+
+def _polygon_area(points: np.ndarray) -> float:
+    """多邊形面積 (shoelace formula)"""
+    xs, ys = points[:, 0], points[:, 1]
+    return float(abs(np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1))) / 2)
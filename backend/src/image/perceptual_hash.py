@@ -0,0 +1,157 @@
+# standard library
+import io
+from collections import defaultdict
+
+# 3rd party library
+import numpy as np
+from PIL import Image, ImageOps
+
+
+def difference_hash(image_bytes: bytes, hash_size: int = 16) -> int:
+    """計算圖片的 dHash (感知雜湊)
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        圖片 bytes
+    hash_size : int, optional
+        雜湊邊長 (雜湊共 hash_size * hash_size 個 bit)
+
+    Returns
+    -------
+    int
+        dHash
+
+    Raises
+    ------
+    PIL.UnidentifiedImageError
+        無法辨識的圖片格式
+    """
+    with open_image(image_bytes, hash_size * 4) as image:
+        return difference_hash_image(image, hash_size)
+
+
+def open_image(image_bytes: bytes, min_size: int) -> Image.Image:
+    """開啟圖片並依 EXIF 轉正 (JPEG 只解碼到至少 `min_size` 的解析度，手機照片完整解碼要上百毫秒)
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        圖片 bytes
+    min_size : int
+        需要的最小邊長 (像素)
+
+    Returns
+    -------
+    Image.Image
+        灰階圖片
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.draft("L", (min_size, min_size))
+        return ImageOps.exif_transpose(image).convert("L")
+
+
+def difference_hash_image(image: Image.Image, hash_size: int = 16) -> int:
+    """計算已開啟圖片的 dHash
+
+    縮成 (hash_size + 1) x hash_size 的灰階圖後，比較每列相鄰像素的明暗，
+    重新壓縮、縮放過的同一張圖片只會差幾個 bit
+
+    Parameters
+    ----------
+    image : Image.Image
+        圖片
+    hash_size : int, optional
+        雜湊邊長 (雜湊共 hash_size * hash_size 個 bit)
+
+    Returns
+    -------
+    int
+        dHash
+    """
+    image = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BOX)
+    pixels = np.asarray(image, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """兩個雜湊的 Hamming 距離 (不同的 bit 數)"""
+    return (a ^ b).bit_count()
+
+
+class HammingIndex:
+    def __init__(self, bits: int, max_distance: int) -> None:
+        """以 multi-index hashing 查詢 Hamming 距離在 `max_distance` 以內的雜湊
+
+        將雜湊切成 max_distance + 1 段，各段各自建表。
+        距離不超過 max_distance 時，由鴿籠原理至少有一段完全相同，
+        因此只需比對任一段相同的候選，不必掃過所有雜湊
+
+        Parameters
+        ----------
+        bits : int
+            雜湊的 bit 數
+        max_distance : int
+            最大 Hamming 距離
+        """
+        if max_distance < 0:
+            raise ValueError("max_distance must >= 0!")
+        if bits <= max_distance:
+            raise ValueError("bits must > max_distance!")
+
+        self.bits = bits
+        self.max_distance = max_distance
+
+        # 每段的 (右移位數, mask)
+        segments = max_distance + 1
+        self._segments: list[tuple[int, int]] = []
+        start = 0
+        for i in range(segments):
+            width = bits // segments + (1 if i < bits % segments else 0)
+            self._segments.append((start, (1 << width) - 1))
+            start += width
+        # 每段一張表：該段的值 -> 雜湊集合
+        self._tables: list[defaultdict[int, set[int]]] = [defaultdict(set) for _ in self._segments]
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._tables[0].values())
+
+    def add(self, key: int) -> None:
+        """加入雜湊"""
+        for table, (shift, mask) in zip(self._tables, self._segments, strict=True):
+            table[(key >> shift) & mask].add(key)
+
+    def remove(self, key: int) -> None:
+        """移除雜湊 (不存在時忽略)"""
+        for table, (shift, mask) in zip(self._tables, self._segments, strict=True):
+            segment = (key >> shift) & mask
+            keys = table.get(segment)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del table[segment]
+
+    def nearest(self, key: int) -> tuple[int, int] | None:
+        """查詢距離最近 (且不超過 `max_distance`) 的雜湊
+
+        Parameters
+        ----------
+        key : int
+            欲查詢的雜湊
+
+        Returns
+        -------
+        tuple[int, int] | None
+            (最近的雜湊, Hamming 距離)，沒有則回傳 None
+        """
+        candidates: set[int] = set()
+        for table, (shift, mask) in zip(self._tables, self._segments, strict=True):
+            candidates.update(table.get((key >> shift) & mask, ()))
+
+        best: tuple[int, int] | None = None
+        for candidate in candidates:
+            distance = hamming_distance(key, candidate)
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (candidate, distance)
+        return best
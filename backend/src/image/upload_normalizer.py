@@ -0,0 +1,191 @@
+# standard library
+import io
+import logging
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
+# 3rd party library
+from PIL import Image, ImageOps
+
+# local module
+from src.utils.process_pool import LazyProcessPool
+
+# EXIF 方向標籤
+_EXIF_ORIENTATION = 0x0112
+
+
+class NormalizedUpload(NamedTuple):
+    # 之後交給圖床、OCR、雜湊的圖片 (不需要正規化時為原圖)
+    image_bytes: bytes
+    # 原圖大小 (byte)
+    original_size: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_size - len(self.image_bytes)
+
+
+def normalize_image(image_bytes: bytes, *, max_edge: int = 2048, quality: int = 90) -> bytes | None:
+    """將上傳圖片正規化：依 EXIF 轉正、縮到最長邊不超過 `max_edge`，重新壓縮成 JPEG
+
+    不含 EXIF 與其他 metadata；透明背景以白色填滿
+
+    Parameters
+    ----------
+    image_bytes : bytes
+        使用者上傳的圖片
+    max_edge : int, optional
+        最長邊 (像素)
+    quality : int, optional
+        JPEG 品質
+
+    Returns
+    -------
+    bytes | None
+        正規化後的圖片，原圖已經夠小 (不必轉正、縮放，且重新壓縮也不會更小) 時回傳 None
+
+    Raises
+    ------
+    PIL.UnidentifiedImageError
+        無法辨識的圖片格式
+    PIL.Image.DecompressionBombError
+        像素數超過 `Image.MAX_IMAGE_PIXELS` 兩倍的圖片 (解壓縮炸彈)
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        rotated = image.getexif().get(_EXIF_ORIENTATION, 1) != 1
+        oversized = max(image.size) > max_edge
+        if not rotated and not oversized and image.format == "JPEG":
+            return None
+
+        # JPEG 只解碼到夠用的解析度 (縮放前先以 DCT 縮小，手機照片完整解碼要上百毫秒)
+        image.draft("RGB", (max_edge, max_edge))
+        normalized = ImageOps.exif_transpose(image)
+        normalized.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        if normalized.mode in ("RGBA", "LA", "P"):
+            normalized = normalized.convert("RGBA")
+            background = Image.new("RGB", normalized.size, (255, 255, 255))
+            background.paste(normalized, mask=normalized.getchannel("A"))
+            normalized = background
+        elif normalized.mode not in ("RGB", "L"):
+            normalized = normalized.convert("RGB")
+
+    buffer = io.BytesIO()
+    normalized.save(buffer, "JPEG", quality=quality, optimize=True)
+    if not rotated and not oversized and buffer.tell() >= len(image_bytes):
+        return None
+    return buffer.getvalue()
+
+
+class UploadNormalizer:
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        max_edge: int = 2048,
+        quality: int = 90,
+    ) -> None:
+        """上傳圖片正規化 (在有上限的行程池中解碼、縮放、重新壓縮)
+
+        之後的圖床上傳、OCR 傳輸、感知雜湊都只需處理縮小後的圖片。
+        行程池已有 `max_pending` 個工作時直接沿用原圖，請求執行緒不會排隊等待
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            日誌 logger
+        max_workers : int, optional
+            行程池大小
+        max_pending : int, optional
+            最多同時幾個正規化工作 (含排隊中)
+        max_edge : int, optional
+            最長邊 (像素)
+        quality : int, optional
+            JPEG 品質
+        """
+        if max_edge < 1:
+            raise ValueError("max_edge must >= 1!")
+        if not 1 <= quality <= 100:
+            raise ValueError("quality must be in [1, 100]!")
+
+        self.logger = logger
+        self.max_edge = max_edge
+        self.quality = quality
+        self.normalized = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+        self._pool = LazyProcessPool(
+            max_workers, max_pending=max_pending, preload=[normalize_image.__module__]
+        )
+        self._lock = threading.Lock()
+
+    def normalize(self, image_bytes: bytes) -> NormalizedUpload:
+        """正規化上傳圖片
+
+        Parameters
+        ----------
+        image_bytes : bytes
+            使用者上傳的圖片
+
+        Returns
+        -------
+        NormalizedUpload
+            正規化後的圖片與原圖大小；
+            不需要正規化、無法解碼或行程池已滿時為原圖
+        """
+        normalized_bytes = self._run(image_bytes)
+        upload = NormalizedUpload(normalized_bytes or image_bytes, len(image_bytes))
+
+        with self._lock:
+            self.bytes_in += upload.original_size
+            self.bytes_out += len(upload.image_bytes)
+            if normalized_bytes is None:
+                self.skipped += 1
+            else:
+                self.normalized += 1
+
+        self.logger.info(
+            "[UploadNormalizer] - %d -> %d bytes (saved %d)",
+            upload.original_size,
+            len(upload.image_bytes),
+            upload.bytes_saved,
+        )
+        return upload
+
+    def stats(self) -> dict[str, int]:
+        """累計的正規化次數與節省的 bytes"""
+        with self._lock:
+            return {
+                "normalized": self.normalized,
+                "skipped": self.skipped,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+            }
+
+    def close(self) -> None:
+        """關閉行程池"""
+        self._pool.close()
+
+    def _run(self, image_bytes: bytes) -> bytes | None:
+        future = self._pool.submit(
+            normalize_image, image_bytes, max_edge=self.max_edge, quality=self.quality
+        )
+        if future is None:
+            self.logger.warning("[UploadNormalizer] - process pool is full, keep the original")
+            return None
+
+        try:
+            return future.result()
+        except (OSError, ValueError, Image.DecompressionBombError):
+            self.logger.warning("[UploadNormalizer] - cannot decode image, keep the original")
+            return None
+        except BrokenProcessPool:
+            # 子行程異常結束 (下一個工作會改用新的行程池)
+            self.logger.warning("[UploadNormalizer] - process pool is broken, keep the original")
+            return None
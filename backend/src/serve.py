@@ -0,0 +1,201 @@
+"""正式環境入口 (pre-fork)
+
+master 行程只載入一次翻譯模型，再 fork 出多個 worker，
+worker 以 copy-on-write 共用同一份權重，並共用同一個 listening socket 處理請求
+
+Usage
+-----
+    cd backend
+    python -m src.serve --workers 4 --port 3000
+
+NOTE: 需要 `os.fork` (Linux / macOS)，且只支援 CPU 推論 (CUDA 不能跨 fork 使用)
+"""
+
+# standard library
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+from collections.abc import Callable
+from functools import partial
+from types import FrameType
+from typing import Any
+
+# 3rd party library
+import torch
+from flask import Flask
+from werkzeug.serving import make_server
+
+# local module
+from src.app import create_app
+
+
+class PreforkServer:
+    def __init__(
+        self,
+        app: Flask,
+        listener: socket.socket,
+        *,
+        workers: int,
+        logger: logging.Logger,
+        on_worker_start: Callable[[], None] | None = None,
+    ) -> None:
+        """pre-fork 伺服器：master 只負責 fork 與監控 worker，請求都由 worker 處理
+
+        Parameters
+        ----------
+        app : Flask
+            已載入好模型的 Flask app (fork 後由所有 worker 共用)
+        listener : socket.socket
+            已 bind 並 listen 的 socket
+        workers : int
+            worker 數量
+        logger : logging.Logger
+            日誌 logger
+        on_worker_start : Callable[[], None] | None, optional
+            每個 worker fork 後、開始處理請求前執行 (例如重設執行緒池)
+        """
+        if workers < 1:
+            raise ValueError("workers must >= 1!")
+
+        self.app = app
+        self.listener = listener
+        self.workers = workers
+        self.logger = logger
+        self.on_worker_start = on_worker_start
+
+        self._worker_pids: set[int] = set()
+        self._stopping = False
+
+    def serve_forever(self) -> None:
+        """啟動所有 worker 並監控 (意外結束的 worker 會重新 fork)，收到 SIGINT / SIGTERM 時停止"""
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        # 將目前所有物件移出 GC 追蹤，避免 worker 做 GC 時寫入共用分頁而觸發 copy-on-write
+        gc.freeze()
+
+        for _ in range(self.workers):
+            self._spawn_worker()
+
+        while self._worker_pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            self._worker_pids.discard(pid)
+            if not self._stopping:
+                self.logger.warning(
+                    "[PreforkServer] - worker %d exited (status: %d), respawning", pid, status
+                )
+                self._spawn_worker()
+
+        self.logger.info("[PreforkServer] - all workers stopped")
+
+    def stop(self) -> None:
+        """通知所有 worker 結束"""
+        self._stopping = True
+        for pid in list(self._worker_pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._worker_pids.discard(pid)
+
+    def _handle_stop(self, signum: int, frame: FrameType | None) -> None:
+        self.logger.info("[PreforkServer] - received signal %d, stopping workers...", signum)
+        self.stop()
+
+    def _spawn_worker(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                self.logger.exception("[PreforkServer] - worker crashed")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        self._worker_pids.add(pid)
+        self.logger.info("[PreforkServer] - worker %d started", pid)
+
+    def _run_worker(self) -> None:
+        """worker 主程式：處理請求直到收到 SIGTERM"""
+        # SIGTERM 直接結束；Ctrl+C 會送給整個 process group，交給 master 統一處理
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        if self.on_worker_start is not None:
+            self.on_worker_start()
+
+        host, port = self.listener.getsockname()[:2]
+        server = make_server(host, port, self.app, threaded=True, fd=self.listener.fileno())
+        server.serve_forever()
+
+
+def main() -> None:
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Serve the app with pre-forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="torch intra-op threads per worker (default: CPU count / workers)",
+    )
+    args = parser.parse_args()
+    threads_per_worker = args.threads_per_worker or max(1, cpu_count // args.workers)
+
+    logging.basicConfig(level=logging.INFO)
+
+    # fork 後 tokenizers 的 Rust 執行緒池不能沿用
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    # master 以單執行緒載入與暖機，fork 前不建立 OpenMP 執行緒池 (執行緒不會被 fork 複製)
+    torch.set_num_threads(1)
+
+    # 同步載入模型 (含暖機)，之後 fork 出的 worker 一開始就是 ready
+    app = create_app(_app_config(args.workers))
+    if torch.cuda.is_initialized():
+        sys.exit(
+            "pre-fork serving requires CPU inference: set CUDA_VISIBLE_DEVICES= "
+            "or FLASK_TRANSLATOR_PRECISION=int8 / bf16"
+        )
+
+    listener = socket.create_server((args.host, args.port), backlog=128)
+    app.logger.info(
+        "[PreforkServer] - listening on %s:%d (workers: %d, threads per worker: %d)",
+        args.host,
+        args.port,
+        args.workers,
+        threads_per_worker,
+    )
+    PreforkServer(
+        app,
+        listener,
+        workers=args.workers,
+        logger=app.logger,
+        on_worker_start=partial(torch.set_num_threads, threads_per_worker),
+    ).serve_forever()
+
+
+def _app_config(workers: int) -> dict[str, Any]:
+    """pre-fork 部署時覆寫的 app 設定
+
+    非同步翻譯工作只保存在建立它的 worker 的記憶體中，而同一個 listening socket 上的連線
+    由 kernel 分給任一 worker (無法固定連到同一個 worker)，查詢多半找不到工作：
+    多於一個 worker 時關閉非同步翻譯工作 API
+    """
+    config: dict[str, Any] = {"MODEL_BACKGROUND_LOADING": False}
+    if workers > 1:
+        config["TRANSLATION_JOBS_ENABLED"] = False
+    return config
+
+
+if __name__ == "__main__":
+    main()
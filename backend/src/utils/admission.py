@@ -0,0 +1,272 @@
+# standard library
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class AdmissionRejectedError(RuntimeError):
+    def __init__(self, status: int, retry_after: float, reason: str) -> None:
+        """請求未被接受 (429：超過 client 的速率限制；503：伺服器忙碌)
+
+        Parameters
+        ----------
+        status : int
+            HTTP 狀態碼
+        retry_after : float
+            建議幾秒後重試
+        reason : str
+            原因
+        """
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        """token bucket 速率限制 (每秒補充 `rate` 個 token，最多累積 `burst` 個)
+
+        Parameters
+        ----------
+        rate : float
+            每秒補充幾個 token
+        burst : float
+            最多累積幾個 token (一開始是滿的)
+        """
+        if rate <= 0:
+            raise ValueError("rate must > 0!")
+        if burst < 1:
+            raise ValueError("burst must >= 1!")
+
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self, cost: float = 1.0) -> float:
+        """取出 `cost` 個 token (不執行緒安全，由呼叫端加鎖)
+
+        Parameters
+        ----------
+        cost : float, optional
+            token 數 (超過 `burst` 時以 `burst` 計)
+
+        Returns
+        -------
+        float
+            0 代表已取出；否則為還要等幾秒才有足夠的 token (此時不取出)
+        """
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class AdmissionTicket:
+    def __init__(self, controller: "AdmissionController") -> None:
+        """已接受的請求 (完成後必須 `release`，可重複呼叫；也可以當 context manager 使用)"""
+        self._controller = controller
+        self._started_at = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        """歸還執行名額，並記錄執行時間 (用來估計之後請求的等待時間)"""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._controller._release(time.monotonic() - self._started_at)
+
+    def __enter__(self) -> "AdmissionTicket":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        max_in_flight: int,
+        max_queue_size: int,
+        rate: float | None = None,
+        burst: float = 10.0,
+        max_clients: int = 10000,
+        service_time_smoothing: float = 0.2,
+    ) -> None:
+        """翻譯管線前的准入控制 (admission control)
+
+        - 每個 client 以 token bucket 限制速率，超過時回 429
+        - 同時最多執行 `max_in_flight` 個請求，最多 `max_queue_size` 個排隊；
+          佇列已滿，或預估的排隊時間 (排在前面的請求數 × 平均執行時間 / 名額數)
+          超過請求的期限時，直接回 503，不讓請求排隊後才逾時
+
+        只限制目前的行程 (pre-fork 時每個 worker 各自計算)
+
+        Parameters
+        ----------
+        max_in_flight : int
+            同時最多執行幾個請求
+        max_queue_size : int
+            最多幾個請求排隊等待執行
+        rate : float | None, optional
+            每個 client 每秒可發出幾個請求 (None 代表不限制)
+        burst : float, optional
+            每個 client 最多可連續發出幾個請求
+        max_clients : int, optional
+            最多記住幾個 client 的 token bucket (LRU)
+        service_time_smoothing : float, optional
+            平均執行時間的指數移動平均係數 (越大越偏重最近的請求)
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must >= 1!")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size must >= 0!")
+        if not 0 < service_time_smoothing <= 1:
+            raise ValueError("service_time_smoothing must be in (0, 1]!")
+
+        self.max_in_flight = max_in_flight
+        self.max_queue_size = max_queue_size
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.service_time_smoothing = service_time_smoothing
+
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.shed = 0
+        # 平均執行時間 (秒)，還沒有請求完成時為 None
+        self.service_time: float | None = None
+
+        self._slots = threading.Semaphore(max_in_flight)
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def estimated_wait(self) -> float:
+        """新請求預估的排隊時間 (秒)"""
+        with self._lock:
+            return self._estimated_wait()
+
+    def admit(self, client: str, *, timeout: float, cost: float = 1.0) -> AdmissionTicket:
+        """接受請求，等待執行名額
+
+        Parameters
+        ----------
+        client : str
+            client 識別 (例如 IP)
+        timeout : float
+            請求的期限 (秒)，預估或實際的排隊時間超過時不接受
+        cost : float, optional
+            消耗幾個 token (例如批次翻譯的圖片數)
+
+        Returns
+        -------
+        AdmissionTicket
+            取得執行名額的請求
+
+        Raises
+        ------
+        AdmissionRejectedError
+            超過速率限制 (429)，或佇列已滿 / 排隊時間會超過期限 (503)
+        """
+        self.limit_rate(client, cost)
+        self._enqueue(timeout)
+
+        acquired = self._slots.acquire(timeout=max(timeout, 0))
+        with self._lock:
+            self.queued -= 1
+            if not acquired:
+                self.shed += 1
+                raise AdmissionRejectedError(
+                    503, self._estimated_wait(), "request timed out in queue"
+                )
+            self.in_flight += 1
+            self.admitted += 1
+        return AdmissionTicket(self)
+
+    def stats(self) -> dict[str, Any]:
+        """執行中 / 排隊中的請求數、被拒絕的次數與平均執行時間"""
+        with self._lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "max_queue_size": self.max_queue_size,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "admitted": self.admitted,
+                "rate_limited": self.rate_limited,
+                "shed": self.shed,
+                "service_time": self.service_time,
+                "estimated_wait": self._estimated_wait(),
+            }
+
+    def limit_rate(self, client: str, cost: float = 1.0) -> None:
+        """只做速率限制：從 client 的 token bucket 取出 token (不佔執行名額)
+
+        Parameters
+        ----------
+        client : str
+            client 識別 (例如 IP)
+        cost : float, optional
+            消耗幾個 token
+
+        Raises
+        ------
+        AdmissionRejectedError
+            超過速率限制 (429)
+        """
+        if self.rate is None:
+            return
+
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+
+            retry_after = bucket.take(cost)
+            if retry_after > 0:
+                self.rate_limited += 1
+                raise AdmissionRejectedError(429, retry_after, "rate limit exceeded")
+
+    def _enqueue(self, timeout: float) -> None:
+        """排入佇列 (佇列已滿，或預估的排隊時間超過期限時拋出 503)"""
+        with self._lock:
+            estimated_wait = self._estimated_wait()
+            if self.queued >= self.max_queue_size and self.in_flight >= self.max_in_flight:
+                self.shed += 1
+                raise AdmissionRejectedError(503, estimated_wait, "queue is full")
+            if estimated_wait > timeout:
+                self.shed += 1
+                raise AdmissionRejectedError(503, estimated_wait, "estimated wait exceeds deadline")
+            self.queued += 1
+
+    def _estimated_wait(self) -> float:
+        """預估的排隊時間 (需持有鎖)"""
+        if self.in_flight < self.max_in_flight or self.service_time is None:
+            return 0.0
+        return (self.queued + 1) * self.service_time / self.max_in_flight
+
+    def _release(self, service_time: float) -> None:
+        """歸還執行名額，並更新平均執行時間"""
+        with self._lock:
+            self.in_flight -= 1
+            if self.service_time is None:
+                self.service_time = service_time
+            else:
+                alpha = self.service_time_smoothing
+                self.service_time = alpha * service_time + (1 - alpha) * self.service_time
+        self._slots.release()
@@ -0,0 +1,108 @@
+# standard library
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class NotReadyError(Exception):
+    """資源尚未載入完成 (或載入失敗)"""
+
+
+class BackgroundLoader(Generic[T]):
+    def __init__(self, load: Callable[[], T], *, logger: logging.Logger, name: str) -> None:
+        """在背景執行緒載入耗時的資源 (例如翻譯模型)，讓呼叫端不必等待
+
+        Parameters
+        ----------
+        load : Callable[[], T]
+            載入函式
+        logger : logging.Logger
+            日誌 logger
+        name : str
+            資源名稱 (用於日誌與執行緒名稱)
+        """
+        self.name = name
+        self.logger = logger
+        self.load_seconds: float | None = None
+        self.error: Exception | None = None
+
+        self._load = load
+        self._value: T | None = None
+        self._done = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        """是否已成功載入"""
+        return self._done.is_set() and self.error is None
+
+    @property
+    def failed(self) -> bool:
+        """是否載入失敗"""
+        return self.error is not None
+
+    def start(self) -> "BackgroundLoader[T]":
+        """在背景執行緒開始載入 (失敗時記錄在 `error`，不會拋出)"""
+        self._thread = threading.Thread(
+            target=self._run, name=f"BackgroundLoader-{self.name}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def load(self) -> T:
+        """在目前執行緒同步載入 (失敗時直接拋出)"""
+        self._run()
+        if self.error is not None:
+            raise self.error
+        return self.get()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """等待載入結束 (成功或失敗)
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            最多等幾秒 (None 代表一直等)
+
+        Returns
+        -------
+        bool
+            是否已成功載入
+        """
+        self._done.wait(timeout)
+        return self.ready
+
+    def get(self) -> T:
+        """取得載入好的資源
+
+        Returns
+        -------
+        T
+            資源
+
+        Raises
+        ------
+        NotReadyError
+            尚未載入完成或載入失敗
+        """
+        if not self.ready:
+            raise NotReadyError(f"{self.name} is not ready")
+        return self._value  # type: ignore[return-value]
+
+    def _run(self) -> None:
+        self.logger.info("[BackgroundLoader] - loading %s...", self.name)
+        start = time.perf_counter()
+        try:
+            self._value = self._load()
+        except Exception as e:
+            self.error = e
+            self.logger.exception("[BackgroundLoader] - failed to load %s", self.name)
+        else:
+            self.load_seconds = time.perf_counter() - start
+            self.logger.info("[BackgroundLoader] - %s ready (%.1f s)", self.name, self.load_seconds)
+        finally:
+            self._done.set()
@@ -0,0 +1,222 @@
+# standard library
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# 任一期限被取消時通知所有 `Deadline.sleep`，由各自重新檢查整條期限鏈 (上層、合併的成員)
+_cancel_condition = threading.Condition()
+
+
+def _reset_cancel_condition() -> None:
+    # fork 時若有其他執行緒持有鎖，子行程會永遠拿不到
+    global _cancel_condition
+    _cancel_condition = threading.Condition()
+
+
+os.register_at_fork(after_in_child=_reset_cancel_condition)
+
+# `Deadline.asleep` 每隔幾秒醒來檢查一次是否被取消 (event loop 上不能等待 `_cancel_condition`)
+_ASYNC_CHECK_INTERVAL = 0.05
+
+
+class DeadlineExceededError(TimeoutError):
+    """請求已超過期限，或已被取消 (例如 client 中斷連線)"""
+
+
+class Deadline:
+    def __init__(self, timeout: float | None = None, *, parent: "Deadline | None" = None) -> None:
+        """請求的期限與取消訊號 (cooperative cancellation)
+
+        各階段在等待 (輪詢、排隊) 或推論時檢查，期限已過或被取消就停止工作，
+        把 CPU / GPU 時間留給仍在等待結果的請求
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            幾秒後到期 (None 代表沒有期限，只能被取消)
+        parent : Deadline | None, optional
+            上層的期限 (上層到期或被取消時，此期限也視為到期)
+        """
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+        self.parent = parent
+
+        self._cancelled = threading.Event()
+
+    @property
+    def expired(self) -> bool:
+        """是否已到期或被取消"""
+        if self._cancelled.is_set():
+            return True
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            return True
+        return self.parent is not None and self.parent.expired
+
+    def remaining(self) -> float | None:
+        """剩餘秒數 (沒有期限時為 None；已到期或被取消時為 0)"""
+        if self.expired:
+            return 0.0
+        remaining = None if self.expires_at is None else self.expires_at - time.monotonic()
+        parent_remaining = None if self.parent is None else self.parent.remaining()
+        if remaining is None or parent_remaining is None:
+            return parent_remaining if remaining is None else max(remaining, 0.0)
+        return max(min(remaining, parent_remaining), 0.0)
+
+    def cancel(self) -> None:
+        """取消 (例如 client 中斷連線)，之後的檢查都會視為到期"""
+        self._cancelled.set()
+        with _cancel_condition:
+            _cancel_condition.notify_all()
+
+    def check(self) -> None:
+        """已到期或被取消時拋出 `DeadlineExceededError`"""
+        if self.expired:
+            raise DeadlineExceededError("deadline exceeded or request cancelled")
+
+    def sleep(self, seconds: float) -> None:
+        """等待 `seconds` 秒 (不超過剩餘時間；期限鏈上任一期限被取消時提早醒來)
+
+        Raises
+        ------
+        DeadlineExceededError
+            等待後已到期或被取消
+        """
+        wake_at = time.monotonic() + seconds
+        with _cancel_condition:
+            while not self.expired:
+                timeout = wake_at - time.monotonic()
+                remaining = self.remaining()
+                if remaining is not None:
+                    timeout = min(timeout, remaining)
+                if timeout <= 0:
+                    break
+                _cancel_condition.wait(timeout)
+        self.check()
+
+    async def asleep(self, seconds: float) -> None:
+        """`sleep` 的 coroutine 版本 (等待時讓出 event loop，定期醒來檢查是否被取消)
+
+        Raises
+        ------
+        DeadlineExceededError
+            等待後已到期或被取消
+        """
+        wake_at = time.monotonic() + seconds
+        while not self.expired:
+            timeout = wake_at - time.monotonic()
+            remaining = self.remaining()
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+            if timeout <= 0:
+                break
+            await asyncio.sleep(min(timeout, _ASYNC_CHECK_INTERVAL))
+        self.check()
+
+
+class AllDeadlines(Deadline):
+    def __init__(self, deadlines: Iterable[Deadline] = ()) -> None:
+        """所有期限都到期 (或此合併期限本身被取消) 時才到期
+        (同一批推論的多個請求，全部放棄時才停止)
+
+        Parameters
+        ----------
+        deadlines : Iterable[Deadline], optional
+            一開始的期限 (之後可以 `add`，例如等待同一個工作的請求陸續加入)
+        """
+        super().__init__()
+        self.deadlines = list(deadlines)
+
+    def add(self, deadline: Deadline | None) -> None:
+        """加入期限 (None 代表沒有期限，合併後也不會到期)"""
+        self.deadlines.append(Deadline() if deadline is None else deadline)
+
+    @property
+    def expired(self) -> bool:
+        if self._cancelled.is_set():
+            return True
+        return all(deadline.expired for deadline in self.deadlines)
+
+    def remaining(self) -> float | None:
+        if self._cancelled.is_set():
+            return 0.0
+        remainings = [deadline.remaining() for deadline in self.deadlines]
+        if any(remaining is None for remaining in remainings):
+            return None
+        return max(remainings)  # type: ignore[type-var]
+
+
+def all_deadlines(deadlines: Iterable[Deadline | None]) -> Deadline | None:
+    """合併多個期限：全部到期時才到期 (任一個沒有期限時回傳 None)"""
+    deadline_list: list[Deadline] = []
+    for deadline in deadlines:
+        if deadline is None:
+            return None
+        deadline_list.append(deadline)
+    if len(deadline_list) == 1:
+        return deadline_list[0]
+    return AllDeadlines(deadline_list) if deadline_list else None
+
+
+# 目前請求的期限 (由 `deadline_scope` 設定，各階段以 `current_deadline` 取得)
+_current_deadline: ContextVar[Deadline | None] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    """目前請求的期限 (沒有時為 None)"""
+    return _current_deadline.get()
+
+
+def check_deadline() -> None:
+    """目前請求已到期或被取消時拋出 `DeadlineExceededError`"""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline | None) -> Iterator[None]:
+    """在此範圍內 (含以 `contextvars.copy_context` 交給其他執行緒的工作) 設定目前請求的期限"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def iterate_in_scope(iterator: Iterator[T], deadline: Deadline | None) -> Iterator[T]:
+    """逐一產出 `iterator` 的元素，每次取值時都在 `deadline_scope` 內
+
+    generator 的 context 屬於呼叫端，不能在 `yield` 前後跨越 `deadline_scope`，
+    因此每次只在取下一個元素時設定期限
+
+    Parameters
+    ----------
+    iterator : Iterator[T]
+        例如翻譯流程的事件 generator
+    deadline : Deadline | None
+        期限
+
+    Yields
+    ------
+    T
+        `iterator` 的元素
+    """
+    try:
+        while True:
+            with deadline_scope(deadline):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            with deadline_scope(deadline):
+                close()
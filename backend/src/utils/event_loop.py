@@ -0,0 +1,70 @@
+# standard library
+import asyncio
+import os
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class EventLoopThread:
+    def __init__(self, name: str = "event-loop") -> None:
+        """在專屬執行緒上執行的 asyncio event loop (第一次使用時才啟動)
+
+        讓同步的 Flask app 也能以 coroutine 執行 I/O 為主的工作 (例如等待 OCR API)：
+        等待中的工作只佔用 event loop 上的一個 coroutine，不佔用執行緒。
+        pre-fork 的每個 worker 各自啟動一個 (event loop 執行緒不會被 fork 複製)
+
+        Parameters
+        ----------
+        name : str, optional
+            執行緒名稱
+        """
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._loop_pid: int | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """event loop (第一次使用時啟動；fork 後的子行程會重新啟動一個)"""
+        if self._loop_pid != os.getpid():
+            with self._lock:
+                if self._loop_pid != os.getpid():
+                    self._loop = asyncio.new_event_loop()
+                    threading.Thread(
+                        target=self._loop.run_forever, name=self.name, daemon=True
+                    ).start()
+                    self._loop_pid = os.getpid()
+        assert self._loop is not None
+        return self._loop
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> Future[T]:
+        """在 event loop 上執行 coroutine
+
+        coroutine 在 event loop 執行緒的 context 中執行，看不到呼叫端的 `ContextVar`
+        (例如請求的期限)，需要的話直接傳入
+
+        Parameters
+        ----------
+        coro : Coroutine[Any, Any, T]
+            要執行的 coroutine
+
+        Returns
+        -------
+        Future[T]
+            執行結果 (可在其他執行緒等待)
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def close(self) -> None:
+        """停止 event loop 執行緒 (不等待執行中的 coroutine)"""
+        with self._lock:
+            if self._loop is None or self._loop_pid != os.getpid():
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+            self._loop_pid = None
@@ -0,0 +1,80 @@
+# standard library
+import os
+import statistics
+import sys
+import threading
+from collections import deque
+
+
+def resident_memory_bytes() -> int | None:
+    """目前行程的常駐記憶體 (RSS)，無法取得時回傳 None"""
+    # Linux：/proc/self/statm 第二欄為 RSS (單位：page)
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # 其他 Unix：退而求其次，回報峰值 RSS (macOS 單位為 byte，其餘為 KB)
+    try:
+        import resource
+    except ImportError:  # pragma: no cover (Windows)
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def proportional_set_size_bytes() -> int | None:
+    """目前行程的 PSS (共用分頁依共用行程數均分)，僅 Linux 可取得，其他平台回傳 None
+
+    多個行程共用同一份 copy-on-write 記憶體時，RSS 會把共用分頁重複計入每個行程，
+    PSS 加總才是實際佔用的記憶體
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as file:
+            for line in file:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class LatencyRecorder:
+    def __init__(self, window: int = 1024) -> None:
+        """記錄最近 `window` 筆延遲，並計算百分位數
+
+        Parameters
+        ----------
+        window : int, optional
+            保留最近幾筆紀錄
+        """
+        self.count = 0
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """記錄一筆延遲 (秒)"""
+        with self._lock:
+            self.count += 1
+            self._samples.append(seconds)
+
+    def summary(self) -> dict[str, float]:
+        """延遲摘要 (秒)：p50 / p95 / p99 / max"""
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+
+        if not samples:
+            return {"count": count}
+        if len(samples) == 1:
+            quantiles = samples * 99
+        else:
+            quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+        return {
+            "count": count,
+            "p50": quantiles[49],
+            "p95": quantiles[94],
+            "p99": quantiles[98],
+            "max": samples[-1],
+        }
@@ -0,0 +1,147 @@
+# standard library
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# fork server 預先 import 的模組 (fork server 是整個行程共用的，所有行程池的 `preload` 合併在一起)
+_forkserver_preload: set[str] = set()
+_forkserver_preload_lock = threading.Lock()
+
+
+class LazyProcessPool:
+    def __init__(
+        self, max_workers: int, *, max_pending: int | None = None, preload: Sequence[str] = ()
+    ) -> None:
+        """第一次使用時才建立的行程池 (CPU 密集的影像運算不會佔住 GIL)
+
+        pre-fork 的每個 worker 各自建立一個 (行程池不能跨 fork 共用)。
+        不直接 fork 已有多個執行緒 (翻譯、OCR stage) 的 app 行程：
+        fork 只複製呼叫的執行緒，其他執行緒持有的鎖在子行程中永遠不會釋放。
+        以 forkserver 啟動 (不支援時用 spawn)，`preload` 的模組只在 fork server 中 import 一次，
+        子行程從 fork server fork 出來 (`src/__init__.py` 不 import 任何依賴，
+        預先 import `src.image` 的模組不會連帶載入 app 與 torch)。
+        fork server 是整個行程共用的：所有行程池的 `preload` 合併在一起，
+        在 fork server 啟動 (任一行程池第一次 `submit`) 之後才建立的行程池，其 `preload` 不會生效
+        (子行程在第一次執行工作時才 import)。
+        子行程異常結束 (例如被 OOM killer 終止) 時，行程池會壞掉：
+        執行中的工作以 `BrokenProcessPool` 失敗，之後的 `submit` 改用新建的行程池
+
+        Parameters
+        ----------
+        max_workers : int
+            行程數
+        max_pending : int | None, optional
+            最多同時幾個工作 (含排隊中)，已滿時 `submit` 回傳 None (None 代表不限制)
+        preload : Sequence[str], optional
+            fork server 預先 import 的模組 (通常是 `submit` 的函式所在的模組)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must >= 1!")
+        if max_pending is not None and max_pending < 1:
+            raise ValueError("max_pending must >= 1!")
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.preload = list(preload)
+
+        _add_forkserver_preload(self.preload)
+
+        self._pending = threading.BoundedSemaphore(max_pending) if max_pending else None
+        self._executor_lock = threading.Lock()
+        self._executor_pid: int | None = None
+        self._executor: ProcessPoolExecutor | None = None
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T] | None:
+        """交給行程池執行
+
+        Returns
+        -------
+        Future[T] | None
+            執行結果，同時進行的工作已達 `max_pending` 時回傳 None (不等待)
+        """
+        if self._pending is not None and not self._pending.acquire(blocking=False):
+            return None
+
+        try:
+            future = self._submit(fn, *args, **kwargs)
+        except BaseException:
+            if self._pending is not None:
+                self._pending.release()
+            raise
+
+        if self._pending is not None:
+            future.add_done_callback(lambda _: self._pending.release())  # type: ignore[union-attr]
+        return future
+
+    def close(self) -> None:
+        """關閉行程池 (等待執行中的工作完成)"""
+        with self._executor_lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown()
+            self._executor = None
+            self._executor_pid = None
+
+    def _submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        """交給行程池執行 (行程池已壞掉時換成新的行程池)"""
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            executor = self._get_executor()
+            future = executor.submit(fn, *args, **kwargs)
+
+        def discard_if_broken(done: Future[T]) -> None:
+            # 子行程異常結束時，下一個工作就改用新的行程池 (不必等到 submit 失敗)
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                self._discard_executor(executor)
+
+        future.add_done_callback(discard_if_broken)
+        return future
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """丟棄已壞掉的行程池 (下次使用時重新建立)"""
+        with self._executor_lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._executor_pid = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """取得行程池 (第一次使用時建立；fork 後的子行程與行程池壞掉後會重新建立一個)"""
+        if self._executor_pid != os.getpid():
+            with self._executor_lock:
+                if self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        self.max_workers, mp_context=self._get_context()
+                    )
+                    self._executor_pid = os.getpid()
+        executor = self._executor
+        assert executor is not None
+        return executor
+
+    def _get_context(self) -> multiprocessing.context.BaseContext:
+        """取得啟動子行程的方式 (forkserver，不支援時用 spawn)"""
+        if "forkserver" not in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context("spawn")
+        return multiprocessing.get_context("forkserver")
+
+
+def _add_forkserver_preload(modules: Sequence[str]) -> None:
+    """將模組加入 fork server 預先 import 的模組 (在 fork server 啟動前呼叫才會生效)"""
+    if not modules or "forkserver" not in multiprocessing.get_all_start_methods():
+        return
+    with _forkserver_preload_lock:
+        if _forkserver_preload.issuperset(modules):
+            return
+        _forkserver_preload.update(modules)
+        multiprocessing.get_context("forkserver").set_forkserver_preload(
+            sorted(_forkserver_preload)
+        )
@@ -0,0 +1,280 @@
+# standard library
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future, wait
+from typing import Any, Generic, NamedTuple, TypeVar
+
+# local module
+from src.utils.deadline import (
+    AllDeadlines,
+    Deadline,
+    DeadlineExceededError,
+    current_deadline,
+    deadline_scope,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+# follower 等待時，每隔幾秒檢查一次自己是否已被取消
+_CANCEL_CHECK_INTERVAL = 0.05
+
+
+class LeaderCancelledError(RuntimeError):
+    """負責執行的請求被取消 (或中斷)，或放棄等待 (超過期限)
+
+    仍在期限內的 follower 收到此例外時，應重新加入 (自己成為 leader 或等待新的工作)
+    """
+
+
+class _Flight(NamedTuple):
+    # 工作的結果
+    future: Future[Any]
+    # 所有等待者 (leader 與 follower) 的期限，全部到期時工作才停止
+    deadline: AllDeadlines
+
+
+class SingleFlight(Generic[K, V]):
+    def __init__(self) -> None:
+        """合併同時進行的相同工作 (single-flight)
+
+        同一個 key 同時只有第一個請求 (leader) 實際執行，
+        之後抵達的請求 (follower) 等待 leader 的 `Future`，取得相同的結果或例外。
+        leader 完成後 key 即移除，不會快取結果。
+
+        工作在所有等待者期限的合併 (全部到期或取消時才到期) 下執行，
+        單一請求的期限很短或中斷連線，不會讓其他請求一起失敗；
+        follower 只等到自己的期限，leader 放棄時仍在期限內的 follower 會重新執行
+        """
+        self.leaders = 0
+        self.followers = 0
+        self.retries = 0
+
+        self._calls: dict[K, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key: K) -> tuple[Future[V], bool]:
+        """加入 key 的工作 (目前請求的期限一併加入工作的期限)
+
+        Parameters
+        ----------
+        key : K
+            工作內容的 key (例如內容雜湊)
+
+        Returns
+        -------
+        tuple[Future[V], bool]
+            (工作的結果, 是否為 leader)。leader 必須在 `deadline` 下執行並在完成後呼叫 `finish`；
+            follower 以 `wait` 等待結果
+        """
+        with self._lock:
+            flight = self._calls.get(key)
+            if flight is not None:
+                flight.deadline.add(current_deadline())
+                self.followers += 1
+                return flight.future, False
+
+            future: Future[V] = Future()
+            # 執行中的 Future 不能被取消 (follower 被取消不會影響其他人)
+            future.set_running_or_notify_cancel()
+            flight = _Flight(future, AllDeadlines())
+            flight.deadline.add(current_deadline())
+            self._calls[key] = flight
+            self.leaders += 1
+            return future, True
+
+    def deadline(self, key: K) -> Deadline | None:
+        """key 的工作的期限 (所有等待者的期限都到期時才到期；沒有進行中的工作時為 None)"""
+        with self._lock:
+            flight = self._calls.get(key)
+            return None if flight is None else flight.deadline
+
+    def wait(self, future: Future[V]) -> V:
+        """follower 等待工作的結果 (最多等到目前請求的期限)
+
+        Parameters
+        ----------
+        future : Future[V]
+            `begin` 回傳的 Future
+
+        Returns
+        -------
+        V
+            工作的結果
+
+        Raises
+        ------
+        DeadlineExceededError
+            目前請求已超過期限或被取消
+        LeaderCancelledError
+            leader 被中斷或放棄，但目前請求仍在期限內 (應重新 `begin`)
+        """
+        deadline = current_deadline()
+        while not wait([future], _wait_timeout(deadline)).done:
+            assert deadline is not None
+            deadline.check()
+        return self._result(future, deadline)
+
+    async def await_result(self, future: Future[V]) -> V:
+        """`wait` 的 coroutine 版本 (等待時讓出 event loop)
+
+        Raises
+        ------
+        DeadlineExceededError
+            目前請求已超過期限或被取消
+        LeaderCancelledError
+            leader 被中斷或放棄，但目前請求仍在期限內 (應重新 `begin`)
+        """
+        deadline = current_deadline()
+        waiter = asyncio.wrap_future(future)
+        try:
+            while not (await asyncio.wait([waiter], timeout=_wait_timeout(deadline)))[0]:
+                assert deadline is not None
+                deadline.check()
+        finally:
+            # 放棄等待時取消 waiter (執行中的工作不會因此被取消)；
+            # 已完成時取走例外，避免 asyncio 回報沒人取的例外 (結果一律從 future 取得)
+            if not waiter.cancel():
+                waiter.exception()
+        return self._result(future, deadline)
+
+    def finish(
+        self,
+        key: K,
+        future: Future[V],
+        *,
+        result: V | None = None,
+        exception: BaseException | None = None,
+    ) -> None:
+        """leader 完成工作，將結果 (或例外) 交給所有 follower
+
+        Parameters
+        ----------
+        key : K
+            工作內容的 key
+        future : Future[V]
+            `begin` 回傳的 Future
+        result : V | None, optional
+            工作的結果
+        exception : BaseException | None, optional
+            工作拋出的例外 (取消、中斷等非 `Exception` 的例外會轉成 `LeaderCancelledError`)
+        """
+        with self._lock:
+            flight = self._calls.get(key)
+            if flight is not None and flight.future is future:
+                del self._calls[key]
+
+        if exception is None:
+            future.set_result(result)  # type: ignore[arg-type]
+        elif isinstance(exception, Exception):
+            future.set_exception(exception)
+        else:
+            future.set_exception(LeaderCancelledError(f"leader was interrupted: {exception!r}"))
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        """執行工作 (相同 key 的工作進行中時，等待其結果)
+
+        Parameters
+        ----------
+        key : K
+            工作內容的 key
+        fn : Callable[[], V]
+            工作 (在所有等待者期限的合併下執行)
+
+        Returns
+        -------
+        V
+            工作的結果
+
+        Raises
+        ------
+        DeadlineExceededError
+            目前請求已超過期限或被取消
+        """
+        while True:
+            future, leader = self.begin(key)
+            if leader:
+                break
+            try:
+                return self.wait(future)
+            except LeaderCancelledError:
+                continue
+
+        try:
+            with deadline_scope(self.deadline(key)):
+                result = fn()
+        except BaseException as exc:
+            self.finish(key, future, exception=exc)
+            raise
+        self.finish(key, future, result=result)
+        return result
+
+    async def ado(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        """`do` 的 coroutine 版本 (在 event loop 上執行工作，等待其他請求的工作時讓出 event loop)
+
+        Parameters
+        ----------
+        key : K
+            工作內容的 key
+        fn : Callable[[], Awaitable[V]]
+            工作 (在所有等待者期限的合併下執行)
+
+        Returns
+        -------
+        V
+            工作的結果
+
+        Raises
+        ------
+        DeadlineExceededError
+            目前請求已超過期限或被取消
+        """
+        while True:
+            future, leader = self.begin(key)
+            if leader:
+                break
+            try:
+                return await self.await_result(future)
+            except LeaderCancelledError:
+                continue
+
+        try:
+            with deadline_scope(self.deadline(key)):
+                result = await fn()
+        except BaseException as exc:
+            # 含 coroutine 被取消 (`asyncio.CancelledError`)，等待中的請求會重新執行
+            self.finish(key, future, exception=exc)
+            raise
+        self.finish(key, future, result=result)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        """leader / follower 次數、leader 放棄後 follower 重新執行的次數，與目前進行中的工作數"""
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "followers": self.followers,
+                "retries": self.retries,
+                "in_flight": len(self._calls),
+            }
+
+    def _result(self, future: Future[V], deadline: Deadline | None) -> V:
+        """已完成的工作的結果 (leader 放棄時，仍在期限內的 follower 應重新 `begin`)"""
+        error = future.exception()
+        if isinstance(error, DeadlineExceededError | LeaderCancelledError):
+            if deadline is not None:
+                deadline.check()
+            with self._lock:
+                self.retries += 1
+            raise LeaderCancelledError("leader gave up, retry") from error
+        return future.result()
+
+
+def _wait_timeout(deadline: Deadline | None) -> float | None:
+    """follower 每次等待的秒數 (不超過剩餘時間，並定期醒來檢查是否被取消)"""
+    if deadline is None:
+        return None
+    remaining = deadline.remaining()
+    return _CANCEL_CHECK_INTERVAL if remaining is None else min(remaining, _CANCEL_CHECK_INTERVAL)
@@ -0,0 +1,167 @@
+# standard library
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+# local module
+from src.utils.metrics import LatencyRecorder
+
+T = TypeVar("T")
+
+
+class StageExecutor:
+    def __init__(self, name: str, *, max_workers: int, max_queue_size: int) -> None:
+        """管線中的一個階段：固定數量的 worker 執行緒 + 有上限的佇列
+
+        佇列已滿時 `submit` 會等待 (backpressure)，上游不會無限制地堆積工作；
+        並記錄佇列深度、排隊時間與執行時間，方便各階段分別調整大小。
+        工作在提交時的 context 中執行 (context 變數，例如請求的期限，會帶到 worker)
+
+        Parameters
+        ----------
+        name : str
+            階段名稱 (用於執行緒名稱)
+        max_workers : int
+            worker 執行緒數 (同時執行的工作數)
+        max_queue_size : int
+            最多幾個工作排隊等待 worker (0 代表不排隊，worker 都在忙時直接等待)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must >= 1!")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size must >= 0!")
+
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.wait_latency = LatencyRecorder()
+        self.run_latency = LatencyRecorder()
+
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue_size)
+        self._lock = threading.Lock()
+        self._executor_pid: int | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """排隊等待 worker 的工作數"""
+        with self._lock:
+            return self.submitted - self.completed - self.failed - self.running
+
+    def submit(
+        self, fn: Callable[..., T], /, *args: Any, timeout: float | None = None, **kwargs: Any
+    ) -> Future[T]:
+        """交給此階段執行 (佇列已滿時等待)
+
+        Parameters
+        ----------
+        fn : Callable[..., T]
+            工作
+        timeout : float | None, optional
+            佇列已滿時最多等幾秒 (None 代表一直等)
+
+        Returns
+        -------
+        Future[T]
+            執行結果
+
+        Raises
+        ------
+        queue.Full
+            等待 `timeout` 秒後佇列仍然是滿的
+        """
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self.rejected += 1
+            raise queue.Full(f"stage {self.name} is full")
+
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+            in_flight = self.submitted - self.completed - self.failed
+            self.max_queue_depth = max(self.max_queue_depth, in_flight - self.max_workers)
+
+        try:
+            context = contextvars.copy_context()
+            return self._get_executor().submit(
+                context.run, self._run, submitted_at, fn, *args, **kwargs
+            )
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            self._slots.release()
+            raise
+
+    def run(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """交給此階段執行並等待結果"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self) -> dict[str, Any]:
+        """工作數、目前的佇列深度與排隊 / 執行時間"""
+        with self._lock:
+            in_flight = self.submitted - self.completed - self.failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "running": self.running,
+                "queue_depth": in_flight - self.running,
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "wait_latency": self.wait_latency.summary(),
+                "run_latency": self.run_latency.summary(),
+            }
+
+    def close(self) -> None:
+        """停止 worker (已排隊的工作會先完成)"""
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown()
+        self._executor = None
+        self._executor_pid = None
+
+    def _run(self, submitted_at: float, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        started_at = time.perf_counter()
+        self.wait_latency.record(started_at - submitted_at)
+        with self._lock:
+            self.running += 1
+
+        succeeded = False
+        try:
+            result = fn(*args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            self.run_latency.record(time.perf_counter() - started_at)
+            with self._lock:
+                self.running -= 1
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            self._slots.release()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """取得執行緒池 (fork 只會複製呼叫 fork 的執行緒，子行程需要自己的 worker)"""
+        if self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix=self.name
+                    )
+                    self._executor_pid = os.getpid()
+        assert self._executor is not None
+        return self._executor
@@ -1,11 +1,18 @@
 # standard library
+import io
 import logging
+from collections.abc import Callable, Iterator
 
 # 3rd party library
+import numpy as np
 import pytest
+from PIL import Image, ImageDraw, ImageFilter
 from pytest_mock import MockerFixture, MockType
 from werkzeug.datastructures import FileStorage
 
+# local module
+from src.utils.event_loop import EventLoopThread
+
 
 @pytest.fixture(scope="function")
 def mock_logger(mocker: MockerFixture) -> MockType:
@@ -15,6 +22,16 @@ def mock_logger(mocker: MockerFixture) -> MockType:
     return mocker.MagicMock(spec=logging.Logger)
 
 
+@pytest.fixture(scope="function")
+def event_loop_thread() -> Iterator[EventLoopThread]:
+    """
+    提供 `EventLoopThread` 物件 (測試結束時停止)
+    """
+    event_loop_thread = EventLoopThread("test-event-loop")
+    yield event_loop_thread
+    event_loop_thread.close()
+
+
 @pytest.fixture(scope="function")
 def mock_file(mocker: MockerFixture) -> MockType:
     """
@@ -23,3 +40,66 @@ def mock_file(mocker: MockerFixture) -> MockType:
     mock_file = mocker.MagicMock(spec=FileStorage)
     mock_file.filename = "test.jpg"
     return mock_file
+
+
+@pytest.fixture(scope="session")
+def make_card_photo() -> Callable[..., bytes]:
+    """
+    提供產生假卡片照片 (JPEG bytes) 的函式
+
+    同一個 seed 產生同一張圖，可另外指定縮放後的尺寸與 JPEG 品質 (模擬重新壓縮、縮放過的複本)
+    """
+
+    def make(seed: int, *, size: tuple[int, int] = (590, 860), quality: int = 90) -> bytes:
+        rng = np.random.default_rng(seed)
+        image = Image.new("RGB", (590, 860), (200, 150, 80))
+        draw = ImageDraw.Draw(image)
+        for _ in range(30):
+            x, y = rng.integers(0, 590), rng.integers(0, 860)
+            r = int(rng.integers(20, 120))
+            fill = tuple(int(c) for c in rng.integers(0, 255, 3))
+            draw.ellipse((x - r, y - r, x + r, y + r), fill=fill)
+        image = image.filter(ImageFilter.GaussianBlur(2)).resize(size)
+
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=quality)
+        return buffer.getvalue()
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def make_card_scene(make_card_photo: Callable[..., bytes]) -> Callable[..., bytes]:
+    """
+    提供產生「桌上斜拍的卡片」照片 (JPEG bytes) 的函式
+
+    將 `make_card_photo` 的卡片透視變換到照片中的 `quad` (左上、右上、右下、左下)
+    """
+    # local module
+    from src.image.card_geometry import perspective_transform
+
+    def make(
+        seed: int,
+        quad: list[tuple[float, float]],
+        *,
+        size: tuple[int, int] = (1600, 1200),
+        background: tuple[int, int, int] = (60, 70, 60),
+    ) -> bytes:
+        card = Image.open(io.BytesIO(make_card_photo(seed))).convert("RGBA")
+        card_corners = [(0, 0), (card.width, 0), (card.width, card.height), (0, card.height)]
+        homography = perspective_transform(np.array(quad), np.array(card_corners))
+        homography /= homography[2, 2]
+        warped = card.transform(
+            size, Image.Transform.PERSPECTIVE, tuple(homography.ravel()[:8]), Image.BILINEAR
+        )
+
+        rng = np.random.default_rng(seed)
+        noise = rng.normal(0, 8, (size[1], size[0], 3)) + np.array(background)
+        image = Image.fromarray(noise.clip(0, 255).astype(np.uint8))
+        image.paste(warped, (0, 0), warped)
+
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=90)
+        return buffer.getvalue()
+
+    return make
@@ -1,5 +1,10 @@
 # standard library
 import io
+import json
+import queue
+import tempfile
+import threading
+from unittest.mock import ANY
 
 import pytest
 
@@ -8,12 +13,14 @@ from flask import Flask
 from flask.testing import FlaskClient
 from pytest_mock import MockerFixture, MockType
 
-from src import create_app
+from src.app import create_app
 from src.card.text_extractor import AbstractTextExtractor
-from src.card.translation_pipeline import TranslationPipeline
+from src.card.translation_pipeline import BatchTranslation, PipelineEvent, TranslationPipeline
 from src.card.translator import AbstractTranslator
 from src.image.card_image import CardImage
-from src.image.user_image import UserImage
+from src.image.upload_normalizer import NormalizedUpload, UploadNormalizer
+from src.utils.admission import AdmissionController, AdmissionRejectedError
+from src.utils.deadline import Deadline, DeadlineExceededError
 
 
 @pytest.fixture(scope="function")
@@ -22,22 +29,10 @@ def mock_card_image(mocker: MockerFixture) -> MockType:
     模擬 `UserImage` 物件
     """
     mock_card_image = mocker.MagicMock(spec=CardImage)
-    mocker.patch("src.CardImage", return_value=mock_card_image)
+    mocker.patch("src.app.CardImage", return_value=mock_card_image)
     return mock_card_image
 
 
-@pytest.fixture(scope="function")
-def mock_user_image(mocker: MockerFixture) -> MockType:
-    """
-    模擬 `UserImage` 物件
-    """
-    mock_user_image = mocker.MagicMock(spec=UserImage)
-    mock_user_image.save = mocker.Mock()
-    mock_user_image.create_url = mocker.Mock(return_value="Mocked URL")
-    mocker.patch("src.UserImage", return_value=mock_user_image)
-    return mock_user_image
-
-
 @pytest.fixture(scope="function")
 def mock_pipeline(mocker: MockerFixture) -> MockType:
     """
@@ -46,21 +41,31 @@ def mock_pipeline(mocker: MockerFixture) -> MockType:
     mock_pipeline = mocker.MagicMock(spec=TranslationPipeline)
     mock_pipeline.process = mocker.Mock(return_value="Mocked Translation")
     mock_pipeline.add_postprocess_hook = mocker.Mock()
-    mocker.patch("src.TranslationPipeline", return_value=mock_pipeline)
+    mocker.patch("src.app.TranslationPipeline", return_value=mock_pipeline)
     return mock_pipeline
 
 
 @pytest.fixture(scope="function")
-def app(mocker: MockerFixture, mock_user_image: MockType, mock_pipeline: MockType):
+def app(mocker: MockerFixture, mock_pipeline: MockType):
     """
     提供 app 物件
     """
     mock_text_extractor = mocker.MagicMock(spec=AbstractTextExtractor)
-    mocker.patch("src.OcrTextExtractor", return_value=mock_text_extractor)
+    mocker.patch("src.app.OcrTextExtractor", return_value=mock_text_extractor)
     mock_translator = mocker.MagicMock(spec=AbstractTranslator)
-    mocker.patch("src.YugiohTranslator", return_value=mock_translator)
-    app = create_app()
+    mock_translator.fingerprint = "mock"
+    mock_translator.stats.return_value = {"load_seconds": 1.0}
+    mocker.patch("src.app.YugiohTranslator", return_value=mock_translator)
+    app = create_app(
+        {
+            "TRANSLATION_CACHE_DB": None,
+            "CARD_TRANSLATION_STORE_DB": None,
+            "CARD_RECTIFY_WORKERS": 0,
+            "UPLOAD_NORMALIZE_WORKERS": 0,
+        }
+    )
     app.config.update({"TESTING": True})
+    app.config["MODEL_LOADER"].wait()
     yield app
 
 
@@ -73,9 +78,7 @@ def client(app: Flask):
         yield client
 
 
-def test_translate_api(
-    client: FlaskClient, mock_user_image: MockType, mock_pipeline: MockType
-) -> None:
+def test_translate_api(client: FlaskClient, mock_pipeline: MockType) -> None:
     """
     SUT
     ---
@@ -94,14 +97,347 @@ def test_translate_api(
     response = client.post("/api/translate", data=data)
 
     # Then
-    mock_user_image.save.assert_called_once()
-    mock_user_image.create_url.assert_called_once()
-    mock_pipeline.process.assert_called_once_with("Mocked URL")
+    mock_pipeline.process.assert_called_once_with(b"fake image data", deadline=ANY)
     assert response.status_code == 200
     assert response.get_json()["success"] is True
     assert response.get_json()["frontCardData"]["description"] == "Mocked Translation"
 
 
+def test_translate_api_normalized_upload(
+    mocker: MockerFixture, app: Flask, client: FlaskClient, mock_pipeline: MockType
+) -> None:
+    """
+    SUT
+    ---
+    Translation API / Streaming Translation API
+
+    Description
+    -----------
+    + Given：啟用上傳圖片正規化
+    + When：呼叫 `/api/translate` 與 `/api/translate/stream` endpoint
+    + Then：應以正規化後的圖片翻譯，並以 header 回報節省的 bytes
+    """
+    # Given
+    mock_normalizer = mocker.Mock(spec=UploadNormalizer)
+    mock_normalizer.normalize = mocker.Mock(return_value=NormalizedUpload(b"small", 15))
+    app.config["UPLOAD_NORMALIZER"] = mock_normalizer
+    mock_pipeline.process_stream = mocker.Mock(return_value=iter([PipelineEvent("done", "OK")]))
+
+    # When
+    response = client.post(
+        "/api/translate", data={"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+    )
+    stream_response = client.post(
+        "/api/translate/stream", data={"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+    )
+
+    stream_response.get_data()
+
+    # Then
+    mock_normalizer.normalize.assert_called_with(b"fake image data")
+    mock_pipeline.process.assert_called_once_with(b"small", deadline=ANY)
+    mock_pipeline.process_stream.assert_called_once_with(b"small", deadline=ANY)
+    assert response.headers["X-Upload-Bytes-Saved"] == "10"
+    assert stream_response.headers["X-Upload-Bytes-Saved"] == "10"
+
+
+def test_healthz_and_readyz(client: FlaskClient) -> None:
+    """
+    SUT
+    ---
+    Health Check API
+
+    Description
+    -----------
+    + Given：模型已載入
+    + When：呼叫 `/healthz` 與 `/readyz` endpoint
+    + Then：都應該回傳 200
+    """
+    # When
+    healthz = client.get("/healthz")
+    readyz = client.get("/readyz")
+
+    # Then
+    assert healthz.status_code == 200
+    assert readyz.status_code == 200
+    assert readyz.get_json()["status"] == "ready"
+
+
+def test_metrics(client: FlaskClient, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Metrics API
+
+    Description
+    -----------
+    + Given：模型已載入
+    + When：呼叫 `/metrics` endpoint
+    + Then：應回傳翻譯模型、翻譯管線各階段與快取的統計 (未啟用的元件不列出)
+    """
+    # Given
+    mock_pipeline.stats.return_value = {"ocr": {"queue_depth": 0}}
+
+    # When
+    response = client.get("/metrics")
+
+    # Then
+    assert response.status_code == 200
+    metrics = response.get_json()
+    assert metrics["translator"] == {"load_seconds": 1.0}
+    assert metrics["pipeline"] == {"ocr": {"queue_depth": 0}}
+    assert "ocrCache" in metrics
+    assert "uploadNormalizer" not in metrics
+
+
+@pytest.mark.parametrize("deterministic", [True, False])
+def test_translation_store_deterministic_only(
+    mocker: MockerFixture, mock_pipeline: MockType, deterministic: bool
+) -> None:
+    """
+    SUT
+    ---
+    `create_app`
+
+    Description
+    -----------
+    + Given：decoding 為確定性 (或非確定性) 的翻譯模型
+    + When：建立 app
+    + Then：只有確定性時才建立以卡片密碼保存完整翻譯的 translation_store
+    """
+    # Given
+    pipeline_class = mocker.patch("src.app.TranslationPipeline", return_value=mock_pipeline)
+    mocker.patch("src.app.OcrTextExtractor")
+    mock_translator = mocker.MagicMock(spec=AbstractTranslator)
+    mock_translator.fingerprint = "mock"
+    mock_translator.deterministic = deterministic
+    mocker.patch("src.app.YugiohTranslator", return_value=mock_translator)
+
+    # When
+    app = create_app(
+        {
+            "TRANSLATION_CACHE_DB": None,
+            "CARD_TRANSLATION_STORE_DB": None,
+            "CARD_RECTIFY_WORKERS": 0,
+            "UPLOAD_NORMALIZE_WORKERS": 0,
+        }
+    )
+    app.config["MODEL_LOADER"].wait()
+
+    # Then
+    translation_store = pipeline_class.call_args.kwargs["translation_store"]
+    assert (translation_store is not None) == deterministic
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_translate_api_before_model_ready(
+    mocker: MockerFixture, mock_pipeline: MockType, fail: bool
+) -> None:
+    """
+    SUT
+    ---
+    Translation API / Health Check API
+
+    Description
+    -----------
+    + Given：模型仍在背景載入 (或載入失敗)
+    + When：呼叫 `/api/translate`、`/readyz`、`/healthz` endpoint
+    + Then：翻譯與就緒檢查應立即回傳 503 與 Retry-After，存活檢查仍回傳 200
+    """
+    # Given
+    release = threading.Event()
+
+    def slow_create_translation_pipeline(*args, **kwargs):
+        release.wait()
+        raise RuntimeError("load failed")
+
+    mocker.patch(
+        "src.app._create_translation_pipeline", side_effect=slow_create_translation_pipeline
+    )
+    app = create_app({"TRANSLATION_CACHE_DB": None, "MODEL_RETRY_AFTER": 7})
+    if fail:
+        release.set()
+        app.config["MODEL_LOADER"].wait()
+    data = {"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+
+    # When
+    with app.test_client() as client:
+        translate = client.post("/api/translate", data=data)
+        readyz = client.get("/readyz")
+        healthz = client.get("/healthz")
+    release.set()
+
+    # Then
+    status = "failed" if fail else "loading"
+    assert translate.status_code == 503
+    assert translate.headers["Retry-After"] == "7"
+    assert translate.get_json()["status"] == status
+    assert readyz.status_code == 503
+    assert readyz.get_json()["status"] == status
+    assert healthz.status_code == 200
+    mock_pipeline.process.assert_not_called()
+
+
+def test_translate_api_large_image_in_memory(
+    mocker: MockerFixture, client: FlaskClient, mock_pipeline: MockType
+) -> None:
+    """
+    SUT
+    ---
+    Translation API
+
+    Description
+    -----------
+    + Given：提供超過 werkzeug 暫存檔門檻 (500 KB) 的圖片
+    + When：呼叫 `/api/translate` endpoint
+    + Then：圖片應留在記憶體 (不建立暫存檔)，並完整交給翻譯管線
+    """
+    # Given
+    image_bytes = b"x" * 2**20
+    data = {"image": (io.BytesIO(image_bytes), "test.jpg")}
+    spy_temporary_file = mocker.patch(
+        "werkzeug.formparser.SpooledTemporaryFile", wraps=tempfile.SpooledTemporaryFile
+    )
+
+    # When
+    response = client.post("/api/translate", data=data)
+
+    # Then
+    assert response.status_code == 200
+    mock_pipeline.process.assert_called_once_with(image_bytes, deadline=ANY)
+    spy_temporary_file.assert_not_called()
+
+
+def test_translate_api_image_too_large(app: Flask, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation API
+
+    Description
+    -----------
+    + Given：提供超過 `MAX_CONTENT_LENGTH` 的圖片
+    + When：呼叫 `/api/translate` endpoint
+    + Then：應該回傳 413
+    """
+    # Given
+    app.config["MAX_CONTENT_LENGTH"] = 1024
+    data = {"image": (io.BytesIO(b"x" * 4096), "test.jpg")}
+
+    # When
+    with app.test_client() as client:
+        response = client.post("/api/translate", data=data)
+
+    # Then
+    assert response.status_code == 413
+    mock_pipeline.process.assert_not_called()
+
+
+def test_translate_api_rate_limited(app: Flask, client: FlaskClient) -> None:
+    """
+    SUT
+    ---
+    Translation API
+
+    Description
+    -----------
+    + Given：每個 client 最多連續 1 個請求
+    + When：同一個 client 連續呼叫 2 次 `/api/translate` endpoint
+    + Then：第 2 次應該回傳 429 與 Retry-After
+    """
+    # Given
+    app.config["ADMISSION_CONTROLLER"] = AdmissionController(
+        max_in_flight=1, max_queue_size=0, rate=0.5, burst=1
+    )
+
+    # When
+    responses = [
+        client.post("/api/translate", data={"image": (io.BytesIO(b"fake"), "test.jpg")})
+        for _ in range(2)
+    ]
+
+    # Then
+    assert responses[0].status_code == 200
+    assert responses[1].status_code == 429
+    assert responses[1].headers["Retry-After"] == "2"
+    assert responses[1].get_json() == {"success": False, "errMessage": "rate limit exceeded"}
+
+
+def test_translate_api_rate_limited_behind_proxy(app: Flask) -> None:
+    """
+    SUT
+    ---
+    Translation API
+
+    Description
+    -----------
+    + Given：預設設定的 app，與信任 1 層代理、每個 client 最多連續 1 個請求的 app
+    + When：經由代理呼叫 `/api/translate` endpoint
+    + Then：預設不限速；信任代理時以 X-Forwarded-For 的 client IP 各自限速
+    """
+    # Given
+    proxied_app = create_app(
+        {
+            "TRANSLATION_CACHE_DB": None,
+            "CARD_TRANSLATION_STORE_DB": None,
+            "CARD_RECTIFY_WORKERS": 0,
+            "UPLOAD_NORMALIZE_WORKERS": 0,
+            "ADMISSION_RATE": 0.5,
+            "ADMISSION_BURST": 1,
+            "PROXY_FIX_X_FOR": 1,
+        }
+    )
+    proxied_app.config["MODEL_LOADER"].wait()
+
+    def post(client: FlaskClient, client_ip: str) -> int:
+        data = {"image": (io.BytesIO(b"fake"), "test.jpg")}
+        headers = {"X-Forwarded-For": client_ip}
+        with client.post("/api/translate", data=data, headers=headers) as response:
+            return response.status_code
+
+    # When
+    with app.test_client() as client:
+        default_statuses = [post(client, "1.1.1.1") for _ in range(20)]
+    with proxied_app.test_client() as client:
+        proxied_statuses = [post(client, ip) for ip in ("1.1.1.1", "2.2.2.2", "1.1.1.1")]
+
+    # Then
+    assert app.config["ADMISSION_CONTROLLER"].rate is None
+    assert default_statuses == [200] * 20
+    assert proxied_statuses == [200, 200, 429]
+
+
+def test_translate_stream_api_holds_admission(
+    app: Flask, client: FlaskClient, mock_pipeline: MockType
+) -> None:
+    """
+    SUT
+    ---
+    Translation Stream API
+
+    Description
+    -----------
+    + Given：同時最多執行 1 個請求、不允許排隊
+    + When：串流翻譯尚未結束時再有請求
+    + Then：應該以 503 拒絕；串流結束後歸還名額
+    """
+    # Given
+    admission = AdmissionController(max_in_flight=1, max_queue_size=0)
+    app.config["ADMISSION_CONTROLLER"] = admission
+    mock_pipeline.process_stream.return_value = iter([PipelineEvent("done", "譯文")])
+
+    # When
+    stream = client.post("/api/translate/stream", data={"image": (io.BytesIO(b"fake"), "test.jpg")})
+    with pytest.raises(AdmissionRejectedError) as exc_info:
+        admission.admit("another client", timeout=1)
+    stream.get_data()
+    stream.close()
+
+    # Then
+    assert exc_info.value.status == 503
+    assert admission.stats()["in_flight"] == 0
+
+
 def test_translate_api_no_image(client: FlaskClient) -> None:
     """
     SUT
@@ -121,6 +457,411 @@ def test_translate_api_no_image(client: FlaskClient) -> None:
     assert response.get_json() == {"success": False, "errMessage": "No image file provided"}
 
 
+def test_translate_stream_api(client: FlaskClient, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation Stream API
+
+    Description
+    -----------
+    + Given：提供有效的圖片
+    + When：呼叫 `/api/translate/stream` endpoint
+    + Then：應該以 Server-Sent Events 依序推送各階段事件
+    """
+    # Given
+    data = {"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+    mock_pipeline.process_stream.return_value = iter(
+        [
+            PipelineEvent("stage", "ocr_done"),
+            PipelineEvent("extracted", "原文"),
+            PipelineEvent("token", "譯"),
+            PipelineEvent("done", "譯文"),
+        ]
+    )
+
+    # When
+    response = client.post("/api/translate/stream", data=data)
+
+    # Then
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.get_data(as_text=True) == (
+        'event: stage\ndata: "uploaded"\n\n'
+        'event: stage\ndata: "ocr_done"\n\n'
+        'event: extracted\ndata: "原文"\n\n'
+        'event: token\ndata: "譯"\n\n'
+        'event: done\ndata: "譯文"\n\n'
+    )
+    mock_pipeline.process_stream.assert_called_once_with(b"fake image data", deadline=ANY)
+
+
+def test_translate_stream_api_error(client: FlaskClient, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation Stream API
+
+    Description
+    -----------
+    + Given：翻譯過程中發生錯誤
+    + When：呼叫 `/api/translate/stream` endpoint
+    + Then：應該推送 error 事件
+    """
+    # Given
+    data = {"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+    mock_pipeline.process_stream.side_effect = RuntimeError("boom")
+
+    # When
+    response = client.post("/api/translate/stream", data=data)
+
+    # Then
+    assert response.get_data(as_text=True).endswith('event: error\ndata: "Translation failed"\n\n')
+
+
+def test_translate_api_deadline_exceeded(client: FlaskClient, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation API
+
+    Description
+    -----------
+    + Given：client 以 `X-Request-Timeout` 縮短期限，翻譯超過期限
+    + When：呼叫 `/api/translate` endpoint
+    + Then：翻譯管線應收到縮短後的期限，並回傳 504
+    """
+    # Given
+    mock_pipeline.process.side_effect = DeadlineExceededError("deadline exceeded")
+
+    # When
+    response = client.post(
+        "/api/translate",
+        data={"image": (io.BytesIO(b"fake image data"), "test.jpg")},
+        headers={"X-Request-Timeout": "5"},
+    )
+
+    # Then
+    assert response.status_code == 504
+    assert response.get_json() == {"success": False, "errMessage": "Translation timed out"}
+    deadline = mock_pipeline.process.call_args.kwargs["deadline"]
+    assert 0 < deadline.remaining() <= 5
+
+
+def test_translate_stream_api_deadline_exceeded(
+    client: FlaskClient, mock_pipeline: MockType
+) -> None:
+    """
+    SUT
+    ---
+    Translation Stream API
+
+    Description
+    -----------
+    + Given：串流翻譯超過期限
+    + When：呼叫 `/api/translate/stream` endpoint
+    + Then：應該推送 timed out 的 error 事件，串流結束後期限應被取消
+    """
+    # Given
+    data = {"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+    mock_pipeline.process_stream.side_effect = DeadlineExceededError("deadline exceeded")
+
+    # When
+    response = client.post("/api/translate/stream", data=data)
+    body = response.get_data(as_text=True)
+
+    # Then
+    assert body.endswith('event: error\ndata: "Translation timed out"\n\n')
+    assert mock_pipeline.process_stream.call_args.kwargs["deadline"].expired
+
+
+def test_translate_batch_api(client: FlaskClient, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation Batch API
+
+    Description
+    -----------
+    + Given：提供多張圖片，其中一張翻譯失敗
+    + When：呼叫 `/api/translate/batch` endpoint
+    + Then：應該以 NDJSON 依完成順序每張圖片回傳一行結果
+    """
+    # Given
+    data = {
+        "images": [
+            (io.BytesIO(b"card a"), "a.jpg"),
+            (io.BytesIO(b"card b"), "b.jpg"),
+        ]
+    }
+    mock_pipeline.process_batch.return_value = iter(
+        [
+            BatchTranslation(1, "譯文 b", None),
+            BatchTranslation(0, None, RuntimeError("OCR failed")),
+        ]
+    )
+
+    # When
+    response = client.post("/api/translate/batch", data=data)
+
+    # Then
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines == [
+        {
+            "index": 1,
+            "filename": "b.jpg",
+            "success": True,
+            "frontCardData": {"description": "譯文 b"},
+        },
+        {"index": 0, "filename": "a.jpg", "success": False, "errMessage": "Translation failed"},
+    ]
+    assert mock_pipeline.process_batch.call_args.args[0] == [b"card a", b"card b"]
+
+
+def test_translate_batch_api_invalid(app: Flask, client: FlaskClient) -> None:
+    """
+    SUT
+    ---
+    Translation Batch API
+
+    Description
+    -----------
+    + Given：沒有圖片，或圖片數超過上限
+    + When：呼叫 `/api/translate/batch` endpoint
+    + Then：應該回傳 400
+    """
+    # Given
+    app.config["TRANSLATE_BATCH_MAX_IMAGES"] = 1
+    data = {"images": [(io.BytesIO(b"a"), "a.jpg"), (io.BytesIO(b"b"), "b.jpg")]}
+
+    # When
+    no_image = client.post("/api/translate/batch", data={})
+    too_many = client.post("/api/translate/batch", data=data)
+
+    # Then
+    assert no_image.status_code == 400
+    assert too_many.status_code == 400
+    assert too_many.get_json()["errMessage"] == "Too many images"
+
+
+def test_translate_batch_api_content_length(app: Flask, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation Batch API
+
+    Description
+    -----------
+    + Given：超過 `MAX_CONTENT_LENGTH` (16 MB)、未超過 `TRANSLATE_BATCH_MAX_CONTENT_LENGTH` 的上傳
+    + When：分別呼叫 `/api/translate/batch` 與 `/api/translate` endpoint，
+            再把批次上限調到 16 MB 後呼叫 `/api/translate/batch`
+    + Then：批次翻譯應接受 (解析表單前已換成批次的上限)，單張翻譯與調低上限後應回傳 413
+    """
+    # Given
+    image = b"x" * (10 * 2**20)
+    mock_pipeline.process_batch.return_value = iter([])
+
+    def post(client: FlaskClient, url: str, field: str) -> int:
+        data = {field: [(io.BytesIO(image), "a.jpg"), (io.BytesIO(image), "b.jpg")]}
+        return client.post(url, data=data).status_code
+
+    # When
+    with app.test_client() as client:
+        batch = post(client, "/api/translate/batch", "images")
+        single = post(client, "/api/translate", "image")
+        app.config["TRANSLATE_BATCH_MAX_CONTENT_LENGTH"] = app.config["MAX_CONTENT_LENGTH"]
+        batch_lowered = post(client, "/api/translate/batch", "images")
+
+    # Then
+    assert app.config["MAX_CONTENT_LENGTH"] == 16 * 2**20
+    assert batch == 200
+    assert mock_pipeline.process_batch.call_args.args[0] == [image, image]
+    assert single == 413
+    mock_pipeline.process.assert_not_called()
+    assert batch_lowered == 413
+    mock_pipeline.process_batch.assert_called_once()
+
+
+def test_translation_job_api(client: FlaskClient, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation Job API
+
+    Description
+    -----------
+    + Given：提供有效的圖片
+    + When：建立非同步翻譯工作，再觀看並查詢該工作
+    + Then：應立即回傳 202 與工作 ID，之後可取得工作狀態事件與翻譯結果；
+            工作應以有期限的同步翻譯流程執行
+    """
+    # Given
+    data = {"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+    mock_pipeline.process.return_value = "譯文"
+
+    # When
+    created = client.post("/api/translate/jobs", data=data)
+    job_id = created.get_json()["jobId"]
+    events = client.get(f"/api/translate/jobs/{job_id}/events").get_data(as_text=True)
+    job = client.get(f"/api/translate/jobs/{job_id}")
+
+    # Then
+    assert created.status_code == 202
+    assert created.headers["Location"] == f"/api/translate/jobs/{job_id}"
+    assert events == (
+        'event: stage\ndata: "queued"\n\n'
+        'event: stage\ndata: "running"\n\n'
+        'event: done\ndata: "譯文"\n\n'
+    )
+    assert job.status_code == 200
+    assert job.get_json() == {
+        "success": True,
+        "jobId": job_id,
+        "status": "succeeded",
+        "frontCardData": {"description": "譯文"},
+    }
+    mock_pipeline.process.assert_called_once_with(b"fake image data", deadline=ANY)
+    assert isinstance(mock_pipeline.process.call_args.kwargs["deadline"], Deadline)
+    mock_pipeline.process_stream.assert_not_called()
+
+
+def test_translation_job_api_ocr_async(mocker: MockerFixture, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation Job API
+
+    Description
+    -----------
+    + Given：啟用非同步 OCR (`OCR_ASYNC`)
+    + When：建立非同步翻譯工作，再觀看該工作
+    + Then：OCR 應以共用 event loop 的 `AsyncOcrTextExtractor` 執行，
+            工作應以有期限的 `aprocess` 在 event loop 上執行，不經過同步翻譯流程
+    """
+    # Given
+    mock_async_ocr = mocker.patch("src.app.AsyncOcrTextExtractor")
+    mocker.patch("src.app.YugiohTranslator").return_value.fingerprint = "mock"
+    mock_pipeline.aprocess = mocker.AsyncMock(return_value="譯文")
+    app = create_app(
+        {
+            "OCR_ASYNC": True,
+            "TRANSLATION_CACHE_DB": None,
+            "CARD_TRANSLATION_STORE_DB": None,
+            "CARD_RECTIFY_WORKERS": 0,
+            "UPLOAD_NORMALIZE_WORKERS": 0,
+        }
+    )
+    app.config["MODEL_LOADER"].wait()
+    data = {"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+
+    # When
+    with app.test_client() as client:
+        created = client.post("/api/translate/jobs", data=data)
+        job_id = created.get_json()["jobId"]
+        events = client.get(f"/api/translate/jobs/{job_id}/events").get_data(as_text=True)
+
+    # Then
+    assert created.status_code == 202
+    assert events.endswith('event: done\ndata: "譯文"\n\n')
+    assert mock_async_ocr.call_args.kwargs["event_loop"] is app.config["EVENT_LOOP"]
+    assert app.config["TRANSLATION_JOBS"].event_loop is app.config["EVENT_LOOP"]
+    mock_pipeline.aprocess.assert_awaited_once_with(b"fake image data", deadline=ANY)
+    assert isinstance(mock_pipeline.aprocess.call_args.kwargs["deadline"], Deadline)
+    mock_pipeline.process.assert_not_called()
+    app.config["EVENT_LOOP"].close()
+
+
+def test_translation_job_api_not_found(client: FlaskClient) -> None:
+    """
+    SUT
+    ---
+    Translation Job API
+
+    Description
+    -----------
+    + Given：不存在 (或已過期) 的工作 ID
+    + When：查詢或觀看該工作
+    + Then：應該回傳 404
+    """
+    # When
+    job = client.get("/api/translate/jobs/unknown")
+    events = client.get("/api/translate/jobs/unknown/events")
+
+    # Then
+    assert job.status_code == 404
+    assert events.status_code == 404
+
+
+def test_translation_job_api_disabled(mocker: MockerFixture, mock_pipeline: MockType) -> None:
+    """
+    SUT
+    ---
+    Translation Job API
+
+    Description
+    -----------
+    + Given：關閉非同步翻譯工作 (例如多個 worker 的 pre-fork 部署)
+    + When：建立或查詢非同步翻譯工作
+    + Then：應該回傳 404，且不建立工作佇列
+    """
+    # Given
+    mocker.patch("src.app.OcrTextExtractor")
+    mocker.patch("src.app.YugiohTranslator")
+    app = create_app(
+        {
+            "TRANSLATION_JOBS_ENABLED": False,
+            "TRANSLATION_CACHE_DB": None,
+            "CARD_TRANSLATION_STORE_DB": None,
+            "CARD_RECTIFY_WORKERS": 0,
+            "UPLOAD_NORMALIZE_WORKERS": 0,
+        }
+    )
+    app.config["MODEL_LOADER"].wait()
+    data = {"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+
+    # When
+    with app.test_client() as client:
+        created = client.post("/api/translate/jobs", data=data)
+        job = client.get("/api/translate/jobs/unknown")
+        metrics = client.get("/metrics").get_json()
+
+    # Then
+    assert created.status_code == 404
+    assert job.status_code == 404
+    assert app.config["TRANSLATION_JOBS"] is None
+    assert "translationJobs" not in metrics
+    mock_pipeline.process.assert_not_called()
+
+
+def test_translation_job_api_queue_full(
+    mocker: MockerFixture, app: Flask, client: FlaskClient
+) -> None:
+    """
+    SUT
+    ---
+    Translation Job API
+
+    Description
+    -----------
+    + Given：工作佇列已滿
+    + When：建立非同步翻譯工作
+    + Then：應該回傳 503 與 Retry-After
+    """
+    # Given
+    mocker.patch.object(app.config["TRANSLATION_JOBS"], "submit", side_effect=queue.Full)
+    data = {"image": (io.BytesIO(b"fake image data"), "test.jpg")}
+
+    # When
+    response = client.post("/api/translate/jobs", data=data)
+
+    # Then
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert response.get_json()["success"] is False
+
+
 def test_question_api(client: FlaskClient) -> None:
     """
     SUT
@@ -172,7 +913,7 @@ def test_serve_card_material(mocker: MockerFixture, client: FlaskClient) -> None
     """
     # Given
     mock_send_from_directory = mocker.patch(
-        "src.send_from_directory", return_value="mocked response"
+        "src.app.send_from_directory", return_value="mocked response"
     )
 
     # When
@@ -201,7 +942,7 @@ def test_serve_card_image(
     # Given
     mock_card_image.exists_locally = mocker.Mock(return_value=True)
     mock_card_image.local_path = "src/assets/card-image/mock_id"
-    mock_send_file = mocker.patch("src.send_file", return_value="mocked response")
+    mock_send_file = mocker.patch("src.app.send_file", return_value="mocked response")
 
     # When
     response = client.get("/api/assets/card-image/mock_id")
@@ -230,7 +971,7 @@ def test_serve_card_image_download_yet(
     mock_card_image.exists_locally = mocker.Mock(return_value=False)
     mock_card_image.local_path = "src/assets/card-image/mock_id"
     mock_card_image.download = mocker.Mock()
-    mock_send_file = mocker.patch("src.send_file", return_value="mocked response")
+    mock_send_file = mocker.patch("src.app.send_file", return_value="mocked response")
 
     # When
     response = client.get("/api/assets/card-image/mock_id")
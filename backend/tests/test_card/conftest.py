@@ -0,0 +1,82 @@
+# 3rd party library
+import pytest
+import torch
+from pytest_mock import MockerFixture, MockType
+from tokenizers import Regex, Tokenizer, decoders, models, pre_tokenizers, processors
+from transformers import MT5Config, MT5ForConditionalGeneration, PreTrainedTokenizerFast
+
+# local module
+from src.card.translator import YugiohTranslator
+
+# 迷你 tokenizer 的字元表 (涵蓋 prefix 與常見卡片文字)
+TINY_VOCAB_CHARS = (
+    "<->ja2zh"
+    "このカードは通常召喚できない。自分フィールドモンスター相手墓地効果発動場合"
+    "①②③：、「」0123456789"
+)
+
+
+@pytest.fixture(scope="session")
+def tiny_tokenizer() -> PreTrainedTokenizerFast:
+    """
+    提供字元級的迷你 tokenizer (不需下載任何檔案)
+    """
+    vocab = {"<pad>": 0, "</s>": 1, "<unk>": 2}
+    for char in TINY_VOCAB_CHARS:
+        vocab.setdefault(char, len(vocab))
+
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Split(Regex("."), behavior="isolated")
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="$A </s>", special_tokens=[("</s>", 1)]
+    )
+    tokenizer.decoder = decoders.Fuse()
+
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, pad_token="<pad>", eos_token="</s>", unk_token="<unk>"
+    )
+
+
+@pytest.fixture(scope="session")
+def tiny_model(tiny_tokenizer: PreTrainedTokenizerFast) -> MT5ForConditionalGeneration:
+    """
+    提供隨機初始化的迷你 MT5 模型
+    """
+    torch.manual_seed(0)
+    config = MT5Config(
+        vocab_size=len(tiny_tokenizer),
+        d_model=16,
+        d_kv=4,
+        d_ff=32,
+        num_layers=2,
+        num_decoder_layers=2,
+        num_heads=2,
+        decoder_start_token_id=0,
+        pad_token_id=0,
+        eos_token_id=1,
+        # 放大初始權重，避免隨機模型一直輸出 pad
+        initializer_factor=8.0,
+    )
+    return MT5ForConditionalGeneration(config).eval()
+
+
+@pytest.fixture(scope="function")
+def tiny_translator(
+    mocker: MockerFixture,
+    mock_logger: MockType,
+    tiny_tokenizer: PreTrainedTokenizerFast,
+    tiny_model: MT5ForConditionalGeneration,
+) -> YugiohTranslator:
+    """
+    提供載入迷你模型、使用 greedy decoding 的 `YugiohTranslator` 物件
+    """
+    mocker.patch("src.card.translator.torch.cuda.is_available", return_value=False)
+    mocker.patch("src.card.translator.AutoTokenizer.from_pretrained", return_value=tiny_tokenizer)
+    mocker.patch(
+        "src.card.translator.MT5ForConditionalGeneration.from_pretrained", return_value=tiny_model
+    )
+
+    translator = YugiohTranslator(logger=mock_logger, decoding="greedy")
+    translator.max_length = 32
+
+    return translator
@@ -0,0 +1,489 @@
+# standard library
+import os
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party library
+import pytest
+from pytest_mock import MockerFixture, MockType
+
+# local module
+from src.card.batching_translator import BatchingTranslator
+from src.card.translator import AbstractTranslator, YugiohTranslator
+from src.utils.deadline import Deadline, DeadlineExceededError, current_deadline, deadline_scope
+
+
+@pytest.fixture(scope="function")
+def mock_translator(mocker: MockerFixture) -> MockType:
+    """
+    模擬 `Translator` 物件 (translate_batch 回傳大寫字串)
+    """
+    mock_translator = mocker.Mock(spec=AbstractTranslator)
+    mock_translator.translate_batch = mocker.Mock(
+        side_effect=lambda texts: [text.upper() for text in texts]
+    )
+    return mock_translator
+
+
+class TestBatchingTranslator:
+    """
+    CUT
+    ---
+    `BatchingTranslator`
+    """
+
+    def test_invalid_arguments(self, mock_translator: MockType, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.__init__`
+
+        Description
+        -----------
+        + Given：不合法的 max_batch_size、max_wait 或 max_queue_size
+        + When：當建立 `BatchingTranslator`
+        + Then：應拋出 `ValueError`
+        """
+        with pytest.raises(ValueError, match="max_batch_size must >= 1!"):
+            BatchingTranslator(mock_translator, logger=mock_logger, max_batch_size=0)
+        with pytest.raises(ValueError, match="max_wait must >= 0!"):
+            BatchingTranslator(mock_translator, logger=mock_logger, max_wait=-1)
+        with pytest.raises(ValueError, match="max_queue_size must >= 0!"):
+            BatchingTranslator(mock_translator, logger=mock_logger, max_queue_size=-1)
+
+    def test_translate(self, mock_translator: MockType, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate`
+
+        Description
+        -----------
+        + Given：batching_translator 物件
+        + When：當呼叫單筆 `translate`
+        + Then：應以大小為 1 的 batch 呼叫 `translate_batch`
+        """
+        # Given
+        batching_translator = BatchingTranslator(mock_translator, logger=mock_logger)
+
+        # When
+        result = batching_translator.translate("abc")
+        batching_translator.close()
+
+        # Then
+        assert result == "ABC"
+        mock_translator.translate_batch.assert_called_once_with(["abc"])
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_translate_after_fork(self, mock_translator: MockType, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate`
+
+        Description
+        -----------
+        + Given：fork 前建立的 batching_translator 物件 (worker 執行緒不會被 fork 複製)
+        + When：當子行程呼叫 `translate`
+        + Then：子行程應啟動自己的 worker 並正常回傳結果
+        """
+        # Given
+        batching_translator = BatchingTranslator(mock_translator, logger=mock_logger)
+
+        # When
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover (子行程)
+            exit_code = 1
+            try:
+                if batching_translator.translate("abc") == "ABC":
+                    exit_code = 0
+            finally:
+                os._exit(exit_code)
+        _, status = os.waitpid(pid, 0)
+
+        # Then
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert batching_translator.translate("def") == "DEF"
+        batching_translator.close()
+
+    def test_translate_stream(
+        self, mocker: MockerFixture, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate_stream`
+
+        Description
+        -----------
+        + Given：batching_translator 物件
+        + When：當串流翻譯
+        + Then：應排進佇列，由 worker 執行緒逐片段生成 (不合批)，並計入統計
+        """
+        # Given
+        stream_threads: list[str] = []
+
+        def translate_stream(text: str) -> Iterator[str]:
+            stream_threads.append(threading.current_thread().name)
+            yield from ["A", "BC"]
+
+        mock_translator.translate_stream = mocker.Mock(side_effect=translate_stream)
+        batching_translator = BatchingTranslator(mock_translator, logger=mock_logger)
+
+        # When
+        chunks = list(batching_translator.translate_stream("abc"))
+        batching_translator.close()
+
+        # Then
+        assert chunks == ["A", "BC"]
+        assert stream_threads == ["BatchingTranslator"]
+        mock_translator.translate_batch.assert_not_called()
+        assert batching_translator.stats()["streams"] == 1
+
+    def test_translate_stream_is_serialized(
+        self, mocker: MockerFixture, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate_stream`
+
+        Description
+        -----------
+        + Given：批次推論執行中的 batching_translator 物件
+        + When：當同時開始串流翻譯，之後提早關閉串流
+        + Then：串流應等批次推論完成才生成 (不同時使用模型)；
+                關閉後 worker 上的期限應被取消，之後的請求照常翻譯
+        """
+        # Given
+        release = threading.Event()
+        running: list[str] = []
+        stream_deadlines: list[Deadline | None] = []
+
+        def translate_batch(texts: list[str]) -> list[str]:
+            running.append("batch")
+            release.wait()
+            return [text.upper() for text in texts]
+
+        def translate_stream(text: str) -> Iterator[str]:
+            running.append("stream")
+            stream_deadlines.append(current_deadline())
+            yield from ["A", "B", "C"]
+
+        mock_translator.translate_batch.side_effect = translate_batch
+        mock_translator.translate_stream = mocker.Mock(side_effect=translate_stream)
+        batching_translator = BatchingTranslator(mock_translator, logger=mock_logger, max_wait=0)
+
+        # When
+        future = batching_translator.submit("a")
+        while not running:
+            threading.Event().wait(0.001)
+        stream = batching_translator.translate_stream("abc")
+        with ThreadPoolExecutor(1) as executor:
+            first_chunk = executor.submit(next, stream)
+            threading.Event().wait(0.05)
+            assert running == ["batch"]
+            release.set()
+            assert first_chunk.result(timeout=5) == "A"
+        stream.close()  # type: ignore[attr-defined]
+
+        # Then
+        assert future.result() == "A"
+        assert running == ["batch", "stream"]
+        assert stream_deadlines[0] is not None and stream_deadlines[0].expired
+        assert batching_translator.translate("d") == "D"
+        batching_translator.close()
+
+    def test_concurrent_requests_are_batched(
+        self, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate`
+
+        Description
+        -----------
+        + Given：時間窗夠長的 batching_translator 物件
+        + When：當多個執行緒同時呼叫 `translate`
+        + Then：應合併成一批推論，且每個呼叫端拿到自己的結果
+        """
+        # Given
+        batching_translator = BatchingTranslator(
+            mock_translator, logger=mock_logger, max_batch_size=4, max_wait=1.0
+        )
+        texts = ["a", "b", "c", "d"]
+        barrier = threading.Barrier(len(texts))
+
+        def call(text: str) -> str:
+            barrier.wait()
+            return batching_translator.translate(text)
+
+        # When
+        with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+            results = list(executor.map(call, texts))
+        batching_translator.close()
+
+        # Then
+        assert results == ["A", "B", "C", "D"]
+        mock_translator.translate_batch.assert_called_once()
+        assert sorted(mock_translator.translate_batch.call_args.args[0]) == texts
+
+    def test_max_batch_size(self, mock_translator: MockType, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：max_batch_size 為 2 的 batching_translator 物件
+        + When：當一次送出 5 筆請求
+        + Then：每批不應超過 2 筆，且結果順序與輸入相同
+        """
+        # Given
+        batching_translator = BatchingTranslator(
+            mock_translator, logger=mock_logger, max_batch_size=2, max_wait=0.05
+        )
+
+        # When
+        results = batching_translator.translate_batch(["a", "b", "c", "d", "e"])
+        batching_translator.close()
+
+        # Then
+        assert results == ["A", "B", "C", "D", "E"]
+        batch_sizes = [len(call.args[0]) for call in mock_translator.translate_batch.call_args_list]
+        assert max(batch_sizes) <= 2
+        assert sum(batch_sizes) == 5
+
+    def test_bounded_queue_stats(self, mock_translator: MockType, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.stats`
+
+        Description
+        -----------
+        + Given：佇列最多 2 筆、每批最多 2 筆的 batching_translator 物件
+        + When：當一次送出 5 筆請求
+        + Then：佇列深度不應超過上限，且應記錄請求數、批次數與排隊時間
+        """
+        # Given
+        batching_translator = BatchingTranslator(
+            mock_translator, logger=mock_logger, max_batch_size=2, max_wait=0.01, max_queue_size=2
+        )
+
+        # When
+        results = batching_translator.translate_batch(["a", "b", "c", "d", "e"])
+        batching_translator.close()
+
+        # Then
+        assert results == ["A", "B", "C", "D", "E"]
+        stats = batching_translator.stats()
+        assert stats["max_queue_size"] == 2
+        assert stats["queue_depth"] == 0
+        assert 1 <= stats["max_queue_depth"] <= 2
+        assert stats["requests"] == 5
+        assert stats["batches"] == mock_translator.translate_batch.call_count
+        assert stats["mean_batch_size"] == 5 / stats["batches"]
+        assert stats["wait_latency"]["count"] == 5
+
+    def test_expired_requests_are_dropped(
+        self, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.submit`
+
+        Description
+        -----------
+        + Given：batching_translator 物件
+        + When：當同一批中有請求在排隊時已被取消
+        + Then：被取消的請求應以 `DeadlineExceededError` 失敗且不推論，其他請求照常翻譯
+        """
+        # Given
+        batching_translator = BatchingTranslator(
+            mock_translator, logger=mock_logger, max_batch_size=4, max_wait=0.05
+        )
+        cancelled = Deadline()
+        cancelled.cancel()
+
+        # When
+        with deadline_scope(cancelled):
+            dropped_future = batching_translator.submit("a")
+        future = batching_translator.submit("b")
+
+        # Then
+        assert future.result() == "B"
+        with pytest.raises(DeadlineExceededError):
+            dropped_future.result()
+        mock_translator.translate_batch.assert_called_once_with(["b"])
+        assert batching_translator.stats()["dropped"] == 1
+        batching_translator.close()
+
+    def test_cancelled_futures_are_skipped(
+        self, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.submit`
+
+        Description
+        -----------
+        + Given：batching_translator 物件
+        + When：當呼叫端在推論前取消 future
+        + Then：被取消的請求不應推論，worker 仍應繼續服務之後的請求
+        """
+        # Given
+        batching_translator = BatchingTranslator(
+            mock_translator, logger=mock_logger, max_batch_size=4, max_wait=0.05
+        )
+
+        # When
+        cancelled_future = batching_translator.submit("a")
+        assert cancelled_future.cancel()
+        future = batching_translator.submit("b")
+
+        # Then
+        assert future.result() == "B"
+        assert batching_translator.translate("c") == "C"
+        assert all("a" not in call.args[0] for call in mock_translator.translate_batch.mock_calls)
+        assert batching_translator.stats()["dropped"] == 1
+        batching_translator.close()
+
+    def test_batch_runs_until_every_deadline_expires(
+        self, mocker: MockerFixture, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.submit`
+
+        Description
+        -----------
+        + Given：batching_translator 物件，同一批的兩個請求各有期限
+        + When：當推論期間其中一個請求被取消
+        + Then：推論應繼續 (仍有請求在等待)，被取消的請求不取得 (可能被截斷的) 結果
+        """
+        # Given
+        deadlines = [Deadline(), Deadline()]
+        batch_expired: list[bool] = []
+
+        def translate_batch(texts: list[str]) -> list[str]:
+            deadlines[0].cancel()
+            batch_deadline = current_deadline()
+            assert batch_deadline is not None
+            batch_expired.append(batch_deadline.expired)
+            return [text.upper() for text in texts]
+
+        mock_translator.translate_batch = mocker.Mock(side_effect=translate_batch)
+        batching_translator = BatchingTranslator(
+            mock_translator, logger=mock_logger, max_batch_size=2, max_wait=1
+        )
+
+        # When
+        futures = []
+        for deadline, text in zip(deadlines, ["a", "b"], strict=True):
+            with deadline_scope(deadline):
+                futures.append(batching_translator.submit(text))
+
+        # Then
+        with pytest.raises(DeadlineExceededError):
+            futures[0].result()
+        assert futures[1].result() == "B"
+        assert batch_expired == [False]
+        batching_translator.close()
+
+    def test_exception_propagates_to_every_caller(
+        self, mocker: MockerFixture, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：推論時會失敗的翻譯器
+        + When：當一批請求送出
+        + Then：批內每個呼叫端都應收到同一個例外，且 worker 仍可繼續服務
+        """
+        # Given
+        mock_translator.translate_batch = mocker.Mock(
+            side_effect=[RuntimeError("CUDA out of memory"), ["OK"]]
+        )
+        batching_translator = BatchingTranslator(
+            mock_translator, logger=mock_logger, max_batch_size=4, max_wait=0.05
+        )
+
+        # When
+        futures = [batching_translator.submit(text) for text in ["a", "b"]]
+
+        # Then
+        for future in futures:
+            with pytest.raises(RuntimeError, match="CUDA out of memory"):
+                future.result()
+        assert batching_translator.translate("c") == "OK"
+        batching_translator.close()
+
+    def test_wrong_number_of_results(
+        self, mocker: MockerFixture, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：回傳結果少一筆的翻譯器
+        + When：當一批請求送出
+        + Then：批內每個呼叫端都應收到例外 (不應拿到錯位的結果)，且 worker 仍可繼續服務
+        """
+        # Given
+        mock_translator.translate_batch = mocker.Mock(side_effect=[["A"], ["C"]])
+        batching_translator = BatchingTranslator(
+            mock_translator, logger=mock_logger, max_batch_size=4, max_wait=0.05
+        )
+
+        # When
+        futures = [batching_translator.submit(text) for text in ["a", "b"]]
+
+        # Then
+        for future in futures:
+            with pytest.raises(ValueError, match="1 results for 2 texts"):
+                future.result(timeout=5)
+        assert batching_translator.submit("c").result(timeout=5) == "C"
+        batching_translator.close()
+
+    def test_matches_single_calls_under_greedy(
+        self, mock_logger: MockType, tiny_translator: YugiohTranslator
+    ) -> None:
+        """
+        MUT
+        ---
+        `BatchingTranslator.translate`
+
+        Description
+        -----------
+        + Given：包裝迷你模型 (greedy decoding) 的 batching_translator 物件
+        + When：當多個執行緒同時送出長短不一的文字
+        + Then：合併推論的結果應與逐句直接翻譯完全相同
+        """
+        # Given
+        texts = ["このカードは通常召喚できない。", "①：自分フィールド", "効果", "相手の墓地"]
+        expected = [tiny_translator.translate(text) for text in texts]
+        batching_translator = BatchingTranslator(
+            tiny_translator, logger=mock_logger, max_batch_size=len(texts), max_wait=1.0
+        )
+
+        # When
+        with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+            results = list(executor.map(batching_translator.translate, texts))
+        batching_translator.close()
+
+        # Then
+        assert results == expected
@@ -0,0 +1,163 @@
+# standard library
+import json
+import os
+
+# 3rd party library
+import pytest
+
+# local module
+from src.card.card_layout import CardLayout, OcrLine, parse_card_layout
+
+# 以 Azure Read API (v3.2) 回傳格式記錄的 OCR fixture
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks", "ocr_fixtures")
+
+
+def load_fixture(name: str) -> list[OcrLine]:
+    with open(os.path.join(FIXTURE_DIR, f"{name}.json"), encoding="utf-8") as file:
+        read_result = json.load(file)
+    return [
+        OcrLine(line["text"], line.get("boundingBox"))
+        for text_result in read_result["analyzeResult"]["readResults"]
+        for line in text_result["lines"]
+    ]
+
+
+class TestParseCardLayout:
+    """
+    ## CUT
+    `parse_card_layout`
+    """
+
+    @pytest.mark.parametrize(
+        "fixture, expected_output",
+        [
+            (
+                "monster_clean",
+                CardLayout(
+                    name="ブラック・マジシャン",
+                    type_line="【魔法使い族／効果】",
+                    effect_text="①：このカードが召喚に成功した時に発動できる。"
+                    "デッキからカードを1枚ドローする。",
+                    stats="ATK/2500 DEF/2100",
+                    password=46986414,
+                ),
+            ),
+            (
+                "monster_bracket_misread",
+                CardLayout(
+                    name="エルフの剣士",
+                    type_line="[戦士族／効果]",
+                    effect_text="①：このカードが戦闘で破壊された時、自分の墓地のモンスター1体を"
+                    "対象として発動できる。そのモンスターを特殊召喚する。",
+                    stats="ATK/1400 DEF/1200",
+                    password=39037517,
+                ),
+            ),
+            (
+                "monster_password_misread",
+                CardLayout(
+                    name="サイバー・ドラゴン",
+                    type_line="【機械族／効果】",
+                    effect_text="①：相手フィールドにのみモンスターが存在する場合、"
+                    "このカードは手札から特殊召喚できる。",
+                    stats="ATK/2100 DEF/1600",
+                    password=None,
+                ),
+            ),
+        ],
+    )
+    def test_parse_card_layout(self, fixture: str, expected_output: CardLayout) -> None:
+        """
+        MUT
+        ---
+        `parse_card_layout`
+
+        Description
+        -----------
+        + Given：記錄下來的 OCR 結果 (含 【 誤讀、密碼誤讀)
+        + When：當依 bounding box 解析版面
+        + Then：效果文字不應混入卡名、種族、攻守、密碼與版權行
+        """
+        # When
+        result = parse_card_layout(load_fixture(fixture))
+
+        # Then
+        assert result == expected_output
+
+    def test_parse_card_layout_rotated(self) -> None:
+        """
+        MUT
+        ---
+        `parse_card_layout`
+
+        Description
+        -----------
+        + Given：傾斜約 8 度、邊緣拍到卡墊文字的魔法卡
+        + When：當依 bounding box 解析版面
+        + Then：轉正後只留下效果框內的文字，卡墊文字不應混入
+        """
+        # When
+        result = parse_card_layout(load_fixture("spell_rotated"))
+
+        # Then
+        assert result is not None
+        assert result.name == "死者蘇生"
+        assert result.type_line == "【魔法カード】"
+        assert result.effect_text == (
+            "①：自分または相手の墓地のモンスター1体を対象として発動できる。"
+            "そのモンスターを自分フィールドに特殊召喚する。"
+        )
+        assert result.password == 83764718
+
+    def test_parse_card_layout_text_box_only(self) -> None:
+        """
+        MUT
+        ---
+        `parse_card_layout`
+
+        Description
+        -----------
+        + Given：只有效果框的 OCR 結果 (`CardRectifier` 切掉了卡名與卡圖)
+        + When：當依 bounding box 解析版面
+        + Then：最上面一行是錨點 (卡號)，卡名應為 None
+        """
+        # Given
+        lines = [
+            OcrLine("SD25-JP001", [830, 20, 960, 20, 960, 44, 830, 44]),
+            OcrLine("【魔法使い族／効果】", [60, 60, 360, 60, 360, 88, 60, 88]),
+            OcrLine("①：このカードは通常召喚できない。", [60, 96, 900, 96, 900, 122, 60, 122]),
+            OcrLine("ATK/2500 DEF/2100", [560, 360, 940, 360, 940, 386, 560, 386]),
+            OcrLine("46986414", [30, 400, 190, 400, 190, 424, 30, 424]),
+        ]
+
+        # When
+        result = parse_card_layout(lines)
+
+        # Then
+        assert result is not None
+        assert result.name is None
+        assert result.effect_text == "①：このカードは通常召喚できない。"
+        assert result.password == 46986414
+
+    @pytest.mark.parametrize(
+        "lines",
+        [
+            [],
+            [OcrLine("【ドラゴン族／通常】"), OcrLine("高い攻撃力を誇る伝説のドラゴン。")],
+            [OcrLine("効果テキスト。", [0, 0, 100, 0, 100, 20, 0, 20])],
+        ],
+    )
+    def test_parse_card_layout_none(self, lines: list[OcrLine]) -> None:
+        """
+        MUT
+        ---
+        `parse_card_layout`
+
+        Description
+        -----------
+        + Given：沒有行、沒有 bounding box，或找不到 【】 行與卡號
+        + When：當依 bounding box 解析版面
+        + Then：應回傳 None (由呼叫端退回字串規則)
+        """
+        # Then
+        assert parse_card_layout(lines) is None
@@ -0,0 +1,171 @@
+# standard library
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+# 3rd party library
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture, MockType
+
+# local module
+from src.card.card_recognizer import ArtworkCardRecognizer
+from src.image.artwork_index import ArtworkIndex, ArtworkMatch, artwork_fingerprint, crop_artwork
+from src.image.perceptual_hash import open_image
+from src.utils.process_pool import LazyProcessPool
+
+# 照片中些微傾斜、四周有背景的卡片的四個角 (左上、右上、右下、左下)
+TILTED_QUAD = [(520, 180), (1060, 215), (1015, 1000), (470, 960)]
+
+
+@pytest.fixture(scope="function")
+def process_pool() -> Iterator[LazyProcessPool]:
+    """
+    提供 `LazyProcessPool` 物件 (測試結束時關閉)
+    """
+    process_pool = LazyProcessPool(1)
+    yield process_pool
+    process_pool.close()
+
+
+class TestArtworkCardRecognizer:
+    """
+    ## CUT
+    `ArtworkCardRecognizer`
+    """
+
+    @pytest.mark.parametrize(
+        "match, expected", [(ArtworkMatch(46986414, 12), 46986414), (None, None)]
+    )
+    def test_recognize(
+        self,
+        mocker: MockerFixture,
+        mock_logger: MockType,
+        make_card_photo: Callable[..., bytes],
+        match: ArtworkMatch | None,
+        expected: int | None,
+    ) -> None:
+        """
+        MUT
+        ---
+        `ArtworkCardRecognizer.recognize`
+
+        Description
+        -----------
+        + Given：卡圖雜湊索引
+        + When：當辨識一張卡片照片
+        + Then：有把握時回傳卡片密碼，否則回傳 None，並以設定的門檻比對
+        """
+        # Given
+        mock_index = mocker.Mock(spec=ArtworkIndex)
+        mock_index.match_fingerprint = mocker.Mock(return_value=match)
+        recognizer = ArtworkCardRecognizer(
+            mock_index, logger=mock_logger, max_distance=30, min_margin=10
+        )
+
+        # When
+        result = recognizer.recognize(make_card_photo(0))
+
+        # Then
+        assert result == expected
+        assert mock_index.match_fingerprint.call_args.kwargs == {
+            "max_distance": 30,
+            "min_margin": 10,
+        }
+
+    @pytest.mark.parametrize("use_pool", [False, True])
+    def test_recognize_card_in_scene(
+        self,
+        request: pytest.FixtureRequest,
+        mock_logger: MockType,
+        make_card_photo: Callable[..., bytes],
+        make_card_scene: Callable[..., bytes],
+        use_pool: bool,
+    ) -> None:
+        """
+        MUT
+        ---
+        `ArtworkCardRecognizer.recognize`
+
+        Description
+        -----------
+        + Given：以正面卡片建立的卡圖雜湊索引
+        + When：當辨識四周有背景、些微傾斜的卡片照片 (在呼叫的執行緒或行程池中計算卡圖指紋)
+        + Then：應先校正卡片再比對卡圖，辨識出正確的卡片 (直接以原照片比對則辨識不出)
+        """
+        # Given
+        seeds = range(5)
+        fingerprints = [
+            artwork_fingerprint(crop_artwork(open_image(make_card_photo(seed), 256)))
+            for seed in seeds
+        ]
+        index = ArtworkIndex(np.array([10000000 + seed for seed in seeds]), np.array(fingerprints))
+        pool = request.getfixturevalue("process_pool") if use_pool else None
+        recognizer = ArtworkCardRecognizer(index, logger=mock_logger, pool=pool)
+        photo = make_card_scene(3, TILTED_QUAD)
+
+        # When
+        result = recognizer.recognize(photo)
+
+        # Then
+        assert result == 10000003
+        assert (
+            index.match(
+                open_image(photo, 256),
+                max_distance=recognizer.max_distance,
+                min_margin=recognizer.min_margin,
+            )
+            is None
+        )
+
+    def test_recognize_undecodable(self, mocker: MockerFixture, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `ArtworkCardRecognizer.recognize`
+
+        Description
+        -----------
+        + Given：卡圖雜湊索引
+        + When：當辨識無法解碼的圖片
+        + Then：應回傳 None，且不比對索引
+        """
+        # Given
+        mock_index = mocker.Mock(spec=ArtworkIndex)
+        recognizer = ArtworkCardRecognizer(mock_index, logger=mock_logger)
+
+        # When
+        result = recognizer.recognize(b"fake image data")
+
+        # Then
+        assert result is None
+        mock_index.match_fingerprint.assert_not_called()
+
+    def test_recognize_broken_pool(
+        self, mocker: MockerFixture, mock_logger: MockType, process_pool: LazyProcessPool
+    ) -> None:
+        """
+        MUT
+        ---
+        `ArtworkCardRecognizer.recognize`
+
+        Description
+        -----------
+        + Given：子行程異常結束 (行程池壞掉) 的卡圖辨識器
+        + When：當辨識卡片照片
+        + Then：應回傳 None 並記錄警告，且不比對索引
+        """
+        # Given
+        broken: Future[None] = Future()
+        broken.set_exception(BrokenProcessPool("worker died"))
+        mocker.patch.object(process_pool, "submit", return_value=broken)
+        mock_index = mocker.Mock(spec=ArtworkIndex)
+        recognizer = ArtworkCardRecognizer(mock_index, logger=mock_logger, pool=process_pool)
+
+        # When
+        result = recognizer.recognize(b"card photo")
+
+        # Then
+        assert result is None
+        mock_logger.warning.assert_called_once()
+        mock_index.match_fingerprint.assert_not_called()
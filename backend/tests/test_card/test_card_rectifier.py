@@ -0,0 +1,339 @@
+# standard library
+import asyncio
+import io
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+# 3rd party library
+import pytest
+from PIL import Image
+from pytest_mock import MockerFixture, MockType
+
+# local module
+from src.card.card_rectifier import CardRectifier, RectifiedTextExtractor
+from src.card.ocr_cache import CachedTextExtractor, OcrResultCache
+from src.card.text_extractor import AbstractTextExtractor, ExtractedCard
+
+SKEWED_QUAD = [(500, 150), (1050, 230), (980, 1050), (380, 960)]
+
+
+@pytest.fixture(scope="function")
+def card_rectifier(mock_logger: MockType) -> Iterator[CardRectifier]:
+    """
+    提供 `CardRectifier` 物件 (測試結束時關閉行程池)
+    """
+    card_rectifier = CardRectifier(logger=mock_logger, max_workers=1, width=600)
+    yield card_rectifier
+    card_rectifier.close()
+
+
+class TestCardRectifier:
+    """
+    ## CUT
+    `CardRectifier`
+    """
+
+    @pytest.mark.parametrize(
+        "kwargs", [{"max_workers": 0}, {"width": 0}, {"quality": 0}, {"quality": 101}]
+    )
+    def test_init_valueerror(self, mock_logger: MockType, kwargs: dict[str, int]) -> None:
+        """
+        MUT
+        ---
+        `CardRectifier.__init__`
+
+        Description
+        -----------
+        + Given：不合法的參數
+        + When：當建立 card_rectifier 物件
+        + Then：應拋出 ValueError
+        """
+        # Then
+        with pytest.raises(ValueError):
+            CardRectifier(logger=mock_logger, **kwargs)
+
+    def test_rectify(
+        self, card_rectifier: CardRectifier, make_card_scene: Callable[..., bytes]
+    ) -> None:
+        """
+        MUT
+        ---
+        `CardRectifier.rectify`
+
+        Description
+        -----------
+        + Given：桌上斜拍的卡片照片
+        + When：當在行程池中校正
+        + Then：應回傳校正後的效果框圖片
+        """
+        # Given
+        photo = make_card_scene(0, SKEWED_QUAD)
+
+        # When
+        text_box = card_rectifier.rectify(photo)
+
+        # Then
+        assert Image.open(io.BytesIO(text_box)).width == 600
+
+    def test_rectify_fallback(self, card_rectifier: CardRectifier, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `CardRectifier.rectify`
+
+        Description
+        -----------
+        + Given：沒有卡片的照片，以及無法解碼的 bytes
+        + When：當校正
+        + Then：應回傳原本的 bytes，無法解碼時記錄警告
+        """
+        # Given
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), (90, 90, 90)).save(buffer, "JPEG")
+        no_card = buffer.getvalue()
+
+        # Then
+        assert card_rectifier.rectify(no_card) == no_card
+        assert card_rectifier.rectify(b"not an image") == b"not an image"
+        mock_logger.warning.assert_called_once()
+
+    def test_rectify_with_hash(
+        self, card_rectifier: CardRectifier, make_card_scene: Callable[..., bytes]
+    ) -> None:
+        """
+        MUT
+        ---
+        `CardRectifier.rectify_with_hash`
+
+        Description
+        -----------
+        + Given：桌上斜拍的卡片照片，以及無法解碼的 bytes
+        + When：當在行程池中校正並計算雜湊
+        + Then：應回傳效果框與卡片的雜湊；無法解碼時回傳原本的 bytes，雜湊為 None
+        """
+        # Given
+        photo = make_card_scene(0, SKEWED_QUAD)
+
+        # When
+        text_box, card_hash = card_rectifier.rectify_with_hash(photo, 16)
+
+        # Then
+        assert text_box == card_rectifier.rectify(photo)
+        assert card_hash is not None
+        assert card_hash[1]
+        assert card_rectifier.rectify_with_hash(b"not an image", 16) == (b"not an image", None)
+
+    def test_arectify(
+        self,
+        card_rectifier: CardRectifier,
+        make_card_scene: Callable[..., bytes],
+        mock_logger: MockType,
+    ) -> None:
+        """
+        MUT
+        ---
+        `CardRectifier.arectify` / `CardRectifier.arectify_with_hash`
+
+        Description
+        -----------
+        + Given：桌上斜拍的卡片照片，以及無法解碼的 bytes
+        + When：當在 event loop 上等待行程池校正
+        + Then：結果應與同步版本相同；無法解碼時回傳原本的 bytes 並記錄警告
+        """
+        # Given
+        photo = make_card_scene(0, SKEWED_QUAD)
+
+        async def rectify_all() -> list[object]:
+            return [
+                await card_rectifier.arectify(photo),
+                await card_rectifier.arectify_with_hash(photo, 16),
+                await card_rectifier.arectify(b"not an image"),
+            ]
+
+        # When
+        text_box, with_hash, fallback = asyncio.run(rectify_all())
+
+        # Then
+        assert text_box == card_rectifier.rectify(photo)
+        assert with_hash == card_rectifier.rectify_with_hash(photo, 16)
+        assert fallback == b"not an image"
+        mock_logger.warning.assert_called_once()
+
+    def test_rectify_broken_pool(
+        self, mocker: MockerFixture, card_rectifier: CardRectifier, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `CardRectifier.rectify`
+
+        Description
+        -----------
+        + Given：子行程異常結束 (行程池壞掉) 的 card_rectifier 物件
+        + When：當校正
+        + Then：應回傳原本的照片並記錄警告
+        """
+        # Given
+        broken: Future[bytes | None] = Future()
+        broken.set_exception(BrokenProcessPool("worker died"))
+        mocker.patch.object(card_rectifier, "_submit", return_value=broken)
+
+        # Then
+        assert card_rectifier.rectify(b"photo") == b"photo"
+        mock_logger.warning.assert_called_once()
+
+
+class TestRectifiedTextExtractor:
+    """
+    ## CUT
+    `RectifiedTextExtractor`
+    """
+
+    def test_extract(self, mocker: MockerFixture) -> None:
+        """
+        MUT
+        ---
+        `RectifiedTextExtractor.extract`
+
+        Description
+        -----------
+        + Given：OCR 前先做影像前處理的 text_extractor 物件
+        + When：當以 stream、URL 提取文字
+        + Then：stream 應先校正再交給 OCR，URL 直接交給 OCR
+        """
+        # Given
+        mock_text_extractor = mocker.Mock(spec=AbstractTextExtractor)
+        mock_text_extractor.extract = mocker.Mock(return_value=ExtractedCard("Extracted text"))
+        mock_card_rectifier = mocker.Mock(spec=CardRectifier)
+        mock_card_rectifier.rectify = mocker.Mock(return_value=b"text box")
+        text_extractor = RectifiedTextExtractor(mock_text_extractor, mock_card_rectifier)
+
+        # When
+        text_extractor.extract(io.BytesIO(b"card photo"))
+        text_extractor.extract("https://fake/card.jpg")
+
+        # Then
+        mock_card_rectifier.rectify.assert_called_once_with(b"card photo")
+        assert [c.args for c in mock_text_extractor.extract.call_args_list] == [
+            (b"text box",),
+            ("https://fake/card.jpg",),
+        ]
+
+    def test_aextract(self, mocker: MockerFixture) -> None:
+        """
+        MUT
+        ---
+        `RectifiedTextExtractor.aextract`
+
+        Description
+        -----------
+        + Given：OCR 前先做影像前處理的 text_extractor 物件
+        + When：當在 event loop 上以 stream、URL 提取文字
+        + Then：stream 應先以 `arectify` 校正再交給 OCR 的 `aextract`，URL 直接交給 OCR
+        """
+        # Given
+        mock_text_extractor = mocker.Mock(spec=AbstractTextExtractor)
+        mock_text_extractor.aextract = mocker.AsyncMock(return_value=ExtractedCard("Extracted"))
+        mock_card_rectifier = mocker.Mock(spec=CardRectifier)
+        mock_card_rectifier.arectify = mocker.AsyncMock(return_value=b"text box")
+        text_extractor = RectifiedTextExtractor(mock_text_extractor, mock_card_rectifier)
+
+        async def extract_all() -> None:
+            await text_extractor.aextract(io.BytesIO(b"card photo"))
+            await text_extractor.aextract("https://fake/card.jpg")
+
+        # When
+        asyncio.run(extract_all())
+
+        # Then
+        mock_card_rectifier.arectify.assert_awaited_once_with(b"card photo")
+        assert [c.args for c in mock_text_extractor.aextract.await_args_list] == [
+            (b"text box",),
+            ("https://fake/card.jpg",),
+        ]
+
+    def test_ocr_cache_keys_on_upload(
+        self,
+        mocker: MockerFixture,
+        mock_logger: MockType,
+        card_rectifier: CardRectifier,
+        make_card_scene: Callable[..., bytes],
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTextExtractor.extract` / `CardRectifier.rectify_with_hash`
+
+        Description
+        -----------
+        + Given：以 card_rectifier 計算快取 key 的 cached_text_extractor 物件
+        + When：當上傳兩張效果框相同、卡圖不同的照片，再重新上傳第一張與其縮小的複本
+        + Then：快取應以照片中的卡片計算雜湊：不同的卡片都要 OCR，重新上傳與複本都命中；
+          每張照片只在行程池中偵測一次卡片，請求執行緒不計算雜湊，OCR 只收到效果框
+        """
+        # Given
+        mock_text_extractor = mocker.Mock(spec=AbstractTextExtractor)
+        mock_text_extractor.extract = mocker.Mock(return_value=ExtractedCard("Extracted text"))
+        rectify_with_hash = mocker.spy(card_rectifier, "rectify_with_hash")
+        ocr_cache = OcrResultCache()
+        image_hash = mocker.spy(ocr_cache, "image_hash")
+        text_extractor = CachedTextExtractor(
+            mock_text_extractor, ocr_cache, logger=mock_logger, card_rectifier=card_rectifier
+        )
+        first, second = make_card_scene(0, SKEWED_QUAD), make_card_scene(1, SKEWED_QUAD)
+        buffer = io.BytesIO()
+        Image.open(io.BytesIO(first)).resize((1200, 900)).save(buffer, "JPEG", quality=60)
+        resized = buffer.getvalue()
+
+        # When
+        for photo in (first, second, first, resized):
+            text_extractor.extract(photo)
+
+        # Then
+        assert mock_text_extractor.extract.call_count == 2
+        for call in mock_text_extractor.extract.call_args_list:
+            assert Image.open(io.BytesIO(call.args[0])).width == 600
+        assert rectify_with_hash.call_count == 4
+        image_hash.assert_not_called()
+        assert ocr_cache.stats()["exact_hits"] + ocr_cache.stats()["near_hits"] == 2
+
+    def test_ocr_cache_keys_on_upload_async(
+        self,
+        mocker: MockerFixture,
+        mock_logger: MockType,
+        card_rectifier: CardRectifier,
+        make_card_scene: Callable[..., bytes],
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTextExtractor.aextract` / `CardRectifier.arectify_with_hash`
+
+        Description
+        -----------
+        + Given：以 card_rectifier 計算快取 key 的 cached_text_extractor 物件
+        + When：當在 event loop 上上傳同一張照片兩次
+        + Then：快取 key 與效果框應在行程池中一起算出，第二次命中快取；OCR 只收到效果框
+        """
+        # Given
+        mock_text_extractor = mocker.Mock(spec=AbstractTextExtractor)
+        mock_text_extractor.aextract = mocker.AsyncMock(return_value=ExtractedCard("Extracted"))
+        arectify_with_hash = mocker.spy(card_rectifier, "arectify_with_hash")
+        text_extractor = CachedTextExtractor(
+            mock_text_extractor, OcrResultCache(), logger=mock_logger, card_rectifier=card_rectifier
+        )
+        photo = make_card_scene(0, SKEWED_QUAD)
+
+        async def extract_twice() -> list[ExtractedCard]:
+            return [await text_extractor.aextract(photo), await text_extractor.aextract(photo)]
+
+        # When
+        results = asyncio.run(extract_twice())
+
+        # Then
+        assert results == [ExtractedCard("Extracted")] * 2
+        assert arectify_with_hash.call_count == 2
+        mock_text_extractor.aextract.assert_awaited_once()
+        assert Image.open(io.BytesIO(mock_text_extractor.aextract.await_args.args[0])).width == 600
+        assert text_extractor.cache.stats()["exact_hits"] == 1
@@ -0,0 +1,75 @@
+# 3rd party library
+import pytest
+
+# local module
+from src.card.clause import Clause, split_clauses
+
+
+class TestSplitClauses:
+    """
+    CUT
+    ---
+    `split_clauses`
+    """
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("", []),
+            (
+                "このカードは通常召喚できない。",
+                [Clause("このカードは通常召喚できない。", True)],
+            ),
+            (
+                "①：このカードが召喚に成功した時に発動できる。デッキから1枚ドローする。",
+                [
+                    Clause("①：", False),
+                    Clause("このカードが召喚に成功した時に発動できる。", True),
+                    Clause("デッキから1枚ドローする。", True),
+                ],
+            ),
+            (
+                "手札を1枚捨てて発動できる：相手は1000ダメージを受ける。",
+                [
+                    Clause("手札を1枚捨てて発動できる", True),
+                    Clause("：", False),
+                    Clause("相手は1000ダメージを受ける。", True),
+                ],
+            ),
+            (
+                "①：Ａ。\nＢ。\n②：Ｃ。\n",
+                [
+                    Clause("①：", False),
+                    Clause("Ａ。", True),
+                    Clause("\n", False),
+                    Clause("Ｂ。", True),
+                    Clause("\n", False),
+                    Clause("②：", False),
+                    Clause("Ｃ。", True),
+                    Clause("\n", False),
+                ],
+            ),
+            (
+                "このカード名の①②の効果は1ターンに1度しか使用できない。",
+                [Clause("このカード名の①②の効果は1ターンに1度しか使用できない。", True)],
+            ),
+        ],
+    )
+    def test_split_clauses(self, text: str, expected: list[Clause]) -> None:
+        """
+        MUT
+        ---
+        `split_clauses`
+
+        Description
+        -----------
+        + Given：卡片效果文字
+        + When：當切成子句
+        + Then：應以「。」切句、分隔符與換行獨立保留 (效果引用「①②の」不切)，且串起來等於原文
+        """
+        # When
+        clauses = split_clauses(text)
+
+        # Then
+        assert clauses == expected
+        assert "".join(clause.text for clause in clauses) == text
@@ -0,0 +1,297 @@
+# standard library
+import asyncio
+import io
+from collections.abc import Callable
+
+# 3rd party library
+import pytest
+from PIL import Image
+from pytest_mock import MockerFixture, MockType
+
+# local module
+from src.card.ocr_cache import CachedTextExtractor, OcrCacheKey, OcrResultCache
+from src.card.text_extractor import AbstractTextExtractor, ExtractedCard
+
+# 斜放在桌墊上的卡片 (偵測得到)，與只佔照片一小塊的卡片 (偵測不到，退回以整張照片計算雜湊)
+SKEWED_QUAD = [(500, 150), (1050, 230), (980, 1050), (380, 960)]
+SMALL_QUAD = [(650, 350), (950, 350), (950, 790), (650, 790)]
+
+
+@pytest.fixture(scope="function")
+def mock_text_extractor(mocker: MockerFixture) -> MockType:
+    """
+    模擬 `TextExtractor` 物件
+    """
+    mock_text_extractor = mocker.Mock(spec=AbstractTextExtractor)
+    mock_text_extractor.extract = mocker.Mock(return_value=ExtractedCard("Extracted text"))
+    return mock_text_extractor
+
+
+class TestOcrResultCache:
+    """
+    ## CUT
+    `OcrResultCache`
+    """
+
+    def test_get(self) -> None:
+        """
+        MUT
+        ---
+        `OcrResultCache.get`
+
+        Description
+        -----------
+        + Given：存有一筆條目的 ocr_result_cache 物件
+        + When：當以相同、相近、相差太多的雜湊查詢
+        + Then：分別為完全命中、相近命中、未命中，並統計命中率
+        """
+        # Given
+        ocr_result_cache = OcrResultCache(max_distance=4)
+        key = 0x0123_4567_89AB_CDEF
+        ocr_result_cache.set(OcrCacheKey(key), ExtractedCard("Extracted text"))
+
+        # When
+        exact = ocr_result_cache.get(OcrCacheKey(key))
+        near = ocr_result_cache.get(OcrCacheKey(key ^ 0b1011))
+        miss = ocr_result_cache.get(OcrCacheKey(key ^ 0b11111))
+
+        # Then
+        assert (exact, near, miss) == (ExtractedCard("Extracted text"),) * 2 + (None,)
+        assert ocr_result_cache.stats() == {
+            "exact_hits": 1,
+            "near_hits": 1,
+            "misses": 1,
+            "hit_rate": 2 / 3,
+            "entries": 1,
+        }
+
+    def test_get_whole_photo_exact_only(self) -> None:
+        """
+        MUT
+        ---
+        `OcrResultCache.get`
+
+        Description
+        -----------
+        + Given：存有一筆整張照片 (找不到卡片) 雜湊的 ocr_result_cache 物件
+        + When：當以相同、相近的整張照片雜湊，以及相同數值的卡片雜湊查詢
+        + Then：只有完全相同的整張照片雜湊命中 (背景相同的不同卡片不會共用條目)
+        """
+        # Given
+        ocr_result_cache = OcrResultCache(max_distance=4)
+        key = 0x0123_4567_89AB_CDEF
+        ocr_result_cache.set(OcrCacheKey(key, card=False), ExtractedCard("Extracted text"))
+
+        # When
+        exact = ocr_result_cache.get(OcrCacheKey(key, card=False))
+        near = ocr_result_cache.get(OcrCacheKey(key ^ 0b1, card=False))
+        card = ocr_result_cache.get(OcrCacheKey(key))
+
+        # Then
+        assert (exact, near, card) == (ExtractedCard("Extracted text"), None, None)
+
+    def test_set_evicts_least_recently_used(self) -> None:
+        """
+        MUT
+        ---
+        `OcrResultCache.set`
+
+        Description
+        -----------
+        + Given：最多保留 2 筆的 ocr_result_cache 物件
+        + When：當寫入第 3 筆條目
+        + Then：應淘汰最久未用的條目 (相近的雜湊也查不到)
+        """
+        # Given
+        ocr_result_cache = OcrResultCache(max_entries=2, max_distance=2)
+        ocr_result_cache.set(OcrCacheKey(0b1 << 10), ExtractedCard("a"))
+        ocr_result_cache.set(OcrCacheKey(0b1 << 100), ExtractedCard("b"))
+        ocr_result_cache.get(OcrCacheKey(0b1 << 10))
+
+        # When
+        ocr_result_cache.set(OcrCacheKey(0b1 << 200), ExtractedCard("c"))
+
+        # Then
+        assert ocr_result_cache.get(OcrCacheKey(0b1 << 100 | 0b1)) is None
+        assert ocr_result_cache.get(OcrCacheKey(0b1 << 10)) == ExtractedCard("a")
+        assert ocr_result_cache.get(OcrCacheKey(0b1 << 200)) == ExtractedCard("c")
+        assert ocr_result_cache.stats()["entries"] == 2
+
+    def test_init_valueerror(self) -> None:
+        """
+        MUT
+        ---
+        `OcrResultCache.__init__`
+
+        Description
+        -----------
+        + Given：不合法的上限
+        + When：當建立 ocr_result_cache 物件
+        + Then：應拋出 ValueError
+        """
+        # When / Then
+        with pytest.raises(ValueError, match="max_entries must >= 1!"):
+            OcrResultCache(max_entries=0)
+
+
+class TestCachedTextExtractor:
+    """
+    ## CUT
+    `CachedTextExtractor`
+    """
+
+    def test_extract_near_duplicate(
+        self,
+        mock_logger: MockType,
+        mock_text_extractor: MockType,
+        make_card_scene: Callable[..., bytes],
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTextExtractor.extract`
+
+        Description
+        -----------
+        + Given：cached_text_extractor 物件
+        + When：當上傳一張照片、其重新壓縮與縮放過的複本 (以 stream 上傳)，再上傳另一張照片
+        + Then：複本應直接回傳快取的 OCR 文字，只有兩張不同照片會呼叫 OCR
+        """
+        # Given
+        cached_text_extractor = CachedTextExtractor(
+            mock_text_extractor, OcrResultCache(), logger=mock_logger
+        )
+        original = make_card_scene(0, SKEWED_QUAD)
+        resized = _resize(original, (1200, 900), quality=60)
+        other = make_card_scene(1, SKEWED_QUAD)
+
+        # When
+        results = [
+            cached_text_extractor.extract(original),
+            cached_text_extractor.extract(io.BytesIO(resized)),
+            cached_text_extractor.extract(other),
+        ]
+
+        # Then
+        assert results == [ExtractedCard("Extracted text")] * 3
+        assert mock_text_extractor.extract.call_args_list == [((original,),), ((other,),)]
+        assert cached_text_extractor.cache.stats()["near_hits"] == 1
+
+    def test_aextract_near_duplicate(
+        self,
+        mocker: MockerFixture,
+        mock_logger: MockType,
+        mock_text_extractor: MockType,
+        make_card_scene: Callable[..., bytes],
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTextExtractor.aextract`
+
+        Description
+        -----------
+        + Given：cached_text_extractor 物件
+        + When：當在 event loop 上依序上傳一張照片與其重新壓縮、縮放過的複本，再以 URL 上傳
+        + Then：複本應直接回傳快取的 OCR 文字；OCR 應以 `aextract` 呼叫，URL 直接交給 OCR
+        """
+        # Given
+        mock_text_extractor.aextract = mocker.AsyncMock(return_value=ExtractedCard("Extracted"))
+        cached_text_extractor = CachedTextExtractor(
+            mock_text_extractor, OcrResultCache(), logger=mock_logger
+        )
+        original = make_card_scene(0, SKEWED_QUAD)
+        resized = _resize(original, (1200, 900), quality=60)
+
+        async def extract_all() -> list[ExtractedCard]:
+            return [
+                await cached_text_extractor.aextract(original),
+                await cached_text_extractor.aextract(io.BytesIO(resized)),
+                await cached_text_extractor.aextract("https://fake/card.jpg"),
+            ]
+
+        # When
+        results = asyncio.run(extract_all())
+
+        # Then
+        assert results == [ExtractedCard("Extracted")] * 3
+        assert mock_text_extractor.aextract.await_args_list == [
+            ((original,),),
+            (("https://fake/card.jpg",),),
+        ]
+        mock_text_extractor.extract.assert_not_called()
+        assert cached_text_extractor.cache.stats()["near_hits"] == 1
+
+    @pytest.mark.parametrize("quad", [SKEWED_QUAD, SMALL_QUAD])
+    @pytest.mark.parametrize("background", [(60, 70, 60), (30, 90, 40)])
+    def test_extract_different_cards_on_same_background(
+        self,
+        mocker: MockerFixture,
+        mock_logger: MockType,
+        mock_text_extractor: MockType,
+        make_card_scene: Callable[..., bytes],
+        quad: list[tuple[float, float]],
+        background: tuple[int, int, int],
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTextExtractor.extract`
+
+        Description
+        -----------
+        + Given：cached_text_extractor 物件
+        + When：當上傳兩張在同一張桌墊、同一個位置拍的不同卡片 (卡片大到偵測得到，或小到偵測不到)
+        + Then：兩張都應呼叫 OCR，不共用快取條目
+        """
+        # Given
+        mock_text_extractor.extract = mocker.Mock(
+            side_effect=[ExtractedCard("first"), ExtractedCard("second")]
+        )
+        cached_text_extractor = CachedTextExtractor(
+            mock_text_extractor, OcrResultCache(), logger=mock_logger
+        )
+        first = make_card_scene(0, quad, background=background)
+        second = make_card_scene(1, quad, background=background)
+
+        # When
+        results = [cached_text_extractor.extract(first), cached_text_extractor.extract(second)]
+
+        # Then
+        assert results == [ExtractedCard("first"), ExtractedCard("second")]
+        assert cached_text_extractor.cache.stats()["misses"] == 2
+
+    @pytest.mark.parametrize("src", ["https://fake/card.jpg", b"fake image data"])
+    def test_extract_uncacheable(
+        self, mock_logger: MockType, mock_text_extractor: MockType, src: str | bytes
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTextExtractor.extract`
+
+        Description
+        -----------
+        + Given：cached_text_extractor 物件
+        + When：當以 URL 或無法解碼的圖片重複呼叫 `extract`
+        + Then：每次都應直接交給 OCR，不查也不寫入快取
+        """
+        # Given
+        cached_text_extractor = CachedTextExtractor(
+            mock_text_extractor, OcrResultCache(), logger=mock_logger
+        )
+
+        # When
+        cached_text_extractor.extract(src)
+        cached_text_extractor.extract(src)
+
+        # Then
+        assert mock_text_extractor.extract.call_count == 2
+        assert cached_text_extractor.cache.stats()["entries"] == 0
+
+
+def _resize(image_bytes: bytes, size: tuple[int, int], *, quality: int) -> bytes:
+    """縮放並重新壓縮照片 (模擬重新上傳的複本)"""
+    buffer = io.BytesIO()
+    Image.open(io.BytesIO(image_bytes)).resize(size).save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
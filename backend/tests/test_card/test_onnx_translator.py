@@ -0,0 +1,99 @@
+# standard library
+import copy
+from pathlib import Path
+
+# 3rd party library
+import pytest
+from pytest_mock import MockType
+from transformers import MT5ForConditionalGeneration, PreTrainedTokenizerFast
+
+# local module
+from src.card.translator import YugiohTranslator
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from src.card.onnx_export import export_onnx  # noqa: E402
+from src.card.onnx_translator import OnnxYugiohTranslator  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def onnx_model_dir(
+    tmp_path_factory: pytest.TempPathFactory,
+    tiny_tokenizer: PreTrainedTokenizerFast,
+    tiny_model: MT5ForConditionalGeneration,
+) -> Path:
+    """
+    提供匯出迷你模型後的 ONNX 目錄
+    """
+    model_dir = tmp_path_factory.mktemp("onnx")
+    export_onnx(copy.deepcopy(tiny_model), tiny_tokenizer, str(model_dir))
+    return model_dir
+
+
+@pytest.fixture(scope="function")
+def onnx_translator(mock_logger: MockType, onnx_model_dir: Path) -> OnnxYugiohTranslator:
+    """
+    提供載入迷你 ONNX 模型的 `OnnxYugiohTranslator` 物件
+    """
+    translator = OnnxYugiohTranslator(logger=mock_logger, model_dir=str(onnx_model_dir))
+    translator.max_length = 32
+    return translator
+
+
+class TestOnnxYugiohTranslator:
+    """
+    CUT
+    ---
+    `OnnxYugiohTranslator`
+    """
+
+    def test_export_files(self, onnx_model_dir: Path) -> None:
+        """
+        MUT
+        ---
+        `export_onnx`
+
+        Description
+        -----------
+        + Given：迷你模型
+        + When：當匯出 ONNX
+        + Then：應產生三張圖、tokenizer 與 config
+        """
+        for filename in (
+            "encoder_model.onnx",
+            "decoder_model.onnx",
+            "decoder_with_past_model.onnx",
+            "tokenizer.json",
+            "config.json",
+        ):
+            assert (onnx_model_dir / filename).exists()
+
+    def test_parity_with_yugioh_translator(
+        self, onnx_translator: OnnxYugiohTranslator, tiny_translator: YugiohTranslator
+    ) -> None:
+        """
+        MUT
+        ---
+        `OnnxYugiohTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：同一個迷你模型的 PyTorch 與 ONNX 版本 (皆為 greedy decoding)
+        + When：當翻譯長短不一的文字 (單筆與整批)
+        + Then：結果應與 `YugiohTranslator` 完全相同
+        """
+        # Given
+        tiny_translator.padding = "longest"
+        texts = ["このカードは通常召喚できない。", "①：自分フィールド", "効果"]
+
+        # When
+        expected = tiny_translator.translate_batch(texts)
+        singles = [onnx_translator.translate(text) for text in texts]
+        batched = onnx_translator.translate_batch(texts)
+
+        # Then
+        assert singles == expected
+        assert batched == expected
+        assert onnx_translator.deterministic is True
+        assert onnx_translator.stats()["latency"]["count"] == len(texts) * 2
@@ -0,0 +1,243 @@
+# standard library
+import random
+import re
+
+# 3rd party library
+import pytest
+
+# local module
+from src.card.postprocess import CharMap, PostprocessHooks, RegexReplace, Replace
+
+
+class TestPostprocessHooks:
+    """
+    ## CUT
+    `PostprocessHooks`
+    """
+
+    def test_char_maps_are_fused(self) -> None:
+        """
+        MUT
+        ---
+        `PostprocessHooks.add` / `PostprocessHooks.__call__`
+
+        Description
+        -----------
+        + Given：多個字元對照表 (後者會替換前者的替換結果)
+        + When：當註冊並套用
+        + Then：應合併成一次 `str.translate`，結果與依序套用相同
+        """
+        # Given
+        char_maps = [CharMap({"a": "b", ",": "，"}), CharMap({"b": "c", "x": ""})]
+        hooks = PostprocessHooks()
+
+        # When
+        for char_map in char_maps:
+            hooks.add(char_map)
+
+        # Then
+        for text in ["a,b,x!", "效果a,x。"]:
+            expected = text
+            for char_map in char_maps:
+                expected = expected.translate(str.maketrans(dict(char_map.mapping)))
+            assert hooks(text) == expected
+        assert hooks("a,b,x!") == "c，c，!"
+        assert len(hooks.passes) == 1
+        assert len(hooks) == 2
+
+    def test_replacements_are_fused(self) -> None:
+        """
+        MUT
+        ---
+        `PostprocessHooks.add` / `PostprocessHooks.__call__`
+
+        Description
+        -----------
+        + Given：彼此不會重疊的字面字串替換，以及正規表示式替換
+        + When：當註冊並套用
+        + Then：字面字串替換應合併成一次掃描 (較長的 key 優先)，正規表示式各自掃描一次，
+                替換字串、`\\g<0>`、替換函式與旗標都應生效
+        """
+        # Given
+        hooks = PostprocessHooks()
+
+        # When
+        hooks.add(Replace({"墓地": "墓地區", "墓": "X"}))
+        hooks.add(Replace({"手札": "手牌"}))
+        hooks.add(RegexReplace(r"\d+", r"[\g<0>]"))
+        hooks.add(RegexReplace(re.compile("atk", re.IGNORECASE), "攻擊力"))
+        hooks.add(RegexReplace("  +", lambda match: " "))
+
+        # Then
+        assert hooks("墓地 墓  手札 ATK 1200") == "墓地區 X 手牌 攻擊力 [1200]"
+        assert len(hooks.passes) == 4
+
+    @pytest.mark.parametrize(
+        "rules, text, expected",
+        [
+            # 比對重疊：後者的 key 會被前者的替換破壞
+            ([Replace({"bc": "X"}), Replace({"ab": "Y"})], "abc", "aX"),
+            # 前者的 key 包含在後者的 key 中
+            ([Replace({"b": "X"}), Replace({"abc": "Y"})], "abc", "aXc"),
+            # 前者的替換結果產生後者的 key
+            ([Replace({"a": "b"}), Replace({"bb": "Z"})], "ab", "Z"),
+            # 前者刪除文字，前後接成後者的 key
+            ([Replace({"X": ""}), Replace({"ab": "Z"})], "aXb", "Z"),
+            # 同一個 key：依序套用時後者比對不到
+            ([Replace({"a": "1"}), Replace({"a": "2"})], "a", "1"),
+        ],
+    )
+    def test_overlapping_replacements(self, rules: list[Replace], text: str, expected: str) -> None:
+        """
+        MUT
+        ---
+        `PostprocessHooks.add` / `PostprocessHooks.__call__`
+
+        Description
+        -----------
+        + Given：比對會重疊或互相影響的字面字串替換
+        + When：當註冊並套用
+        + Then：不應合併，結果與依序套用相同
+        """
+        # Given
+        hooks = PostprocessHooks()
+
+        # When
+        for rule in rules:
+            hooks.add(rule)
+
+        # Then
+        assert _apply_sequentially(rules, text) == expected
+        assert hooks(text) == expected
+        assert len(hooks.passes) == len(rules)
+
+    def test_fused_matches_sequential(self) -> None:
+        """
+        MUT
+        ---
+        `PostprocessHooks.__call__`
+
+        Description
+        -----------
+        + Given：隨機產生的字面字串替換 (小字母表，容易重疊)
+        + When：當註冊並套用到隨機字串
+        + Then：結果應與依序套用每個規則相同
+        """
+        rng = random.Random(0)
+
+        def random_text(max_length: int) -> str:
+            return "".join(rng.choice("abcd") for _ in range(rng.randint(0, max_length)))
+
+        for _ in range(300):
+            # Given
+            rules = [
+                Replace({random_text(3) or "a": random_text(2) for _ in range(rng.randint(1, 3))})
+                for _ in range(rng.randint(2, 4))
+            ]
+            hooks = PostprocessHooks()
+
+            # When
+            for rule in rules:
+                hooks.add(rule)
+
+            # Then
+            for _ in range(5):
+                text = random_text(12)
+                assert hooks(text) == _apply_sequentially(rules, text), (rules, text)
+
+    def test_order_is_preserved(self) -> None:
+        """
+        MUT
+        ---
+        `PostprocessHooks.add` / `PostprocessHooks.__call__`
+
+        Description
+        -----------
+        + Given：字元對照表、任意函式、字面字串替換與含 capture group 的正規表示式
+        + When：當依序註冊並套用
+        + Then：任意函式與無法合併的正規表示式應隔開合併，結果與依序套用相同
+        """
+        # Given
+        hooks = PostprocessHooks()
+
+        # When
+        hooks.add(CharMap({"a": "b"}))
+        hooks.add(str.upper)
+        hooks.add(CharMap({"B": "c"}))
+        hooks.add(Replace({"c": "d"}))
+        hooks.add(RegexReplace(r"(d)(!)", r"\2\1"))
+        hooks.add(Replace({"!": "?"}))
+
+        # Then
+        # ab! → bb! → BB! → cc! → dd! → d!d → d?d
+        assert hooks("ab!") == "d?d"
+        assert len(hooks.passes) == 6
+
+    def test_add_valueerror(self) -> None:
+        """
+        MUT
+        ---
+        `PostprocessHooks.add`
+
+        Description
+        -----------
+        + Given：key 不是單一字元的字元對照表，或不合法的正規表示式
+        + When：當註冊
+        + Then：應拋出 ValueError，且不影響已註冊的 hook
+        """
+        # Given
+        hooks = PostprocessHooks()
+        hooks.add(CharMap({"a": "b"}))
+
+        # When / Then
+        with pytest.raises(ValueError):
+            hooks.add(CharMap({"ab": "c"}))
+        with pytest.raises(ValueError, match="invalid postprocess regex"):
+            hooks.add(RegexReplace("(", ""))
+        assert len(hooks) == 1
+        assert hooks("a") == "b"
+
+
+def _apply_sequentially(rules: list[Replace], text: str) -> str:
+    """依序套用每個字面字串替換 (各自掃描一次，同一位置較長的 key 優先)"""
+    for rule in rules:
+        replacements = {key: value for key, value in rule.replacements.items() if key}
+        if replacements:
+            keys = sorted(replacements, key=len, reverse=True)
+            pattern = "|".join(map(re.escape, keys))
+            text = re.sub(pattern, lambda match, table=replacements: table[match.group()], text)
+    return text
+
+    def test_fingerprint(self) -> None:
+        """
+        MUT
+        ---
+        `PostprocessHooks.fingerprint`
+
+        Description
+        -----------
+        + Given：以相同 (或不同) hook 註冊的兩組後處理
+        + When：當取得 fingerprint
+        + Then：hook 與順序相同時應相同 (替換函式以名稱表示，不含記憶體位址)，否則應不同
+        """
+
+        # Given
+        def make_hooks(*hooks) -> PostprocessHooks:
+            postprocess_hooks = PostprocessHooks()
+            for hook in hooks:
+                postprocess_hooks.add(hook)
+            return postprocess_hooks
+
+        regex = RegexReplace(re.compile(r"(\d+)"), lambda match: match.group(1))
+
+        # When
+        fingerprint = make_hooks(CharMap({"a": "b"}), str.upper, regex).fingerprint
+        same = make_hooks(CharMap({"a": "b"}), str.upper, regex).fingerprint
+        reordered = make_hooks(str.upper, CharMap({"a": "b"}), regex).fingerprint
+        changed = make_hooks(CharMap({"a": "c"}), str.upper, regex).fingerprint
+
+        # Then
+        assert fingerprint == same
+        assert "0x" not in fingerprint
+        assert len({fingerprint, reordered, changed}) == 3
+        assert make_hooks().fingerprint == ""
@@ -1,10 +1,24 @@
+# standard library
+import asyncio
+import io
+import json
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
 # 3rd party library
 import pytest
 from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
 from pytest_mock import MockerFixture, MockType
 
 # local module
-from src.card.text_extractor import OcrTextExtractor
+from src.card.card_layout import OcrLine
+from src.card.text_extractor import AsyncOcrTextExtractor, ExtractedCard, OcrTextExtractor
+from src.utils.deadline import Deadline, DeadlineExceededError, deadline_scope
+from src.utils.event_loop import EventLoopThread
 
 
 @pytest.fixture(scope="function")
@@ -24,6 +38,158 @@ def ocr_text_extractor(mocker: MockerFixture, mock_logger: MockType) -> OcrTextE
     return OcrTextExtractor(logger=mock_logger)
 
 
+class FakeComputerVisionClient:
+    """
+    Azure Read API 的本地替身 (記錄收到的圖片，回傳預先設定的文字行)
+    """
+
+    def __init__(self, lines: list[str]) -> None:
+        self.lines = lines
+        self.received: list[str | bytes] = []
+
+    def read(self, url: str, raw: bool = False) -> SimpleNamespace:
+        self.received.append(url)
+        return self._read_response()
+
+    def read_in_stream(self, image: io.BufferedIOBase, raw: bool = False) -> SimpleNamespace:
+        self.received.append(image.read())
+        return self._read_response()
+
+    def get_read_result(self, operation_id: str) -> SimpleNamespace:
+        lines = [SimpleNamespace(text=text) for text in self.lines]
+        return SimpleNamespace(
+            status=OperationStatusCodes.succeeded,
+            analyze_result=SimpleNamespace(read_results=[SimpleNamespace(lines=lines)]),
+        )
+
+    def _read_response(self) -> SimpleNamespace:
+        operation_location = f"https://fake/vision/v3.2/read/analyzeResults/{len(self.received)}"
+        return SimpleNamespace(headers={"Operation-Location": operation_location})
+
+
+class FakeOcrServer(ThreadingHTTPServer):
+    """
+    Azure Read REST API 的本地 HTTP 替身
+    (每個 OCR 工作先回 `running_polls` 次 running，且收到 `release_after` 個工作前一律回 running，
+    之後回 `final_status`；記錄同時進行中的工作數與 client 的連線)
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(
+        self,
+        lines: list[str],
+        *,
+        running_polls: int = 1,
+        final_status: str = "succeeded",
+        release_after: int = 0,
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), FakeOcrRequestHandler)
+        self.lines = lines
+        self.running_polls = running_polls
+        self.final_status = final_status
+        self.release_after = release_after
+        self.received: list[str | bytes] = []
+        self.polls: Counter[str] = Counter()
+        self.in_flight: set[str] = set()
+        self.peak_in_flight = 0
+        self.connections: set[tuple[str, int]] = set()
+        self.lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+
+class FakeOcrRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: FakeOcrServer
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+
+    def do_POST(self) -> None:
+        assert self.path == "/vision/v3.2/read/analyze"
+        assert self.headers["Ocp-Apim-Subscription-Key"] == "fake_subscription_key"
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers["Content-Type"] == "application/json":
+            received: str | bytes = json.loads(body)["url"]
+        else:
+            received = body
+
+        path = f"/vision/v3.2/read/analyzeResults/{uuid.uuid4()}"
+        with self.server.lock:
+            self.server.received.append(received)
+            self.server.in_flight.add(path)
+            self.server.peak_in_flight = max(self.server.peak_in_flight, len(self.server.in_flight))
+
+        self._respond(202, b"", {"Operation-Location": f"{self.server.endpoint}{path[1:]}"})
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.polls[self.path] += 1
+            finished = (
+                self.server.polls[self.path] > self.server.running_polls
+                and len(self.server.received) >= self.server.release_after
+            )
+            if finished:
+                self.server.in_flight.discard(self.path)
+
+        status = self.server.final_status if finished else "running"
+        read_result = {
+            "status": status,
+            "analyzeResult": {"readResults": [{"lines": [{"text": t} for t in self.server.lines]}]},
+        }
+        self._respond(200, json.dumps(read_result).encode(), {"Content-Type": "application/json"})
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _respond(self, status: int, body: bytes, headers: dict[str, str]) -> None:
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="function")
+def fake_ocr_server() -> Iterator[FakeOcrServer]:
+    """
+    提供在背景執行緒運行的 `FakeOcrServer`
+    """
+    server = FakeOcrServer(["【効果モンスター】", "このカードは通常召喚できない。"])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="function")
+def async_ocr_text_extractor(
+    mock_logger: MockType, fake_ocr_server: FakeOcrServer, event_loop_thread: EventLoopThread
+) -> Iterator[AsyncOcrTextExtractor]:
+    """
+    提供連到 `FakeOcrServer` 的 `AsyncOcrTextExtractor` 物件 (測試結束時關閉連線)
+    """
+    extractor = AsyncOcrTextExtractor(
+        logger=mock_logger,
+        event_loop=event_loop_thread,
+        endpoint=fake_ocr_server.endpoint,
+        subscription_key="fake_subscription_key",
+        initial_wait=0.01,
+    )
+    yield extractor
+    event_loop_thread.submit(extractor.aclose()).result()
+
+
 class TestOcrTextExtractor:
     """
     ## CUT
@@ -166,6 +332,31 @@ class TestOcrTextExtractor:
         with pytest.raises(TimeoutError, match="OCR processing took too long!"):
             ocr_text_extractor._poll_with_backoff("operation-id", max_attempts=1)
 
+    def test__poll_with_backoff_deadline_exceeded(
+        self, mocker: MockerFixture, ocr_text_extractor: OcrTextExtractor
+    ) -> None:
+        """
+        MUT
+        ---
+        `OcrTextExtractor._poll_with_backoff`
+
+        Description
+        -----------
+        + Given：使用 Azure OCR API，請求的期限只剩很短的時間
+        + When：當 Azure OCR 長時間未完成
+        + Then：等待不應超過期限，到期後應拋出 `DeadlineExceededError` 且不再輪詢
+        """
+        mock_result = mocker.Mock()
+        mock_result.status = OperationStatusCodes.running
+        ocr_text_extractor._computervision_client.get_read_result = mocker.Mock(
+            return_value=mock_result
+        )
+
+        with deadline_scope(Deadline(0.05)), pytest.raises(DeadlineExceededError):
+            ocr_text_extractor._poll_with_backoff("operation-id", initial_wait=10)
+
+        ocr_text_extractor._computervision_client.get_read_result.assert_called_once()
+
     def test__poll_with_backoff_not_started(
         self, mocker: MockerFixture, ocr_text_extractor: OcrTextExtractor
     ) -> None:
@@ -236,6 +427,72 @@ class TestOcrTextExtractor:
         # Then
         assert OcrTextExtractor._filter_text(text_list) == expected_output
 
+    @pytest.mark.parametrize(
+        "text_list, expected_output",
+        [
+            (
+                [
+                    "ブルーアイズ・ホワイト・ドラゴン",
+                    "【ドラゴン族／通常】",
+                    "高い攻撃力を誇る伝説のドラゴン。",
+                    "ATK/3000 DEF/2500",
+                    "89631139 ©スタジオ・ダイス",
+                ],
+                ExtractedCard("高い攻撃力を誇る伝説のドラゴン。", "【ドラゴン族／通常】", 89631139),
+            ),
+            (["効果テキスト。"], ExtractedCard("効果テキスト。", None, None)),
+        ],
+    )
+    def test__parse_card(self, text_list: list[str], expected_output: ExtractedCard) -> None:
+        """
+        MUT
+        ---
+        `OcrTextExtractor._parse_card`
+
+        Description
+        -----------
+        + Given：OCR 提取出的每一行文字
+        + When：當整理卡片文字
+        + Then：應取得效果文字、【】 行與卡片密碼 (找不到時為 None)
+        """
+        # When
+        result = OcrTextExtractor._parse_card(text_list)
+
+        # Then
+        assert result == expected_output
+
+    def test__parse_card_layout(self) -> None:
+        """
+        MUT
+        ---
+        `OcrTextExtractor._parse_card`
+
+        Description
+        -----------
+        + Given：帶 bounding box 的每一行文字
+        + When：當整理卡片文字
+        + Then：應依版面只取效果框內的文字，並取得卡名
+        """
+        # Given
+        text_list: list[str] = [
+            OcrLine("ブルーアイズ・ホワイト・ドラゴン", [42, 36, 420, 36, 420, 76, 42, 76]),
+            OcrLine("【ドラゴン族／通常】", [44, 650, 260, 650, 260, 670, 44, 670]),
+            OcrLine("高い攻撃力を誇る伝説のドラゴン。", [44, 676, 546, 676, 546, 694, 44, 694]),
+            OcrLine("ATK/3000 DEF/2500", [330, 782, 548, 782, 548, 800, 330, 800]),
+            OcrLine("89631139", [24, 822, 118, 822, 118, 838, 24, 838]),
+        ]
+
+        # When
+        result = OcrTextExtractor._parse_card(text_list)
+
+        # Then
+        assert result == ExtractedCard(
+            "高い攻撃力を誇る伝説のドラゴン。",
+            "【ドラゴン族／通常】",
+            89631139,
+            "ブルーアイズ・ホワイト・ドラゴン",
+        )
+
     def test_extract(self, mocker: MockerFixture, ocr_text_extractor: OcrTextExtractor) -> None:
         """
         MUT
@@ -275,4 +532,269 @@ class TestOcrTextExtractor:
         result = ocr_text_extractor.extract("fake_url")
 
         # Then
-        assert result == "Some description\n"
+        assert result == ExtractedCard("Some description\n", None, None)
+
+    @pytest.mark.parametrize(
+        "src, expected_received",
+        [
+            ("https://fake/card.jpg", "https://fake/card.jpg"),
+            (b"fake image data", b"fake image data"),
+            (io.BytesIO(b"fake image data"), b"fake image data"),
+        ],
+    )
+    def test_extract_image_source(
+        self, mock_logger: MockType, src: str | bytes | io.BytesIO, expected_received: str | bytes
+    ) -> None:
+        """
+        MUT
+        ---
+        `OcrTextExtractor.extract`
+
+        Description
+        -----------
+        + Given：使用本地替身 client 的 ocr_text_extractor 物件
+        + When：當以 URL、圖片 bytes 或 binary stream 呼叫 `extract`
+        + Then：URL 應走 `read`，bytes / stream 應直接以 `read_in_stream` 上傳圖片本身
+        """
+        # Given
+        client = FakeComputerVisionClient(["【効果モンスター】", "このカードは通常召喚できない。"])
+        ocr_text_extractor = OcrTextExtractor(logger=mock_logger, client=client)
+
+        # When
+        result = ocr_text_extractor.extract(src)
+
+        # Then
+        assert result == ExtractedCard("このカードは通常召喚できない。", "【効果モンスター】", None)
+        assert client.received == [expected_received]
+
+
+class TestAsyncOcrTextExtractor:
+    """
+    ## CUT
+    `AsyncOcrTextExtractor`
+    """
+
+    @pytest.mark.parametrize(
+        "kwargs, message",
+        [
+            ({"max_attempts": 0}, "max_attempts must >= 1!"),
+            ({"initial_wait": 0}, "initial_wait must > 0!"),
+            ({"max_connections": 0}, "max_connections must >= 1!"),
+        ],
+    )
+    def test_init_valueerror(
+        self,
+        mock_logger: MockType,
+        event_loop_thread: EventLoopThread,
+        kwargs: dict[str, float],
+        message: str,
+    ) -> None:
+        """
+        MUT
+        ---
+        `AsyncOcrTextExtractor.__init__`
+
+        Description
+        -----------
+        + Given：不合法的輪詢或連線設定
+        + When：當建立 async_ocr_text_extractor 物件
+        + Then：應拋出 ValueError
+        """
+        # When / Then
+        with pytest.raises(ValueError, match=message):
+            AsyncOcrTextExtractor(
+                logger=mock_logger,
+                event_loop=event_loop_thread,
+                endpoint="fake_endpoint",
+                subscription_key="fake_key",
+                **kwargs,
+            )
+
+    @pytest.mark.parametrize(
+        "src, expected_received",
+        [
+            ("https://fake/card.jpg", "https://fake/card.jpg"),
+            (b"fake image data", b"fake image data"),
+            (io.BytesIO(b"fake image data"), b"fake image data"),
+        ],
+    )
+    def test_extract(
+        self,
+        fake_ocr_server: FakeOcrServer,
+        async_ocr_text_extractor: AsyncOcrTextExtractor,
+        src: str | bytes | io.BytesIO,
+        expected_received: str | bytes,
+    ) -> None:
+        """
+        MUT
+        ---
+        `AsyncOcrTextExtractor.extract`
+
+        Description
+        -----------
+        + Given：本地 OCR 替身伺服器 (先回 running 再回 succeeded)
+        + When：當以 URL、圖片 bytes 或 binary stream 同步呼叫 `extract`
+        + Then：應上傳正確的圖片來源，並取得過濾後的 OCR 文字
+        """
+        # When
+        result = async_ocr_text_extractor.extract(src)
+
+        # Then
+        assert result == ExtractedCard("このカードは通常召喚できない。", "【効果モンスター】", None)
+        assert fake_ocr_server.received == [expected_received]
+        assert list(fake_ocr_server.polls.values()) == [2]
+
+    def test_extract_deadline_exceeded(
+        self, fake_ocr_server: FakeOcrServer, async_ocr_text_extractor: AsyncOcrTextExtractor
+    ) -> None:
+        """
+        MUT
+        ---
+        `AsyncOcrTextExtractor.extract`
+
+        Description
+        -----------
+        + Given：本地 OCR 替身伺服器，請求已被取消
+        + When：當在請求的期限內呼叫 `extract`
+        + Then：event loop 上的工作應取得呼叫端的期限，拋出 `DeadlineExceededError` 且不再輪詢
+        """
+        # Given
+        deadline = Deadline()
+        deadline.cancel()
+
+        # When
+        with deadline_scope(deadline), pytest.raises(DeadlineExceededError):
+            async_ocr_text_extractor.extract(b"fake image data")
+
+        # Then
+        assert fake_ocr_server.received == [b"fake image data"]
+        assert not fake_ocr_server.polls
+
+    def test_aextract_cancelled_while_polling(
+        self,
+        fake_ocr_server: FakeOcrServer,
+        async_ocr_text_extractor: AsyncOcrTextExtractor,
+        event_loop_thread: EventLoopThread,
+    ) -> None:
+        """
+        MUT
+        ---
+        `AsyncOcrTextExtractor.aextract`
+
+        Description
+        -----------
+        + Given：一直回 running 的本地替身伺服器，輪詢間隔很長
+        + When：當輪詢等待中，請求被其他執行緒取消
+        + Then：應提早醒來並拋出 `DeadlineExceededError`，不再輪詢
+        """
+        # Given
+        fake_ocr_server.running_polls = 100
+        async_ocr_text_extractor.initial_wait = 30
+        deadline = Deadline()
+
+        async def extract() -> ExtractedCard:
+            with deadline_scope(deadline):
+                return await async_ocr_text_extractor.aextract(b"fake image data")
+
+        # When
+        future = event_loop_thread.submit(extract())
+        while not fake_ocr_server.polls:
+            threading.Event().wait(0.001)
+        deadline.cancel()
+
+        # Then
+        with pytest.raises(DeadlineExceededError):
+            future.result(timeout=5)
+        assert list(fake_ocr_server.polls.values()) == [1]
+
+    @pytest.mark.parametrize(
+        "running_polls, final_status, error, message",
+        [
+            (0, "failed", RuntimeError, "OCR processing failed."),
+            (10, "succeeded", TimeoutError, "OCR processing took too long!"),
+        ],
+    )
+    def test_extract_error(
+        self,
+        fake_ocr_server: FakeOcrServer,
+        async_ocr_text_extractor: AsyncOcrTextExtractor,
+        running_polls: int,
+        final_status: str,
+        error: type[Exception],
+        message: str,
+    ) -> None:
+        """
+        MUT
+        ---
+        `AsyncOcrTextExtractor.extract`
+
+        Description
+        -----------
+        + Given：OCR 失敗，或輪詢次數用完仍未完成的本地替身伺服器
+        + When：當呼叫 `extract`
+        + Then：應拋出對應的例外
+        """
+        # Given
+        fake_ocr_server.running_polls = running_polls
+        fake_ocr_server.final_status = final_status
+        async_ocr_text_extractor.max_attempts = 3
+
+        # When / Then
+        with pytest.raises(error, match=message):
+            async_ocr_text_extractor.extract(b"fake image data")
+
+    def test_aextract_many_in_flight(
+        self,
+        mock_logger: MockType,
+        fake_ocr_server: FakeOcrServer,
+        event_loop_thread: EventLoopThread,
+    ) -> None:
+        """
+        MUT
+        ---
+        `AsyncOcrTextExtractor.aextract`
+
+        Description
+        -----------
+        + Given：收到 300 個 OCR 工作前一律回 running 的本地替身伺服器，
+                 最多 20 條 HTTP 連線的 async_ocr_text_extractor 物件
+        + When：當在 event loop 上同時執行 300 個 `aextract`
+        + Then：300 個 OCR 工作應同時進行中 (全部上傳後才有工作完成)，都取得 OCR 文字；
+                只用一條 event loop 執行緒，HTTP 連線不超過 20 條
+        """
+        # Given
+        fake_ocr_server.release_after = 300
+        extractor = AsyncOcrTextExtractor(
+            logger=mock_logger,
+            event_loop=event_loop_thread,
+            endpoint=fake_ocr_server.endpoint,
+            subscription_key="fake_subscription_key",
+            initial_wait=0.01,
+            max_attempts=20,
+            max_connections=20,
+        )
+        threads: set[str] = set()
+
+        async def extract(index: int) -> ExtractedCard:
+            threads.add(threading.current_thread().name)
+            return await extractor.aextract(f"card photo {index}".encode())
+
+        async def extract_all() -> list[ExtractedCard]:
+            try:
+                return await asyncio.gather(*(extract(i) for i in range(300)))
+            finally:
+                await extractor.aclose()
+
+        # When
+        results = event_loop_thread.submit(extract_all()).result(timeout=60)
+
+        # Then
+        assert (
+            results
+            == [ExtractedCard("このカードは通常召喚できない。", "【効果モンスター】", None)] * 300
+        )
+        assert len(fake_ocr_server.received) == 300
+        assert fake_ocr_server.peak_in_flight == 300
+        assert not fake_ocr_server.in_flight
+        assert threads == {"test-event-loop"}
+        assert len(fake_ocr_server.connections) <= 20
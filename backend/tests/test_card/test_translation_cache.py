@@ -0,0 +1,377 @@
+# standard library
+import os
+import sqlite3
+from pathlib import Path
+
+# 3rd party library
+import pytest
+from pytest_mock import MockerFixture, MockType
+
+# local module
+from src.card.translation_cache import CachedTranslator, TranslationCache, normalize_source_text
+from src.card.translator import AbstractTranslator
+
+
+@pytest.fixture(scope="function")
+def mock_translator(mocker: MockerFixture) -> MockType:
+    """
+    模擬 `Translator` 物件 (fingerprint 為 "mock"，translate_batch 回傳加上 "譯：" 前綴的字串)
+    """
+    mock_translator = mocker.Mock(spec=AbstractTranslator)
+    mock_translator.fingerprint = "mock"
+    mock_translator.translate_batch = mocker.Mock(
+        side_effect=lambda texts: [f"譯：{text}" for text in texts]
+    )
+    return mock_translator
+
+
+def test_normalize_source_text() -> None:
+    """
+    MUT
+    ---
+    `normalize_source_text`
+
+    Description
+    -----------
+    + Given：OCR 切行、空白位置不同的同一段原文
+    + When：當呼叫 `normalize_source_text`
+    + Then：應得到相同的 key
+    """
+    assert normalize_source_text("このカードは\n通常召喚 できない。") == normalize_source_text(
+        "このカードは通常召喚できない。"
+    )
+
+
+class TestTranslationCache:
+    """
+    CUT
+    ---
+    `TranslationCache`
+    """
+
+    def test_get_and_set(self) -> None:
+        """
+        MUT
+        ---
+        `TranslationCache.get`
+
+        Description
+        -----------
+        + Given：只用記憶體的 cache 物件
+        + When：當查詢未寫入與已寫入的 key
+        + Then：應分別回傳 None 與快取值，並記錄命中 / 未命中次數
+        """
+        # Given
+        cache = TranslationCache()
+
+        # When
+        missed = cache.get("key")
+        cache.set("key", "value")
+        hit = cache.get("key")
+
+        # Then
+        assert missed is None
+        assert hit == "value"
+        assert cache.stats() == {
+            "memory_hits": 1,
+            "disk_hits": 0,
+            "misses": 1,
+            "memory_entries": 1,
+        }
+
+    def test_lru_eviction(self) -> None:
+        """
+        MUT
+        ---
+        `TranslationCache.set`
+
+        Description
+        -----------
+        + Given：max_entries 為 2 的 cache 物件
+        + When：當寫入第 3 筆
+        + Then：應淘汰最久未使用的條目
+        """
+        # Given
+        cache = TranslationCache(max_entries=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.get("a")
+
+        # When
+        cache.set("c", "C")
+
+        # Then
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+
+    def test_ttl_expiry(self, mocker: MockerFixture) -> None:
+        """
+        MUT
+        ---
+        `TranslationCache.get`
+
+        Description
+        -----------
+        + Given：ttl 為 10 秒的 cache 物件
+        + When：當條目寫入超過 10 秒後查詢
+        + Then：應視為未命中
+        """
+        # Given
+        mock_monotonic = mocker.patch("src.card.translation_cache.time.monotonic", return_value=0)
+        cache = TranslationCache(ttl=10)
+        cache.set("key", "value")
+
+        # When
+        mock_monotonic.return_value = 11
+
+        # Then
+        assert cache.get("key") is None
+        assert cache.stats()["memory_entries"] == 0
+
+    def test_persistence(self, tmp_path: Path) -> None:
+        """
+        MUT
+        ---
+        `TranslationCache.get`
+
+        Description
+        -----------
+        + Given：寫入 SQLite 後關閉的 cache 物件
+        + When：當以同一個檔案重新建立 cache 並查詢
+        + Then：應從 SQLite 命中，且資料庫為 WAL 模式
+        """
+        # Given
+        db_path = str(tmp_path / "translation.sqlite3")
+        cache = TranslationCache(db_path)
+        cache.set("key", "value")
+        cache.close()
+
+        # When
+        reopened_cache = TranslationCache(db_path)
+        first = reopened_cache.get("key")
+        second = reopened_cache.get("key")
+        reopened_cache.close()
+
+        # Then
+        assert first == second == "value"
+        assert reopened_cache.disk_hits == 1
+        assert reopened_cache.memory_hits == 1
+        journal_mode = sqlite3.connect(db_path).execute("PRAGMA journal_mode").fetchone()[0]
+        assert journal_mode == "wal"
+
+    def test_persistence_ttl_expiry(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        """
+        MUT
+        ---
+        `TranslationCache.get`
+
+        Description
+        -----------
+        + Given：ttl 為 10 秒、已寫入 SQLite 的 cache 物件
+        + When：當以同一個檔案重新建立 cache，並在寫入 5 秒、11 秒後查詢
+        + Then：5 秒時從 SQLite 命中且只在記憶體再存活 5 秒，11 秒時視為未命中，並在重新連線時清除
+        """
+        # Given
+        db_path = str(tmp_path / "translation.sqlite3")
+        mock_time = mocker.patch("src.card.translation_cache.time.time", return_value=1000)
+        mock_monotonic = mocker.patch("src.card.translation_cache.time.monotonic", return_value=0)
+        cache = TranslationCache(db_path, ttl=10)
+        cache.set("key", "value")
+        cache.close()
+
+        # When
+        mock_time.return_value = 1005
+        reopened_cache = TranslationCache(db_path, ttl=10)
+        fresh = reopened_cache.get("key")
+        mock_time.return_value = 1011
+        mock_monotonic.return_value = 6
+        expired = reopened_cache.get("key")
+        reopened_cache.close()
+        TranslationCache(db_path, ttl=10).get("key")
+
+        # Then
+        assert fresh == "value"
+        assert expired is None
+        assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM translation").fetchone() == (
+            0,
+        )
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_fork_reconnects(self, tmp_path: Path) -> None:
+        """
+        MUT
+        ---
+        `TranslationCache.get` / `TranslationCache.set`
+
+        Description
+        -----------
+        + Given：已連上 SQLite 的快取
+        + When：當 fork 出的子行程讀寫快取
+        + Then：子行程應使用自己的連線，寫入的條目父行程也讀得到
+        """
+        # Given
+        db_path = str(tmp_path / "translation.sqlite3")
+        cache = TranslationCache(db_path)
+        cache.set("効果", "效果")
+
+        # When
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover (子行程)
+            exit_code = 1
+            try:
+                if cache.get("効果") == "效果":
+                    cache.set("相手", "對手")
+                    exit_code = 0
+            finally:
+                os._exit(exit_code)
+        _, status = os.waitpid(pid, 0)
+
+        # Then
+        assert os.waitstatus_to_exitcode(status) == 0
+        cache._entries.clear()
+        assert cache.get("相手") == "對手"
+        assert cache.get("効果") == "效果"
+        cache.close()
+
+
+class TestCachedTranslator:
+    """
+    CUT
+    ---
+    `CachedTranslator`
+    """
+
+    def test_translate_hit_and_miss(self, mock_translator: MockType, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `CachedTranslator.translate`
+
+        Description
+        -----------
+        + Given：cached_translator 物件
+        + When：當同一段原文 (空白不同) 翻譯兩次
+        + Then：只有第一次會呼叫翻譯器
+        """
+        # Given
+        cached_translator = CachedTranslator(
+            mock_translator, TranslationCache(), logger=mock_logger
+        )
+
+        # When
+        first = cached_translator.translate("効果 発動")
+        second = cached_translator.translate("効果発動")
+
+        # Then
+        assert first == second == "譯：効果 発動"
+        mock_translator.translate_batch.assert_called_once_with(["効果 発動"])
+
+    def test_translate_batch_only_translates_misses(
+        self, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：已快取部分原文的 cached_translator 物件
+        + When：當整批翻譯 (含重複原文)
+        + Then：只把未命中且不重複的原文交給翻譯器，結果順序與輸入相同
+        """
+        # Given
+        cached_translator = CachedTranslator(
+            mock_translator, TranslationCache(), logger=mock_logger
+        )
+        cached_translator.translate("効果")
+        mock_translator.translate_batch.reset_mock()
+
+        # When
+        results = cached_translator.translate_batch(["効果", "相手", "墓地", "相手"])
+
+        # Then
+        assert results == ["譯：効果", "譯：相手", "譯：墓地", "譯：相手"]
+        mock_translator.translate_batch.assert_called_once_with(["相手", "墓地"])
+
+    def test_translate_fingerprint(
+        self, mocker: MockerFixture, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTranslator.translate`
+
+        Description
+        -----------
+        + Given：共用同一個快取、fingerprint 不同 (例如換了精度或 decoding profile) 的兩個翻譯器
+        + When：當翻譯同一段原文
+        + Then：不應讀到另一個翻譯器的翻譯
+        """
+        # Given
+        cache = TranslationCache()
+        other_translator = mocker.Mock(spec=AbstractTranslator)
+        other_translator.fingerprint = "other"
+        other_translator.translate_batch = mocker.Mock(return_value=["其他：効果"])
+        CachedTranslator(other_translator, cache, logger=mock_logger).translate("効果")
+
+        # When
+        result = CachedTranslator(mock_translator, cache, logger=mock_logger).translate("効果")
+
+        # Then
+        assert result == "譯：効果"
+        mock_translator.translate_batch.assert_called_once_with(["効果"])
+
+    def test_fingerprint_delegates(self, mock_translator: MockType, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `CachedTranslator.fingerprint` / `CachedTranslator.deterministic`
+
+        Description
+        -----------
+        + Given：包裝翻譯器的 CachedTranslator
+        + When：當取得 fingerprint 與 deterministic
+        + Then：應與被包裝的翻譯器相同 (以卡片密碼保存的完整翻譯以此區分模型)
+        """
+        # Given
+        mock_translator.deterministic = True
+
+        # When
+        cached_translator = CachedTranslator(
+            mock_translator, TranslationCache(), logger=mock_logger
+        )
+
+        # Then
+        assert cached_translator.fingerprint == "mock"
+        assert cached_translator.deterministic is True
+
+    def test_translate_stream_hit_and_miss(
+        self, mocker: MockerFixture, mock_translator: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `CachedTranslator.translate_stream`
+
+        Description
+        -----------
+        + Given：cached_translator 物件
+        + When：當同一段原文串流翻譯兩次
+        + Then：第一次逐片段產出並在結束後寫入快取，第二次直接一次產出快取結果
+        """
+        # Given
+        mock_translator.translate_stream = mocker.Mock(return_value=iter(["譯：", "効果"]))
+        cached_translator = CachedTranslator(
+            mock_translator, TranslationCache(), logger=mock_logger
+        )
+
+        # When
+        first = list(cached_translator.translate_stream("効果"))
+        second = list(cached_translator.translate_stream("効果"))
+
+        # Then
+        assert first == ["譯：", "効果"]
+        assert second == ["譯：効果"]
+        mock_translator.translate_stream.assert_called_once_with("効果")
@@ -0,0 +1,295 @@
+# standard library
+import asyncio
+import queue
+import threading
+from collections.abc import Iterator
+
+# 3rd party library
+import pytest
+from pytest_mock import MockerFixture, MockType
+
+# local module
+from src.card.translation_jobs import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    TranslationJob,
+    TranslationJobQueue,
+)
+from src.card.translation_pipeline import PipelineEvent
+from src.utils.deadline import Deadline, DeadlineExceededError
+from src.utils.event_loop import EventLoopThread
+
+
+@pytest.fixture(scope="function")
+def job_queue(mock_logger: MockType) -> Iterator[TranslationJobQueue]:
+    """
+    提供 1 個 worker、最多 1 個工作排隊的 `TranslationJobQueue` 物件 (測試結束時關閉)
+    """
+    job_queue = TranslationJobQueue(logger=mock_logger, max_workers=1, max_queue_size=1, ttl=60)
+    yield job_queue
+    job_queue.close()
+
+
+class TestTranslationJobQueue:
+    """
+    ## CUT
+    `TranslationJobQueue`
+    """
+
+    def test_init_valueerror(self, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `TranslationJobQueue.__init__`
+
+        Description
+        -----------
+        + Given：不合法的 ttl 或 timeout
+        + When：當建立 job_queue 物件
+        + Then：應拋出 ValueError
+        """
+        # Then
+        with pytest.raises(ValueError, match="ttl must > 0!"):
+            TranslationJobQueue(logger=mock_logger, ttl=0)
+        with pytest.raises(ValueError, match="timeout must > 0!"):
+            TranslationJobQueue(logger=mock_logger, timeout=0)
+        with pytest.raises(ValueError, match="max_in_flight must >= 1!"):
+            TranslationJobQueue(logger=mock_logger, max_in_flight=0)
+
+    def test_submit(self, job_queue: TranslationJobQueue) -> None:
+        """
+        MUT
+        ---
+        `TranslationJobQueue.submit` / `TranslationJob.watch`
+
+        Description
+        -----------
+        + Given：job_queue 物件
+        + When：當提交工作並觀看
+        + Then：工作應以有期限的 deadline 執行，依序產出 queued、running 與 done，
+                且工作成功並保存結果
+        """
+        # Given
+        deadlines: list[Deadline] = []
+
+        def run(deadline: Deadline) -> str:
+            deadlines.append(deadline)
+            return "翻譯"
+
+        # When
+        job = job_queue.submit(run)
+        events = list(job.watch(timeout=5))
+
+        # Then
+        assert events == [
+            PipelineEvent("stage", "queued"),
+            PipelineEvent("stage", "running"),
+            PipelineEvent("done", "翻譯"),
+        ]
+        remaining = deadlines[0].remaining()
+        assert remaining is not None and 0 < remaining <= 120
+        assert job.status == JOB_SUCCEEDED
+        assert job.result == "翻譯"
+        assert job_queue.get(job.id) is job
+        assert job_queue.get("unknown") is None
+
+    def test_submit_failed(self, job_queue: TranslationJobQueue, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `TranslationJobQueue.submit`
+
+        Description
+        -----------
+        + Given：job_queue 物件
+        + When：當翻譯流程拋出例外，或超過工作的期限
+        + Then：工作應失敗，最後一個事件為 error，並記錄日誌
+        """
+
+        # Given
+        def fail(deadline: Deadline) -> str:
+            raise RuntimeError("boom")
+
+        def time_out(deadline: Deadline) -> str:
+            raise DeadlineExceededError("deadline exceeded")
+
+        # When
+        failed = job_queue.submit(fail)
+        failed_events = list(failed.watch(timeout=5))
+        timed_out = job_queue.submit(time_out)
+        timed_out_events = list(timed_out.watch(timeout=5))
+
+        # Then
+        assert failed.status == JOB_FAILED
+        assert failed_events[-1] == PipelineEvent("error", "Translation failed")
+        mock_logger.exception.assert_called_once()
+        assert timed_out.status == JOB_FAILED
+        assert timed_out.error == "Translation timed out"
+        assert timed_out_events[-1] == PipelineEvent("error", "Translation timed out")
+        mock_logger.warning.assert_called_once()
+
+    def test_submit_queue_full(self, job_queue: TranslationJobQueue) -> None:
+        """
+        MUT
+        ---
+        `TranslationJobQueue.submit`
+
+        Description
+        -----------
+        + Given：worker 執行中、佇列也已滿的 job_queue 物件
+        + When：當再提交工作
+        + Then：應立即拋出 queue.Full，且不保存該工作
+        """
+        # Given
+        release = threading.Event()
+
+        def block(deadline: Deadline) -> str:
+            release.wait()
+            return ""
+
+        running = job_queue.submit(block)
+        queued = job_queue.submit(block)
+
+        # When
+        with pytest.raises(queue.Full):
+            job_queue.submit(block)
+
+        # Then
+        assert queued.status == JOB_QUEUED
+        assert job_queue.stats()["jobs"] == 2
+        release.set()
+        assert list(running.watch(timeout=5))[-1].event == "done"
+        assert list(queued.watch(timeout=5))[-1].event == "done"
+
+    def test_submit_async(self, mock_logger: MockType, event_loop_thread: EventLoopThread) -> None:
+        """
+        MUT
+        ---
+        `TranslationJobQueue.submit_async`
+
+        Description
+        -----------
+        + Given：1 個 worker、最多同時 200 個 event loop 工作的 job_queue 物件
+        + When：當提交 200 個等待中的工作 (例如等待 OCR)，再提交一個，之後讓工作完成
+        + Then：200 個工作應同時執行中 (不佔用 worker)，第 201 個應拋出 queue.Full 且不保存；
+                完成後所有工作成功 (失敗的工作記錄為 error)，並讓出名額
+        """
+        # Given
+        job_queue = TranslationJobQueue(
+            logger=mock_logger,
+            max_workers=1,
+            max_queue_size=1,
+            ttl=60,
+            event_loop=event_loop_thread,
+            max_in_flight=200,
+        )
+        release = asyncio.Event()
+        deadlines: list[Deadline] = []
+
+        async def wait_for_ocr(deadline: Deadline) -> str:
+            index = len(deadlines)
+            deadlines.append(deadline)
+            await release.wait()
+            if index == 0:
+                raise RuntimeError("boom")
+            return "翻譯"
+
+        # When
+        jobs = [job_queue.submit_async(wait_for_ocr) for _ in range(200)]
+        while len(deadlines) < 200:
+            threading.Event().wait(0.001)
+        with pytest.raises(queue.Full):
+            job_queue.submit_async(wait_for_ocr)
+        stats = job_queue.stats()
+        statuses = {job.status for job in jobs}
+        event_loop_thread.loop.call_soon_threadsafe(release.set)
+        last_events = [list(job.watch(timeout=5))[-1] for job in jobs]
+
+        # Then
+        assert stats["in_flight"] == 200
+        assert stats["jobs"] == 200
+        assert stats["stage"]["submitted"] == 0
+        assert statuses == {JOB_RUNNING}
+        assert last_events.count(PipelineEvent("done", "翻譯")) == 199
+        assert last_events.count(PipelineEvent("error", "Translation failed")) == 1
+        mock_logger.exception.assert_called_once()
+        assert job_queue.stats()["in_flight"] == 0
+        assert job_queue.stats()["jobs"] == 200
+        job_queue.close()
+
+    def test_submit_async_without_event_loop(self, job_queue: TranslationJobQueue) -> None:
+        """
+        MUT
+        ---
+        `TranslationJobQueue.submit_async`
+
+        Description
+        -----------
+        + Given：沒有 event loop 的 job_queue 物件
+        + When：當以 `submit_async` 提交工作
+        + Then：應拋出 RuntimeError
+        """
+
+        # Given
+        async def run(deadline: Deadline) -> str:
+            return "翻譯"
+
+        # When / Then
+        with pytest.raises(RuntimeError):
+            job_queue.submit_async(run)
+
+    def test_ttl_eviction(self, mocker: MockerFixture, job_queue: TranslationJobQueue) -> None:
+        """
+        MUT
+        ---
+        `TranslationJobQueue.get`
+
+        Description
+        -----------
+        + Given：已完成的工作
+        + When：當完成超過 ttl 秒後查詢
+        + Then：工作應已被淘汰
+        """
+        # Given
+        job = job_queue.submit(lambda deadline: "翻譯")
+        list(job.watch(timeout=5))
+        assert job_queue.get(job.id) is job
+        assert job.finished_at is not None
+
+        # When
+        mocker.patch("src.card.translation_jobs.time.monotonic", return_value=job.finished_at + 61)
+
+        # Then
+        assert job_queue.get(job.id) is None
+        assert job_queue.stats()["jobs"] == 0
+
+
+class TestTranslationJob:
+    """
+    ## CUT
+    `TranslationJob`
+    """
+
+    def test_watch_timeout(self) -> None:
+        """
+        MUT
+        ---
+        `TranslationJob.watch`
+
+        Description
+        -----------
+        + Given：沒有進展的工作
+        + When：當觀看並設定 timeout
+        + Then：產出目前的事件後，逾時即停止
+        """
+        # Given
+        job = TranslationJob("job")
+
+        # When
+        events = list(job.watch(timeout=0.01))
+
+        # Then
+        assert events == [PipelineEvent("stage", "queued")]
+        assert not job.finished
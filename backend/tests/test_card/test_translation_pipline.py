@@ -1,11 +1,37 @@
 # standard library
+import asyncio
+import io
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from pytest_mock import MockFixture, MockType
 
+from src.card.batching_translator import BatchingTranslator
+
 # local module
-from src.card.text_extractor import AbstractTextExtractor
-from src.card.translation_pipeline import TranslationPipeline, normalize_punctuation
+from src.card.card_recognizer import ArtworkCardRecognizer
+from src.card.postprocess import Replace
+from src.card.text_extractor import AbstractTextExtractor, ExtractedCard
+from src.card.translation_cache import CachedTranslator, TranslationCache
+from src.card.translation_pipeline import (
+    PUNCTUATION_MAP,
+    PipelineEvent,
+    TranslationPipeline,
+    normalize_punctuation,
+)
 from src.card.translator import AbstractTranslator
+from src.utils.deadline import (
+    AllDeadlines,
+    Deadline,
+    DeadlineExceededError,
+    check_deadline,
+    current_deadline,
+)
+from src.utils.single_flight import SingleFlight
+from src.utils.stage_executor import StageExecutor
 
 
 @pytest.fixture(scope="function")
@@ -14,7 +40,7 @@ def mock_text_extractor(mocker: MockFixture) -> MockType:
     模擬 `TextExtractor` 物件
     """
     mock_text_extractor = mocker.Mock(spec=AbstractTextExtractor)
-    mock_text_extractor.extract = mocker.Mock(return_value="Extracted text")
+    mock_text_extractor.extract = mocker.Mock(return_value=ExtractedCard("Extracted text"))
     return mock_text_extractor
 
 
@@ -25,6 +51,7 @@ def mock_translator(mocker: MockFixture) -> MockType:
     """
     mock_translator = mocker.Mock(spec=AbstractTranslator)
     mock_translator.translate = mocker.Mock(return_value="Translated text")
+    mock_translator.fingerprint = "mock"
     return mock_translator
 
 
@@ -126,6 +153,907 @@ class TestTranslationPipeline:
         mock_translator.translate.assert_called_once_with("Extracted text")
         mock_text_extractor.extract.assert_called_once_with("Source text")
 
+    def test_process_with_clause_segmentation(
+        self, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process`
+
+        Description
+        -----------
+        + Given：開啟子句切分的 translation_pipeline 物件
+        + When：當卡片效果含有效果編號與重複子句
+        + Then：應只將不重複的子句整批翻譯一次，並保留效果編號依原順序組回
+        """
+        # Given
+        mock_text_extractor.extract.return_value = ExtractedCard("①：Ａ。Ｂ。②：Ａ。")
+        mock_translator.translate_batch.side_effect = lambda texts: [f"<{text}>" for text in texts]
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor, mock_translator, clause_segmentation=True
+        )
+
+        # When
+        result = translation_pipeline.process("Source text")
+
+        # Then
+        assert result == "①：<Ａ。><Ｂ。>②：<Ａ。>"
+        mock_translator.translate_batch.assert_called_once_with(["Ａ。", "Ｂ。"])
+        mock_translator.translate.assert_not_called()
+
+    def test_process_with_clause_segmentation_keeps_newlines(
+        self, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process`
+
+        Description
+        -----------
+        + Given：開啟子句切分的 translation_pipeline 物件
+        + When：當卡片效果以換行分隔
+        + Then：翻譯器應只收到不含換行的句子，組回後換行應保留在原位置
+        """
+        # Given
+        mock_text_extractor.extract.return_value = ExtractedCard("①：Ａ。\nＢ。\n②：Ｃ。")
+        mock_translator.translate_batch.side_effect = lambda texts: [f"<{text}>" for text in texts]
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor, mock_translator, clause_segmentation=True
+        )
+
+        # When
+        result = translation_pipeline.process("Source text")
+
+        # Then
+        assert result == "①：<Ａ。>\n<Ｂ。>\n②：<Ｃ。>"
+        mock_translator.translate_batch.assert_called_once_with(["Ａ。", "Ｂ。", "Ｃ。"])
+
+    def test_process_stream(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process_stream`
+
+        Description
+        -----------
+        + Given：註冊了可串流與不可串流 hook 的 translation_pipeline 物件
+        + When：當串流翻譯
+        + Then：應依序產出階段、原文與翻譯片段 (只套用可串流 hook)，
+                最後產出套用所有 hook 的完整翻譯
+        """
+        # Given
+        mock_translator.translate_stream = mocker.Mock(return_value=iter(["Hello,", " world!"]))
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+        translation_pipeline.add_postprocess_hook(normalize_punctuation, streamable=True)
+        translation_pipeline.add_postprocess_hook(str.upper)
+
+        # When
+        events = list(translation_pipeline.process_stream("Source text"))
+
+        # Then
+        assert events == [
+            PipelineEvent("stage", "ocr_done"),
+            PipelineEvent("extracted", "Extracted text"),
+            PipelineEvent("token", "Hello，"),
+            PipelineEvent("token", " world！"),
+            PipelineEvent("done", "HELLO， WORLD！"),
+        ]
+        mock_translator.translate_stream.assert_called_once_with("Extracted text")
+
+    def test_process_stream_declarative_hooks(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process_stream`
+
+        Description
+        -----------
+        + Given：註冊了字元對照表與字面字串替換的 translation_pipeline 物件 (未指定 streamable)
+        + When：當串流翻譯
+        + Then：字元對照表應逐片段套用，字面字串替換只套用在完整翻譯
+        """
+        # Given
+        mock_translator.translate_stream = mocker.Mock(return_value=iter(["墓", "地,"]))
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+        translation_pipeline.add_postprocess_hook(PUNCTUATION_MAP)
+        translation_pipeline.add_postprocess_hook(Replace({"墓地": "墓地區"}))
+
+        # When
+        events = list(translation_pipeline.process_stream("Source text"))
+
+        # Then
+        assert events[2:] == [
+            PipelineEvent("token", "墓"),
+            PipelineEvent("token", "地，"),
+            PipelineEvent("done", "墓地區，"),
+        ]
+        assert len(translation_pipeline.postprocess_hooks.passes) == 2
+
+    def test_process_card_recognized(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process` / `TranslationPipeline.process_stream`
+
+        Description
+        -----------
+        + Given：以卡圖辨識卡片的 translation_pipeline 物件
+        + When：當第一次、第二次上傳同一張卡 (以 stream 上傳)
+        + Then：第一次走 OCR 與翻譯，並以 OCR 確認的密碼保存完整翻譯，之後直接回傳，
+                不必 OCR 也不必推論
+        """
+        # Given
+        mock_card_recognizer = mocker.Mock(spec=ArtworkCardRecognizer)
+        mock_card_recognizer.recognize = mocker.Mock(return_value=46986414)
+        mock_text_extractor.extract.return_value = ExtractedCard(
+            "Extracted text", password=46986414
+        )
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor,
+            mock_translator,
+            card_recognizer=mock_card_recognizer,
+            translation_store=TranslationCache(None, ttl=None),
+        )
+        translation_pipeline.add_postprocess_hook(str.upper)
+
+        # When
+        first = translation_pipeline.process(io.BytesIO(b"card photo"))
+        second = translation_pipeline.process(b"card photo")
+        events = list(translation_pipeline.process_stream(b"card photo"))
+
+        # Then
+        assert first == second == "TRANSLATED TEXT"
+        assert events == [
+            PipelineEvent("stage", "card_recognized"),
+            PipelineEvent("done", "TRANSLATED TEXT"),
+        ]
+        mock_text_extractor.extract.assert_called_once_with(b"card photo")
+        mock_translator.translate.assert_called_once_with("Extracted text")
+        assert (
+            translation_pipeline.translation_store.get(
+                translation_pipeline.translation_store_key(46986414)
+            )
+            == "TRANSLATED TEXT"
+        )
+
+    def test_process_card_not_recognized(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process`
+
+        Description
+        -----------
+        + Given：以卡圖辨識卡片的 translation_pipeline 物件
+        + When：當上傳辨識不出的卡片 (或以 URL 上傳)
+        + Then：每次都應走 OCR 與翻譯，且不保存完整翻譯
+        """
+        # Given
+        mock_card_recognizer = mocker.Mock(spec=ArtworkCardRecognizer)
+        mock_card_recognizer.recognize = mocker.Mock(return_value=None)
+        translation_store = TranslationCache(None, ttl=None)
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor,
+            mock_translator,
+            card_recognizer=mock_card_recognizer,
+            translation_store=translation_store,
+        )
+
+        # When
+        translation_pipeline.process(b"card photo")
+        translation_pipeline.process("https://fake/card.jpg")
+
+        # Then
+        assert mock_text_extractor.extract.call_count == 2
+        mock_card_recognizer.recognize.assert_called_once_with(b"card photo")
+        assert translation_store.stats()["memory_entries"] == 0
+
+    def test_process_card_recognize_single_flight(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process`
+
+        Description
+        -----------
+        + Given：卡圖辨識會等待的 translation_pipeline 物件
+        + When：當同一張圖片在辨識完成前被上傳 3 次
+        + Then：只辨識一次，所有請求都取得相同的翻譯
+        """
+        # Given
+        recognize_release = threading.Event()
+
+        def slow_recognize(image_bytes: bytes) -> int | None:
+            recognize_release.wait()
+            return None
+
+        mock_card_recognizer = mocker.Mock(spec=ArtworkCardRecognizer)
+        mock_card_recognizer.recognize = mocker.Mock(side_effect=slow_recognize)
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor, mock_translator, card_recognizer=mock_card_recognizer
+        )
+
+        # When
+        with ThreadPoolExecutor(3) as executor:
+            futures = [
+                executor.submit(translation_pipeline.process, b"card photo"),
+                executor.submit(translation_pipeline.process, io.BytesIO(b"card photo")),
+                executor.submit(translation_pipeline.process, b"card photo"),
+            ]
+            while translation_pipeline.recognize_flight.stats()["followers"] < 2:
+                threading.Event().wait(0.001)
+            recognize_release.set()
+            results = [future.result() for future in futures]
+
+        # Then
+        assert results == ["Translated text"] * 3
+        mock_card_recognizer.recognize.assert_called_once_with(b"card photo")
+        assert translation_pipeline.stats()["recognize_flight"]["leaders"] == 1
+
+    def test_process_card_password_mismatch(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process`
+
+        Description
+        -----------
+        + Given：以卡圖辨識卡片的 translation_pipeline 物件
+        + When：當 OCR 讀到的卡片密碼與卡圖辨識的結果不一致，或 OCR 讀不到密碼
+        + Then：應以 OCR 讀到的密碼查詢已完成的翻譯；查不到時翻譯，但不保存完整翻譯
+        """
+        # Given
+        mock_card_recognizer = mocker.Mock(spec=ArtworkCardRecognizer)
+        mock_card_recognizer.recognize = mocker.Mock(return_value=46986414)
+        translation_store = TranslationCache(None, ttl=None)
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor,
+            mock_translator,
+            card_recognizer=mock_card_recognizer,
+            translation_store=translation_store,
+        )
+        translation_store.set(translation_pipeline.translation_store_key(89631139), "Stored text")
+
+        # When
+        mock_text_extractor.extract.return_value = ExtractedCard(
+            "Extracted text", password=89631139
+        )
+        stored = translation_pipeline.process(b"card photo")
+        mock_text_extractor.extract.return_value = ExtractedCard(
+            "Extracted text", password=12345678
+        )
+        mismatched = translation_pipeline.process(b"card photo")
+        mock_text_extractor.extract.return_value = ExtractedCard("Extracted text")
+        unconfirmed = translation_pipeline.process(b"card photo")
+
+        # Then
+        assert stored == "Stored text"
+        assert mismatched == unconfirmed == "Translated text"
+        assert mock_translator.translate.call_count == 2
+        assert translation_store.get(translation_pipeline.translation_store_key(46986414)) is None
+        assert translation_store.get(translation_pipeline.translation_store_key(12345678)) is None
+        assert translation_store.stats()["memory_entries"] == 1
+
+    def test_process_password_short_circuit(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process` / `TranslationPipeline.process_stream`
+
+        Description
+        -----------
+        + Given：OCR 讀得到卡片密碼的 translation_pipeline 物件 (沒有卡圖辨識)
+        + When：當同一張卡第一次、第二次翻譯
+        + Then：第一次推論並以密碼保存完整翻譯，之後只需 OCR，直接回傳保存的翻譯
+        """
+        # Given
+        mock_text_extractor.extract.return_value = ExtractedCard(
+            "Extracted text", "【ドラゴン族／効果】", 89631139
+        )
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor, mock_translator, translation_store=TranslationCache(None, ttl=None)
+        )
+
+        # When
+        first = translation_pipeline.process(b"card photo")
+        second = translation_pipeline.process(b"card photo")
+        events = list(translation_pipeline.process_stream(b"card photo"))
+
+        # Then
+        assert first == second == "Translated text"
+        assert events == [
+            PipelineEvent("stage", "ocr_done"),
+            PipelineEvent("extracted", "Extracted text"),
+            PipelineEvent("done", "Translated text"),
+        ]
+        assert mock_text_extractor.extract.call_count == 3
+        mock_translator.translate.assert_called_once_with("Extracted text")
+        mock_translator.translate_stream.assert_not_called()
+
+    def test_translation_store_key(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.translation_store_key`
+
+        Description
+        -----------
+        + Given：共用同一個 translation_store 的 translation_pipeline 物件
+        + When：當以同一個密碼保存翻譯後，換了後處理 hook、子句切分或翻譯模型
+        + Then：key 應不同，不會讀到其他設定保存的翻譯；設定相同時 key 相同
+        """
+        # Given
+        mock_text_extractor.extract.return_value = ExtractedCard(
+            "Extracted text", password=89631139
+        )
+        translation_store = TranslationCache(None, ttl=None)
+
+        def make_pipeline(fingerprint: str = "mock", **kwargs) -> TranslationPipeline:
+            translator = mocker.Mock(spec=AbstractTranslator)
+            translator.translate = mocker.Mock(return_value=f"{fingerprint} text")
+            translator.fingerprint = fingerprint
+            return TranslationPipeline(
+                mock_text_extractor, translator, translation_store=translation_store, **kwargs
+            )
+
+        stored = make_pipeline()
+        stored.add_postprocess_hook(PUNCTUATION_MAP)
+        stored_key = stored.translation_store_key(89631139)
+        stored.process(b"card photo")
+
+        # When
+        same = make_pipeline()
+        same.add_postprocess_hook(PUNCTUATION_MAP)
+        other_hook = make_pipeline()
+        other_hook.add_postprocess_hook(PUNCTUATION_MAP)
+        other_hook.add_postprocess_hook(str.upper)
+        clauses = make_pipeline(clause_segmentation=True)
+        clauses.add_postprocess_hook(PUNCTUATION_MAP)
+        other_model = make_pipeline("other")
+        other_model.add_postprocess_hook(PUNCTUATION_MAP)
+
+        # Then
+        assert same.translation_store_key(89631139) == stored_key
+        assert same.process(b"card photo") == "mock text"
+        assert other_hook.translation_store_key(89631139) != stored_key
+        assert other_hook.process(b"card photo") == "MOCK TEXT"
+        assert clauses.translation_store_key(89631139) != stored_key
+        assert other_model.translation_store_key(89631139) != stored_key
+        assert other_model.process(b"card photo") == "other text"
+        same.translator.translate.assert_not_called()
+
+    def test_process_ocr_stage(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process` / `TranslationPipeline.stats`
+
+        Description
+        -----------
+        + Given：OCR 在 OCR 階段執行、推論在 micro-batching worker 執行的 translation_pipeline 物件
+        + When：當翻譯一張圖片
+        + Then：OCR 應在 OCR 階段的執行緒執行，且統計應列出兩個階段
+        """
+        # Given
+        ocr_threads: list[str] = []
+
+        def extract(src: str) -> ExtractedCard:
+            ocr_threads.append(threading.current_thread().name)
+            return ExtractedCard("Extracted text")
+
+        mock_text_extractor.extract = mocker.Mock(side_effect=extract)
+        mock_model = mocker.Mock(spec=AbstractTranslator)
+        mock_model.fingerprint = "mock"
+        mock_model.translate_batch = mocker.Mock(return_value=["Translated text"])
+        batching_translator = BatchingTranslator(mock_model, logger=mock_logger)
+        ocr_stage = StageExecutor("ocr", max_workers=1, max_queue_size=1)
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor,
+            CachedTranslator(
+                batching_translator, TranslationCache(None, ttl=None), logger=mock_logger
+            ),
+            ocr_stage=ocr_stage,
+        )
+
+        # When
+        result = translation_pipeline.process("Source text")
+        stats = translation_pipeline.stats()
+        batching_translator.close()
+        ocr_stage.close()
+
+        # Then
+        assert result == "Translated text"
+        assert len(ocr_threads) == 1 and ocr_threads[0].startswith("ocr")
+        assert stats["ocr"]["completed"] == 1
+        assert stats["translate"]["requests"] == 1
+        assert stats["extract_flight"]["leaders"] == 1
+
+    def test_process_deadline_exceeded(
+        self,
+        mocker: MockFixture,
+        mock_text_extractor: MockType,
+        mock_translator: MockType,
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process`
+
+        Description
+        -----------
+        + Given：OCR 在 OCR 階段執行的 translation_pipeline 物件
+        + When：當請求在 OCR 期間被取消
+        + Then：OCR 階段的執行緒應取得請求的期限 (合併等待同一張圖片的請求)，且取消後不再推論
+        """
+        # Given
+        deadline = Deadline(60)
+        ocr_deadlines: list[Deadline | None] = []
+
+        def extract(src: str) -> ExtractedCard:
+            ocr_deadlines.append(current_deadline())
+            deadline.cancel()
+            return ExtractedCard("Extracted text")
+
+        mock_text_extractor.extract = mocker.Mock(side_effect=extract)
+        ocr_stage = StageExecutor("ocr", max_workers=1, max_queue_size=1)
+        translation_pipeline = TranslationPipeline(
+            mock_text_extractor, mock_translator, ocr_stage=ocr_stage
+        )
+
+        # When
+        with pytest.raises(DeadlineExceededError):
+            translation_pipeline.process("Source text", deadline=deadline)
+        ocr_stage.close()
+
+        # Then
+        assert len(ocr_deadlines) == 1
+        assert ocr_deadlines[0] is not None and ocr_deadlines[0].expired
+        mock_translator.translate.assert_not_called()
+        assert current_deadline() is None
+
+    def test_process_stream_deadline(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process_stream`
+
+        Description
+        -----------
+        + Given：translation_pipeline 物件
+        + When：當以期限串流翻譯，並在讀取途中檢查呼叫端的 context
+        + Then：翻譯器在每個片段都應取得含請求期限的合併期限，呼叫端的 context 則不受影響
+        """
+        # Given
+        deadline = Deadline(60)
+        translator_deadlines: list[Deadline | None] = []
+
+        def translate_stream(text: str) -> Iterator[str]:
+            for chunk in ["a", "b"]:
+                translator_deadlines.append(current_deadline())
+                yield chunk
+
+        mock_translator.translate_stream = mocker.Mock(side_effect=translate_stream)
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+
+        # When
+        caller_deadlines: list[Deadline | None] = []
+        for _ in translation_pipeline.process_stream("Source text", deadline=deadline):
+            caller_deadlines.append(current_deadline())
+
+        # Then
+        flight_deadline = translator_deadlines[0]
+        assert translator_deadlines == [flight_deadline, flight_deadline]
+        assert isinstance(flight_deadline, AllDeadlines)
+        assert flight_deadline.deadlines == [deadline]
+        assert set(caller_deadlines) == {None}
+
+    def test_process_batch_deadline_exceeded(
+        self, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process_batch`
+
+        Description
+        -----------
+        + Given：translation_pipeline 物件
+        + When：當以已到期的期限批次翻譯
+        + Then：每張圖片都應以 `DeadlineExceededError` 失敗，且不 OCR
+        """
+        # Given
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+
+        # When
+        results = list(translation_pipeline.process_batch([b"a", b"b"], deadline=Deadline(0)))
+
+        # Then
+        assert len(results) == 2
+        assert all(isinstance(r.error, DeadlineExceededError) for r in results)
+        mock_text_extractor.extract.assert_not_called()
+
+    def test_process_batch(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process_batch`
+
+        Description
+        -----------
+        + Given：translation_pipeline 物件，以及含重複圖片、且有一張 OCR 失敗的多張圖片
+        + When：當批次翻譯
+        + Then：重複的圖片只翻譯一次但各自產出結果，失敗的圖片產出例外而不影響其他圖片；
+          OCR 完成的原文應一起交給 `translate_batch`
+        """
+
+        # Given
+        def extract(src: bytes) -> ExtractedCard:
+            if src == b"broken!":
+                raise RuntimeError("OCR failed")
+            return ExtractedCard(src.decode())
+
+        mock_text_extractor.extract.side_effect = extract
+        mock_translator.translate_batch = mocker.Mock(
+            side_effect=lambda texts: [t.upper() for t in texts]
+        )
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+
+        # When
+        results = sorted(
+            translation_pipeline.process_batch(
+                [b"a", b"b", b"a", b"broken"], max_workers=2, prepare=lambda b: b + b"!"
+            )
+        )
+
+        # Then
+        assert [(r.index, r.translated_text) for r in results] == [
+            (0, "A!"),
+            (1, "B!"),
+            (2, "A!"),
+            (3, None),
+        ]
+        assert isinstance(results[3].error, RuntimeError)
+        assert mock_text_extractor.extract.call_count == 3
+        mock_translator.translate_batch.assert_called_once()
+        assert sorted(mock_translator.translate_batch.call_args.args[0]) == ["a!", "b!"]
+        mock_translator.translate.assert_not_called()
+
+    def test_process_batch_batched_generation(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process_batch`
+
+        Description
+        -----------
+        + Given：推論階段為 `BatchingTranslator` 的 translation_pipeline 物件
+        + When：當批次翻譯 3 張 OCR 完成時間各不相同的圖片 (間隔遠大於湊批的時間窗)
+        + Then：3 段原文仍應合併成一批推論
+        """
+
+        # Given
+        def extract(src: bytes) -> ExtractedCard:
+            time.sleep({b"a": 0.0, b"b": 0.1, b"c": 0.2}[src])
+            return ExtractedCard(src.decode())
+
+        mock_text_extractor.extract.side_effect = extract
+        mock_model = mocker.Mock(spec=AbstractTranslator)
+        mock_model.translate_batch = mocker.Mock(
+            side_effect=lambda texts: [t.upper() for t in texts]
+        )
+        batching_translator = BatchingTranslator(
+            mock_model, logger=mock_logger, max_batch_size=8, max_wait=0.01
+        )
+        translation_pipeline = TranslationPipeline(mock_text_extractor, batching_translator)
+
+        # When
+        results = list(translation_pipeline.process_batch([b"a", b"b", b"c"]))
+        batching_translator.close()
+
+        # Then
+        assert sorted(r.translated_text for r in results) == ["A", "B", "C"]
+        mock_model.translate_batch.assert_called_once()
+        assert sorted(mock_model.translate_batch.call_args.args[0]) == ["a", "b", "c"]
+
+    def test_process_batch_waits_for_translation_in_flight(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process_batch`
+
+        Description
+        -----------
+        + Given：翻譯很慢的 translation_pipeline 物件，且另一個請求正在翻譯同一段原文
+        + When：當批次翻譯含這段原文與另一段原文的圖片
+        + Then：這段原文應等待進行中的翻譯，只有另一段原文交給 `translate_batch`
+        """
+        # Given
+        translate_started, translate_release = threading.Event(), threading.Event()
+
+        def slow_translate(text: str) -> str:
+            translate_started.set()
+            translate_release.wait(5)
+            return text.upper()
+
+        def translate_batch(texts: list[str]) -> list[str]:
+            # 批次翻譯開始時，等待中的原文已加入進行中的翻譯
+            translate_release.set()
+            return [t.upper() for t in texts]
+
+        mock_text_extractor.extract.side_effect = lambda src: ExtractedCard(src.decode())
+        mock_translator.translate.side_effect = slow_translate
+        mock_translator.translate_batch = mocker.Mock(side_effect=translate_batch)
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+
+        with ThreadPoolExecutor(1) as executor:
+            in_flight = executor.submit(translation_pipeline.process, b"a")
+            assert translate_started.wait(5)
+
+            # When
+            results = sorted(translation_pipeline.process_batch([b"a", b"b"]))
+
+            # Then
+            assert in_flight.result() == "A"
+        assert [(r.index, r.translated_text) for r in results] == [(0, "A"), (1, "B")]
+        mock_translator.translate_batch.assert_called_once_with(["b"])
+        mock_translator.translate.assert_called_once_with("a")
+
+    def test_process_single_flight(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process` / `TranslationPipeline.process_stream`
+
+        Description
+        -----------
+        + Given：OCR 與翻譯都很慢的 translation_pipeline 物件
+        + When：當同一張圖片在 OCR、翻譯完成前被上傳 3 次 (含一次串流)
+        + Then：只 OCR 一次、只翻譯一次，所有請求都取得相同的翻譯
+        """
+        # Given
+        ocr_release, translate_release = threading.Event(), threading.Event()
+
+        def slow_extract(src: bytes) -> ExtractedCard:
+            ocr_release.wait()
+            return ExtractedCard("Extracted text")
+
+        def slow_translate(text: str) -> str:
+            translate_release.wait()
+            return "Translated text"
+
+        def slow_translate_stream(text: str) -> Iterator[str]:
+            translate_release.wait()
+            yield "Translated text"
+
+        mock_text_extractor.extract.side_effect = slow_extract
+        mock_translator.translate.side_effect = slow_translate
+        mock_translator.translate_stream = mocker.Mock(side_effect=slow_translate_stream)
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+
+        def wait_followers(single_flight: SingleFlight, count: int) -> None:
+            while single_flight.stats()["followers"] < count:
+                threading.Event().wait(0.001)
+
+        # When
+        with ThreadPoolExecutor(3) as executor:
+            futures = [
+                executor.submit(translation_pipeline.process, b"card photo"),
+                executor.submit(translation_pipeline.process, io.BytesIO(b"card photo")),
+                executor.submit(lambda: list(translation_pipeline.process_stream(b"card photo"))),
+            ]
+            wait_followers(translation_pipeline.extract_flight, 2)
+            ocr_release.set()
+            wait_followers(translation_pipeline.translate_flight, 2)
+            translate_release.set()
+            results = [future.result() for future in futures]
+
+        # Then
+        assert results[:2] == ["Translated text", "Translated text"]
+        assert results[2][-1] == PipelineEvent("done", "Translated text")
+        mock_text_extractor.extract.assert_called_once_with(b"card photo")
+        assert (
+            mock_translator.translate.call_count + mock_translator.translate_stream.call_count == 1
+        )
+
+    def test_process_single_flight_short_deadline(
+        self, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process` / `TranslationPipeline.process_stream`
+
+        Description
+        -----------
+        + Given：OCR 會超過 0.2 秒的 translation_pipeline 物件
+        + When：當同一張圖片先以 0.2 秒的期限上傳，再以 30 秒的期限上傳
+        + Then：期限長的請求應取得翻譯，不會因先到的請求到期而失敗
+        """
+        # Given
+        ocr_started = threading.Event()
+
+        def slow_extract(src: bytes) -> ExtractedCard:
+            ocr_started.set()
+            threading.Event().wait(0.4)
+            check_deadline()
+            return ExtractedCard("Extracted text")
+
+        mock_text_extractor.extract.side_effect = slow_extract
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+
+        # When
+        with ThreadPoolExecutor(2) as executor:
+            leader = executor.submit(
+                translation_pipeline.process, b"card photo", deadline=Deadline(0.2)
+            )
+            ocr_started.wait()
+            follower = executor.submit(
+                translation_pipeline.process, b"card photo", deadline=Deadline(30)
+            )
+            result = follower.result()
+        leader.exception()
+
+        # Then
+        assert result == "Translated text"
+        assert translation_pipeline.stats()["extract_flight"]["leaders"] == 1
+
+    def test_process_single_flight_error(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.process`
+
+        Description
+        -----------
+        + Given：翻譯會失敗的 translation_pipeline 物件
+        + When：當同一段文字在翻譯完成前被送出 3 次 (不同圖片)
+        + Then：只翻譯一次，所有請求都收到同一個例外
+        """
+        # Given
+        release = threading.Event()
+
+        def failing_translate(text: str) -> str:
+            release.wait()
+            raise RuntimeError("CUDA out of memory")
+
+        mock_translator.translate.side_effect = failing_translate
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+
+        # When
+        with ThreadPoolExecutor(3) as executor:
+            futures = [
+                executor.submit(translation_pipeline.process, f"https://fake/{i}.jpg")
+                for i in range(3)
+            ]
+            while translation_pipeline.translate_flight.stats()["followers"] < 2:
+                threading.Event().wait(0.001)
+            release.set()
+
+        # Then
+        assert all(isinstance(future.exception(), RuntimeError) for future in futures)
+        mock_translator.translate.assert_called_once_with("Extracted text")
+
+    def test_aprocess(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.aprocess`
+
+        Description
+        -----------
+        + Given：OCR 為 coroutine、需要一段時間的 translation_pipeline 物件
+        + When：當在 event loop 上同時翻譯 3 次同一張圖片與 1 張不同的圖片
+        + Then：等待 OCR 時應讓出 event loop (4 個請求同時在 OCR 中)，同一張圖片只 OCR 一次；
+                不經過同步的 `extract`，推論在其他執行緒執行，所有請求都取得翻譯
+        """
+        # Given
+        ocr_in_flight: list[bytes] = []
+        translate_threads: list[str] = []
+
+        async def slow_aextract(src: bytes) -> ExtractedCard:
+            ocr_in_flight.append(src)
+            while len(ocr_in_flight) < 2:
+                await asyncio.sleep(0.001)
+            return ExtractedCard(f"Extracted {src.decode()}")
+
+        def translate(text: str) -> str:
+            translate_threads.append(threading.current_thread().name)
+            return f"Translated {text}"
+
+        mock_text_extractor.aextract = mocker.AsyncMock(side_effect=slow_aextract)
+        mock_translator.translate.side_effect = translate
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+        translation_pipeline.add_postprocess_hook(Replace({"Translated": "譯"}))
+
+        async def process_all() -> list[str]:
+            return await asyncio.gather(
+                translation_pipeline.aprocess(b"card photo"),
+                translation_pipeline.aprocess(io.BytesIO(b"card photo")),
+                translation_pipeline.aprocess(b"card photo"),
+                translation_pipeline.aprocess(b"other photo"),
+            )
+
+        # When
+        results = asyncio.run(process_all())
+
+        # Then
+        assert results == ["譯 Extracted card photo"] * 3 + ["譯 Extracted other photo"]
+        assert sorted(ocr_in_flight) == [b"card photo", b"other photo"]
+        mock_text_extractor.extract.assert_not_called()
+        assert translation_pipeline.extract_flight.stats()["followers"] == 2
+        assert translate_threads
+        assert threading.current_thread().name not in translate_threads
+
+    def test_aprocess_deadline_exceeded(
+        self, mocker: MockFixture, mock_text_extractor: MockType, mock_translator: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `TranslationPipeline.aprocess`
+
+        Description
+        -----------
+        + Given：translation_pipeline 物件
+        + When：當請求在 OCR 期間被取消
+        + Then：OCR 應取得請求的期限 (合併等待同一張圖片的請求)，且取消後不再推論
+        """
+        # Given
+        deadline = Deadline(60)
+        ocr_deadlines: list[Deadline | None] = []
+
+        async def aextract(src: bytes) -> ExtractedCard:
+            ocr_deadlines.append(current_deadline())
+            deadline.cancel()
+            return ExtractedCard("Extracted text")
+
+        mock_text_extractor.aextract = mocker.AsyncMock(side_effect=aextract)
+        translation_pipeline = TranslationPipeline(mock_text_extractor, mock_translator)
+
+        # When
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(translation_pipeline.aprocess(b"card photo", deadline=deadline))
+
+        # Then
+        assert len(ocr_deadlines) == 1
+        assert ocr_deadlines[0] is not None and ocr_deadlines[0].expired
+        mock_translator.translate.assert_not_called()
+        assert current_deadline() is None
+
 
 def test_normalize_punctuation() -> None:
     """
@@ -1,12 +1,15 @@
 # standard library
+import threading
 
 # 3rd party library
 import pytest
 import torch
 from pytest_mock import MockerFixture, MockType
+from transformers import MT5ForConditionalGeneration, PreTrainedTokenizerFast
 
 # local module
-from src.card.translator import YugiohTranslator
+from src.card.translator import YugiohTranslator, decoding_kwargs
+from src.utils.deadline import Deadline, DeadlineExceededError, deadline_scope
 
 
 @pytest.fixture(scope="function")
@@ -47,6 +50,46 @@ def translator(mocker: MockerFixture, mock_logger: MockType) -> YugiohTranslator
     return translator
 
 
+@pytest.mark.parametrize(
+    "profile, expected_kwargs",
+    [
+        ("greedy", {"do_sample": False, "num_beams": 1}),
+        ("beam-4", {"do_sample": False, "num_beams": 4, "early_stopping": True}),
+        ("sampling", {"do_sample": True, "top_k": 50, "top_p": 0.95, "temperature": 0.1}),
+    ],
+)
+def test_decoding_kwargs(profile: str, expected_kwargs: dict) -> None:
+    """
+    MUT
+    ---
+    `decoding_kwargs`
+
+    Description
+    -----------
+    + Given：decoding profile
+    + When：當呼叫 `decoding_kwargs`
+    + Then：應回傳對應的 `generate` 參數
+    """
+    assert decoding_kwargs(profile) == expected_kwargs
+
+
+@pytest.mark.parametrize("profile", ["beam", "beam-0", "top-k"])
+def test_decoding_kwargs_unknown_profile(profile: str) -> None:
+    """
+    MUT
+    ---
+    `decoding_kwargs`
+
+    Description
+    -----------
+    + Given：未知的 decoding profile
+    + When：當呼叫 `decoding_kwargs`
+    + Then：應拋出 `ValueError`
+    """
+    with pytest.raises(ValueError, match="Unknown decoding profile"):
+        decoding_kwargs(profile)
+
+
 class TestYugiohTranslator:
     """
     CUT
@@ -72,10 +115,11 @@ class TestYugiohTranslator:
         + Then：應啟動 tokenizer 與 model，並完成翻譯
         """
         # Given
-        translator._tokenizer.encode = mocker.Mock(return_value=mock_tensor)
-        translator._tokenizer.decode = mocker.Mock(
-            side_effect=["Translated text", "Something else...", "Something else..."]
-        )
+        mock_encodings = mocker.MagicMock(name="mock_encodings")
+        mock_encodings.to = mocker.Mock(return_value=mock_encodings)
+        translator._tokenizer.return_value = {"input_ids": [[1, 2, 3]]}
+        translator._tokenizer.pad = mocker.Mock(return_value=mock_encodings)
+        translator._tokenizer.batch_decode = mocker.Mock(return_value=["Translated text"])
         translator._model.generate = mocker.Mock(return_value=mock_tensor)
 
         # When
@@ -83,5 +127,425 @@ class TestYugiohTranslator:
 
         # Then
         assert translated_text == "Translated text"
-        translator._tokenizer.encode.assert_called_once()
+        translator._tokenizer.assert_called_once()
+        translator._tokenizer.pad.assert_called_once()
         translator._model.generate.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "padding, input_length, expected_length",
+        [
+            ("max_length", 10, 768),
+            ("longest", 10, 0),
+            ("bucket", 10, 64),
+            ("bucket", 64, 64),
+            ("bucket", 65, 128),
+            ("bucket", 700, 768),
+            ("bucket", 900, 768),
+        ],
+    )
+    def test__padded_length(
+        self, translator: YugiohTranslator, padding: str, input_length: int, expected_length: int
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator._padded_length`
+
+        Description
+        -----------
+        + Given：各種 padding 模式
+        + When：當輸入長度不同
+        + Then：應 pad 到對應的長度 (bucket 模式取不小於輸入長度的最小桶)
+        """
+        translator.padding = padding
+        assert translator._padded_length(input_length) == expected_length
+
+    @pytest.mark.parametrize(
+        "padding, input_length, expected_budget",
+        [
+            ("max_length", 10, 768),
+            ("bucket", 10, 36),
+            ("longest", 100, 216),
+            ("bucket", 500, 768),
+        ],
+    )
+    def test__output_budget(
+        self, translator: YugiohTranslator, padding: str, input_length: int, expected_budget: int
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator._output_budget`
+
+        Description
+        -----------
+        + Given：預設 ratio (2.0) 與 margin (16)
+        + When：當輸入長度不同
+        + Then：輸出預算應隨輸入長度成長，且不超過 `max_length`
+        """
+        translator.padding = padding
+        assert translator._output_budget(input_length) == expected_budget
+
+    def test_bucket_groups_inputs_by_length(
+        self, mocker: MockerFixture, tiny_translator: YugiohTranslator
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：bucket 模式的 translator 物件
+        + When：當整批翻譯長短差距大的文字時
+        + Then：應依桶分次推論，每次只 pad 到桶的上限，且結果順序與輸入相同
+        """
+        # Given
+        tiny_translator.padding = "bucket"
+        tiny_translator.length_buckets = (16, 32)
+        texts = ["効果", "このカードは通常召喚できない。", "相手"]
+        expected = [tiny_translator.translate(text) for text in texts]
+        spy_generate = mocker.spy(tiny_translator._model, "generate")
+
+        # When
+        results = tiny_translator.translate_batch(texts)
+
+        # Then
+        assert results == expected
+        input_widths = sorted(
+            call.kwargs["input_ids"].shape for call in spy_generate.call_args_list
+        )
+        assert input_widths == [(1, 32), (2, 16)]
+
+    def test_translate_batch_matches_single(self, tiny_translator: YugiohTranslator) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：載入迷你模型、使用 greedy decoding 的 translator 物件
+        + When：當整批翻譯長短不一的文字時
+        + Then：結果應與逐句呼叫 `translate` 完全相同
+        """
+        # Given
+        texts = ["このカードは通常召喚できない。", "①：自分フィールド", "効果"]
+
+        # When
+        batched = tiny_translator.translate_batch(texts)
+        singles = [tiny_translator.translate(text) for text in texts]
+
+        # Then
+        assert batched == singles
+
+    def test_dynamic_padding_matches_max_length(self, tiny_translator: YugiohTranslator) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：載入迷你模型、使用 greedy decoding 的 translator 物件
+        + When：當分別以 "max_length" 與 "longest" 模式翻譯
+        + Then：pad token 被遮蔽，結果應完全相同
+        """
+        # Given
+        texts = ["このカードは通常召喚できない。", "効果"]
+
+        # When
+        tiny_translator.padding = "max_length"
+        max_length_results = tiny_translator.translate_batch(texts)
+        tiny_translator.padding = "longest"
+        tiny_translator.output_length_margin = tiny_translator.max_length
+        longest_results = tiny_translator.translate_batch(texts)
+
+        # Then
+        assert longest_results == max_length_results
+
+    @pytest.mark.parametrize(
+        "profile, expected", [("greedy", True), ("beam-4", True), ("sampling", False)]
+    )
+    def test_deterministic(
+        self, mocker: MockerFixture, mock_logger: MockType, profile: str, expected: bool
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.deterministic`
+
+        Description
+        -----------
+        + Given：不同 decoding profile 的 translator 物件
+        + When：當查詢 `deterministic`
+        + Then：只有取樣 profile 為非確定性
+        """
+        mocker.patch("src.card.translator.AutoTokenizer.from_pretrained")
+        mocker.patch("src.card.translator.MT5ForConditionalGeneration.from_pretrained")
+        assert YugiohTranslator(logger=mock_logger, decoding=profile).deterministic is expected
+
+    def test_fingerprint(self, mocker: MockerFixture, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.fingerprint`
+
+        Description
+        -----------
+        + Given：decoding profile 或精度不同的 translator 物件
+        + When：當查詢 `fingerprint`
+        + Then：設定不同時應不同，並含模型版本
+        """
+        mocker.patch("src.card.translator.AutoTokenizer.from_pretrained")
+        mocker.patch("src.card.translator.MT5ForConditionalGeneration.from_pretrained")
+        mocker.patch.object(
+            YugiohTranslator, "_apply_precision", side_effect=lambda model, _: model
+        )
+        fingerprints = {
+            YugiohTranslator(logger=mock_logger, decoding=decoding, precision=precision).fingerprint
+            for decoding, precision in [("greedy", "fp32"), ("beam-4", "fp32"), ("greedy", "int8")]
+        }
+        assert len(fingerprints) == 3
+        assert all("defualt_0321-0402" in fingerprint for fingerprint in fingerprints)
+
+    def test_beam_search_matches_single(self, tiny_translator: YugiohTranslator) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.translate_batch`
+
+        Description
+        -----------
+        + Given：使用 beam search 的迷你模型 translator 物件
+        + When：當整批翻譯與逐句翻譯
+        + Then：結果應完全相同 (確定性)
+        """
+        # Given
+        tiny_translator._generate_kwargs = decoding_kwargs("beam-3")
+        texts = ["このカードは通常召喚できない。", "効果"]
+
+        # When
+        batched = tiny_translator.translate_batch(texts)
+        singles = [tiny_translator.translate(text) for text in texts]
+
+        # Then
+        assert batched == singles
+
+    @pytest.mark.parametrize("profile", ["greedy", "beam-3"])
+    def test_translate_stream_matches_translate(
+        self, tiny_translator: YugiohTranslator, profile: str
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.translate_stream`
+
+        Description
+        -----------
+        + Given：迷你模型 translator 物件
+        + When：當串流翻譯
+        + Then：所有片段串起來應與 `translate` 相同 (beam search 只產出一個片段)
+        """
+        # Given
+        tiny_translator._generate_kwargs = decoding_kwargs(profile)
+        text = "このカードは通常召喚できない。"
+
+        # When
+        chunks = list(tiny_translator.translate_stream(text))
+
+        # Then
+        assert "".join(chunks) == tiny_translator.translate(text)
+        if profile == "beam-3":
+            assert len(chunks) == 1
+
+    def test_translate_stream_propagates_exception(
+        self, mocker: MockerFixture, tiny_translator: YugiohTranslator
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.translate_stream`
+
+        Description
+        -----------
+        + Given：generate 會失敗的迷你模型 translator 物件
+        + When：當串流翻譯
+        + Then：背景執行緒的例外應在呼叫端拋出 (不會卡住)
+        """
+        # Given
+        mocker.patch.object(tiny_translator._model, "generate", side_effect=RuntimeError("boom"))
+
+        # When / Then
+        with pytest.raises(RuntimeError, match="boom"):
+            list(tiny_translator.translate_stream("効果"))
+
+    def test_translate_deadline_exceeded(
+        self, mocker: MockerFixture, tiny_translator: YugiohTranslator
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.translate`
+
+        Description
+        -----------
+        + Given：迷你模型 translator 物件
+        + When：當請求在生成途中被取消
+        + Then：應在下一個 token 停止生成，並拋出 `DeadlineExceededError` (不回傳截斷的結果)
+        """
+        # Given
+        deadline = Deadline()
+        generate = tiny_translator._model.generate
+        output_lengths: list[int] = []
+
+        def cancel_and_generate(**kwargs: object) -> torch.Tensor:
+            deadline.cancel()
+            output = generate(**kwargs)
+            output_lengths.append(output.shape[1])
+            return output
+
+        mocker.patch.object(tiny_translator._model, "generate", side_effect=cancel_and_generate)
+
+        # When / Then
+        with deadline_scope(deadline), pytest.raises(DeadlineExceededError):
+            tiny_translator.translate("このカードは通常召喚できない。")
+        # decoder 起始 token + 1 個生成的 token
+        assert output_lengths == [2]
+
+        # 已到期的請求不再推論
+        with deadline_scope(deadline), pytest.raises(DeadlineExceededError):
+            tiny_translator.translate("効果")
+        assert output_lengths == [2]
+
+    def test_translate_stream_cancelled_when_closed(
+        self, mocker: MockerFixture, tiny_translator: YugiohTranslator
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.translate_stream`
+
+        Description
+        -----------
+        + Given：迷你模型 translator 物件
+        + When：當呼叫端讀取第一個片段後關閉串流 (client 中斷連線)
+        + Then：背景執行緒的生成應被取消
+        """
+        # Given
+        generate_errors: list[Exception] = []
+        _generate = tiny_translator._generate
+
+        def record_generate(*args: object, **kwargs: object) -> list[str]:
+            try:
+                return _generate(*args, **kwargs)  # type: ignore[arg-type]
+            except Exception as e:
+                generate_errors.append(e)
+                raise
+
+        mocker.patch.object(tiny_translator, "_generate", side_effect=record_generate)
+        # 生成夠長，關閉串流時仍在生成
+        tiny_translator.max_length = 256
+        tiny_translator.output_length_margin = 256
+        tiny_translator._generate_kwargs = {
+            **tiny_translator._generate_kwargs,
+            "min_new_tokens": 256,
+        }
+
+        # When
+        stream = tiny_translator.translate_stream("このカードは通常召喚できない。" * 4)
+        next(stream)
+        stream.close()
+
+        # Then
+        threads = [t for t in threading.enumerate() if t.name == "YugiohTranslator-stream"]
+        for thread in threads:
+            thread.join(5)
+        assert len(generate_errors) == 1
+        assert isinstance(generate_errors[0], DeadlineExceededError)
+
+    def test_int8_precision(
+        self,
+        mocker: MockerFixture,
+        mock_logger: MockType,
+        tiny_tokenizer: PreTrainedTokenizerFast,
+        tiny_model: MT5ForConditionalGeneration,
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.__init__`
+
+        Description
+        -----------
+        + Given：precision 為 "int8"
+        + When：當建立 translator 並翻譯
+        + Then：Linear 層應被動態量化、在 CPU 上推論，並記錄載入時間與延遲
+        """
+        # Given
+        mocker.patch(
+            "src.card.translator.AutoTokenizer.from_pretrained", return_value=tiny_tokenizer
+        )
+        mocker.patch(
+            "src.card.translator.MT5ForConditionalGeneration.from_pretrained",
+            return_value=tiny_model,
+        )
+
+        # When
+        translator = YugiohTranslator(logger=mock_logger, precision="int8")
+        translator.max_length = 32
+        translated_text = translator.translate("このカードは通常召喚できない。")
+        stats = translator.stats()
+
+        # Then
+        assert isinstance(translated_text, str)
+        assert not any(type(module) is torch.nn.Linear for module in translator._model.modules())
+        assert stats["precision"] == "int8"
+        assert stats["device"] == "cpu"
+        assert stats["load_seconds"] >= 0
+        assert stats["latency"]["count"] == 1
+        # 不應改動原本的 fp32 模型
+        assert any(type(module) is torch.nn.Linear for module in tiny_model.modules())
+
+    def test_bf16_fallback_when_unsupported(
+        self, mocker: MockerFixture, mock_logger: MockType
+    ) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.__init__`
+
+        Description
+        -----------
+        + Given：CPU 不支援 bf16
+        + When：當以 precision "bf16" 建立 translator
+        + Then：應退回 fp32 並發出警告
+        """
+        # Given
+        mocker.patch("src.card.translator.AutoTokenizer.from_pretrained")
+        mocker.patch("src.card.translator.MT5ForConditionalGeneration.from_pretrained")
+        mocker.patch("src.card.translator.torch.backends.mkldnn.is_available", return_value=False)
+
+        # When
+        translator = YugiohTranslator(logger=mock_logger, precision="bf16")
+
+        # Then
+        assert translator.precision == "fp32"
+        mock_logger.warning.assert_called_once()
+
+    def test_unknown_precision(self, mocker: MockerFixture, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `YugiohTranslator.__init__`
+
+        Description
+        -----------
+        + Given：未知的 precision
+        + When：當建立 translator
+        + Then：應拋出 `ValueError`
+        """
+        mocker.patch("src.card.translator.AutoTokenizer.from_pretrained")
+        mocker.patch("src.card.translator.MT5ForConditionalGeneration.from_pretrained")
+        with pytest.raises(ValueError, match="Unknown precision: fp8"):
+            YugiohTranslator(logger=mock_logger, precision="fp8")
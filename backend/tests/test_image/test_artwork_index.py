@@ -0,0 +1,120 @@
+# standard library
+import io
+from collections.abc import Callable
+from pathlib import Path
+
+# 3rd party library
+import numpy as np
+import pytest
+from PIL import Image
+from pytest_mock import MockType
+
+# local module
+from src.image.artwork_index import ARTWORK_BOX, ArtworkIndex, ArtworkMatch
+
+
+def photograph_card(artwork: bytes, *, size: tuple[int, int] = (413, 602)) -> Image.Image:
+    """把卡圖貼進卡框，再縮放、重新壓縮 (模擬使用者拍的卡片照片)"""
+    card = Image.new("RGB", (590, 860), (160, 110, 60))
+    left, top, right, bottom = ARTWORK_BOX
+    box = (round(left * 590), round(top * 860), round(right * 590), round(bottom * 860))
+    card.paste(Image.open(io.BytesIO(artwork)).resize((box[2] - box[0], box[3] - box[1])), box)
+
+    buffer = io.BytesIO()
+    card.resize(size).save(buffer, "JPEG", quality=70)
+    return Image.open(buffer)
+
+
+@pytest.fixture(scope="function")
+def artwork_dir(tmp_path: Path, make_card_photo: Callable[..., bytes]) -> Path:
+    """
+    提供放有 3 張卡圖 (檔名為卡片密碼) 與 1 個無關檔案的資料夾
+    """
+    for seed, password in enumerate([89631139, 46986414, 55144522]):
+        (tmp_path / f"{password}.jpg").write_bytes(make_card_photo(seed, size=(624, 614)))
+    (tmp_path / "README.md").write_text("not an artwork")
+    return tmp_path
+
+
+class TestArtworkIndex:
+    """
+    ## CUT
+    `ArtworkIndex`
+    """
+
+    def test_build_save_load(self, tmp_path: Path, artwork_dir: Path, mock_logger: MockType):
+        """
+        MUT
+        ---
+        `ArtworkIndex.build` / `ArtworkIndex.save` / `ArtworkIndex.load`
+
+        Description
+        -----------
+        + Given：放有卡圖的資料夾
+        + When：當建立索引、存檔後再讀回
+        + Then：應只收錄卡圖，且每張卡圖的指紋為 4 個 uint64
+        """
+        # When
+        index = ArtworkIndex.build(str(artwork_dir), logger=mock_logger)
+        index.save(str(tmp_path / "index.npz"))
+        loaded = ArtworkIndex.load(str(tmp_path / "index.npz"))
+
+        # Then
+        assert loaded.passwords.tolist() == [46986414, 55144522, 89631139]
+        assert loaded.fingerprints.shape == (3, 4)
+        assert loaded.fingerprints.dtype == np.uint64
+        assert np.array_equal(loaded.fingerprints, index.fingerprints)
+
+    def test_match(
+        self, artwork_dir: Path, mock_logger: MockType, make_card_photo: Callable[..., bytes]
+    ) -> None:
+        """
+        MUT
+        ---
+        `ArtworkIndex.match`
+
+        Description
+        -----------
+        + Given：3 張卡圖的索引
+        + When：當以其中一張卡的照片，以及索引外的卡片照片比對
+        + Then：前者應辨識出卡片密碼，後者不應辨識出任何卡片
+        """
+        # Given
+        index = ArtworkIndex.build(str(artwork_dir), logger=mock_logger)
+        known = photograph_card((artwork_dir / "46986414.jpg").read_bytes())
+        unknown = photograph_card(make_card_photo(99))
+
+        # When
+        known_match = index.match(known, max_distance=40, min_margin=16)
+        unknown_match = index.match(unknown, max_distance=40, min_margin=16)
+
+        # Then
+        assert isinstance(known_match, ArtworkMatch)
+        assert known_match.password == 46986414
+        assert unknown_match is None
+
+    def test_match_min_margin(self, mock_logger: MockType, artwork_dir: Path) -> None:
+        """
+        MUT
+        ---
+        `ArtworkIndex.match`
+
+        Description
+        -----------
+        + Given：同一張卡圖以兩個密碼收錄 (例如異圖卡) 的索引
+        + When：當以該卡的照片比對
+        + Then：最近的兩張距離差不到 min_margin，沒有把握，不應辨識出卡片
+        """
+        # Given
+        index = ArtworkIndex.build(str(artwork_dir), logger=mock_logger)
+        duplicated = ArtworkIndex(
+            np.append(index.passwords, 11111111),
+            np.vstack([index.fingerprints, index.fingerprints[0]]),
+        )
+        card = photograph_card((artwork_dir / "46986414.jpg").read_bytes())
+
+        # When
+        match = duplicated.match(card, max_distance=40, min_margin=16)
+
+        # Then
+        assert match is None
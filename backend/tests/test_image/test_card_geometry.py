@@ -0,0 +1,226 @@
+# standard library
+import io
+from collections.abc import Callable
+
+# 3rd party library
+import numpy as np
+import pytest
+from PIL import Image
+
+# local module
+from src.image.card_geometry import (
+    CARD_ASPECT_RATIO,
+    TEXT_BOX,
+    card_difference_hash,
+    detect_card_quad,
+    perspective_transform,
+    rectify_card,
+    rectify_card_image,
+    rectify_card_with_hash,
+)
+from src.image.perceptual_hash import hamming_distance
+
+# 照片中卡片的四個角 (左上、右上、右下、左下)
+SKEWED_QUAD = [(500, 150), (1050, 230), (980, 1050), (380, 960)]
+
+
+def test_perspective_transform() -> None:
+    """
+    MUT
+    ---
+    `perspective_transform`
+
+    Description
+    -----------
+    + Given：兩組四個點
+    + When：當計算透視變換
+    + Then：`src` 的四個點應對應到 `dst` 的四個點
+    """
+    # Given
+    src = np.array([[0, 0], [100, 0], [100, 150], [0, 150]], dtype=np.float64)
+    dst = np.array(SKEWED_QUAD, dtype=np.float64)
+
+    # When
+    homography = perspective_transform(src, dst)
+
+    # Then
+    points = np.c_[src, np.ones(4)] @ homography.T
+    assert points[:, :2] / points[:, 2:] == pytest.approx(dst)
+
+
+class TestDetectCardQuad:
+    """
+    ## CUT
+    `detect_card_quad`
+    """
+
+    def test_detect_card_quad(self, make_card_scene: Callable[..., bytes]) -> None:
+        """
+        MUT
+        ---
+        `detect_card_quad`
+
+        Description
+        -----------
+        + Given：桌上斜拍的卡片照片
+        + When：當找出卡片的四個角
+        + Then：四個角與實際位置的誤差應在照片長邊的 1.5% 以內
+        """
+        # Given
+        image = Image.open(io.BytesIO(make_card_scene(0, SKEWED_QUAD)))
+
+        # When
+        quad = detect_card_quad(image)
+
+        # Then
+        assert quad is not None
+        assert np.abs(quad - np.array(SKEWED_QUAD)).max() < 1600 * 0.015
+
+    @pytest.mark.parametrize(
+        "quad",
+        [
+            # 卡片太小
+            [(700, 500), (760, 500), (760, 590), (700, 590)],
+            # 寬高比不像卡片 (橫放)
+            [(300, 300), (1300, 300), (1300, 900), (300, 900)],
+        ],
+    )
+    def test_detect_card_quad_none(
+        self, make_card_scene: Callable[..., bytes], quad: list[tuple[float, float]]
+    ) -> None:
+        """
+        MUT
+        ---
+        `detect_card_quad`
+
+        Description
+        -----------
+        + Given：沒有卡片、卡片太小或寬高比不像卡片的照片
+        + When：當找出卡片的四個角
+        + Then：應回傳 None
+        """
+        # Then
+        assert detect_card_quad(Image.new("RGB", (800, 600), (90, 90, 90))) is None
+        assert detect_card_quad(Image.open(io.BytesIO(make_card_scene(0, quad)))) is None
+
+
+class TestRectifyCard:
+    """
+    ## CUT
+    `rectify_card`
+    """
+
+    def test_rectify_card(
+        self, make_card_photo: Callable[..., bytes], make_card_scene: Callable[..., bytes]
+    ) -> None:
+        """
+        MUT
+        ---
+        `rectify_card`
+
+        Description
+        -----------
+        + Given：桌上斜拍的卡片照片
+        + When：當校正並切出效果框
+        + Then：應為指定寬度的灰階圖片，內容與正面卡片的效果框相近，且比原照片小
+        """
+        # Given
+        photo = make_card_scene(0, SKEWED_QUAD)
+
+        # When
+        text_box_bytes = rectify_card(photo, width=600)
+
+        # Then
+        assert text_box_bytes is not None
+        assert len(text_box_bytes) < len(photo)
+        text_box = Image.open(io.BytesIO(text_box_bytes))
+        left, top, right, bottom = TEXT_BOX
+        height = 600 / CARD_ASPECT_RATIO
+        assert text_box.mode == "L"
+        assert text_box.size == (round((right - left) * 600), round((bottom - top) * height))
+
+        card = Image.open(io.BytesIO(make_card_photo(0))).convert("L")
+        expected = card.crop(
+            (left * card.width, top * card.height, right * card.width, bottom * card.height)
+        ).resize(text_box.size)
+        difference = np.abs(np.asarray(text_box, np.float32) - np.asarray(expected, np.float32))
+        assert difference.mean() < 15
+
+    def test_rectify_card_no_card(self) -> None:
+        """
+        MUT
+        ---
+        `rectify_card`
+
+        Description
+        -----------
+        + Given：沒有卡片的照片
+        + When：當校正並切出效果框
+        + Then：應回傳 None
+        """
+        # Given
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), (90, 90, 90)).save(buffer, "JPEG")
+
+        # Then
+        assert rectify_card(buffer.getvalue()) is None
+
+    def test_rectify_card_with_hash(self, make_card_scene: Callable[..., bytes]) -> None:
+        """
+        MUT
+        ---
+        `rectify_card_with_hash`
+
+        Description
+        -----------
+        + Given：桌上斜拍的卡片照片，與沒有卡片的照片
+        + When：當以同一次偵測切出效果框並計算雜湊
+        + Then：效果框應與 `rectify_card` 相同，雜湊應與 `card_difference_hash` 相近；
+          沒有卡片時效果框為 None，雜湊為整張照片的雜湊
+        """
+        # Given
+        photo = make_card_scene(0, SKEWED_QUAD)
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), (90, 90, 90)).save(buffer, "JPEG")
+
+        # When
+        text_box, card_hash, card_found = rectify_card_with_hash(photo, width=600)
+        no_card = rectify_card_with_hash(buffer.getvalue())
+
+        # Then
+        assert text_box == rectify_card(photo, width=600)
+        assert card_found
+        assert hamming_distance(card_hash, card_difference_hash(photo)[0]) <= 8
+        assert no_card[0] is None
+        assert not no_card[2]
+
+
+def test_rectify_card_image(
+    make_card_photo: Callable[..., bytes], make_card_scene: Callable[..., bytes]
+) -> None:
+    """
+    MUT
+    ---
+    `rectify_card_image`
+
+    Description
+    -----------
+    + Given：桌上斜拍的卡片照片，與沒有卡片的照片
+    + When：當校正整張卡片
+    + Then：應為指定寬度的灰階卡片，內容與正面卡片相近；沒有卡片時回傳 None
+    """
+    # Given
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), (90, 90, 90)).save(buffer, "JPEG")
+
+    # When
+    card = rectify_card_image(make_card_scene(0, SKEWED_QUAD), width=256)
+
+    # Then
+    assert card is not None
+    assert card.mode == "L"
+    assert card.size == (256, round(256 / CARD_ASPECT_RATIO))
+    expected = Image.open(io.BytesIO(make_card_photo(0))).convert("L").resize(card.size)
+    difference = np.abs(np.asarray(card, np.float32) - np.asarray(expected, np.float32))
+    assert difference.mean() < 15
+    assert rectify_card_image(buffer.getvalue()) is None
@@ -0,0 +1,113 @@
+# standard library
+from collections.abc import Callable
+
+# 3rd party library
+import pytest
+
+# local module
+from src.image.perceptual_hash import HammingIndex, difference_hash, hamming_distance
+
+
+def test_difference_hash(make_card_photo: Callable[..., bytes]) -> None:
+    """
+    MUT
+    ---
+    `difference_hash`
+
+    Description
+    -----------
+    + Given：一張照片、其重新壓縮與縮放過的複本，以及另一張照片
+    + When：當計算 dHash
+    + Then：複本與原圖只差幾個 bit，不同照片則差很多
+    """
+    # Given
+    original = make_card_photo(0)
+    recompressed = make_card_photo(0, quality=50)
+    resized = make_card_photo(0, size=(413, 602), quality=70)
+    other = make_card_photo(1)
+
+    # When
+    original_hash = difference_hash(original)
+
+    # Then
+    assert original_hash.bit_length() <= 256
+    assert hamming_distance(original_hash, difference_hash(recompressed)) <= 8
+    assert hamming_distance(original_hash, difference_hash(resized)) <= 8
+    assert hamming_distance(original_hash, difference_hash(other)) > 64
+
+
+class TestHammingIndex:
+    """
+    ## CUT
+    `HammingIndex`
+    """
+
+    @pytest.mark.parametrize(
+        "bits, max_distance, message",
+        [(64, -1, "max_distance must >= 0!"), (4, 4, "bits must > max_distance!")],
+    )
+    def test_init_valueerror(self, bits: int, max_distance: int, message: str) -> None:
+        """
+        MUT
+        ---
+        `HammingIndex.__init__`
+
+        Description
+        -----------
+        + Given：不合法的 bit 數或距離
+        + When：當建立 hamming_index 物件
+        + Then：應拋出 ValueError
+        """
+        # When / Then
+        with pytest.raises(ValueError, match=message):
+            HammingIndex(bits, max_distance)
+
+    def test_nearest(self) -> None:
+        """
+        MUT
+        ---
+        `HammingIndex.nearest`
+
+        Description
+        -----------
+        + Given：加入數個雜湊的 hamming_index 物件
+        + When：當查詢與其中一個雜湊相差數個 bit (分散在各段) 的雜湊
+        + Then：應找到距離最近且不超過 max_distance 的雜湊，超過則找不到
+        """
+        # Given
+        hamming_index = HammingIndex(64, 3)
+        near, far = 0x0123_4567_89AB_CDEF, 0xFEDC_BA98_7654_3210
+        hamming_index.add(near)
+        hamming_index.add(far)
+
+        # When / Then
+        three_bits = near ^ (1 << 0) ^ (1 << 20) ^ (1 << 40)
+        assert hamming_index.nearest(near) == (near, 0)
+        assert hamming_index.nearest(three_bits) == (near, 3)
+        assert hamming_index.nearest(three_bits ^ (1 << 60)) is None
+
+    def test_remove(self) -> None:
+        """
+        MUT
+        ---
+        `HammingIndex.remove`
+
+        Description
+        -----------
+        + Given：加入兩個雜湊的 hamming_index 物件
+        + When：當移除其中一個雜湊 (包含重複移除)
+        + Then：被移除的雜湊不會再被查到
+        """
+        # Given
+        hamming_index = HammingIndex(64, 2)
+        hamming_index.add(0b1111)
+        hamming_index.add(0b1 << 40)
+
+        # When
+        hamming_index.remove(0b1111)
+        hamming_index.remove(0b1111)
+
+        # Then
+        assert len(hamming_index) == 1
+        assert hamming_index.nearest(0b1111) is None
+        assert hamming_index.nearest(0b1 << 40) == (0b1 << 40, 0)
@@ -0,0 +1,219 @@
+# standard library
+import io
+import struct
+import zlib
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+# 3rd party library
+import numpy as np
+import pytest
+from PIL import Image
+from pytest_mock import MockerFixture, MockType
+
+# local module
+from src.image.upload_normalizer import NormalizedUpload, UploadNormalizer, normalize_image
+
+
+def encode(image: Image.Image, format: str = "JPEG", **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format, **kwargs)
+    return buffer.getvalue()
+
+
+def png_bomb(width: int, height: int) -> bytes:
+    """宣告尺寸遠大於實際資料的 PNG (用來模擬解壓縮炸彈，只有開頭的 chunk)"""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(b"\0"))
+
+
+@pytest.fixture(scope="function")
+def upload_normalizer(mock_logger: MockType) -> Iterator[UploadNormalizer]:
+    """
+    提供 `UploadNormalizer` 物件 (測試結束時關閉行程池)
+    """
+    upload_normalizer = UploadNormalizer(logger=mock_logger, max_workers=1, max_edge=400)
+    yield upload_normalizer
+    upload_normalizer.close()
+
+
+class TestNormalizeImage:
+    """
+    ## CUT
+    `normalize_image`
+    """
+
+    def test_normalize_image_oversized(self, make_card_photo: Callable[..., bytes]) -> None:
+        """
+        MUT
+        ---
+        `normalize_image`
+
+        Description
+        -----------
+        + Given：超過最長邊的照片
+        + When：當正規化
+        + Then：應等比例縮到最長邊，且比原圖小
+        """
+        # Given
+        photo = make_card_photo(0, size=(1180, 1720))
+
+        # When
+        result = normalize_image(photo, max_edge=860)
+
+        # Then
+        assert result is not None
+        assert len(result) < len(photo)
+        assert Image.open(io.BytesIO(result)).size == (590, 860)
+
+    def test_normalize_image_exif_orientation(self) -> None:
+        """
+        MUT
+        ---
+        `normalize_image`
+
+        Description
+        -----------
+        + Given：EXIF 標示需旋轉 90 度的橫向照片
+        + When：當正規化
+        + Then：應轉正成直向，且不再帶 EXIF
+        """
+        # Given
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        photo = encode(Image.new("RGB", (300, 200), (200, 150, 80)), exif=exif)
+
+        # When
+        result = normalize_image(photo, max_edge=1000)
+
+        # Then
+        assert result is not None
+        image = Image.open(io.BytesIO(result))
+        assert image.size == (200, 300)
+        assert 0x0112 not in image.getexif()
+
+    def test_normalize_image_png(self) -> None:
+        """
+        MUT
+        ---
+        `normalize_image`
+
+        Description
+        -----------
+        + Given：左上角透明的 PNG 截圖
+        + When：當正規化
+        + Then：應以白色填滿透明背景，轉成較小的 JPEG
+        """
+        # Given
+        pixels = np.random.default_rng(0).integers(0, 256, (200, 300, 4), dtype=np.uint8)
+        pixels[:20, :20] = 0
+        pixels[20:, :, 3] = pixels[:20, 20:, 3] = 255
+        photo = encode(Image.fromarray(pixels, "RGBA"), "PNG")
+
+        # When
+        result = normalize_image(photo, max_edge=1000)
+
+        # Then
+        assert result is not None
+        image = Image.open(io.BytesIO(result))
+        assert len(result) < len(photo)
+        assert image.format == "JPEG"
+        assert all(channel > 245 for channel in image.getpixel((5, 5)))
+
+    def test_normalize_image_already_small(self, make_card_photo: Callable[..., bytes]) -> None:
+        """
+        MUT
+        ---
+        `normalize_image`
+
+        Description
+        -----------
+        + Given：不必轉正、不超過最長邊的 JPEG
+        + When：當正規化
+        + Then：應回傳 None (沿用原圖)
+        """
+        # Then
+        assert normalize_image(make_card_photo(0), max_edge=1000) is None
+
+
+class TestUploadNormalizer:
+    """
+    ## CUT
+    `UploadNormalizer`
+    """
+
+    def test_normalize(
+        self, upload_normalizer: UploadNormalizer, make_card_photo: Callable[..., bytes]
+    ) -> None:
+        """
+        MUT
+        ---
+        `UploadNormalizer.normalize`
+
+        Description
+        -----------
+        + Given：upload_normalizer 物件
+        + When：當正規化超過最長邊的照片，與不需正規化的照片
+        + Then：應回報每次節省的 bytes，並累計統計
+        """
+        # Given
+        large_photo = make_card_photo(0)
+        small_photo = make_card_photo(0, size=(200, 290))
+
+        # When
+        large = upload_normalizer.normalize(large_photo)
+        small = upload_normalizer.normalize(small_photo)
+
+        # Then
+        assert large.original_size == len(large_photo)
+        assert large.bytes_saved > 0
+        assert small == NormalizedUpload(small_photo, len(small_photo))
+        assert small.bytes_saved == 0
+        assert upload_normalizer.stats() == {
+            "normalized": 1,
+            "skipped": 1,
+            "bytes_in": len(large_photo) + len(small_photo),
+            "bytes_out": len(large.image_bytes) + len(small_photo),
+            "bytes_saved": large.bytes_saved,
+        }
+
+    def test_normalize_fallback(
+        self, mocker: MockerFixture, mock_logger: MockType, upload_normalizer: UploadNormalizer
+    ) -> None:
+        """
+        MUT
+        ---
+        `UploadNormalizer.normalize`
+
+        Description
+        -----------
+        + Given：upload_normalizer 物件
+        + When：當圖片無法解碼、像素數過多 (解壓縮炸彈)、行程池已滿，或子行程異常結束
+        + Then：應沿用原圖並記錄警告，不等待行程池
+        """
+        # Given
+        bomb = png_bomb(50000, 50000)
+        broken: Future[bytes | None] = Future()
+        broken.set_exception(BrokenProcessPool("worker died"))
+
+        # When
+        undecodable = upload_normalizer.normalize(b"not an image")
+        decompression_bomb = upload_normalizer.normalize(bomb)
+        mocker.patch.object(upload_normalizer._pool, "submit", return_value=None)
+        pool_full = upload_normalizer.normalize(b"photo")
+        mocker.patch.object(upload_normalizer._pool, "submit", return_value=broken)
+        pool_broken = upload_normalizer.normalize(b"photo")
+
+        # Then
+        assert undecodable == NormalizedUpload(b"not an image", 12)
+        assert decompression_bomb == NormalizedUpload(bomb, len(bomb))
+        assert pool_full == NormalizedUpload(b"photo", 5)
+        assert pool_broken == NormalizedUpload(b"photo", 5)
+        assert mock_logger.warning.call_count == 4
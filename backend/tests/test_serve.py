@@ -0,0 +1,114 @@
+# standard library
+import logging
+import os
+import signal
+import socket
+import time
+import urllib.request
+
+# 3rd party library
+import pytest
+from flask import Flask
+
+# local module
+from src.serve import PreforkServer, _app_config
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+def _get(url: str, timeout: float = 5.0) -> str:
+    """重試到 worker 開始回應為止"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return response.read().decode()
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+class TestPreforkServer:
+    """
+    CUT
+    ---
+    `PreforkServer`
+    """
+
+    def test_invalid_workers(self) -> None:
+        """
+        MUT
+        ---
+        `PreforkServer.__init__`
+
+        Description
+        -----------
+        + Given：不合法的 workers
+        + When：當建立 `PreforkServer`
+        + Then：應拋出 `ValueError`
+        """
+        with pytest.raises(ValueError, match="workers must >= 1!"):
+            PreforkServer(Flask(__name__), socket.socket(), workers=0, logger=logging.getLogger())
+
+    def test_serve_forever(self) -> None:
+        """
+        MUT
+        ---
+        `PreforkServer.serve_forever`
+
+        Description
+        -----------
+        + Given：fork 前就建立好的 app 與 listening socket
+        + When：當 master 啟動兩個 worker 後收到 SIGTERM
+        + Then：請求應由 worker (不是 master) 處理，且 master 會停止所有 worker 後結束
+        """
+        # Given
+        app = Flask(__name__)
+        app.add_url_rule("/pid", "pid", lambda: str(os.getpid()))
+        listener = socket.create_server(("127.0.0.1", 0))
+        port = listener.getsockname()[1]
+
+        # When
+        master_pid = os.fork()
+        if master_pid == 0:  # pragma: no cover (子行程)
+            try:
+                PreforkServer(
+                    app, listener, workers=2, logger=logging.getLogger("prefork")
+                ).serve_forever()
+            finally:
+                os._exit(0)
+        listener.close()
+
+        try:
+            worker_pid = int(_get(f"http://127.0.0.1:{port}/pid"))
+        finally:
+            os.kill(master_pid, signal.SIGTERM)
+            _, status = os.waitpid(master_pid, 0)
+
+        # Then
+        assert worker_pid not in (os.getpid(), master_pid)
+        assert os.waitstatus_to_exitcode(status) == 0
+        with pytest.raises(ProcessLookupError):
+            os.kill(worker_pid, 0)
+
+
+@pytest.mark.parametrize("workers, jobs_enabled", [(1, True), (2, False)])
+def test_app_config(workers: int, jobs_enabled: bool) -> None:
+    """
+    MUT
+    ---
+    `_app_config`
+
+    Description
+    -----------
+    + Given：worker 數量
+    + When：當取得 pre-fork 部署的 app 設定
+    + Then：應同步載入模型；多於一個 worker 時應關閉非同步翻譯工作 (工作只保存在單一 worker)
+    """
+    # When
+    config = _app_config(workers)
+
+    # Then
+    assert config["MODEL_BACKGROUND_LOADING"] is False
+    assert config.get("TRANSLATION_JOBS_ENABLED", True) is jobs_enabled
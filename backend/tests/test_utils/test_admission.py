@@ -0,0 +1,195 @@
+# standard library
+import threading
+
+# 3rd party library
+import pytest
+from pytest_mock import MockerFixture
+
+# local module
+from src.utils.admission import AdmissionController, AdmissionRejectedError, TokenBucket
+
+
+class TestTokenBucket:
+    """
+    ## CUT
+    `TokenBucket`
+    """
+
+    def test_take(self, mocker: MockerFixture) -> None:
+        """
+        MUT
+        ---
+        `TokenBucket.take`
+
+        Description
+        -----------
+        + Given：每秒補充 2 個、最多 3 個 token 的 token_bucket 物件
+        + When：當連續取出 token，並在一段時間後再取出
+        + Then：token 用完時應回傳需要等待的秒數，時間經過後應補充 token
+        """
+        # Given
+        mock_monotonic = mocker.patch("src.utils.admission.time.monotonic", return_value=100.0)
+        token_bucket = TokenBucket(rate=2, burst=3)
+
+        # When / Then
+        assert [token_bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert token_bucket.take() == pytest.approx(0.5)
+        assert token_bucket.take(cost=10) == pytest.approx(1.5)
+
+        mock_monotonic.return_value = 100.5
+        assert token_bucket.take() == 0.0
+        assert token_bucket.take() == pytest.approx(0.5)
+
+
+class TestAdmissionController:
+    """
+    ## CUT
+    `AdmissionController`
+    """
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"max_in_flight": 0, "max_queue_size": 0},
+            {"max_in_flight": 1, "max_queue_size": -1},
+            {"max_in_flight": 1, "max_queue_size": 0, "service_time_smoothing": 0},
+        ],
+    )
+    def test_init_valueerror(self, kwargs: dict[str, float]) -> None:
+        """
+        MUT
+        ---
+        `AdmissionController.__init__`
+
+        Description
+        -----------
+        + Given：不合法的參數
+        + When：當建立 admission 物件
+        + Then：應拋出 ValueError
+        """
+        # Then
+        with pytest.raises(ValueError):
+            AdmissionController(**kwargs)
+
+    def test_admit_rate_limited(self) -> None:
+        """
+        MUT
+        ---
+        `AdmissionController.admit`
+
+        Description
+        -----------
+        + Given：每個 client 最多連續 2 個請求的 admission 物件
+        + When：當同一個 client 連續發出 3 個請求
+        + Then：第 3 個請求應以 429 拒絕，其他 client 不受影響
+        """
+        # Given
+        admission = AdmissionController(max_in_flight=4, max_queue_size=0, rate=0.1, burst=2)
+
+        # When
+        for _ in range(2):
+            admission.admit("client-a", timeout=1).release()
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            admission.admit("client-a", timeout=1)
+
+        # Then
+        assert exc_info.value.status == 429
+        assert exc_info.value.retry_after == pytest.approx(10, rel=0.01)
+        admission.admit("client-b", timeout=1).release()
+        assert admission.stats()["rate_limited"] == 1
+
+    def test_admit_queue_full(self) -> None:
+        """
+        MUT
+        ---
+        `AdmissionController.admit`
+
+        Description
+        -----------
+        + Given：名額已用完、不允許排隊的 admission 物件
+        + When：當再有請求
+        + Then：應立即以 503 拒絕，名額歸還後即可接受
+        """
+        # Given
+        admission = AdmissionController(max_in_flight=1, max_queue_size=0)
+        ticket = admission.admit("client", timeout=1)
+
+        # When
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            admission.admit("client", timeout=1)
+
+        # Then
+        assert exc_info.value.status == 503
+        ticket.release()
+        ticket.release()
+        with admission.admit("client", timeout=1):
+            assert admission.stats()["in_flight"] == 1
+        stats = admission.stats()
+        assert stats["in_flight"] == 0
+        assert stats["admitted"] == 2
+        assert stats["shed"] == 1
+
+    def test_admit_estimated_wait_exceeds_deadline(self) -> None:
+        """
+        MUT
+        ---
+        `AdmissionController.admit`
+
+        Description
+        -----------
+        + Given：名額已用完、平均每個請求執行 10 秒的 admission 物件
+        + When：當期限為 5 秒與 1 秒的請求抵達
+        + Then：預估排隊時間超過期限的請求應立即以 503 拒絕，並建議預估的秒數後重試；
+                期限內仍等不到名額的請求也應以 503 拒絕
+        """
+        # Given
+        admission = AdmissionController(max_in_flight=1, max_queue_size=4)
+        admission.service_time = 10.0
+        ticket = admission.admit("client", timeout=1)
+
+        # When
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            admission.admit("client", timeout=5)
+
+        # Then
+        assert exc_info.value.status == 503
+        assert exc_info.value.retry_after == pytest.approx(10)
+
+        admission.service_time = 0.01
+        with pytest.raises(AdmissionRejectedError, match="timed out in queue"):
+            admission.admit("client", timeout=0.05)
+        assert admission.stats()["queued"] == 0
+        ticket.release()
+
+    def test_admit_waits_for_slot(self) -> None:
+        """
+        MUT
+        ---
+        `AdmissionController.admit`
+
+        Description
+        -----------
+        + Given：名額已用完、允許排隊的 admission 物件
+        + When：當再有請求，之後名額被歸還
+        + Then：請求應排隊等待，取得歸還的名額
+        """
+        # Given
+        admission = AdmissionController(max_in_flight=1, max_queue_size=1)
+        ticket = admission.admit("client", timeout=1)
+        admitted = threading.Event()
+
+        def admit() -> None:
+            with admission.admit("client", timeout=5):
+                admitted.set()
+
+        # When
+        thread = threading.Thread(target=admit)
+        thread.start()
+        while admission.stats()["queued"] == 0:
+            threading.Event().wait(0.001)
+        ticket.release()
+        thread.join(5)
+
+        # Then
+        assert admitted.is_set()
+        assert admission.stats()["admitted"] == 2
@@ -0,0 +1,100 @@
+# standard library
+import threading
+
+# 3rd party library
+import pytest
+from pytest_mock import MockType
+
+# local module
+from src.utils.background_loader import BackgroundLoader, NotReadyError
+
+
+class TestBackgroundLoader:
+    """
+    CUT
+    ---
+    `BackgroundLoader`
+    """
+
+    def test_start(self, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `BackgroundLoader.start`
+
+        Description
+        -----------
+        + Given：載入中會卡住的 loader
+        + When：當在背景開始載入
+        + Then：載入完成前 `get` 應拋出 `NotReadyError`，完成後可取得資源
+        """
+        # Given
+        release = threading.Event()
+
+        def load() -> str:
+            release.wait()
+            return "model"
+
+        loader = BackgroundLoader(load, logger=mock_logger, name="model")
+
+        # When
+        loader.start()
+
+        # Then
+        assert loader.ready is False
+        with pytest.raises(NotReadyError):
+            loader.get()
+
+        release.set()
+        assert loader.wait(timeout=5) is True
+        assert loader.get() == "model"
+        assert loader.load_seconds is not None
+
+    def test_start_failed(self, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `BackgroundLoader.start`
+
+        Description
+        -----------
+        + Given：載入會失敗的 loader
+        + When：當在背景開始載入
+        + Then：應記錄錯誤 (不拋出)，並視為載入失敗
+        """
+
+        # Given
+        def load() -> str:
+            raise RuntimeError("boom")
+
+        loader = BackgroundLoader(load, logger=mock_logger, name="model")
+
+        # When
+        loader.start()
+
+        # Then
+        assert loader.wait(timeout=5) is False
+        assert loader.failed is True
+        assert isinstance(loader.error, RuntimeError)
+        with pytest.raises(NotReadyError):
+            loader.get()
+
+    def test_load(self, mock_logger: MockType) -> None:
+        """
+        MUT
+        ---
+        `BackgroundLoader.load`
+
+        Description
+        -----------
+        + Given：loader 物件
+        + When：當同步載入
+        + Then：成功時回傳資源，失敗時直接拋出
+        """
+        assert BackgroundLoader(lambda: 42, logger=mock_logger, name="n").load() == 42
+
+        def load() -> int:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            BackgroundLoader(load, logger=mock_logger, name="n").load()
@@ -0,0 +1,305 @@
+# standard library
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+
+# 3rd party library
+import pytest
+from pytest_mock import MockerFixture
+
+# local module
+from src.utils.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    all_deadlines,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+    iterate_in_scope,
+)
+
+
+class TestDeadline:
+    """
+    ## CUT
+    `Deadline`
+    """
+
+    def test_expired(self, mocker: MockerFixture) -> None:
+        """
+        MUT
+        ---
+        `Deadline.expired` / `Deadline.remaining`
+
+        Description
+        -----------
+        + Given：10 秒後到期的 deadline 物件，以及以它為上層的子期限
+        + When：當時間經過
+        + Then：剩餘時間應遞減，到期後 (含子期限) 應視為到期並拋出 `DeadlineExceededError`
+        """
+        # Given
+        mock_monotonic = mocker.patch("src.utils.deadline.time.monotonic", return_value=100.0)
+        deadline = Deadline(10)
+        child = Deadline(parent=deadline)
+
+        # When / Then
+        mock_monotonic.return_value = 104.0
+        assert deadline.remaining() == pytest.approx(6)
+        assert child.remaining() == pytest.approx(6)
+        assert not child.expired
+
+        mock_monotonic.return_value = 110.0
+        assert deadline.expired
+        assert child.expired
+        assert child.remaining() == 0
+        with pytest.raises(DeadlineExceededError):
+            child.check()
+
+    def test_cancel(self) -> None:
+        """
+        MUT
+        ---
+        `Deadline.cancel` / `Deadline.sleep`
+
+        Description
+        -----------
+        + Given：沒有期限的 deadline 物件
+        + When：當等待中被其他執行緒取消
+        + Then：等待應提早結束並拋出 `DeadlineExceededError`，上層不受子期限取消影響
+        """
+        # Given
+        deadline = Deadline()
+        child = Deadline(parent=deadline)
+        assert deadline.remaining() is None
+
+        # When
+        timer = threading.Timer(0.01, child.cancel)
+        timer.start()
+        started_at = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            child.sleep(10)
+
+        # Then
+        assert time.monotonic() - started_at < 5
+        assert not deadline.expired
+
+    def test_sleep_wakes_on_parent_cancel(self) -> None:
+        """
+        MUT
+        ---
+        `Deadline.sleep`
+
+        Description
+        -----------
+        + Given：以沒有期限的 deadline 為上層的子期限
+        + When：當子期限等待中，上層被其他執行緒取消
+        + Then：等待應提早結束並拋出 `DeadlineExceededError`；未被取消時應睡滿指定秒數後返回
+        """
+        # Given
+        deadline = Deadline()
+        child = Deadline(parent=deadline)
+        child.sleep(0.01)
+
+        # When
+        timer = threading.Timer(0.01, deadline.cancel)
+        timer.start()
+        started_at = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            child.sleep(10)
+
+        # Then
+        assert time.monotonic() - started_at < 5
+
+    def test_asleep(self) -> None:
+        """
+        MUT
+        ---
+        `Deadline.asleep`
+
+        Description
+        -----------
+        + Given：以沒有期限的 deadline 為上層的子期限
+        + When：當子期限在 event loop 上等待，同時執行其他 coroutine，之後上層被其他執行緒取消
+        + Then：等待時應讓出 event loop (其他 coroutine 照常執行)；
+                上層被取消時應提早醒來並拋出 `DeadlineExceededError`
+        """
+        # Given
+        deadline = Deadline()
+        child = Deadline(parent=deadline)
+        ticks: list[int] = []
+
+        async def tick() -> None:
+            for i in range(3):
+                ticks.append(i)
+                await asyncio.sleep(0)
+
+        async def sleep_and_tick() -> None:
+            await asyncio.gather(child.asleep(0.01), tick())
+
+        asyncio.run(sleep_and_tick())
+
+        # When
+        timer = threading.Timer(0.01, deadline.cancel)
+        timer.start()
+        started_at = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(child.asleep(10))
+
+        # Then
+        assert ticks == [0, 1, 2]
+        assert time.monotonic() - started_at < 5
+
+
+def test_all_deadlines() -> None:
+    """
+    MUT
+    ---
+    `all_deadlines`
+
+    Description
+    -----------
+    + Given：多個期限
+    + When：當合併期限
+    + Then：全部到期時才到期；任一個沒有期限時回傳 None
+    """
+    # Given
+    deadlines = [Deadline(60), Deadline(60)]
+
+    # When
+    merged = all_deadlines(deadlines)
+
+    # Then
+    assert merged is not None
+    deadlines[0].cancel()
+    assert not merged.expired
+    deadlines[1].cancel()
+    assert merged.expired
+
+    assert all_deadlines([deadlines[0]]) is deadlines[0]
+    assert all_deadlines([deadlines[0], None]) is None
+    assert all_deadlines([]) is None
+
+
+def test_all_deadlines_cancel() -> None:
+    """
+    MUT
+    ---
+    `AllDeadlines.cancel`
+
+    Description
+    -----------
+    + Given：合併兩個尚未到期的期限
+    + When：當取消合併後的期限
+    + Then：合併期限 (含以它為上層的子期限) 應視為到期，各成員不受影響
+    """
+    # Given
+    deadlines = [Deadline(60), Deadline()]
+    merged = all_deadlines(deadlines)
+    assert merged is not None
+    child = Deadline(parent=merged)
+
+    # When
+    merged.cancel()
+
+    # Then
+    assert merged.expired
+    assert merged.remaining() == 0
+    assert child.expired
+    assert not any(deadline.expired for deadline in deadlines)
+
+
+@pytest.mark.parametrize("cancel_merged", [False, True])
+def test_all_deadlines_sleep(cancel_merged: bool) -> None:
+    """
+    MUT
+    ---
+    `AllDeadlines.sleep`
+
+    Description
+    -----------
+    + Given：合併兩個沒有期限的期限
+    + When：當等待中，所有成員 (或合併期限本身) 被其他執行緒取消
+    + Then：等待應提早結束並拋出 `DeadlineExceededError`
+    """
+    # Given
+    deadlines = [Deadline(), Deadline()]
+    merged = all_deadlines(deadlines)
+    assert merged is not None
+
+    def cancel() -> None:
+        if cancel_merged:
+            merged.cancel()
+        else:
+            for deadline in deadlines:
+                deadline.cancel()
+
+    # When
+    timer = threading.Timer(0.01, cancel)
+    timer.start()
+    started_at = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        merged.sleep(10)
+
+    # Then
+    assert time.monotonic() - started_at < 5
+
+
+def test_deadline_scope() -> None:
+    """
+    MUT
+    ---
+    `deadline_scope` / `check_deadline`
+
+    Description
+    -----------
+    + Given：已取消的期限
+    + When：當在範圍內與範圍外檢查
+    + Then：範圍內應拋出 `DeadlineExceededError`，離開範圍後恢復原本的期限
+    """
+    # Given
+    deadline = Deadline()
+    deadline.cancel()
+
+    # When / Then
+    with deadline_scope(deadline):
+        assert current_deadline() is deadline
+        with pytest.raises(DeadlineExceededError):
+            check_deadline()
+    assert current_deadline() is None
+    check_deadline()
+
+
+def test_iterate_in_scope() -> None:
+    """
+    MUT
+    ---
+    `iterate_in_scope`
+
+    Description
+    -----------
+    + Given：記錄目前期限的 generator
+    + When：當以 `iterate_in_scope` 逐一取值，並提早關閉
+    + Then：generator 每次取值與關閉時都在範圍內，呼叫端的 context 不受影響
+    """
+    # Given
+    deadline = Deadline()
+    seen: list[Deadline | None] = []
+
+    def events() -> Iterator[int]:
+        try:
+            for i in range(3):
+                seen.append(current_deadline())
+                yield i
+        finally:
+            seen.append(current_deadline())
+
+    # When
+    iterator = iterate_in_scope(events(), deadline)
+    assert next(iterator) == 0
+    assert current_deadline() is None
+    assert next(iterator) == 1
+    iterator.close()  # type: ignore[attr-defined]
+
+    # Then
+    assert seen == [deadline, deadline, deadline]
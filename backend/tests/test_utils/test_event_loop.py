@@ -0,0 +1,44 @@
+# standard library
+import asyncio
+import threading
+
+# local module
+from src.utils.event_loop import EventLoopThread
+
+
+class TestEventLoopThread:
+    """
+    ## CUT
+    `EventLoopThread`
+    """
+
+    def test_submit(self) -> None:
+        """
+        MUT
+        ---
+        `EventLoopThread.submit` / `EventLoopThread.close`
+
+        Description
+        -----------
+        + Given：event_loop_thread 物件
+        + When：當從其他執行緒提交 coroutine，之後停止 event loop 再提交一次
+        + Then：coroutine 應在專屬的執行緒上執行並回傳結果；停止後會啟動新的 event loop
+        """
+        # Given
+        event_loop_thread = EventLoopThread("test-event-loop")
+
+        async def work(value: int) -> tuple[int, str]:
+            await asyncio.sleep(0)
+            return value, threading.current_thread().name
+
+        # When
+        result = event_loop_thread.submit(work(1)).result(timeout=5)
+        first_loop = event_loop_thread.loop
+        event_loop_thread.close()
+        again = event_loop_thread.submit(work(2)).result(timeout=5)
+
+        # Then
+        assert result == (1, "test-event-loop")
+        assert again == (2, "test-event-loop")
+        assert event_loop_thread.loop is not first_loop
+        event_loop_thread.close()
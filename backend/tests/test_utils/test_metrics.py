@@ -0,0 +1,89 @@
+# local module
+from src.utils.metrics import (
+    LatencyRecorder,
+    proportional_set_size_bytes,
+    resident_memory_bytes,
+)
+
+
+def test_resident_memory_bytes() -> None:
+    """
+    MUT
+    ---
+    `resident_memory_bytes`
+
+    Description
+    -----------
+    + Given：目前的行程
+    + When：當呼叫 `resident_memory_bytes`
+    + Then：應回傳正整數 (byte)
+    """
+    resident_memory = resident_memory_bytes()
+    assert resident_memory is None or resident_memory > 0
+
+
+def test_proportional_set_size_bytes() -> None:
+    """
+    MUT
+    ---
+    `proportional_set_size_bytes`
+
+    Description
+    -----------
+    + Given：目前的行程
+    + When：當呼叫 `proportional_set_size_bytes`
+    + Then：應回傳不超過 RSS 的正整數 (byte)，無法取得時回傳 None
+    """
+    proportional_set_size = proportional_set_size_bytes()
+    resident_memory = resident_memory_bytes()
+    assert proportional_set_size is None or proportional_set_size > 0
+    if proportional_set_size is not None and resident_memory is not None:
+        assert proportional_set_size <= resident_memory * 1.1
+
+
+class TestLatencyRecorder:
+    """
+    CUT
+    ---
+    `LatencyRecorder`
+    """
+
+    def test_summary_empty(self) -> None:
+        """
+        MUT
+        ---
+        `LatencyRecorder.summary`
+
+        Description
+        -----------
+        + Given：沒有任何紀錄
+        + When：當呼叫 `summary`
+        + Then：只回傳筆數
+        """
+        assert LatencyRecorder().summary() == {"count": 0}
+
+    def test_summary(self) -> None:
+        """
+        MUT
+        ---
+        `LatencyRecorder.summary`
+
+        Description
+        -----------
+        + Given：1 ~ 100 秒共 100 筆紀錄，但 window 只保留最近 100 筆
+        + When：當呼叫 `summary`
+        + Then：百分位數應依最近的紀錄計算
+        """
+        # Given
+        recorder = LatencyRecorder(window=100)
+        recorder.record(1000.0)
+        for seconds in range(1, 101):
+            recorder.record(float(seconds))
+
+        # When
+        summary = recorder.summary()
+
+        # Then
+        assert summary["count"] == 101
+        assert summary["p50"] == 50.5
+        assert summary["max"] == 100.0
@@ -0,0 +1,202 @@
+# standard library
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures.process import BrokenProcessPool
+
+# 3rd party library
+import pytest
+
+# local module
+from src.utils import process_pool as process_pool_module
+from src.utils.process_pool import LazyProcessPool
+
+
+@pytest.fixture(scope="function")
+def process_pool() -> Iterator[LazyProcessPool]:
+    """
+    提供最多同時 2 個工作的 `LazyProcessPool` 物件 (測試結束時關閉)
+    """
+    process_pool = LazyProcessPool(1, max_pending=2)
+    yield process_pool
+    process_pool.close()
+
+
+class TestLazyProcessPool:
+    """
+    ## CUT
+    `LazyProcessPool`
+    """
+
+    @pytest.mark.parametrize("kwargs", [{"max_workers": 0}, {"max_workers": 1, "max_pending": 0}])
+    def test_init_valueerror(self, kwargs: dict[str, int]) -> None:
+        """
+        MUT
+        ---
+        `LazyProcessPool.__init__`
+
+        Description
+        -----------
+        + Given：不合法的參數
+        + When：當建立 process_pool 物件
+        + Then：應拋出 ValueError
+        """
+        # Then
+        with pytest.raises(ValueError):
+            LazyProcessPool(**kwargs)
+
+    def test_submit(self, process_pool: LazyProcessPool) -> None:
+        """
+        MUT
+        ---
+        `LazyProcessPool.submit`
+
+        Description
+        -----------
+        + Given：process_pool 物件
+        + When：當提交工作
+        + Then：應在另一個行程中執行
+        """
+        # When
+        future = process_pool.submit(os.getpid)
+
+        # Then
+        assert future is not None
+        assert future.result() != os.getpid()
+
+    def test_submit_max_pending(self, process_pool: LazyProcessPool) -> None:
+        """
+        MUT
+        ---
+        `LazyProcessPool.submit`
+
+        Description
+        -----------
+        + Given：最多同時 2 個工作的 process_pool 物件
+        + When：當已有 2 個工作未完成時再提交，以及工作完成後再提交
+        + Then：已滿時應直接回傳 None (不等待)，工作完成後可以再提交
+        """
+        # Given
+        running = [process_pool.submit(time.sleep, 0.2) for _ in range(2)]
+
+        # When
+        rejected = process_pool.submit(os.getpid)
+        for future in running:
+            assert future is not None
+            future.result()
+        accepted = process_pool.submit(os.getpid)
+
+        # Then
+        assert rejected is None
+        assert accepted is not None
+        accepted.result()
+
+    @pytest.mark.skipif(
+        "forkserver" not in multiprocessing.get_all_start_methods(), reason="no forkserver"
+    )
+    def test_submit_not_forked_from_app(self) -> None:
+        """
+        MUT
+        ---
+        `LazyProcessPool.submit`
+
+        Description
+        -----------
+        + Given：預先 import 模組的 process_pool 物件
+        + When：當提交工作
+        + Then：子行程不應直接從 app 行程 fork，而是從 fork server fork 出來
+        """
+        # Given
+        process_pool = LazyProcessPool(1, preload=["src.utils.process_pool"])
+
+        # When
+        try:
+            future = process_pool.submit(os.getppid)
+            assert future is not None
+            parent_pid = future.result()
+        finally:
+            process_pool.close()
+
+        # Then
+        assert parent_pid != os.getpid()
+
+    def test_submit_after_broken(self, process_pool: LazyProcessPool) -> None:
+        """
+        MUT
+        ---
+        `LazyProcessPool.submit`
+
+        Description
+        -----------
+        + Given：process_pool 物件
+        + When：當子行程異常結束後再提交工作
+        + Then：該工作應以 BrokenProcessPool 失敗，之後的工作改用新的行程池執行
+        """
+        # Given
+        crashed = process_pool.submit(os._exit, 1)
+        assert crashed is not None
+
+        # When
+        with pytest.raises(BrokenProcessPool):
+            crashed.result()
+        future = process_pool.submit(os.getpid)
+
+        # Then
+        assert future is not None
+        assert future.result() != os.getpid()
+
+    def test_preload_merged(self) -> None:
+        """
+        MUT
+        ---
+        `LazyProcessPool.__init__`
+
+        Description
+        -----------
+        + Given：預先 import 不同模組的兩個 process_pool 物件
+        + When：當建立 process_pool 物件 (fork server 是整個行程共用的)
+        + Then：兩個行程池的模組都應在 fork server 預先 import 的模組中
+        """
+        # When
+        pools = [
+            LazyProcessPool(1, preload=["src.image.card_geometry"]),
+            LazyProcessPool(1, preload=["src.image.upload_normalizer"]),
+        ]
+
+        # Then
+        assert {"src.image.card_geometry", "src.image.upload_normalizer"} <= (
+            process_pool_module._forkserver_preload
+        )
+        for pool in pools:
+            pool.close()
+
+    def test_preload_without_app(self) -> None:
+        """
+        MUT
+        ---
+        `LazyProcessPool.__init__`
+
+        Description
+        -----------
+        + Given：行程池預先 import 的 `src.image` 模組
+        + When：當在新的直譯器中 import
+        + Then：不應連帶載入 Flask 與 torch (`src/__init__.py` 不 import app)
+        """
+        # When
+        loaded = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, src.image.card_geometry, src.image.upload_normalizer; "
+                "print(sorted({'flask', 'torch'} & set(sys.modules)))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        # Then
+        assert loaded.strip() == "[]"
@@ -0,0 +1,289 @@
+# standard library
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party library
+import pytest
+
+# local module
+from src.utils.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+)
+from src.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """
+    ## CUT
+    `SingleFlight`
+    """
+
+    def test_do(self) -> None:
+        """
+        MUT
+        ---
+        `SingleFlight.do`
+
+        Description
+        -----------
+        + Given：single_flight 物件
+        + When：當 4 個執行緒同時以相同 key 執行工作，完成後再執行一次
+        + Then：同時進行時只執行一次，所有人取得相同結果；完成後不快取，會再執行
+        """
+        # Given
+        single_flight: SingleFlight[str, int] = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work() -> int:
+            calls.append(1)
+            release.wait()
+            return 42
+
+        # When
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(single_flight.do, "key", work) for _ in range(4)]
+            while single_flight.stats()["followers"] < 3:
+                threading.Event().wait(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+        again = single_flight.do("key", work)
+
+        # Then
+        assert results == [42] * 4
+        assert again == 42
+        assert len(calls) == 2
+        assert single_flight.stats() == {
+            "leaders": 2,
+            "followers": 3,
+            "retries": 0,
+            "in_flight": 0,
+        }
+
+    def test_do_exception(self) -> None:
+        """
+        MUT
+        ---
+        `SingleFlight.do`
+
+        Description
+        -----------
+        + Given：single_flight 物件
+        + When：當 leader 的工作拋出例外
+        + Then：leader 與所有 follower 都應收到相同的例外，之後的請求會重新執行
+        """
+        # Given
+        single_flight: SingleFlight[str, int] = SingleFlight()
+        release = threading.Event()
+
+        def work() -> int:
+            release.wait()
+            raise RuntimeError("OCR failed")
+
+        # When
+        with ThreadPoolExecutor(3) as executor:
+            futures = [executor.submit(single_flight.do, "key", work) for _ in range(3)]
+            while single_flight.stats()["followers"] < 2:
+                threading.Event().wait(0.001)
+            release.set()
+
+        # Then
+        for future in futures:
+            with pytest.raises(RuntimeError, match="OCR failed"):
+                future.result()
+        assert single_flight.do("key", lambda: 1) == 1
+
+    def test_do_short_deadline_leader(self) -> None:
+        """
+        MUT
+        ---
+        `SingleFlight.do`
+
+        Description
+        -----------
+        + Given：single_flight 物件
+        + When：當期限很短的 leader 與期限很長的 follower 等待同一個工作，工作超過 leader 的期限
+        + Then：工作應在所有等待者期限的合併下繼續執行，follower 取得結果，不會因 leader 到期而失敗
+        """
+        # Given
+        single_flight: SingleFlight[str, int] = SingleFlight()
+        started = threading.Event()
+        work_deadlines: list[Deadline | None] = []
+
+        def work() -> int:
+            work_deadlines.append(current_deadline())
+            started.set()
+            threading.Event().wait(0.3)
+            check_deadline()
+            return 42
+
+        def call(timeout: float) -> int:
+            with deadline_scope(Deadline(timeout)):
+                return single_flight.do("key", work)
+
+        # When
+        with ThreadPoolExecutor(2) as executor:
+            leader = executor.submit(call, 0.1)
+            started.wait()
+            follower = executor.submit(call, 30)
+            while single_flight.stats()["followers"] < 1:
+                threading.Event().wait(0.001)
+
+        # Then
+        assert follower.result() == 42
+        assert leader.result() == 42
+        assert len(work_deadlines) == 1
+
+    def test_do_leader_gave_up(self) -> None:
+        """
+        MUT
+        ---
+        `SingleFlight.do`
+
+        Description
+        -----------
+        + Given：single_flight 物件
+        + When：當 leader 的工作因期限拋出 `DeadlineExceededError`，follower 仍在期限內
+        + Then：follower 應重新執行工作並取得結果，而不是收到 leader 的例外
+        """
+        # Given
+        single_flight: SingleFlight[str, int] = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work() -> int:
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait()
+                raise DeadlineExceededError("leader deadline exceeded")
+            return 42
+
+        def call() -> int:
+            with deadline_scope(Deadline(30)):
+                return single_flight.do("key", work)
+
+        # When
+        with ThreadPoolExecutor(2) as executor:
+            leader = executor.submit(call)
+            while not calls:
+                threading.Event().wait(0.001)
+            follower = executor.submit(call)
+            while single_flight.stats()["followers"] < 1:
+                threading.Event().wait(0.001)
+            release.set()
+
+        # Then
+        with pytest.raises(DeadlineExceededError):
+            leader.result()
+        assert follower.result() == 42
+        assert len(calls) == 2
+        assert single_flight.stats()["retries"] == 1
+
+    def test_wait_deadline_exceeded(self) -> None:
+        """
+        MUT
+        ---
+        `SingleFlight.wait`
+
+        Description
+        -----------
+        + Given：single_flight 物件，leader 的工作執行中
+        + When：當 follower 的期限先到期，或 follower 被取消
+        + Then：follower 應在自己的期限拋出 `DeadlineExceededError`，leader 的工作不受影響
+        """
+        # Given
+        single_flight: SingleFlight[str, int] = SingleFlight()
+        future, leader = single_flight.begin("key")
+        cancelled = Deadline()
+        threading.Timer(0.05, cancelled.cancel).start()
+
+        # When / Then
+        for deadline in [Deadline(0.05), cancelled]:
+            with deadline_scope(deadline), pytest.raises(DeadlineExceededError):
+                single_flight.wait(single_flight.begin("key")[0])
+        assert leader
+        assert not future.done()
+        single_flight.finish("key", future, result=1)
+        assert future.result() == 1
+
+    def test_ado(self) -> None:
+        """
+        MUT
+        ---
+        `SingleFlight.ado`
+
+        Description
+        -----------
+        + Given：single_flight 物件
+        + When：當 4 個 coroutine 同時以相同 key 執行工作
+        + Then：只執行一次，所有人取得相同結果 (follower 等待時讓出 event loop，leader 才能完成)
+        """
+        # Given
+        single_flight: SingleFlight[str, int] = SingleFlight()
+        calls = []
+
+        async def work() -> int:
+            calls.append(1)
+            while single_flight.stats()["followers"] < 3:
+                await asyncio.sleep(0.001)
+            return 42
+
+        async def run_all() -> list[int]:
+            return await asyncio.gather(*(single_flight.ado("key", work) for _ in range(4)))
+
+        # When
+        results = asyncio.run(run_all())
+
+        # Then
+        assert results == [42] * 4
+        assert len(calls) == 1
+        assert single_flight.stats() == {
+            "leaders": 1,
+            "followers": 3,
+            "retries": 0,
+            "in_flight": 0,
+        }
+
+    def test_ado_leader_cancelled(self) -> None:
+        """
+        MUT
+        ---
+        `SingleFlight.ado`
+
+        Description
+        -----------
+        + Given：single_flight 物件，leader 的 coroutine 執行中
+        + When：當 leader 的 coroutine 被取消 (`asyncio.CancelledError`)
+        + Then：仍在期限內的 follower 應重新執行工作並取得結果
+        """
+        # Given
+        single_flight: SingleFlight[str, int] = SingleFlight()
+        calls = []
+
+        async def work() -> int:
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(10)
+            return 42
+
+        async def run() -> int:
+            leader = asyncio.create_task(single_flight.ado("key", work))
+            while not calls:
+                await asyncio.sleep(0)
+            follower = asyncio.create_task(single_flight.ado("key", work))
+            while single_flight.stats()["followers"] < 1:
+                await asyncio.sleep(0)
+
+            # When
+            leader.cancel()
+            return await follower
+
+        # Then
+        assert asyncio.run(run()) == 42
+        assert len(calls) == 2
+        assert single_flight.stats()["retries"] == 1
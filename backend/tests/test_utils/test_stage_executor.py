@@ -0,0 +1,135 @@
+# standard library
+import queue
+import threading
+from collections.abc import Iterator
+
+# 3rd party library
+import pytest
+
+# local module
+from src.utils.stage_executor import StageExecutor
+
+
+@pytest.fixture(scope="function")
+def stage() -> Iterator[StageExecutor]:
+    """
+    提供 1 個 worker、最多 1 個工作排隊的 `StageExecutor` 物件 (測試結束時關閉)
+    """
+    stage = StageExecutor("test", max_workers=1, max_queue_size=1)
+    yield stage
+    stage.close()
+
+
+class TestStageExecutor:
+    """
+    ## CUT
+    `StageExecutor`
+    """
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"max_workers": 0, "max_queue_size": 1}, {"max_workers": 1, "max_queue_size": -1}],
+    )
+    def test_init_valueerror(self, kwargs: dict[str, int]) -> None:
+        """
+        MUT
+        ---
+        `StageExecutor.__init__`
+
+        Description
+        -----------
+        + Given：不合法的參數
+        + When：當建立 stage 物件
+        + Then：應拋出 ValueError
+        """
+        # Then
+        with pytest.raises(ValueError):
+            StageExecutor("test", **kwargs)
+
+    def test_run(self, stage: StageExecutor) -> None:
+        """
+        MUT
+        ---
+        `StageExecutor.run`
+
+        Description
+        -----------
+        + Given：stage 物件
+        + When：當執行工作
+        + Then：應在 worker 執行緒執行並回傳結果，且記錄完成數與時間
+        """
+        # When
+        thread_name = stage.run(lambda: threading.current_thread().name)
+
+        # Then
+        assert thread_name.startswith("test")
+        stats = stage.stats()
+        assert stats["submitted"] == stats["completed"] == 1
+        assert stats["queue_depth"] == stats["running"] == 0
+        assert stats["run_latency"]["count"] == 1
+
+    def test_run_exception(self, stage: StageExecutor) -> None:
+        """
+        MUT
+        ---
+        `StageExecutor.run`
+
+        Description
+        -----------
+        + Given：stage 物件
+        + When：當工作拋出例外
+        + Then：呼叫端應收到例外，且記錄失敗數 (佇列位置會歸還)
+        """
+
+        # Given
+        def fail() -> None:
+            raise RuntimeError("boom")
+
+        # When
+        with pytest.raises(RuntimeError, match="boom"):
+            stage.run(fail)
+
+        # Then
+        assert stage.stats()["failed"] == 1
+        assert stage.run(lambda: "ok") == "ok"
+
+    def test_submit_backpressure(self, stage: StageExecutor) -> None:
+        """
+        MUT
+        ---
+        `StageExecutor.submit`
+
+        Description
+        -----------
+        + Given：worker 執行中、佇列也已滿的 stage 物件
+        + When：當再提交工作
+        + Then：應等待至逾時後拋出 queue.Full，worker 空出後即可繼續提交
+        """
+        # Given
+        started = threading.Event()
+        release = threading.Event()
+
+        def block() -> str:
+            started.set()
+            release.wait()
+            return "done"
+
+        running = stage.submit(block)
+        started.wait()
+        queued = stage.submit(lambda: "queued")
+
+        # When
+        with pytest.raises(queue.Full):
+            stage.submit(lambda: "rejected", timeout=0.05)
+
+        # Then
+        stats = stage.stats()
+        assert stats["running"] == 1
+        assert stats["queue_depth"] == 1
+        assert stats["max_queue_depth"] == 1
+        assert stats["rejected"] == 1
+
+        release.set()
+        assert running.result() == "done"
+        assert queued.result() == "queued"
+        assert stage.run(lambda: "next") == "next"